@@ -71,6 +71,7 @@
 #define WAIT_ABANDONED_0 ...
 #define WAIT_OBJECT_0 ...
 #define WAIT_TIMEOUT ...
+#define WAIT_IO_COMPLETION ...
 #define WAIT_FAILED ...
 #define INFINITE ...
 
@@ -105,6 +106,25 @@
 #define FILE_ATTRIBUTE_READONLY ...
 #define FILE_ATTRIBUTE_SYSTEM ...
 #define FILE_ATTRIBUTE_TEMPORARY ...
+#define FILE_ATTRIBUTE_DIRECTORY ...
+#define FILE_ATTRIBUTE_REPARSE_POINT ...
+#define IO_REPARSE_TAG_SYMLINK ...
+#define IO_REPARSE_TAG_MOUNT_POINT ...
+#define FIND_FIRST_EX_CASE_SENSITIVE ...
+#define FIND_FIRST_EX_LARGE_FETCH ...
+#define FILE_NOTIFY_CHANGE_FILE_NAME ...
+#define FILE_NOTIFY_CHANGE_DIR_NAME ...
+#define FILE_NOTIFY_CHANGE_ATTRIBUTES ...
+#define FILE_NOTIFY_CHANGE_SIZE ...
+#define FILE_NOTIFY_CHANGE_LAST_WRITE ...
+#define FILE_NOTIFY_CHANGE_LAST_ACCESS ...
+#define FILE_NOTIFY_CHANGE_CREATION ...
+#define FILE_NOTIFY_CHANGE_SECURITY ...
+#define FILE_ACTION_ADDED ...
+#define FILE_ACTION_REMOVED ...
+#define FILE_ACTION_MODIFIED ...
+#define FILE_ACTION_RENAMED_OLD_NAME ...
+#define FILE_ACTION_RENAMED_NEW_NAME ...
 #define FILE_FLAG_BACKUP_SEMANTICS ...
 #define FILE_FLAG_DELETE_ON_CLOSE ...
 #define FILE_FLAG_NO_BUFFERING ...
@@ -122,6 +142,19 @@
 #define OPEN_EXISTING ...
 #define TRUNCATE_EXISTING ...
 
+// Move methods for SetFilePointerEx
+#define FILE_BEGIN ...
+#define FILE_CURRENT ...
+#define FILE_END ...
+
+// Flags for SetFileCompletionNotificationModes
+// https://msdn.microsoft.com/en-us/library/aa365538
+#define FILE_SKIP_COMPLETION_PORT_ON_SUCCESS ...
+#define FILE_SKIP_SET_EVENT_ON_HANDLE ...
+
+// The value of OVERLAPPED.Internal while an operation is pending
+#define STATUS_PENDING ...
+
 // Flags for pywincffi.kernel32.pipe (may be shared with other modules too)
 #define PIPE_TYPE_MESSAGE ...
 #define PIPE_READMODE_BYTE ...
@@ -132,6 +165,15 @@
 #define PIPE_SERVER_END ...
 #define PIPE_TYPE_BYTE ...
 #define PIPE_TYPE_MESSAGE ...
+#define PIPE_ACCESS_DUPLEX ...
+#define PIPE_ACCESS_INBOUND ...
+#define PIPE_ACCESS_OUTBOUND ...
+#define PIPE_ACCEPT_REMOTE_CLIENTS ...
+#define PIPE_REJECT_REMOTE_CLIENTS ...
+#define PIPE_UNLIMITED_INSTANCES ...
+#define FILE_FLAG_FIRST_PIPE_INSTANCE ...
+#define NMPWAIT_USE_DEFAULT_WAIT ...
+#define NMPWAIT_WAIT_FOREVER ...
 
 // Flags for pywincffi.kernel32.handle
 #define HANDLE_FLAG_INHERIT ...
@@ -147,10 +189,35 @@
 #define MOVEFILE_REPLACE_EXISTING ...
 #define MOVEFILE_WRITE_THROUGH ...
 
+// Flags and progress routine return values for CopyFileEx
+// https://msdn.microsoft.com/en-us/library/aa363852
+// https://msdn.microsoft.com/en-us/library/aa363854
+#define COPY_FILE_FAIL_IF_EXISTS ...
+#define COPY_FILE_NO_BUFFERING ...
+#define PROGRESS_CONTINUE ...
+#define PROGRESS_CANCEL ...
+#define PROGRESS_STOP ...
+#define PROGRESS_QUIET ...
+
 // Flags for LockFileEx
 #define LOCKFILE_EXCLUSIVE_LOCK ...
 #define LOCKFILE_FAIL_IMMEDIATELY ...
 
+// Flags for pywincffi.kernel32.memory
+// https://msdn.microsoft.com/en-us/library/aa366887
+// https://msdn.microsoft.com/en-us/library/aa366786
+#define MEM_COMMIT ...
+#define MEM_RESERVE ...
+#define MEM_RESET ...
+#define MEM_DECOMMIT ...
+#define MEM_RELEASE ...
+#define PAGE_NOACCESS ...
+#define PAGE_READONLY ...
+#define PAGE_READWRITE ...
+#define FILE_MAP_ALL_ACCESS ...
+#define FILE_MAP_READ ...
+#define FILE_MAP_WRITE ...
+
 // General security
 #define SECURITY_ANONYMOUS ...
 #define SECURITY_CONTEXT_TRACKING ...
@@ -171,10 +238,29 @@
 #define ERROR_ALREADY_EXISTS ...
 #define ERROR_NOT_SAME_DEVICE ...
 #define ERROR_SHARING_VIOLATION ...
+#define ERROR_LOCK_VIOLATION ...
 #define ERROR_FILE_EXISTS ...
 #define ERROR_FILE_NOT_FOUND ...
 #define ERROR_PATH_NOT_FOUND ...
 #define ERROR_IO_PENDING ...
+#define ERROR_HANDLE_EOF ...
+#define ERROR_NO_MORE_FILES ...
+#define ERROR_NOTIFY_ENUM_DIR ...
+#define ERROR_OPERATION_ABORTED ...
+#define ERROR_IO_INCOMPLETE ...
+#define ERROR_NOT_FOUND ...
+#define ERROR_BROKEN_PIPE ...
+#define ERROR_PIPE_BUSY ...
+#define ERROR_PIPE_CONNECTED ...
+#define ERROR_PIPE_LISTENING ...
+#define ERROR_NO_DATA ...
+#define ERROR_MORE_DATA ...
+#define ERROR_SEM_TIMEOUT ...
+#define ERROR_NOT_OWNER ...
+#define ERROR_REQUEST_ABORTED ...
+#define ERROR_JOURNAL_DELETE_IN_PROGRESS ...
+#define ERROR_JOURNAL_NOT_ACTIVE ...
+#define ERROR_JOURNAL_ENTRY_DELETED ...
 
 // Events
 #define DELETE ...
@@ -351,6 +437,32 @@
 #define WSA_QOS_ESHAPERATEOBJ ...
 #define WSA_QOS_RESERVED_PETYPE ...
 
+// Device I/O
+#define FSCTL_QUERY_USN_JOURNAL ...
+#define FSCTL_READ_USN_JOURNAL ...
+#define FSCTL_ENUM_USN_DATA ...
+#define USN_REASON_DATA_OVERWRITE ...
+#define USN_REASON_DATA_EXTEND ...
+#define USN_REASON_DATA_TRUNCATION ...
+#define USN_REASON_NAMED_DATA_OVERWRITE ...
+#define USN_REASON_NAMED_DATA_EXTEND ...
+#define USN_REASON_NAMED_DATA_TRUNCATION ...
+#define USN_REASON_FILE_CREATE ...
+#define USN_REASON_FILE_DELETE ...
+#define USN_REASON_EA_CHANGE ...
+#define USN_REASON_SECURITY_CHANGE ...
+#define USN_REASON_RENAME_OLD_NAME ...
+#define USN_REASON_RENAME_NEW_NAME ...
+#define USN_REASON_INDEXABLE_CHANGE ...
+#define USN_REASON_BASIC_INFO_CHANGE ...
+#define USN_REASON_HARD_LINK_CHANGE ...
+#define USN_REASON_COMPRESSION_CHANGE ...
+#define USN_REASON_ENCRYPTION_CHANGE ...
+#define USN_REASON_OBJECT_ID_CHANGE ...
+#define USN_REASON_REPARSE_POINT_CHANGE ...
+#define USN_REASON_STREAM_CHANGE ...
+#define USN_REASON_CLOSE ...
+
 // Other
 #define FOREGROUND_RED ...
 #define FOREGROUND_GREEN ...
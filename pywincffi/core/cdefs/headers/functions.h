@@ -67,6 +67,35 @@ BOOL WINAPI SetNamedPipeHandleState(
   _In_opt_ LPDWORD lpCollectDataTimeout
 );
 
+// https://msdn.microsoft.com/en-us/aa365150
+HANDLE WINAPI CreateNamedPipe(
+  _In_     LPCTSTR               lpName,
+  _In_     DWORD                 dwOpenMode,
+  _In_     DWORD                 dwPipeMode,
+  _In_     DWORD                 nMaxInstances,
+  _In_     DWORD                 nOutBufferSize,
+  _In_     DWORD                 nInBufferSize,
+  _In_     DWORD                 nDefaultTimeOut,
+  _In_opt_ LPSECURITY_ATTRIBUTES lpSecurityAttributes
+);
+
+// https://msdn.microsoft.com/en-us/aa365146
+BOOL WINAPI ConnectNamedPipe(
+  _In_        HANDLE       hNamedPipe,
+  _Inout_opt_ LPOVERLAPPED lpOverlapped
+);
+
+// https://msdn.microsoft.com/en-us/aa365166
+BOOL WINAPI DisconnectNamedPipe(
+  _In_ HANDLE hNamedPipe
+);
+
+// https://msdn.microsoft.com/en-us/aa365800
+BOOL WINAPI WaitNamedPipe(
+  _In_ LPCTSTR lpNamedPipeName,
+  _In_ DWORD   nTimeOut
+);
+
 
 ///////////////////////
 // Files
@@ -132,6 +161,88 @@ BOOL WINAPI UnlockFileEx(
   _Inout_    LPOVERLAPPED lpOverlapped
 );
 
+// https://msdn.microsoft.com/en-us/aa365469
+BOOL WINAPI ReadFileScatter(
+  _In_       HANDLE               hFile,
+  _In_       FILE_SEGMENT_ELEMENT aSegmentArray[],
+  _In_       DWORD                nNumberOfBytesToRead,
+  _Reserved_ LPDWORD              lpReserved,
+  _Inout_    LPOVERLAPPED         lpOverlapped
+);
+
+// https://msdn.microsoft.com/en-us/aa365749
+BOOL WINAPI WriteFileGather(
+  _In_       HANDLE               hFile,
+  _In_       FILE_SEGMENT_ELEMENT aSegmentArray[],
+  _In_       DWORD                nNumberOfBytesToWrite,
+  _Reserved_ LPDWORD              lpReserved,
+  _Inout_    LPOVERLAPPED         lpOverlapped
+);
+
+// https://msdn.microsoft.com/en-us/aa365538
+BOOL WINAPI SetFileCompletionNotificationModes(
+  _In_ HANDLE FileHandle,
+  _In_ UCHAR  Flags
+);
+
+// https://msdn.microsoft.com/en-us/aa365539
+BOOL WINAPI SetFileInformationByHandle(
+  _In_ HANDLE                    hFile,
+  _In_ FILE_INFO_BY_HANDLE_CLASS FileInformationClass,
+  _In_ LPVOID                    lpFileInformation,
+  _In_ DWORD                     dwBufferSize
+);
+
+// https://msdn.microsoft.com/en-us/aa364953
+BOOL WINAPI GetFileInformationByHandleEx(
+  _In_  HANDLE                    hFile,
+  _In_  FILE_INFO_BY_HANDLE_CLASS FileInformationClass,
+  _Out_ LPVOID                    lpFileInformation,
+  _In_  DWORD                     dwBufferSize
+);
+
+// https://msdn.microsoft.com/en-us/aa365531
+BOOL WINAPI SetEndOfFile(
+  _In_ HANDLE hFile
+);
+
+// https://msdn.microsoft.com/en-us/aa365542
+BOOL WINAPI SetFilePointerEx(
+  _In_      HANDLE         hFile,
+  _In_      LARGE_INTEGER  liDistanceToMove,
+  _Out_opt_ PLARGE_INTEGER lpNewFilePointer,
+  _In_      DWORD          dwMoveMethod
+);
+
+// https://msdn.microsoft.com/en-us/aa364957
+BOOL WINAPI GetFileSizeEx(
+  _In_  HANDLE         hFile,
+  _Out_ PLARGE_INTEGER lpFileSize
+);
+
+// https://msdn.microsoft.com/en-us/aa364946
+BOOL WINAPI GetFileAttributesEx(
+  _In_  LPCTSTR                lpFileName,
+  _In_  GET_FILEEX_INFO_LEVELS fInfoLevelId,
+  _Out_ LPVOID                 lpFileInformation
+);
+
+// https://msdn.microsoft.com/en-us/aa364935
+BOOL WINAPI GetDiskFreeSpace(
+  _In_  LPCTSTR lpRootPathName,
+  _Out_ LPDWORD lpSectorsPerCluster,
+  _Out_ LPDWORD lpBytesPerSector,
+  _Out_ LPDWORD lpNumberOfFreeClusters,
+  _Out_ LPDWORD lpTotalNumberOfClusters
+);
+
+// https://msdn.microsoft.com/en-us/aa364996
+BOOL WINAPI GetVolumePathName(
+  _In_  LPCTSTR lpszFileName,
+  _Out_ LPTSTR  lpszVolumePathName,
+  _In_  DWORD   cchBufferLength
+);
+
 ///////////////////////
 // Files
 ///////////////////////
@@ -152,6 +263,14 @@ DWORD WINAPI WaitForSingleObject(
   _In_ DWORD  dwMilliseconds
 );
 
+// https://msdn.microsoft.com/en-us/ms687025
+DWORD WINAPI WaitForMultipleObjects(
+  _In_       DWORD  nCount,
+  _In_ const HANDLE *lpHandles,
+  _In_       BOOL   bWaitAll,
+  _In_       DWORD  dwMilliseconds
+);
+
 // https://msdn.microsoft.com/en-us/ms724329
 BOOL WINAPI GetHandleInformation(
   _In_  HANDLE  hObject,
@@ -186,6 +305,61 @@ DWORD WINAPI MsgWaitForMultipleObjects(
 );
 
 
+///////////////////////
+// Directories
+///////////////////////
+
+// https://msdn.microsoft.com/en-us/aa364419
+HANDLE WINAPI FindFirstFileEx(
+  _In_       LPCTSTR            lpFileName,
+  _In_       FINDEX_INFO_LEVELS fInfoLevelId,
+  _Out_      LPVOID             lpFindFileData,
+  _In_       FINDEX_SEARCH_OPS  fSearchOp,
+  _Reserved_ LPVOID             lpSearchFilter,
+  _In_       DWORD              dwAdditionalFlags
+);
+
+// https://msdn.microsoft.com/en-us/aa364428
+BOOL WINAPI FindNextFile(
+  _In_  HANDLE             hFindFile,
+  _Out_ LPWIN32_FIND_DATA  lpFindFileData
+);
+
+// https://msdn.microsoft.com/en-us/aa364413
+BOOL WINAPI FindClose(
+  _Inout_ HANDLE hFindFile
+);
+
+// https://msdn.microsoft.com/en-us/aa365465
+BOOL WINAPI ReadDirectoryChangesW(
+  _In_        HANDLE                          hDirectory,
+  _Out_       LPVOID                          lpBuffer,
+  _In_        DWORD                           nBufferLength,
+  _In_        BOOL                            bWatchSubtree,
+  _In_        DWORD                           dwNotifyFilter,
+  _Out_opt_   LPDWORD                         lpBytesReturned,
+  _Inout_opt_ LPOVERLAPPED                    lpOverlapped,
+  _In_opt_    LPOVERLAPPED_COMPLETION_ROUTINE lpCompletionRoutine
+);
+
+
+///////////////////////
+// Devices
+///////////////////////
+
+// https://msdn.microsoft.com/en-us/aa363216
+BOOL WINAPI DeviceIoControl(
+  _In_        HANDLE       hDevice,
+  _In_        DWORD        dwIoControlCode,
+  _In_opt_    LPVOID       lpInBuffer,
+  _In_        DWORD        nInBufferSize,
+  _Out_opt_   LPVOID       lpOutBuffer,
+  _In_        DWORD        nOutBufferSize,
+  _Out_opt_   LPDWORD      lpBytesReturned,
+  _Inout_opt_ LPOVERLAPPED lpOverlapped
+);
+
+
 ///////////////////////
 // Events
 ///////////////////////
@@ -205,11 +379,35 @@ HANDLE WINAPI OpenEvent(
   _In_ LPCTSTR lpName
 );
 
+// https://msdn.microsoft.com/en-us/ms682411
+HANDLE WINAPI CreateMutex(
+  _In_opt_ LPSECURITY_ATTRIBUTES lpMutexAttributes,
+  _In_     BOOL                  bInitialOwner,
+  _In_opt_ LPCTSTR               lpName
+);
+
+// https://msdn.microsoft.com/en-us/ms684315
+HANDLE WINAPI OpenMutex(
+  _In_ DWORD   dwDesiredAccess,
+  _In_ BOOL    bInheritHandle,
+  _In_ LPCTSTR lpName
+);
+
+// https://msdn.microsoft.com/en-us/ms685066
+BOOL WINAPI ReleaseMutex(
+  _In_ HANDLE hMutex
+);
+
 // https://msdn.microsoft.com/en-us/ms685081
 BOOL WINAPI ResetEvent(
   _In_ HANDLE hEvent
 );
 
+// https://msdn.microsoft.com/en-us/ms686211
+BOOL WINAPI SetEvent(
+  _In_ HANDLE hEvent
+);
+
 ///////////////////////
 // Communications
 ///////////////////////
@@ -251,6 +449,9 @@ int WSAEnumNetworkEvents(
 ///////////////////////
 HANDLE handle_from_fd(int);
 BOOL wsa_invalid_event(WSAEVENT);
+BOOL copy_file_ex(
+    LPCWSTR, LPCWSTR, COPY_PROGRESS_ROUTINE, LPVOID, LPBOOL, DWORD);
+BOOL get_overlapped_result_ex(HANDLE, LPOVERLAPPED, LPDWORD, DWORD, BOOL);
 
 ///////////////////////
 // Processes
@@ -283,6 +484,86 @@ BOOL WINAPI GetOverlappedResult(
   _In_  BOOL         bWait
 );
 
+// https://msdn.microsoft.com/en-us/aa363791
+BOOL WINAPI CancelIo(
+  _In_ HANDLE hFile
+);
+
+// https://msdn.microsoft.com/en-us/aa363792
+BOOL WINAPI CancelIoEx(
+  _In_     HANDLE       hFile,
+  _In_opt_ LPOVERLAPPED lpOverlapped
+);
+
+
+///////////////////////
+// Memory
+///////////////////////
+
+// https://msdn.microsoft.com/en-us/aa366887
+LPVOID WINAPI VirtualAlloc(
+  _In_opt_ LPVOID lpAddress,
+  _In_     SIZE_T dwSize,
+  _In_     DWORD  flAllocationType,
+  _In_     DWORD  flProtect
+);
+
+// https://msdn.microsoft.com/en-us/aa366892
+BOOL WINAPI VirtualFree(
+  _In_ LPVOID lpAddress,
+  _In_ SIZE_T dwSize,
+  _In_ DWORD  dwFreeType
+);
+
+// https://msdn.microsoft.com/en-us/ms724381
+void WINAPI GetSystemInfo(
+  _Out_ LPSYSTEM_INFO lpSystemInfo
+);
+
+// https://msdn.microsoft.com/en-us/aa366537
+HANDLE WINAPI CreateFileMapping(
+  _In_     HANDLE                hFile,
+  _In_opt_ LPSECURITY_ATTRIBUTES lpAttributes,
+  _In_     DWORD                 flProtect,
+  _In_     DWORD                 dwMaximumSizeHigh,
+  _In_     DWORD                 dwMaximumSizeLow,
+  _In_opt_ LPCTSTR               lpName
+);
+
+// https://msdn.microsoft.com/en-us/aa366791
+HANDLE WINAPI OpenFileMapping(
+  _In_ DWORD   dwDesiredAccess,
+  _In_ BOOL    bInheritHandle,
+  _In_ LPCTSTR lpName
+);
+
+// https://msdn.microsoft.com/en-us/aa366761
+LPVOID WINAPI MapViewOfFile(
+  _In_ HANDLE hFileMappingObject,
+  _In_ DWORD  dwDesiredAccess,
+  _In_ DWORD  dwFileOffsetHigh,
+  _In_ DWORD  dwFileOffsetLow,
+  _In_ SIZE_T dwNumberOfBytesToMap
+);
+
+// https://msdn.microsoft.com/en-us/aa366882
+BOOL WINAPI UnmapViewOfFile(
+  _In_ LPCVOID lpBaseAddress
+);
+
+// https://msdn.microsoft.com/en-us/ms683590
+LONG InterlockedExchange(
+  _Inout_ LONG volatile *Target,
+  _In_    LONG          Value
+);
+
+// https://msdn.microsoft.com/en-us/ms683560
+LONG InterlockedCompareExchange(
+  _Inout_ LONG volatile *Destination,
+  _In_    LONG          Exchange,
+  _In_    LONG          Comparand
+);
+
 
 // Used internally to reset the last error to 0
 // in cases where pywincffi is the cause of the
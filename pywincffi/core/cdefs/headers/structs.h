@@ -26,6 +26,31 @@ typedef struct _OVERLAPPED {
   HANDLE    hEvent;
 } OVERLAPPED, *LPOVERLAPPED;
 
+// https://msdn.microsoft.com/en-us/library/aa363813
+typedef void (WINAPI *LPOVERLAPPED_COMPLETION_ROUTINE)(
+  DWORD        dwErrorCode,
+  DWORD        dwNumberOfBytesTransfered,
+  LPOVERLAPPED lpOverlapped
+);
+
+// The progress routine called by copy_file_ex(), see main.c.  Unlike
+// LPPROGRESS_ROUTINE it only takes scalar arguments so it can be
+// implemented with ffi.callback().
+typedef DWORD (*COPY_PROGRESS_ROUTINE)(
+  LONGLONG TotalFileSize,
+  LONGLONG TotalBytesTransferred,
+  LPVOID   lpData
+);
+
+// https://msdn.microsoft.com/en-us/library/aa383713
+typedef union _LARGE_INTEGER {
+  struct {
+    DWORD LowPart;
+    LONG  HighPart;
+  };
+  LONGLONG QuadPart;
+} LARGE_INTEGER, *PLARGE_INTEGER;
+
 // https://msdn.microsoft.com/en-us/library/ms724284
 typedef struct _FILETIME {
   DWORD dwLowDateTime;
@@ -81,3 +106,66 @@ typedef struct _PROCESS_INFORMATION {
   DWORD  dwProcessId;
   DWORD  dwThreadId;
 } PROCESS_INFORMATION, *LPPROCESS_INFORMATION;
+
+// https://docs.microsoft.com/en-us/windows/win32/api/winnt/ns-winnt-file_segment_element
+//
+// The Buffer member is declared as PVOID64 which cffi can't represent
+// so the address of each buffer is stored using the Alignment member
+// instead.  Both members occupy the same 64 bits.
+typedef union _FILE_SEGMENT_ELEMENT {
+  ULONGLONG Alignment;
+} FILE_SEGMENT_ELEMENT, *PFILE_SEGMENT_ELEMENT;
+
+// https://msdn.microsoft.com/en-us/library/ms724958
+typedef struct _SYSTEM_INFO {
+  union {
+    DWORD  dwOemId;
+    struct {
+      WORD wProcessorArchitecture;
+      WORD wReserved;
+    };
+  };
+  DWORD     dwPageSize;
+  LPVOID    lpMinimumApplicationAddress;
+  LPVOID    lpMaximumApplicationAddress;
+  DWORD_PTR dwActiveProcessorMask;
+  DWORD     dwNumberOfProcessors;
+  DWORD     dwProcessorType;
+  DWORD     dwAllocationGranularity;
+  WORD      wProcessorLevel;
+  WORD      wProcessorRevision;
+} SYSTEM_INFO, *LPSYSTEM_INFO;
+
+// https://docs.microsoft.com/en-us/windows/win32/api/winbase/ns-winbase-file_allocation_info
+typedef struct _FILE_ALLOCATION_INFO {
+  LARGE_INTEGER AllocationSize;
+} FILE_ALLOCATION_INFO, *PFILE_ALLOCATION_INFO;
+
+// https://docs.microsoft.com/en-us/windows/win32/api/winbase/ns-winbase-file_end_of_file_info
+typedef struct _FILE_END_OF_FILE_INFO {
+  LARGE_INTEGER EndOfFile;
+} FILE_END_OF_FILE_INFO, *PFILE_END_OF_FILE_INFO;
+
+// https://msdn.microsoft.com/en-us/library/aa365739
+typedef struct _WIN32_FILE_ATTRIBUTE_DATA {
+  DWORD    dwFileAttributes;
+  FILETIME ftCreationTime;
+  FILETIME ftLastAccessTime;
+  FILETIME ftLastWriteTime;
+  DWORD    nFileSizeHigh;
+  DWORD    nFileSizeLow;
+} WIN32_FILE_ATTRIBUTE_DATA, *LPWIN32_FILE_ATTRIBUTE_DATA;
+
+// https://msdn.microsoft.com/en-us/library/aa365740
+typedef struct _WIN32_FIND_DATAW {
+  DWORD    dwFileAttributes;
+  FILETIME ftCreationTime;
+  FILETIME ftLastAccessTime;
+  FILETIME ftLastWriteTime;
+  DWORD    nFileSizeHigh;
+  DWORD    nFileSizeLow;
+  DWORD    dwReserved0;
+  DWORD    dwReserved1;
+  WCHAR    cFileName[260];
+  WCHAR    cAlternateFileName[14];
+} WIN32_FIND_DATA, *PWIN32_FIND_DATA, *LPWIN32_FIND_DATA;
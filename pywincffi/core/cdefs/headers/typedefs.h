@@ -11,3 +11,44 @@
 
 typedef int... SOCKET;
 typedef HANDLE WSAEVENT;  // according to winsock2.h
+typedef unsigned char UCHAR;
+
+// https://docs.microsoft.com/en-us/windows/win32/api/minwinbase/ne-minwinbase-file_info_by_handle_class
+typedef enum _FILE_INFO_BY_HANDLE_CLASS {
+  FileBasicInfo,
+  FileStandardInfo,
+  FileNameInfo,
+  FileRenameInfo,
+  FileDispositionInfo,
+  FileAllocationInfo,
+  FileEndOfFileInfo,
+  FileStreamInfo,
+  FileCompressionInfo,
+  FileAttributeTagInfo,
+  FileIdBothDirectoryInfo,
+  FileIdBothDirectoryRestartInfo,
+  FileIoPriorityHintInfo,
+  FileRemoteProtocolInfo,
+  ...
+} FILE_INFO_BY_HANDLE_CLASS;
+
+// https://msdn.microsoft.com/en-us/library/aa364413
+typedef enum _GET_FILEEX_INFO_LEVELS {
+  GetFileExInfoStandard,
+  GetFileExMaxInfoLevel
+} GET_FILEEX_INFO_LEVELS;
+
+// https://msdn.microsoft.com/en-us/library/aa364415
+typedef enum _FINDEX_INFO_LEVELS {
+  FindExInfoStandard,
+  FindExInfoBasic,
+  FindExInfoMaxInfoLevel
+} FINDEX_INFO_LEVELS;
+
+// https://msdn.microsoft.com/en-us/library/aa364416
+typedef enum _FINDEX_SEARCH_OPS {
+  FindExSearchNameMatch,
+  FindExSearchLimitToDirectories,
+  FindExSearchLimitToDevices,
+  FindExSearchMaxSearchOp
+} FINDEX_SEARCH_OPS;
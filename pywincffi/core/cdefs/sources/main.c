@@ -3,6 +3,7 @@
 #include <winerror.h>
 #include <TlHelp32.h>
 #include <windows.h>
+#include <winioctl.h>
 
 // Extra constants which are not defined in all versions of the Windows
 // SDK.  If cffi fails to find the value, it ends up being picked up from
@@ -39,6 +40,10 @@
     static const int INHERIT_PARENT_AFFINITY = 0x00010000;
 #endif
 
+#if !defined(COPY_FILE_NO_BUFFERING)
+    static const int COPY_FILE_NO_BUFFERING = 0x00001000;
+#endif
+
 HANDLE handle_from_fd(int fd) {
     return (HANDLE)_get_osfhandle(fd);
 }
@@ -49,3 +54,87 @@ HANDLE handle_from_fd(int fd) {
 BOOL wsa_invalid_event(WSAEVENT event) {
     return event == WSA_INVALID_EVENT;
 }
+
+// CopyFileExW() passes LARGE_INTEGER values, which are unions, to its
+// progress routine and cffi can't create callbacks which take unions.
+// copy_file_ex() installs a progress routine which forwards the sizes
+// to a COPY_PROGRESS_ROUTINE as LONGLONG values instead.
+typedef DWORD (*COPY_PROGRESS_ROUTINE)(LONGLONG, LONGLONG, LPVOID);
+
+typedef struct {
+    COPY_PROGRESS_ROUTINE lpProgressRoutine;
+    LPVOID lpData;
+} copy_progress_context;
+
+static DWORD CALLBACK copy_progress(
+        LARGE_INTEGER TotalFileSize, LARGE_INTEGER TotalBytesTransferred,
+        LARGE_INTEGER StreamSize, LARGE_INTEGER StreamBytesTransferred,
+        DWORD dwStreamNumber, DWORD dwCallbackReason, HANDLE hSourceFile,
+        HANDLE hDestinationFile, LPVOID lpData) {
+    copy_progress_context *context = (copy_progress_context *)lpData;
+    return context->lpProgressRoutine(
+        TotalFileSize.QuadPart, TotalBytesTransferred.QuadPart,
+        context->lpData);
+}
+
+BOOL copy_file_ex(
+        LPCWSTR lpExistingFileName, LPCWSTR lpNewFileName,
+        COPY_PROGRESS_ROUTINE lpProgressRoutine, LPVOID lpData,
+        LPBOOL pbCancel, DWORD dwCopyFlags) {
+    copy_progress_context context;
+
+    if (lpProgressRoutine == NULL) {
+        return CopyFileExW(
+            lpExistingFileName, lpNewFileName, NULL, NULL, pbCancel,
+            dwCopyFlags);
+    }
+
+    context.lpProgressRoutine = lpProgressRoutine;
+    context.lpData = lpData;
+    return CopyFileExW(
+        lpExistingFileName, lpNewFileName, copy_progress, &context,
+        pbCancel, dwCopyFlags);
+}
+
+// GetOverlappedResultEx() was added in Windows 8 so it's looked up at
+// runtime.  On older versions of Windows the wait is done with
+// WaitForSingleObjectEx() which reports timeouts and alerts the same way.
+typedef BOOL (WINAPI *GET_OVERLAPPED_RESULT_EX)(
+    HANDLE, LPOVERLAPPED, LPDWORD, DWORD, BOOL);
+
+BOOL get_overlapped_result_ex(
+        HANDLE hFile, LPOVERLAPPED lpOverlapped,
+        LPDWORD lpNumberOfBytesTransferred, DWORD dwMilliseconds,
+        BOOL bAlertable) {
+    static GET_OVERLAPPED_RESULT_EX function = NULL;
+    static BOOL resolved = FALSE;
+    HANDLE hObject;
+    DWORD result;
+
+    if (!resolved) {
+        function = (GET_OVERLAPPED_RESULT_EX)GetProcAddress(
+            GetModuleHandleW(L"kernel32.dll"), "GetOverlappedResultEx");
+        resolved = TRUE;
+    }
+
+    if (function != NULL) {
+        return function(
+            hFile, lpOverlapped, lpNumberOfBytesTransferred, dwMilliseconds,
+            bAlertable);
+    }
+
+    if (dwMilliseconds != 0) {
+        hObject = lpOverlapped->hEvent != NULL ? lpOverlapped->hEvent : hFile;
+        result = WaitForSingleObjectEx(hObject, dwMilliseconds, bAlertable);
+        if (result == WAIT_TIMEOUT || result == WAIT_IO_COMPLETION) {
+            SetLastError(result);
+            return FALSE;
+        }
+        if (result == WAIT_FAILED) {
+            return FALSE;
+        }
+    }
+
+    return GetOverlappedResult(
+        hFile, lpOverlapped, lpNumberOfBytesTransferred, FALSE);
+}
@@ -10,12 +10,17 @@ the pywincffi library:
 >>> from pywincffi.core import dist
 >>> ffi, lib = dist.load()
 
+Setting the ``PYWINCFFI_BACKEND`` environment variable to ``posix`` loads
+:class:`pywincffi.dev.posix.PosixLibrary` instead, which emulates a
+subset of the library so it can be used on hosts without Windows.
+
 The second is to facilitate a means of building a static
 library.  This is used by the setup.py during the install
 process to build and install pywincffi as well as a wheel
 for distribution.
 """
 
+import os
 import re
 import shutil
 import tempfile
@@ -27,7 +32,8 @@ from pkg_resources import resource_filename
 
 from cffi import FFI
 
-from pywincffi.exceptions import ResourceNotFoundError, InternalError
+from pywincffi.exceptions import (
+    ResourceNotFoundError, InternalError, ConfigurationError)
 
 imp = None  # pylint: disable=invalid-name
 ExtensionFileLoader = None  # pylint: disable=invalid-name
@@ -59,6 +65,7 @@ SOURCE_FILES = (
     resource_filename(
         "pywincffi", join("core", "cdefs", "sources", "main.c")), )
 LIBRARIES = ("kernel32", "user32", "Ws2_32")
+BACKENDS = ("cffi", "posix")
 REGEX_SAL_ANNOTATION = re.compile(
     r"\b(_In_|_Inout_|_Out_|_Outptr_|_Reserved_)(opt_)?\b")
 
@@ -93,7 +100,14 @@ class LibraryWrapper(object):  # pylint: disable=too-few-public-methods
         # Technically, this is not a Windows constant.  It's something that
         # pywincffi defines for ease of use and to limit the possibility of
         # typos.
-        MAX_COMMAND_LINE=32768
+        MAX_COMMAND_LINE=32768,
+
+        # Members of FILE_INFO_BY_HANDLE_CLASS which are only present in
+        # the Windows 8 SDK and later.  Being enum members they can't be
+        # conditionally defined in main.c.
+        # https://docs.microsoft.com/en-us/windows/win32/api/minwinbase/ne-minwinbase-file_info_by_handle_class
+        FileIdExtdDirectoryInfo=19,
+        FileIdExtdDirectoryRestartInfo=20
     )
 
     def __init__(self, library):
@@ -300,10 +314,27 @@ def load():
     """
     The main function used by pywincffi to load an instance of
     :class:`FFI` and the underlying library.
+
+    :raises pywincffi.exceptions.ConfigurationError:
+        Raised if the ``PYWINCFFI_BACKEND`` environment variable is not
+        one of :data:`BACKENDS`.
     """
     try:
         return Loader.get()
     except InternalError:
+        backend = os.environ.get("PYWINCFFI_BACKEND") or "cffi"
+        if backend not in BACKENDS:
+            raise ConfigurationError(
+                "PYWINCFFI_BACKEND must be one of %s, not %r" % (
+                    ", ".join(BACKENDS), backend))
+
+        if backend == "posix":
+            # pylint: disable=cyclic-import
+            from pywincffi.dev.posix import PosixLibrary
+            library = PosixLibrary()
+            Loader.set(library.ffi, library)
+            return Loader.get()
+
         try:
             import _pywincffi as pywincffi
         except ImportError:
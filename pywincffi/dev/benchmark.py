@@ -0,0 +1,456 @@
+"""
+Benchmark
+=========
+
+A module for developers which provides the timing harness used by
+``tools/benchmark.py`` along with a stand-in for the compiled library.
+The stand-in implements a small subset of ``kernel32`` on top of the
+:mod:`os` module so benchmarks can measure pywincffi's own overhead, such
+as batching and queuing, on hosts where the compiled library is not
+available.  It is not a substitute for running the benchmarks on Windows.
+"""
+
+from __future__ import print_function
+
+import array
+import json
+import os
+import stat
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from errno import (
+    ENOENT, ENOTDIR, EEXIST, EBADF, EPIPE, EACCES, EPERM, EISDIR, ENOSPC,
+    EMFILE)
+
+try:
+    import fcntl
+    import termios
+except ImportError:  # pragma: no cover
+    # Only the pipe functions of the stand-in library require these.
+    fcntl = termios = None
+
+from cffi import FFI
+
+from pywincffi.core import dist
+from pywincffi.core.logger import get_logger
+from pywincffi.kernel32.directory import FILETIME_EPOCH_OFFSET
+
+logger = get_logger("dev.benchmark")
+
+# Types used by the wrappers which the stand-in library supports.
+STAND_IN_CDEF = """
+typedef void *HANDLE, **PHANDLE, *LPVOID, *PVOID;
+typedef const void *LPCVOID;
+typedef unsigned long DWORD, *LPDWORD;
+typedef int BOOL;
+typedef long LONG;
+typedef unsigned long long ULONGLONG;
+typedef size_t SIZE_T;
+typedef const wchar_t *LPCWSTR, *LPCTSTR;
+typedef union {
+    struct {
+        DWORD LowPart;
+        LONG HighPart;
+    };
+    long long QuadPart;
+} LARGE_INTEGER, *PLARGE_INTEGER;
+typedef struct {
+    DWORD nLength;
+    LPVOID lpSecurityDescriptor;
+    BOOL bInheritHandle;
+} SECURITY_ATTRIBUTES, *LPSECURITY_ATTRIBUTES;
+typedef struct {
+    SIZE_T Internal;
+    SIZE_T InternalHigh;
+    union {
+        struct {
+            DWORD Offset;
+            DWORD OffsetHigh;
+        };
+        PVOID Pointer;
+    };
+    HANDLE hEvent;
+} OVERLAPPED, *LPOVERLAPPED;
+typedef struct {
+    DWORD dwLowDateTime;
+    DWORD dwHighDateTime;
+} FILETIME, *PFILETIME;
+typedef struct {
+    DWORD dwFileAttributes;
+    FILETIME ftCreationTime;
+    FILETIME ftLastAccessTime;
+    FILETIME ftLastWriteTime;
+    DWORD nFileSizeHigh;
+    DWORD nFileSizeLow;
+} WIN32_FILE_ATTRIBUTE_DATA, *LPWIN32_FILE_ATTRIBUTE_DATA;
+"""
+
+# Windows error codes reported by the stand-in library.  Any other errno
+# is reported as ERROR_GEN_FAILURE so a raw errno, which would be read as
+# an unrelated Windows error, never escapes.
+STAND_IN_ERRORS = {
+    ENOENT: 2,  # ERROR_FILE_NOT_FOUND
+    ENOTDIR: 3,  # ERROR_PATH_NOT_FOUND
+    EMFILE: 4,  # ERROR_TOO_MANY_OPEN_FILES
+    EACCES: 5,  # ERROR_ACCESS_DENIED
+    EPERM: 5,  # ERROR_ACCESS_DENIED
+    EISDIR: 5,  # ERROR_ACCESS_DENIED
+    EBADF: 6,  # ERROR_INVALID_HANDLE
+    EEXIST: 80,  # ERROR_FILE_EXISTS
+    EPIPE: 109,  # ERROR_BROKEN_PIPE
+    ENOSPC: 112,  # ERROR_DISK_FULL
+}
+
+# Changes the size of a pipe's buffer on Linux.
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+
+
+class BenchmarkResult(namedtuple(
+        "BenchmarkResult",
+        ("name", "seconds", "operations", "bytes", "parameters"))):
+    """
+    The result of a single benchmark run as returned by :func:`measure`.
+    """
+    @property
+    def operations_per_second(self):
+        """The number of operations completed per second"""
+        return self.operations / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        """The number of bytes processed per second"""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        """Returns the result as a dictionary suitable for json"""
+        result = dict(self._asdict())
+        result.update(
+            operations_per_second=self.operations_per_second,
+            bytes_per_second=self.bytes_per_second)
+        return result
+
+    def __str__(self):
+        return "%-32s %10.3fs %12.1f ops/s %10.2f MiB/s" % (
+            self.name, self.seconds, self.operations_per_second,
+            self.bytes_per_second / 1048576.0)
+
+
+def measure(name, function, operations=0, bytes_=0, repeat=1, **parameters):
+    """
+    Calls ``function`` ``repeat`` times and returns a
+    :class:`BenchmarkResult` for the fastest call.  ``parameters`` are
+    passed to ``function`` and recorded in the result.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function(**parameters)
+        elapsed = time.time() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    result = BenchmarkResult(
+        name=name, seconds=best, operations=operations, bytes=bytes_,
+        parameters=parameters)
+    logger.debug("%s", result)
+    return result
+
+
+def write_results(results, path):
+    """Writes a list of :class:`BenchmarkResult` objects to ``path``"""
+    with open(path, "w") as file_:
+        json.dump(
+            [result.as_dict() for result in results], file_,
+            indent=4, sort_keys=True)
+
+
+class StandInFFI(object):
+    """
+    Wraps an instance of :class:`FFI` which only knows about the types in
+    :data:`STAND_IN_CDEF` and adds a ``getwinerror()`` method backed by
+    the last error of the :class:`StandInLibrary`.
+    """
+    def __init__(self, library):
+        self._ffi = FFI()
+        self._ffi.cdef(STAND_IN_CDEF)
+        self._library = library
+
+    def getwinerror(self, code=-1):
+        """Mirrors ``ffi.getwinerror()`` for the stand-in library"""
+        if code == -1:
+            code = self._library.last_error
+        return code, os.strerror(code) if code else "No error"
+
+    def __getattr__(self, item):
+        return getattr(self._ffi, item)
+
+
+class StandInLibrary(object):
+    """
+    Implements the subset of the ``kernel32`` functions and constants used
+    by the benchmarks on top of the :mod:`os` module.  Handles are file
+    descriptors offset by one so a valid handle is never ``NULL``.
+    """
+    # pylint: disable=invalid-name,no-self-use,too-many-arguments
+    GENERIC_READ = 0x80000000
+    GENERIC_WRITE = 0x40000000
+    FILE_SHARE_READ = 0x00000001
+    FILE_SHARE_WRITE = 0x00000002
+    FILE_SHARE_DELETE = 0x00000004
+    FILE_ATTRIBUTE_READONLY = 0x00000001
+    FILE_ATTRIBUTE_DIRECTORY = 0x00000010
+    FILE_ATTRIBUTE_NORMAL = 0x00000080
+    CREATE_NEW = 1
+    CREATE_ALWAYS = 2
+    OPEN_EXISTING = 3
+    OPEN_ALWAYS = 4
+    TRUNCATE_EXISTING = 5
+    FILE_BEGIN = 0
+    FILE_CURRENT = 1
+    FILE_END = 2
+    ERROR_FILE_NOT_FOUND = 2
+    ERROR_ACCESS_DENIED = 5
+    ERROR_GEN_FAILURE = 31
+    ERROR_NOT_SUPPORTED = 50
+    ERROR_INVALID_PARAMETER = 87
+    ERROR_BROKEN_PIPE = 109
+    ERROR_ALREADY_EXISTS = 183
+    GetFileExInfoStandard = 0
+    INVALID_HANDLE_VALUE = -1
+
+    def __init__(self):
+        self.ffi = StandInFFI(self)
+        self._local = threading.local()
+
+    @property
+    def last_error(self):
+        """The last error set on the calling thread"""
+        return getattr(self._local, "last_error", 0)
+
+    def SetLastError(self, dwErrCode):
+        """Sets the last error for the calling thread"""
+        self._local.last_error = int(dwErrCode)
+
+    def _call(self, function, *args):
+        """
+        Calls ``function`` and translates an :class:`OSError` into a
+        last error, returning None.
+        """
+        try:
+            result = function(*args)
+        except (OSError, IOError) as error:
+            self.SetLastError(
+                STAND_IN_ERRORS.get(error.errno, self.ERROR_GEN_FAILURE))
+            return None
+        self.SetLastError(0)
+        return result
+
+    def _fd(self, hFile):
+        """Converts a ``HANDLE`` into a file descriptor"""
+        return int(self.ffi.cast("intptr_t", hFile)) - 1
+
+    def handle(self, fd):
+        """Converts a file descriptor into a ``HANDLE``"""
+        return self.ffi.cast("HANDLE", fd + 1)
+
+    def _overlapped(self, lpOverlapped):
+        """
+        Overlapped I/O is not emulated.  Returns True, after setting
+        ``ERROR_NOT_SUPPORTED``, if ``lpOverlapped`` is not ``NULL``.
+        """
+        if lpOverlapped is None or lpOverlapped == self.ffi.NULL:
+            return False
+        self.SetLastError(self.ERROR_NOT_SUPPORTED)
+        return True
+
+    def CreateFile(
+            self, lpFileName, dwDesiredAccess, dwShareMode,
+            lpSecurityAttributes, dwCreationDisposition,
+            dwFlagsAndAttributes, hTemplateFile):
+        """Opens ``lpFileName`` with :func:`os.open`"""
+        # pylint: disable=unused-argument
+        access = int(dwDesiredAccess)
+        if access & self.GENERIC_READ and access & self.GENERIC_WRITE:
+            flags = os.O_RDWR
+        elif access & self.GENERIC_WRITE:
+            flags = os.O_WRONLY
+        else:
+            flags = os.O_RDONLY
+
+        flags |= {
+            self.CREATE_NEW: os.O_CREAT | os.O_EXCL,
+            self.CREATE_ALWAYS: os.O_CREAT | os.O_TRUNC,
+            self.OPEN_EXISTING: 0,
+            self.OPEN_ALWAYS: os.O_CREAT,
+            self.TRUNCATE_EXISTING: os.O_TRUNC
+        }[int(dwCreationDisposition)]
+        flags |= getattr(os, "O_BINARY", 0)
+
+        if isinstance(lpFileName, self.ffi.CData):
+            lpFileName = self.ffi.string(lpFileName)
+
+        fd = self._call(os.open, lpFileName, flags, 0o666)
+        if fd is None:
+            return self.ffi.cast("HANDLE", self.INVALID_HANDLE_VALUE)
+        return self.handle(fd)
+
+    def CloseHandle(self, hObject):
+        """Closes the file descriptor behind ``hObject``"""
+        self._call(os.close, self._fd(hObject))
+        return int(self.last_error == 0)
+
+    def WriteFile(
+            self, hFile, lpBuffer, nNumberOfBytesToWrite,
+            lpNumberOfBytesWritten, lpOverlapped):
+        """
+        Writes ``lpBuffer`` with :func:`os.write`.  Fails with
+        ``ERROR_NOT_SUPPORTED`` if ``lpOverlapped`` is provided.
+        """
+        if self._overlapped(lpOverlapped):
+            return 0
+
+        if not isinstance(lpBuffer, bytes):
+            lpBuffer = self.ffi.buffer(lpBuffer, nNumberOfBytesToWrite)[:]
+
+        written = self._call(
+            os.write, self._fd(hFile),
+            lpBuffer[:int(nNumberOfBytesToWrite)])
+        if written is None:
+            return 0
+
+        lpNumberOfBytesWritten[0] = written
+        return 1
+
+    def ReadFile(
+            self, hFile, lpBuffer, nNumberOfBytesToRead,
+            lpNumberOfBytesRead, lpOverlapped):
+        """
+        Reads into ``lpBuffer`` with :func:`os.read`.  Fails with
+        ``ERROR_NOT_SUPPORTED`` if ``lpOverlapped`` is provided.
+        """
+        if self._overlapped(lpOverlapped):
+            return 0
+
+        data = self._call(os.read, self._fd(hFile), int(nNumberOfBytesToRead))
+        if data is None:
+            return 0
+
+        self.ffi.buffer(lpBuffer, len(data))[:] = data
+        lpNumberOfBytesRead[0] = len(data)
+        return 1
+
+    def CreatePipe(self, hReadPipe, hWritePipe, lpPipeAttributes, nSize):
+        """
+        Creates a pipe with :func:`os.pipe`.  ``nSize`` is only applied
+        on Linux and is ignored if it's larger than the system allows.
+        """
+        # pylint: disable=unused-argument
+        fds = self._call(os.pipe)
+        if fds is None:
+            return 0
+
+        if nSize and sys.platform.startswith("linux"):
+            try:
+                fcntl.fcntl(fds[1], F_SETPIPE_SZ, int(nSize))
+            except (OSError, IOError):
+                pass
+
+        hReadPipe[0] = self.handle(fds[0])
+        hWritePipe[0] = self.handle(fds[1])
+        return 1
+
+    def PeekNamedPipe(
+            self, hNamedPipe, lpBuffer, nBufferSize, lpBytesRead,
+            lpTotalBytesAvail, lpBytesLeftThisMessage):
+        """
+        Reports the number of bytes in a pipe using the ``FIONREAD``
+        ioctl.  Data can't be peeked at so ``nBufferSize`` must be 0.
+        """
+        # pylint: disable=unused-argument
+        if nBufferSize:
+            self.SetLastError(self.ERROR_INVALID_PARAMETER)
+            return 0
+
+        available = array.array("i", [0])
+        result = self._call(
+            fcntl.ioctl, self._fd(hNamedPipe), termios.FIONREAD, available,
+            True)
+        if result is None:
+            return 0
+
+        for pointer, value in ((lpBytesRead, 0),
+                               (lpTotalBytesAvail, available[0]),
+                               (lpBytesLeftThisMessage, 0)):
+            if pointer != self.ffi.NULL:
+                pointer[0] = value
+        return 1
+
+    def FlushFileBuffers(self, hFile):
+        """Flushes ``hFile`` with :func:`os.fsync`"""
+        self._call(os.fsync, self._fd(hFile))
+        return int(self.last_error == 0)
+
+    def SetFilePointerEx(
+            self, hFile, liDistanceToMove, lpNewFilePointer, dwMoveMethod):
+        """Moves the file pointer with :func:`os.lseek`"""
+        position = self._call(
+            os.lseek, self._fd(hFile), int(liDistanceToMove.QuadPart),
+            int(dwMoveMethod))
+        if position is None:
+            return 0
+
+        if lpNewFilePointer != self.ffi.NULL:
+            lpNewFilePointer.QuadPart = position
+        return 1
+
+    def GetFileAttributesEx(
+            self, lpFileName, fInfoLevelId, lpFileInformation):
+        """Fills in ``lpFileInformation`` using :func:`os.stat`"""
+        # pylint: disable=unused-argument
+        if isinstance(lpFileName, self.ffi.CData):
+            lpFileName = self.ffi.string(lpFileName)
+
+        result = self._call(os.stat, lpFileName)
+        if result is None:
+            return 0
+
+        if stat.S_ISDIR(result.st_mode):
+            attributes = self.FILE_ATTRIBUTE_DIRECTORY
+        else:
+            attributes = self.FILE_ATTRIBUTE_NORMAL
+        if not result.st_mode & stat.S_IWUSR:
+            attributes |= self.FILE_ATTRIBUTE_READONLY
+
+        mtime = getattr(result, "st_mtime_ns", None)
+        if mtime is None:
+            mtime = int(result.st_mtime * 1000000000)
+        mtime = mtime // 100 + FILETIME_EPOCH_OFFSET
+
+        data = self.ffi.cast("LPWIN32_FILE_ATTRIBUTE_DATA", lpFileInformation)
+        data.dwFileAttributes = attributes
+        data.nFileSizeHigh = result.st_size >> 32
+        data.nFileSizeLow = result.st_size & 0xFFFFFFFF
+        data.ftLastWriteTime.dwHighDateTime = mtime >> 32
+        data.ftLastWriteTime.dwLowDateTime = mtime & 0xFFFFFFFF
+        return 1
+
+
+@contextmanager
+def stand_in(library=None):
+    """
+    Replaces the library returned by :func:`pywincffi.core.dist.load`
+    with ``library``, by default an instance of :class:`StandInLibrary`,
+    for the duration of the context.
+    """
+    if library is None:
+        library = StandInLibrary()
+    previous = dist.Loader.cache
+    dist.Loader.cache = (library.ffi, library)
+    try:
+        yield library
+    finally:
+        dist.Loader.cache = previous
@@ -0,0 +1,270 @@
+"""
+POSIX Backend
+=============
+
+A module for developers which provides :class:`PosixLibrary`, a backend
+for :func:`pywincffi.core.dist.load` which emulates the portable subset of
+``kernel32`` so pipes, events, files and waits can be exercised on hosts
+without Windows.  It's selected by setting the ``PYWINCFFI_BACKEND``
+environment variable:
+
+.. code-block:: console
+
+    $ PYWINCFFI_BACKEND=posix python -m pytest \\
+          tests/test_kernel32/test_channel.py
+
+Pipes and files are file descriptors, events are an ``eventfd`` where
+available, or a pipe otherwise, and waits use :func:`select.poll`.
+Failures are reported with the error codes Windows would use.  Overlapped
+I/O is not emulated, ``ReadFile`` and ``WriteFile`` fail with
+``ERROR_NOT_SUPPORTED`` if ``lpOverlapped`` is provided, so only tests of
+the synchronous functions pass.  It is not a substitute for testing on
+Windows.
+"""
+
+import fcntl
+import math
+import os
+import select
+import struct
+import time
+from errno import EAGAIN
+
+from pywincffi.dev.benchmark import StandInLibrary
+
+
+class _Event(object):
+    """
+    An event which is readable while it's set.  The ``eventfd`` counter,
+    or the number of bytes in the pipe, is drained to reset it.
+    """
+    _TOKEN = struct.pack("=Q", 1)
+
+    def __init__(self, manual_reset):
+        self.manual_reset = manual_reset
+
+        # pylint: disable=no-member
+        if hasattr(os, "eventfd"):
+            self.fd = self._write_fd = os.eventfd(
+                0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        else:
+            self.fd, self._write_fd = os.pipe()
+            for fd in (self.fd, self._write_fd):
+                flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+                fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def set(self):
+        """Sets the event"""
+        try:
+            os.write(self._write_fd, self._TOKEN)
+        except (OSError, IOError) as error:
+            # The pipe is full so the event is already set.
+            if error.errno != EAGAIN:
+                raise
+
+    def reset(self):
+        """Resets the event.  Returns True if the event was set."""
+        was_set = False
+        while True:
+            try:
+                os.read(self.fd, 4096)
+            except (OSError, IOError) as error:
+                if error.errno != EAGAIN:
+                    raise
+                return was_set
+            was_set = True
+
+    def acquire(self):
+        """
+        Called when the event is readable to complete a wait.  Returns
+        False if another waiter reset an auto-reset event first.
+        """
+        return self.manual_reset or self.reset()
+
+    def close(self):
+        """Closes the file descriptors behind the event"""
+        os.close(self.fd)
+        if self._write_fd != self.fd:
+            os.close(self._write_fd)
+
+
+def _poll(events, timeout):
+    """
+    Waits up to ``timeout`` seconds, or forever if ``timeout`` is None,
+    for any of ``events`` to be set and returns the indexes of those which
+    are set.
+    """
+    poller = select.poll()
+    for event in events:
+        poller.register(event.fd, select.POLLIN)
+
+    if timeout is not None:
+        timeout = int(math.ceil(timeout * 1000))
+
+    ready = set(fd for fd, _ in poller.poll(timeout))
+    return set(
+        index for index, event in enumerate(events) if event.fd in ready)
+
+
+class PosixLibrary(StandInLibrary):
+    """
+    Extends :class:`pywincffi.dev.benchmark.StandInLibrary` with events
+    and waits and with the pipe semantics of Windows, such as reading
+    from a pipe whose write end was closed failing with
+    ``ERROR_BROKEN_PIPE``.  Only unnamed events can be created and only
+    events can be waited on.  Waiting for every object is not atomic, an
+    auto-reset event may be reset while waiting for the others.
+    """
+    # pylint: disable=invalid-name
+    INFINITE = 0xFFFFFFFF
+    WAIT_OBJECT_0 = 0x00000000
+    WAIT_ABANDONED = 0x00000080
+    WAIT_TIMEOUT = 0x00000102
+    WAIT_FAILED = 0xFFFFFFFF
+    MAXIMUM_WAIT_OBJECTS = 64
+    ERROR_INVALID_HANDLE = 6
+
+    def __init__(self):
+        super(PosixLibrary, self).__init__()
+        self._events = {}
+        self._pipes = set()
+
+    def _event(self, hEvent):
+        """
+        Returns the :class:`_Event` for ``hEvent`` or sets
+        ``ERROR_INVALID_HANDLE`` and returns None.
+        """
+        event = self._events.get(self._fd(hEvent))
+        if event is None:
+            self.SetLastError(self.ERROR_INVALID_HANDLE)
+        return event
+
+    def CreatePipe(self, hReadPipe, hWritePipe, lpPipeAttributes, nSize):
+        """Creates a pipe with :func:`os.pipe`"""
+        code = super(PosixLibrary, self).CreatePipe(
+            hReadPipe, hWritePipe, lpPipeAttributes, nSize)
+        if code:
+            self._pipes.add(self._fd(hReadPipe[0]))
+            self._pipes.add(self._fd(hWritePipe[0]))
+        return code
+
+    def ReadFile(
+            self, hFile, lpBuffer, nNumberOfBytesToRead,
+            lpNumberOfBytesRead, lpOverlapped):
+        """
+        Reads into ``lpBuffer`` with :func:`os.read`.  Windows reports the
+        end of a pipe as ``ERROR_BROKEN_PIPE`` rather than a read of zero
+        bytes.
+        """
+        code = super(PosixLibrary, self).ReadFile(
+            hFile, lpBuffer, nNumberOfBytesToRead, lpNumberOfBytesRead,
+            lpOverlapped)
+
+        if code and nNumberOfBytesToRead and not lpNumberOfBytesRead[0] \
+                and self._fd(hFile) in self._pipes:
+            self.SetLastError(self.ERROR_BROKEN_PIPE)
+            return 0
+        return code
+
+    def CloseHandle(self, hObject):
+        """Closes the file descriptor, or event, behind ``hObject``"""
+        fd = self._fd(hObject)
+        event = self._events.pop(fd, None)
+        if event is None:
+            self._pipes.discard(fd)
+            return super(PosixLibrary, self).CloseHandle(hObject)
+
+        self._call(event.close)
+        return int(self.last_error == 0)
+
+    def CreateEvent(
+            self, lpEventAttributes, bManualReset, bInitialState, lpName):
+        """Creates an unnamed event"""
+        # pylint: disable=unused-argument
+        if lpName != self.ffi.NULL:
+            self.SetLastError(self.ERROR_NOT_SUPPORTED)
+            return self.ffi.NULL
+
+        event = self._call(_Event, bool(int(bManualReset)))
+        if event is None:
+            return self.ffi.NULL
+
+        if int(bInitialState):
+            event.set()
+
+        self._events[event.fd] = event
+        return self.handle(event.fd)
+
+    def SetEvent(self, hEvent):
+        """Sets ``hEvent``"""
+        event = self._event(hEvent)
+        if event is None:
+            return 0
+
+        self._call(event.set)
+        return int(self.last_error == 0)
+
+    def ResetEvent(self, hEvent):
+        """Resets ``hEvent``"""
+        event = self._event(hEvent)
+        if event is None:
+            return 0
+
+        self._call(event.reset)
+        return int(self.last_error == 0)
+
+    def _wait(self, handles, wait_all, dwMilliseconds):
+        """Implements the wait functions using :func:`_poll`"""
+        events = []
+        for handle in handles:
+            event = self._event(handle)
+            if event is None:
+                return self.WAIT_FAILED
+            events.append(event)
+
+        deadline = None
+        if int(dwMilliseconds) != self.INFINITE:
+            deadline = time.time() + int(dwMilliseconds) / 1000.0
+
+        self.SetLastError(0)
+        while True:
+            signaled = _poll(events, 0)
+
+            if wait_all:
+                if len(signaled) == len(events) and \
+                        all(event.acquire() for event in events):
+                    return self.WAIT_OBJECT_0
+            else:
+                for index, event in enumerate(events):
+                    if index in signaled and event.acquire():
+                        return self.WAIT_OBJECT_0 + index
+
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    return self.WAIT_TIMEOUT
+
+            # When waiting for every event there's no need to be woken
+            # by those which are already set.
+            waiting = events
+            if wait_all:
+                waiting = [
+                    event for index, event in enumerate(events)
+                    if index not in signaled] or events
+
+            _poll(waiting, timeout)
+
+    def WaitForSingleObject(self, hHandle, dwMilliseconds):
+        """Waits for the event ``hHandle`` to be set"""
+        return self._wait([hHandle], False, dwMilliseconds)
+
+    def WaitForMultipleObjects(
+            self, nCount, lpHandles, bWaitAll, dwMilliseconds):
+        """Waits for one or all of the events in ``lpHandles`` to be set"""
+        if not 0 < int(nCount) <= self.MAXIMUM_WAIT_OBJECTS:
+            self.SetLastError(self.ERROR_INVALID_PARAMETER)
+            return self.WAIT_FAILED
+
+        handles = [lpHandles[index] for index in range(int(nCount))]
+        return self._wait(handles, bool(int(bWaitAll)), dwMilliseconds)
@@ -10,17 +10,58 @@ Provides functions, constants and utilities that wrap functions provided by
 # we're wrapping are imported here so it's easier to access and because
 # it's close to the way Windows would present them (as a single module)
 from pywincffi.kernel32.file import (
-    ReadFile, WriteFile, FlushFileBuffers, MoveFileEx, CreateFile, LockFileEx,
-    UnlockFileEx)
+    ReadFile, ReadFileInto, WriteFile, FlushFileBuffers, MoveFileEx,
+    CreateFile, LockFileEx, UnlockFileEx, ReadFileScatter, WriteFileGather,
+    SegmentArray, GetDiskFreeSpace, GetDiskFreeSpaceResult, GetVolumePathName,
+    DirectFile, sector_size, SetFilePointerEx, SetEndOfFile,
+    SetFileInformationByHandle, preallocate, truncate,
+    GetFileInformationByHandleEx, GetFileSizeEx, CopyFileEx,
+    GetFileAttributesEx, SetFileCompletionNotificationModes, OverlappedRead)
 from pywincffi.kernel32.handle import (
     CloseHandle, GetStdHandle, GetHandleInformation, SetHandleInformation,
     DuplicateHandle)
 from pywincffi.kernel32.pipe import (
-    CreatePipe, PeekNamedPipe, PeekNamedPipeResult, SetNamedPipeHandleState)
+    CreatePipe, PeekNamedPipe, PeekNamedPipeResult, SetNamedPipeHandleState,
+    pipe_bytes_available, CreateNamedPipe, ConnectNamedPipe,
+    DisconnectNamedPipe, WaitNamedPipe)
 from pywincffi.kernel32.process import (
     GetProcessId, GetCurrentProcess, OpenProcess, GetExitCodeProcess,
     TerminateProcess, CreateToolhelp32Snapshot, CreateProcess, pid_exists)
-from pywincffi.kernel32.events import CreateEvent, OpenEvent, ResetEvent
+from pywincffi.kernel32.events import (
+    CreateEvent, OpenEvent, ResetEvent, SetEvent)
 from pywincffi.kernel32.comms import ClearCommError
-from pywincffi.kernel32.synchronization import WaitForSingleObject
-from pywincffi.kernel32.overlapped import GetOverlappedResult
+from pywincffi.kernel32.synchronization import (
+    WaitForSingleObject, WaitForMultipleObjects, CreateMutex, OpenMutex,
+    ReleaseMutex)
+from pywincffi.kernel32.overlapped import (
+    GetOverlappedResult, GetOverlappedResultEx, CancelIo, CancelIoEx,
+    cancel_overlapped, HasOverlappedIoCompleted)
+from pywincffi.kernel32.memory import (
+    VirtualAlloc, VirtualFree, GetSystemInfo, PageAllocator,
+    CreateFileMapping, OpenFileMapping, MapViewOfFile, UnmapViewOfFile)
+from pywincffi.kernel32.appendlog import AppendLog
+from pywincffi.kernel32.directory import (
+    FindFirstFileEx, FindFirstFileExResult, FindNextFile, FindClose,
+    FindDirEntry, ScandirIterator, scandir, FileIdDirectoryEntry,
+    DirectoryReader, parse_file_id_directory_info, ReadDirectoryChangesW,
+    DirectoryChange, DirectoryWatcher, parse_file_notify_information)
+from pywincffi.kernel32.device import DeviceIoControl
+from pywincffi.kernel32.usn import (
+    UsnJournal, UsnJournalData, UsnRecord, UsnRecords, UsnCheckpoint,
+    parse_usn_journal_data, parse_usn_records)
+from pywincffi.kernel32.handlecache import (
+    HandleCache, HandleCacheStats, HandleLease)
+from pywincffi.kernel32.filecopy import copyfile, CopyProgress
+from pywincffi.kernel32.rangelock import (
+    RangeLockManager, RangeLock, RangeLockStats, coalesce)
+from pywincffi.kernel32.bulkattributes import (
+    bulk_file_attributes, BulkFileAttributes)
+from pywincffi.kernel32.pipeserver import (
+    NamedPipeServer, NamedPipeServerStats, PipeConnection)
+from pywincffi.kernel32.messagereader import MessageReader
+from pywincffi.kernel32.multiplexer import (
+    PipeMultiplexer, PipeChunk, create_overlapped_pipe)
+from pywincffi.kernel32.ringbuffer import SharedRingBuffer
+from pywincffi.kernel32.sharedcache import SharedCache, SharedCacheValue
+from pywincffi.kernel32.channel import PipeChannel
+from pywincffi.kernel32.reduction import reduce_handle, rebuild_handle
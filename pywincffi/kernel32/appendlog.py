@@ -0,0 +1,284 @@
+"""
+Append Log
+----------
+
+A group commit writer which appends records produced by many threads
+to a single file.  Every thread waiting on the writer shares one
+:func:`pywincffi.kernel32.WriteFile` and one
+:func:`pywincffi.kernel32.FlushFileBuffers` call so the cost of a device
+flush is paid once per commit instead of once per record.
+"""
+
+import threading
+import time
+from collections import deque
+
+try:
+    # pylint: disable=wrong-import-order
+    from concurrent.futures import Future
+except ImportError:  # pragma: no cover
+    # Python 2 requires the `futures` backport.
+    Future = None
+
+from six import integer_types, binary_type
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.core.logger import get_logger
+from pywincffi.exceptions import PyWinCFFINotImplementedError, InputError
+from pywincffi.kernel32.file import (
+    WriteFile, FlushFileBuffers, SetFilePointerEx, truncate)
+from pywincffi.wintypes import HANDLE
+
+logger = get_logger("kernel32.appendlog")
+
+
+class AppendLog(object):  # pylint: disable=too-many-instance-attributes
+    """
+    Appends records to ``hFile`` from any number of threads.  Records are
+    queued by :meth:`append` and a background thread commits everything
+    that has been queued with a single write followed by a single flush.
+    While one commit is being flushed new records accumulate and form the
+    next commit, so the batch size grows with the load.
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import AppendLog, CreateFile
+    >>> _, library = dist.load()
+    >>> hFile = CreateFile(
+    ...     u"C:\\\\data\\\\events.log", library.GENERIC_WRITE,
+    ...     dwCreationDisposition=library.OPEN_ALWAYS)
+    >>> with AppendLog(hFile) as log:
+    ...     future = log.append(b"record\\n")
+    ...     offset = future.result()  # returns once the record is durable
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        A handle opened with the ``GENERIC_WRITE`` access right.  Records
+        are written starting at the current end of the file.  The handle
+        is not closed by :meth:`close`.
+
+    :keyword float commit_window:
+        The number of seconds to wait, after the first record of a commit
+        arrives, for more records to join the commit.  The default of
+        ``0`` commits whatever is queued as soon as the previous commit
+        finishes which is usually enough to form large batches under load.
+
+    :keyword int max_batch_bytes:
+        The maximum number of bytes written by a single commit.  A record
+        larger than this is written by itself.
+
+    :keyword bool flush:
+        If False then :func:`FlushFileBuffers` is not called and futures
+        resolve once the data has been handed to the operating system.
+
+    If a commit fails the file is truncated back to where the commit
+    started so a failed record is never left partially written.  If the
+    file can't be truncated the log fails: every queued record raises
+    the original error and :meth:`append` raises :class:`ValueError`.
+    """
+    def __init__(self, hFile, commit_window=0, max_batch_bytes=4194304,
+                 flush=True):
+        if Future is None:  # pragma: no cover
+            raise PyWinCFFINotImplementedError(
+                "AppendLog requires concurrent.futures.  On Python 2 this "
+                "is provided by the `futures` package.")
+
+        input_check("hFile", hFile, HANDLE)
+        input_check("commit_window", commit_window, integer_types + (float, ))
+        input_check("max_batch_bytes", max_batch_bytes, integer_types)
+        input_check("flush", flush, bool)
+
+        if max_batch_bytes < 1:
+            raise InputError(
+                "max_batch_bytes", max_batch_bytes,
+                message="`max_batch_bytes` must be greater than zero")
+
+        _, library = dist.load()
+        self.hFile = hFile
+        self.commit_window = commit_window
+        self.max_batch_bytes = max_batch_bytes
+        self.flush = flush
+        self.offset = SetFilePointerEx(hFile, 0, library.FILE_END)
+
+        # Statistics
+        self.commits = 0
+        self.records = 0
+        self.bytes_written = 0
+
+        self._condition = threading.Condition()
+        self._pending = deque()
+        self._pending_bytes = 0
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="pywincffi-appendlog")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def append(self, data):
+        """
+        Queues ``data`` to be appended to the file.
+
+        :param bytes data:
+            Type is ``str`` on Python 2, ``bytes`` on Python 3.
+            The record to append.
+
+        :raises ValueError:
+            Raised if the log has been closed or has failed.
+
+        :rtype: :class:`concurrent.futures.Future`
+        :return:
+            Returns a future which resolves to the file offset of the
+            record once the commit containing it has been flushed.  If the
+            commit fails the future raises the error instead.
+        """
+        input_check("data", data, binary_type)
+        future = Future()
+
+        with self._condition:
+            if self._closed:
+                raise ValueError("append() called on a closed AppendLog")
+
+            if self._error is not None:
+                raise ValueError(
+                    "append() called on a failed AppendLog: %s" % self._error)
+
+            self._pending.append((data, future))
+            self._pending_bytes += len(data)
+            self._condition.notify()
+
+        return future
+
+    def _next_batch(self):
+        """
+        Blocks until records are queued and returns the next batch as
+        a list of ``(data, future)`` tuples.  Returns None once the log
+        has been closed and every queued record has been committed.
+        """
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+
+            if not self._pending:
+                return None
+
+            if self.commit_window:
+                deadline = time.time() + self.commit_window
+                while (not self._closed and
+                       self._pending_bytes < self.max_batch_bytes):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+            batch = []
+            size = 0
+            while self._pending:
+                data, future = self._pending[0]
+                if batch and size + len(data) > self.max_batch_bytes:
+                    break
+
+                self._pending.popleft()
+                self._pending_bytes -= len(data)
+
+                # Producers may cancel a record until it's part of a commit.
+                if future.set_running_or_notify_cancel():
+                    batch.append((data, future))
+                    size += len(data)
+
+        return batch
+
+    def _commit(self, batch):
+        """Writes and flushes ``batch`` then resolves its futures."""
+        data = b"".join(record for record, _ in batch)
+
+        written = 0
+        while written < len(data):
+            written += WriteFile(self.hFile, data[written:])
+
+        if self.flush:
+            FlushFileBuffers(self.hFile)
+
+        offset = self.offset
+        self.offset += len(data)
+        self.commits += 1
+        self.records += len(batch)
+        self.bytes_written += len(data)
+
+        for record, future in batch:
+            future.set_result(offset)
+            offset += len(record)
+
+    def _rollback(self):
+        """
+        Truncates the file back to :attr:`offset`, the end of the last
+        successful commit, and moves the file pointer there so a failed
+        commit leaves nothing behind.
+        """
+        _, library = dist.load()
+        truncate(self.hFile, self.offset)
+        SetFilePointerEx(self.hFile, self.offset, library.FILE_BEGIN)
+
+    def _fail(self, error):
+        """
+        Puts the log into a failed state.  New records are refused and
+        every queued record raises ``error``.
+        """
+        with self._condition:
+            self._error = error
+            pending = list(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+
+        for _, future in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            if not batch:
+                continue
+
+            try:
+                self._commit(batch)
+
+            # Any error must be delivered to the producers waiting on
+            # the commit rather than killing the writer thread.
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error("Commit of %d records failed: %s",
+                             len(batch), error)
+
+                # Part of the commit may have been written.
+                try:
+                    self._rollback()
+                except Exception as failure:  # pylint: disable=broad-except
+                    logger.error(
+                        "Failed to truncate the log to %d bytes: %s",
+                        self.offset, failure)
+                    self._fail(error)
+
+                for _, future in batch:
+                    future.set_exception(error)
+
+                if self._error is not None:
+                    return
+
+    def close(self):
+        """
+        Stops accepting records, waits for every queued record to be
+        committed and stops the writer thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,149 @@
+"""
+Bulk File Attributes
+--------------------
+
+Provides :func:`bulk_file_attributes` which retrieves the size, last write
+time and attributes of a large number of paths using several threads and
+stores the results in compact arrays rather than one object per path.
+"""
+
+import threading
+from collections import namedtuple
+
+from six import integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.exceptions import InputError
+from pywincffi.wintypes import path_to_cdata
+
+BulkFileAttributes = namedtuple(
+    "BulkFileAttributes",
+    ("sizes", "last_write_times", "attributes", "errors"))
+
+
+def _query(paths, start, stop, results):
+    """
+    Calls ``GetFileAttributesEx`` for ``paths[start:stop]`` storing the
+    results, or the error number, at the same index in ``results``.
+    """
+    ffi, library = dist.load()
+    sizes, last_write_times, attributes, errors = results
+
+    # A single structure is reused for every path queried by this thread.
+    data = ffi.new("WIN32_FILE_ATTRIBUTE_DATA *")
+    failed = False
+    for index in range(start, stop):
+        code = library.GetFileAttributesEx(
+            paths[index], library.GetFileExInfoStandard, data)
+        if code == 0:
+            errors[index] = ffi.getwinerror()[0]
+            failed = True
+            continue
+
+        sizes[index] = (data.nFileSizeHigh << 32) + data.nFileSizeLow
+        last_write_times[index] = (
+            (data.ftLastWriteTime.dwHighDateTime << 32) +
+            data.ftLastWriteTime.dwLowDateTime)
+        attributes[index] = data.dwFileAttributes
+
+    # The errors have been recorded, don't leave the last one set on the
+    # calling thread.
+    if failed:
+        library.SetLastError(0)
+
+
+def bulk_file_attributes(paths, max_workers=8, chunk_size=256):
+    """
+    Retrieves the attributes of every path in ``paths`` by calling
+    ``GetFileAttributesEx`` from up to ``max_workers`` threads.  Files are
+    not opened so this is considerably cheaper than
+    :func:`pywincffi.kernel32.CreateFile` followed by
+    :func:`pywincffi.kernel32.GetFileInformationByHandleEx`.  Like
+    ``GetFileAttributesEx`` symbolic links are not followed.
+
+    Paths which can't be queried don't raise an exception.  Instead the
+    error number is stored in ``errors`` and the other arrays contain
+    zero for that path.
+
+    >>> from pywincffi.kernel32 import bulk_file_attributes
+    >>> result = bulk_file_attributes(paths)
+    >>> stale = [
+    ...     path for path, error, mtime in zip(
+    ...         paths, result.errors, result.last_write_times)
+    ...     if error or mtime > cached_mtime]
+
+    :param list paths:
+        The paths to query.  Each path may be ``unicode``/``str``, a
+        :class:`pywincffi.wintypes.WidePath` or an :class:`os.PathLike`
+        object.
+
+    :keyword int max_workers:
+        The maximum number of threads used to query paths.
+
+    :keyword int chunk_size:
+        The number of consecutive paths a thread queries before taking
+        the next chunk.
+
+    :raises InputError:
+        Raised if an element of ``paths`` is not a path.
+
+    :rtype: :class:`BulkFileAttributes`
+    :return:
+        Returns a named tuple of cffi arrays with one element per path
+        which can be indexed, iterated or copied with ``ffi.buffer()``.
+        ``sizes`` and ``last_write_times`` are ``long long[]`` arrays, the
+        latter in ``FILETIME`` units.  ``attributes`` and ``errors`` are
+        ``DWORD[]`` arrays holding the ``FILE_ATTRIBUTE_*`` flags and the
+        Windows error numbers, zero for paths which were queried.
+    """
+    input_check("max_workers", max_workers, integer_types)
+    input_check("chunk_size", chunk_size, integer_types)
+
+    for name, value in (("max_workers", max_workers),
+                        ("chunk_size", chunk_size)):
+        if value < 1:
+            raise InputError(
+                name, value, message="`%s` must be at least 1" % name)
+
+    ffi, _ = dist.load()
+    paths = [path_to_cdata("paths", path) for path in paths]
+    count = len(paths)
+
+    # ffi.new() zero fills the arrays.
+    results = BulkFileAttributes(
+        sizes=ffi.new("long long[]", count),
+        last_write_times=ffi.new("long long[]", count),
+        attributes=ffi.new("DWORD[]", count),
+        errors=ffi.new("DWORD[]", count))
+
+    starts = iter(range(0, count, chunk_size))
+    lock = threading.Lock()
+    failures = []
+
+    def worker():
+        while not failures:
+            with lock:
+                start = next(starts, None)
+            if start is None:
+                return
+
+            try:
+                _query(paths, start, min(start + chunk_size, count), results)
+            except Exception as error:  # pylint: disable=broad-except
+                failures.append(error)
+
+    workers = min(max_workers, (count + chunk_size - 1) // chunk_size)
+    if workers <= 1:
+        worker()
+    else:
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if failures:
+        raise failures[0]
+
+    return results
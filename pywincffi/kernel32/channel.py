@@ -0,0 +1,212 @@
+"""
+Object Channel
+--------------
+
+Provides :class:`PipeChannel` which sends Python objects over pipe
+handles as length prefixed frames.  With pickle protocol 5 large buffers,
+such as ``numpy`` arrays, are moved out-of-band so they cross the process
+boundary without being copied into the pickle.
+"""
+
+import struct
+
+from six import integer_types
+from six.moves import cPickle as pickle
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check, NoneType
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.file import ReadFileInto
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.wintypes import HANDLE, wintype_to_cdata
+
+# The size of the pickle and the number of out-of-band buffers, followed
+# by the size of each buffer.
+_HEADER = struct.Struct("<QI")
+
+# Pickles smaller than this are written along with the header.
+_INLINE = 65536
+
+# ReadFile and WriteFile take a DWORD so larger buffers are read and
+# written in pieces.
+_MAX_TRANSFER = 1 << 30
+
+
+class PipeChannel(object):
+    """
+    Sends objects to and receives objects from the other end of a pipe,
+    for example between a parent process and a child which inherited
+    the handles from :func:`pywincffi.kernel32.CreatePipe`.
+
+    Each object is sent as a frame containing a header, the pickle and
+    then the out-of-band buffers produced by pickle protocol 5.  The
+    buffers are written straight from the memory of the objects which
+    own them, without being joined into one bytes object first.
+    ``WriteFileGather`` only works on files opened with
+    ``FILE_FLAG_NO_BUFFERING`` so each buffer is written with its own
+    call instead.  The receiver reads each buffer with
+    :func:`pywincffi.kernel32.ReadFileInto` into a :class:`bytearray`
+    allocated at its final size, which the unpickled object then uses
+    without copying it again.
+
+    On versions of Python without pickle protocol 5 every object is
+    pickled in-band.
+
+    >>> from pywincffi.kernel32 import CreatePipe, PipeChannel
+    >>> hRead, hWrite = CreatePipe()
+    >>> sender = PipeChannel(hWrite=hWrite)
+    >>> receiver = PipeChannel(hRead=hRead)
+    >>> sender.send(numpy.zeros(1 << 20))
+    >>> array = receiver.recv()
+
+    :keyword pywincffi.wintypes.HANDLE hRead:
+        The handle objects are received from.
+
+    :keyword pywincffi.wintypes.HANDLE hWrite:
+        The handle objects are sent to.  This may be the same as
+        ``hRead`` for a duplex named pipe.
+
+    :keyword int protocol:
+        The pickle protocol to use.  Defaults to the highest protocol
+        supported.  Buffers are only sent out-of-band with protocol 5
+        or higher.
+    """
+    def __init__(self, hRead=None, hWrite=None, protocol=None):
+        input_check("hRead", hRead, (NoneType, HANDLE))
+        input_check("hWrite", hWrite, (NoneType, HANDLE))
+        input_check("protocol", protocol, (NoneType, ) + integer_types)
+
+        if hRead is None and hWrite is None:
+            raise InputError(
+                "hRead", hRead,
+                message="At least one of `hRead` or `hWrite` is required")
+
+        if protocol is None:
+            protocol = pickle.HIGHEST_PROTOCOL
+
+        ffi, _ = dist.load()
+        self.hRead = hRead
+        self.hWrite = hWrite
+        self.protocol = protocol
+        self.out_of_band = protocol >= 5
+        self._header = bytearray(_HEADER.size)
+        self._written = ffi.new("LPDWORD")
+
+    def _write(self, data):
+        """Writes all of ``data``, which supports the buffer protocol"""
+        ffi, library = dist.load()
+        pointer = ffi.from_buffer(data)
+        handle = wintype_to_cdata(self.hWrite)
+        size = len(pointer)
+        offset = 0
+
+        while offset < size:
+            code = library.WriteFile(
+                handle, pointer + offset, min(size - offset, _MAX_TRANSFER),
+                self._written, ffi.NULL)
+            if code == 0:
+                errno, message = ffi.getwinerror()
+                raise WindowsAPIError("WriteFile", message, errno)
+            offset += self._written[0]
+
+    def _read(self, buffer_):
+        """
+        Fills ``buffer_``.  Raises :class:`EOFError` if the other end is
+        closed first.
+        """
+        _, library = dist.load()
+        view = memoryview(buffer_)
+        size = len(buffer_)
+        offset = 0
+
+        while offset < size:
+            try:
+                offset += ReadFileInto(
+                    self.hRead, view[offset:offset + _MAX_TRANSFER])
+            except WindowsAPIError as error:
+                if error.errno != library.ERROR_BROKEN_PIPE:
+                    raise
+                library.SetLastError(0)
+                raise EOFError("The other end of the pipe was closed")
+
+    def send(self, obj):
+        """
+        Pickles ``obj`` and writes it to :attr:`hWrite`.  This blocks
+        until the whole frame has been written to the pipe.
+
+        :param obj:
+            The object to send.
+
+        :raises WindowsAPIError:
+            Raised if the frame could not be written, for example because
+            the other end was closed.
+        """
+        if self.hWrite is None:
+            raise ValueError("The channel has no write handle")
+
+        buffers = []
+        if self.out_of_band:
+            data = pickle.dumps(
+                obj, protocol=self.protocol, buffer_callback=buffers.append)
+        else:
+            data = pickle.dumps(obj, self.protocol)
+
+        views = [buffer_.raw() for buffer_ in buffers]
+        header = _HEADER.pack(len(data), len(views)) + struct.pack(
+            "<%dQ" % len(views), *[view.nbytes for view in views])
+
+        if len(data) < _INLINE:
+            self._write(header + data)
+        else:
+            self._write(header)
+            self._write(data)
+
+        for view in views:
+            if view.nbytes:
+                self._write(view)
+
+    def recv(self):
+        """
+        Waits for the next object from :attr:`hRead` and returns it.
+
+        :raises EOFError:
+            Raised if the other end of the pipe was closed.
+
+        :raises WindowsAPIError:
+            Raised if the pipe could not be read for another reason.
+        """
+        if self.hRead is None:
+            raise ValueError("The channel has no read handle")
+
+        self._read(self._header)
+        size, count = _HEADER.unpack(bytes(self._header))
+        sizes = bytearray(8 * count)
+        self._read(sizes)
+
+        data = bytearray(size)
+        self._read(data)
+
+        buffers = []
+        for length in struct.unpack("<%dQ" % count, bytes(sizes)):
+            buffer_ = bytearray(length)
+            self._read(buffer_)
+            buffers.append(buffer_)
+
+        if self.out_of_band:
+            return pickle.loads(data, buffers=buffers)
+        return pickle.loads(bytes(data))
+
+    def close(self):
+        """Closes the handles of the channel"""
+        if self.hRead is not None:
+            CloseHandle(self.hRead)
+        if self.hWrite is not None and self.hWrite is not self.hRead:
+            CloseHandle(self.hWrite)
+        self.hRead = None
+        self.hWrite = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
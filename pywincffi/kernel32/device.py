@@ -0,0 +1,116 @@
+"""
+Devices
+-------
+
+A module containing Windows functions for sending control codes to
+device drivers and file systems.
+"""
+
+from six import integer_types, binary_type
+
+from pywincffi.core import dist
+from pywincffi.core.checks import NON_ZERO, input_check, error_check, NoneType
+from pywincffi.wintypes import HANDLE, OVERLAPPED, wintype_to_cdata
+
+
+def DeviceIoControl(
+        hDevice, dwIoControlCode, lpInBuffer, lpOutBuffer,
+        lpOverlapped=None, nOutBufferSize=None):
+    """
+    Sends a control code directly to a specified device driver, causing
+    the corresponding device to perform the corresponding operation.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa363216
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import DeviceIoControl
+    >>> ffi, library = dist.load()
+    >>> output = ffi.new("char[]", 64)
+    >>> size = DeviceIoControl(
+    ...     hVolume, library.FSCTL_QUERY_USN_JOURNAL, None, output)
+    >>> data = ffi.buffer(output, size)[:]
+
+    :param pywincffi.wintypes.HANDLE hDevice:
+        A handle to the device, file or directory the operation is
+        performed on.
+
+    :param int dwIoControlCode:
+        The control code for the operation, ``FSCTL_READ_USN_JOURNAL`` for
+        example.
+
+    :param lpInBuffer:
+        Type is ``str`` on Python 2, ``bytes`` on Python 3.
+        The input data required by the operation or None if the operation
+        does not require input data.
+
+    :param lpOutBuffer:
+        A cdata buffer, such as one created with
+        ``ffi.new("char[]", size)``, which receives the output of the
+        operation or None if the operation does not produce output.
+        The buffer can be reused across calls.
+
+    :keyword pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        If provided, and ``hDevice`` was opened with
+        ``FILE_FLAG_OVERLAPPED``, the operation is performed
+        asynchronously.  Use :func:`pywincffi.kernel32.GetOverlappedResult`
+        to retrieve the result.
+
+    :keyword int nOutBufferSize:
+        The number of bytes of ``lpOutBuffer`` which may be written.
+        Defaults to the size of ``lpOutBuffer``.
+
+    :raises WindowsAPIError:
+        Raised if the operation fails.  When ``lpOverlapped`` is provided
+        an error number of ``ERROR_IO_PENDING`` is not considered a
+        failure.
+
+    :rtype: int
+    :return:
+        Returns the number of bytes written to ``lpOutBuffer``.  This is
+        zero if the operation is still pending.
+    """
+    input_check("hDevice", hDevice, HANDLE)
+    input_check("dwIoControlCode", dwIoControlCode, integer_types)
+    input_check("lpInBuffer", lpInBuffer, (NoneType, binary_type))
+    input_check(
+        "lpOverlapped", lpOverlapped, allowed_types=(NoneType, OVERLAPPED))
+
+    ffi, library = dist.load()
+    input_check("lpOutBuffer", lpOutBuffer, (NoneType, ffi.CData))
+
+    if lpInBuffer is None:
+        lpInBuffer = ffi.NULL
+        nInBufferSize = 0
+    else:
+        nInBufferSize = len(lpInBuffer)
+
+    if lpOutBuffer is None:
+        lpOutBuffer = ffi.NULL
+        nOutBufferSize = 0
+    elif nOutBufferSize is None:
+        nOutBufferSize = ffi.sizeof(lpOutBuffer)
+
+    input_check("nOutBufferSize", nOutBufferSize, integer_types)
+
+    lpBytesReturned = ffi.new("LPDWORD")
+    code = library.DeviceIoControl(
+        wintype_to_cdata(hDevice),
+        ffi.cast("DWORD", dwIoControlCode),
+        lpInBuffer,
+        ffi.cast("DWORD", nInBufferSize),
+        lpOutBuffer,
+        ffi.cast("DWORD", nOutBufferSize),
+        lpBytesReturned,
+        wintype_to_cdata(lpOverlapped)
+    )
+
+    if lpOverlapped is not None and code == 0:
+        errno, _ = ffi.getwinerror()
+        if errno == library.ERROR_IO_PENDING:
+            return 0
+
+    error_check("DeviceIoControl", code=code, expected=NON_ZERO)
+
+    return lpBytesReturned[0]
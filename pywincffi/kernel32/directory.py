@@ -0,0 +1,823 @@
+"""
+Directories
+-----------
+
+A module containing Windows functions for enumerating the contents of
+directories.
+"""
+
+import struct
+from collections import namedtuple
+from os.path import join
+
+from six import text_type, integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import NON_ZERO, input_check, error_check, NoneType
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.events import CreateEvent, ResetEvent
+from pywincffi.kernel32.file import CreateFile, GetFileInformationByHandleEx
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.overlapped import (
+    GetOverlappedResult, cancel_overlapped)
+from pywincffi.kernel32.synchronization import WaitForSingleObject
+from pywincffi.wintypes import (
+    HANDLE, OVERLAPPED, WIN32_FIND_DATA, wintype_to_cdata, path_to_text,
+    path_to_cdata)
+
+# The number of 100 nanosecond intervals between the FILETIME
+# epoch (1601-01-01) and the unix epoch (1970-01-01).
+FILETIME_EPOCH_OFFSET = 116444736000000000
+
+# The fixed size portion of FILE_ID_BOTH_DIR_INFO and FILE_ID_EXTD_DIR_INFO
+# up to, but not including, the variable length FileName.  The short name
+# in FILE_ID_BOTH_DIR_INFO is skipped.
+#   https://msdn.microsoft.com/en-us/library/aa364226
+#   https://docs.microsoft.com/en-us/windows/win32/api/winbase/ns-winbase-file_id_extd_dir_info
+FILE_ID_BOTH_DIR_INFO = struct.Struct("<2L6q3Lb25x2xq")
+FILE_ID_EXTD_DIR_INFO = struct.Struct("<2L6q4L16s")
+
+# The fixed size portion of FILE_NOTIFY_INFORMATION.
+#   https://msdn.microsoft.com/en-us/library/aa364391
+FILE_NOTIFY_INFORMATION = struct.Struct("<3L")
+
+FindFirstFileExResult = namedtuple(
+    "FindFirstFileExResult", ("hFindFile", "lpFindFileData"))
+
+DirectoryChange = namedtuple("DirectoryChange", ("action", "name"))
+
+FileIdDirectoryEntry = namedtuple(
+    "FileIdDirectoryEntry",
+    ("name", "file_id", "attributes", "size", "allocation_size",
+     "creation_time", "last_access_time", "last_write_time", "change_time",
+     "reparse_tag"))
+
+
+def _filetime_to_timestamp(low, high):
+    """
+    Converts the two halves of a ``FILETIME`` into seconds since the
+    unix epoch, the same unit :func:`os.stat` uses.
+    """
+    return _large_integer_to_timestamp((high << 32) + low)
+
+
+def _large_integer_to_timestamp(value):
+    """
+    Converts a ``LARGE_INTEGER`` timestamp, which uses the same units as
+    ``FILETIME``, into seconds since the unix epoch.
+    """
+    return (value - FILETIME_EPOCH_OFFSET) / 10000000.0
+
+
+def FindFirstFileEx(
+        lpFileName, fInfoLevelId=None, fSearchOp=None, dwAdditionalFlags=0):
+    """
+    Searches a directory for a file or subdirectory with a name that
+    matches a specific name, or a wildcard pattern.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364419
+
+    :param str lpFileName:
+        The directory or path, and the file name which can include
+        wildcard characters, ``C:\\Windows\\*`` for example.
+
+    :keyword int fInfoLevelId:
+        The information level of the returned data.  Defaults to
+        ``FindExInfoStandard``.  ``FindExInfoBasic`` is faster because it
+        does not query the short name of each file.
+
+    :keyword int fSearchOp:
+        The type of filtering to perform.  Defaults to
+        ``FindExSearchNameMatch``.
+
+    :keyword int dwAdditionalFlags:
+        Additional flags that control the search such as
+        ``FIND_FIRST_EX_LARGE_FETCH`` which uses a larger buffer for
+        directory queries.
+
+    :raises WindowsAPIError:
+        Raised if the search could not be started.  If no files match
+        the error number will be ``ERROR_FILE_NOT_FOUND``.
+
+    :rtype: :class:`FindFirstFileExResult`
+    :return:
+        Returns a named tuple containing the search handle, ``hFindFile``,
+        and the first file found, ``lpFindFileData``.  The search handle
+        must be closed with :func:`FindClose`.
+    """
+    ffi, library = dist.load()
+
+    if fInfoLevelId is None:
+        fInfoLevelId = library.FindExInfoStandard
+
+    if fSearchOp is None:
+        fSearchOp = library.FindExSearchNameMatch
+
+    lpFileName = path_to_cdata("lpFileName", lpFileName)
+    input_check(
+        "fInfoLevelId", fInfoLevelId,
+        allowed_values=(library.FindExInfoStandard, library.FindExInfoBasic))
+    input_check(
+        "fSearchOp", fSearchOp,
+        allowed_values=(
+            library.FindExSearchNameMatch,
+            library.FindExSearchLimitToDirectories))
+    input_check("dwAdditionalFlags", dwAdditionalFlags, integer_types)
+
+    lpFindFileData = WIN32_FIND_DATA()
+    handle = library.FindFirstFileEx(
+        lpFileName, fInfoLevelId, wintype_to_cdata(lpFindFileData),
+        fSearchOp, ffi.NULL, ffi.cast("DWORD", dwAdditionalFlags))
+
+    if handle == ffi.cast("HANDLE", library.INVALID_HANDLE_VALUE):
+        errno, message = ffi.getwinerror()
+        raise WindowsAPIError("FindFirstFileEx", message, errno)
+
+    return FindFirstFileExResult(HANDLE(handle), lpFindFileData)
+
+
+def FindNextFile(hFindFile, lpFindFileData):
+    """
+    Continues a search started by :func:`FindFirstFileEx`.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364428
+
+    :param pywincffi.wintypes.HANDLE hFindFile:
+        The search handle returned by :func:`FindFirstFileEx`.
+
+    :param pywincffi.wintypes.WIN32_FIND_DATA lpFindFileData:
+        The structure which will receive information about the next file.
+        This is normally the structure returned by :func:`FindFirstFileEx`
+        so the same memory is reused by the whole search.
+
+    :rtype: bool
+    :return:
+        Returns True if ``lpFindFileData`` was populated or False if
+        there are no more files.
+    """
+    input_check("hFindFile", hFindFile, HANDLE)
+    input_check("lpFindFileData", lpFindFileData, WIN32_FIND_DATA)
+    ffi, library = dist.load()
+
+    code = library.FindNextFile(
+        wintype_to_cdata(hFindFile), wintype_to_cdata(lpFindFileData))
+
+    if code == 0:
+        errno, message = ffi.getwinerror()
+        if errno == library.ERROR_NO_MORE_FILES:
+            library.SetLastError(0)
+            return False
+        raise WindowsAPIError("FindNextFile", message, errno)
+
+    return True
+
+
+def FindClose(hFindFile):
+    """
+    Closes a search handle opened by :func:`FindFirstFileEx`.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364413
+
+    :param pywincffi.wintypes.HANDLE hFindFile:
+        The search handle to close.
+    """
+    input_check("hFindFile", hFindFile, HANDLE)
+    _, library = dist.load()
+    code = library.FindClose(wintype_to_cdata(hFindFile))
+    error_check("FindClose", code=code, expected=NON_ZERO)
+
+
+class FindDirEntry(object):
+    """
+    A single entry produced by :func:`scandir`.  Everything is copied out
+    of the find data when the entry is created so no further system calls
+    are made; sizes and timestamps are only converted when accessed.
+
+    :ivar str name:
+        The name of the entry relative to the directory.
+
+    :ivar str path:
+        The name of the entry joined with the directory.
+
+    :ivar int attributes:
+        The ``FILE_ATTRIBUTE_*`` flags for the entry.
+    """
+    __slots__ = (
+        "name", "path", "attributes", "_reparse_tag", "_size", "_times")
+
+    def __init__(self, directory, data):
+        ffi, _ = dist.load()
+        self.name = ffi.string(data.cFileName)
+        self.path = join(directory, self.name)
+        self.attributes = data.dwFileAttributes
+        self._reparse_tag = data.dwReserved0
+        self._size = (data.nFileSizeHigh, data.nFileSizeLow)
+        self._times = (
+            data.ftCreationTime.dwLowDateTime,
+            data.ftCreationTime.dwHighDateTime,
+            data.ftLastAccessTime.dwLowDateTime,
+            data.ftLastAccessTime.dwHighDateTime,
+            data.ftLastWriteTime.dwLowDateTime,
+            data.ftLastWriteTime.dwHighDateTime)
+
+    def is_dir(self):
+        """Returns True if the entry is a directory"""
+        _, library = dist.load()
+        return bool(self.attributes & library.FILE_ATTRIBUTE_DIRECTORY)
+
+    def is_file(self):
+        """Returns True if the entry is not a directory"""
+        return not self.is_dir()
+
+    def is_symlink(self):
+        """Returns True if the entry is a symbolic link"""
+        _, library = dist.load()
+        return bool(
+            self.attributes & library.FILE_ATTRIBUTE_REPARSE_POINT and
+            self._reparse_tag == library.IO_REPARSE_TAG_SYMLINK)
+
+    @property
+    def size(self):
+        """The size of the entry in bytes"""
+        high, low = self._size
+        return (high << 32) + low
+
+    @property
+    def creation_time(self):
+        """The creation time in seconds since the unix epoch"""
+        return _filetime_to_timestamp(self._times[0], self._times[1])
+
+    @property
+    def last_access_time(self):
+        """The last access time in seconds since the unix epoch"""
+        return _filetime_to_timestamp(self._times[2], self._times[3])
+
+    @property
+    def last_write_time(self):
+        """The last write time in seconds since the unix epoch"""
+        return _filetime_to_timestamp(self._times[4], self._times[5])
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.name)
+
+
+class ScandirIterator(object):
+    """
+    The iterator returned by :func:`scandir`.  The search handle is
+    closed once the iterator is exhausted, when :meth:`close` is called
+    or when the iterator is used as a context manager and the context
+    exits.
+    """
+    def __init__(self, path, pattern=u"*", large_fetch=True):
+        self._hFindFile = None
+        self._data = None
+        path = path_to_text("path", path)
+        input_check("pattern", pattern, text_type)
+        _, library = dist.load()
+
+        flags = library.FIND_FIRST_EX_LARGE_FETCH if large_fetch else 0
+        self.path = path
+
+        try:
+            self._hFindFile, self._data = FindFirstFileEx(
+                join(path, pattern), library.FindExInfoBasic,
+                library.FindExSearchNameMatch, flags)
+        except WindowsAPIError as error:
+            # Nothing matched the pattern.
+            if error.errno != library.ERROR_FILE_NOT_FOUND:
+                raise
+            library.SetLastError(0)
+
+        self._pending = self._hFindFile is not None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self._pending:
+            entry = FindDirEntry(self.path, wintype_to_cdata(self._data))
+
+            # The find data is reused so the entry must be built before
+            # fetching the next one.
+            self._pending = FindNextFile(self._hFindFile, self._data)
+
+            if entry.name not in (u".", u".."):
+                return entry
+
+        self.close()
+        raise StopIteration
+
+    next = __next__  # Python 2
+
+    def close(self):
+        """Closes the search handle, if it's still open"""
+        self._pending = False
+        if self._hFindFile is not None:
+            hFindFile, self._hFindFile = self._hFindFile, None
+            FindClose(hFindFile)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+def scandir(path, pattern=u"*", large_fetch=True):
+    """
+    Returns an iterator of :class:`FindDirEntry` objects for the contents
+    of ``path``, excluding ``.`` and ``..``.  Unlike :func:`os.listdir`
+    followed by :func:`os.stat` this produces the attributes, size and
+    timestamps of every entry without an extra system call per entry.
+
+    >>> from pywincffi.kernel32 import scandir
+    >>> with scandir(u"C:\\\\Windows") as entries:
+    ...     sizes = dict(
+    ...         (entry.name, entry.size) for entry in entries
+    ...         if entry.is_file())
+
+    :param str path:
+        The directory to enumerate.
+
+    :keyword str pattern:
+        The file name pattern, which may contain wildcards, to match
+        against.
+
+    :keyword bool large_fetch:
+        If True, the default, ``FIND_FIRST_EX_LARGE_FETCH`` is used so
+        each directory query returns more entries.
+
+    :rtype: :class:`ScandirIterator`
+    """
+    return ScandirIterator(path, pattern=pattern, large_fetch=large_fetch)
+
+
+def parse_file_id_directory_info(data, extended=False):
+    """
+    Parses the packed, variable length, records written by
+    :func:`pywincffi.kernel32.GetFileInformationByHandleEx` for the
+    ``FileIdBothDirectoryInfo`` or ``FileIdExtdDirectoryInfo`` classes.
+    The ``.`` and ``..`` entries are skipped.
+
+    :param data:
+        A buffer, such as ``ffi.buffer(...)`` or ``bytes``, containing the
+        records.
+
+    :keyword bool extended:
+        True if ``data`` contains ``FILE_ID_EXTD_DIR_INFO`` records
+        rather than ``FILE_ID_BOTH_DIR_INFO`` records.
+
+    :rtype: list
+    :return:
+        Returns a list of :class:`FileIdDirectoryEntry` objects.  The
+        ``file_id`` is a 128-bit integer for extended records and a 64-bit
+        integer otherwise.  The ``reparse_tag`` is only available for
+        extended records and is None otherwise.
+    """
+    header = FILE_ID_EXTD_DIR_INFO if extended else FILE_ID_BOTH_DIR_INFO
+    entries = []
+    offset = 0
+
+    while True:
+        fields = header.unpack_from(data, offset)
+        (next_offset, _, creation, access, write, change, end_of_file,
+         allocation, attributes, name_length) = fields[:10]
+
+        if extended:
+            reparse_tag = fields[11]
+            low, high = struct.unpack("<2Q", fields[12])
+            file_id = (high << 64) + low
+        else:
+            reparse_tag = None
+            file_id = fields[12]
+
+        start = offset + header.size
+        name = data[start:start + name_length].decode("utf-16-le")
+
+        if name not in (u".", u".."):
+            entries.append(FileIdDirectoryEntry(
+                name=name, file_id=file_id, attributes=attributes,
+                size=end_of_file, allocation_size=allocation,
+                creation_time=_large_integer_to_timestamp(creation),
+                last_access_time=_large_integer_to_timestamp(access),
+                last_write_time=_large_integer_to_timestamp(write),
+                change_time=_large_integer_to_timestamp(change),
+                reparse_tag=reparse_tag))
+
+        if next_offset == 0:
+            return entries
+
+        offset += next_offset
+
+
+class DirectoryReader(object):
+    """
+    Lists a directory by calling
+    :func:`pywincffi.kernel32.GetFileInformationByHandleEx` on a directory
+    handle.  Each call fills a single reusable buffer with as many entries
+    as fit, usually hundreds, and the file ids returned can later be used
+    to open files by id.
+
+    >>> from pywincffi.kernel32 import DirectoryReader
+    >>> with DirectoryReader(u"C:\\Windows") as reader:
+    ...     ids = dict((entry.name, entry.file_id) for entry in reader)
+
+    :param str path:
+        The directory to list.
+
+    :keyword int buffer_size:
+        The size, in bytes, of the buffer each call fills.
+
+    :keyword bool extended:
+        If True use ``FileIdExtdDirectoryInfo`` which returns 128-bit file
+        ids and reparse tags and requires Windows 8 or later.  If False use
+        ``FileIdBothDirectoryInfo``.  By default ``FileIdExtdDirectoryInfo``
+        is tried first and ``FileIdBothDirectoryInfo`` is used if it's not
+        supported.
+    """
+    def __init__(self, path, buffer_size=65536, extended=None):
+        path_to_text("path", path)
+        input_check("buffer_size", buffer_size, integer_types)
+        input_check("extended", extended, (NoneType, bool))
+
+        # Each record is 104 bytes plus a name of up to 255 characters.
+        if buffer_size < 1024:
+            raise InputError(
+                "buffer_size", buffer_size,
+                message="`buffer_size` must be at least 1024")
+
+        ffi, library = dist.load()
+        self.path = path
+        self.extended = extended
+        self._buffer = ffi.new("char[]", buffer_size)
+        self._restart = False
+        self._done = False
+        self.hDirectory = CreateFile(
+            path, library.FILE_LIST_DIRECTORY,
+            dwShareMode=(
+                library.FILE_SHARE_READ | library.FILE_SHARE_WRITE |
+                library.FILE_SHARE_DELETE),
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=library.FILE_FLAG_BACKUP_SEMANTICS)
+
+    def _query(self, extended):
+        """Fills the buffer, returns False if there are no more entries"""
+        _, library = dist.load()
+
+        if extended:
+            information_class = (
+                library.FileIdExtdDirectoryRestartInfo if self._restart else
+                library.FileIdExtdDirectoryInfo)
+        else:
+            information_class = (
+                library.FileIdBothDirectoryRestartInfo if self._restart else
+                library.FileIdBothDirectoryInfo)
+
+        try:
+            GetFileInformationByHandleEx(
+                self.hDirectory, information_class, self._buffer)
+        except WindowsAPIError as error:
+            if error.errno != library.ERROR_NO_MORE_FILES:
+                raise
+            library.SetLastError(0)
+            return False
+
+        self._restart = False
+        return True
+
+    def read(self):
+        """
+        Returns the next batch of entries as a list of
+        :class:`FileIdDirectoryEntry` objects.  An empty list is returned
+        once every entry has been read.
+        """
+        ffi, library = dist.load()
+
+        if self._done:
+            return []
+
+        if self.extended is None:
+            try:
+                found = self._query(True)
+                self.extended = True
+            except WindowsAPIError as error:
+                if error.errno != library.ERROR_INVALID_PARAMETER:
+                    raise
+                library.SetLastError(0)
+                self.extended = False
+                found = self._query(False)
+        else:
+            found = self._query(self.extended)
+
+        if not found:
+            self._done = True
+            return []
+
+        return parse_file_id_directory_info(
+            ffi.buffer(self._buffer), extended=self.extended)
+
+    def restart(self):
+        """Restarts the listing from the first entry"""
+        self._restart = True
+        self._done = False
+
+    def __iter__(self):
+        while True:
+            entries = self.read()
+            if not entries and self._done:
+                return
+
+            for entry in entries:
+                yield entry
+
+    def close(self):
+        """Closes the directory handle"""
+        if self.hDirectory is not None:
+            hDirectory, self.hDirectory = self.hDirectory, None
+            CloseHandle(hDirectory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def ReadDirectoryChangesW(
+        hDirectory, lpBuffer, bWatchSubtree, dwNotifyFilter,
+        lpOverlapped=None, nBufferLength=None):
+    """
+    Retrieves information that describes the changes within the specified
+    directory.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365465
+
+    :param pywincffi.wintypes.HANDLE hDirectory:
+        A handle to the directory opened with the ``FILE_LIST_DIRECTORY``
+        access right and ``FILE_FLAG_BACKUP_SEMANTICS``.  If
+        ``lpOverlapped`` is provided the handle must also have been
+        opened with ``FILE_FLAG_OVERLAPPED``.
+
+    :param lpBuffer:
+        A DWORD aligned cdata buffer, such as one created with
+        ``ffi.new("char[]", size)``, which will receive
+        ``FILE_NOTIFY_INFORMATION`` records.  See
+        :func:`parse_file_notify_information`.
+
+    :param bool bWatchSubtree:
+        If True, monitor the directory tree rooted at ``hDirectory``.
+
+    :param int dwNotifyFilter:
+        The ``FILE_NOTIFY_CHANGE_*`` flags describing the changes to
+        watch for.
+
+    :keyword pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        If provided the call returns immediately and the results should
+        be retrieved with :func:`pywincffi.kernel32.GetOverlappedResult`.
+
+    :keyword int nBufferLength:
+        The size of ``lpBuffer`` in bytes.  Defaults to the size of the
+        cdata object.
+
+    :rtype: int
+    :return:
+        Returns the number of bytes written to ``lpBuffer``.  A value of
+        zero means the buffer overflowed and the directory should be
+        rescanned.  The value is undefined when ``lpOverlapped`` is
+        provided.
+    """
+    input_check("hDirectory", hDirectory, HANDLE)
+    input_check("bWatchSubtree", bWatchSubtree, bool)
+    input_check("dwNotifyFilter", dwNotifyFilter, integer_types)
+    input_check(
+        "lpOverlapped", lpOverlapped, allowed_types=(NoneType, OVERLAPPED))
+
+    ffi, library = dist.load()
+    input_check("lpBuffer", lpBuffer, ffi.CData)
+
+    if nBufferLength is None:
+        nBufferLength = ffi.sizeof(lpBuffer)
+
+    input_check("nBufferLength", nBufferLength, integer_types)
+
+    lpBytesReturned = ffi.new("LPDWORD")
+    code = library.ReadDirectoryChangesW(
+        wintype_to_cdata(hDirectory), lpBuffer,
+        ffi.cast("DWORD", nBufferLength), ffi.cast("BOOL", bWatchSubtree),
+        ffi.cast("DWORD", dwNotifyFilter), lpBytesReturned,
+        wintype_to_cdata(lpOverlapped), ffi.NULL)
+    error_check("ReadDirectoryChangesW", code=code, expected=NON_ZERO)
+
+    return lpBytesReturned[0]
+
+
+def parse_file_notify_information(data):
+    """
+    Parses the packed, variable length, ``FILE_NOTIFY_INFORMATION``
+    records written by :func:`ReadDirectoryChangesW`.
+
+    Changes are coalesced: a change is dropped if the previous change to
+    the same name in ``data`` had the same action.  This collapses the
+    bursts of ``FILE_ACTION_MODIFIED`` notifications produced by a single
+    write while keeping sequences like added, removed, added intact.
+
+    :param data:
+        A buffer, such as ``ffi.buffer(...)`` or ``bytes``, containing the
+        records.
+
+    :rtype: list
+    :return:
+        Returns a list of :class:`DirectoryChange` objects in the order
+        the changes happened.  The name is relative to the watched
+        directory.
+    """
+    changes = []
+    last_action = {}
+    offset = 0
+
+    while True:
+        next_offset, action, name_length = \
+            FILE_NOTIFY_INFORMATION.unpack_from(data, offset)
+        start = offset + FILE_NOTIFY_INFORMATION.size
+        name = data[start:start + name_length].decode("utf-16-le")
+
+        if last_action.get(name) != action:
+            last_action[name] = action
+            changes.append(DirectoryChange(action=action, name=name))
+
+        if next_offset == 0:
+            return changes
+
+        offset += next_offset
+
+
+class DirectoryWatcher(object):  # pylint: disable=too-many-instance-attributes
+    """
+    Watches a directory for changes using overlapped calls to
+    :func:`ReadDirectoryChangesW`.  A read is always outstanding so
+    changes which happen while a batch is being processed are not lost,
+    and a single notification buffer is reused for every read.
+
+    Changes can be consumed by iterating over the watcher, which blocks,
+    or by waiting on :attr:`event` alongside other handles and calling
+    :meth:`read` once it's signaled.
+
+    >>> from pywincffi.kernel32 import DirectoryWatcher
+    >>> with DirectoryWatcher(u"C:\\incoming") as watcher:
+    ...     for change in watcher:
+    ...         if change.action is None:
+    ...             pass  # Notifications were lost, rescan the directory.
+
+    :param str path:
+        The directory to watch.
+
+    :keyword bool recursive:
+        If True, watch the whole directory tree under ``path``.
+
+    :keyword int notify_filter:
+        The ``FILE_NOTIFY_CHANGE_*`` flags to watch for.  Defaults to
+        file and directory name changes, size changes and writes.
+
+    :keyword int buffer_size:
+        The size of the notification buffer in bytes.  Watching a
+        directory on a network share limits this to 64KiB.
+    """
+    def __init__(self, path, recursive=False, notify_filter=None,
+                 buffer_size=65536):
+        ffi, library = dist.load()
+
+        if notify_filter is None:
+            notify_filter = (
+                library.FILE_NOTIFY_CHANGE_FILE_NAME |
+                library.FILE_NOTIFY_CHANGE_DIR_NAME |
+                library.FILE_NOTIFY_CHANGE_SIZE |
+                library.FILE_NOTIFY_CHANGE_LAST_WRITE)
+
+        path_to_text("path", path)
+        input_check("recursive", recursive, bool)
+        input_check("notify_filter", notify_filter, integer_types)
+        input_check("buffer_size", buffer_size, integer_types)
+
+        self.path = path
+        self.recursive = recursive
+        self.notify_filter = notify_filter
+        self.hDirectory = CreateFile(
+            path, library.FILE_LIST_DIRECTORY,
+            dwShareMode=(
+                library.FILE_SHARE_READ | library.FILE_SHARE_WRITE |
+                library.FILE_SHARE_DELETE),
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=(
+                library.FILE_FLAG_BACKUP_SEMANTICS |
+                library.FILE_FLAG_OVERLAPPED))
+        self._buffer = ffi.new("char[]", buffer_size)
+        self._overlapped = OVERLAPPED()
+        self._overlapped.hEvent = CreateEvent(True, False)
+        self._pending = False
+        self._start()
+
+    @property
+    def event(self):
+        """
+        A manual reset event which is signaled once changes are ready to
+        be returned by :meth:`read`.
+        """
+        return self._overlapped.hEvent
+
+    def _start(self):
+        """Starts the next overlapped read"""
+        ResetEvent(self.event)
+        ReadDirectoryChangesW(
+            self.hDirectory, self._buffer, self.recursive,
+            self.notify_filter, lpOverlapped=self._overlapped)
+        self._pending = True
+
+    def read(self, timeout=None):
+        """
+        Waits for the next batch of changes and returns them as a list of
+        :class:`DirectoryChange` objects.
+
+        If the notification buffer overflowed, and changes were lost, the
+        list contains a single change whose ``action`` and ``name`` are
+        None.  The caller should rescan the directory.
+
+        :keyword int timeout:
+            The number of milliseconds to wait.  By default this waits
+            forever.  An empty list is returned if the timeout expires.
+        """
+        ffi, library = dist.load()
+
+        if self.hDirectory is None:
+            raise ValueError("read() called on a closed DirectoryWatcher")
+
+        if timeout is None:
+            timeout = library.INFINITE
+
+        if WaitForSingleObject(self.event, timeout) == library.WAIT_TIMEOUT:
+            return []
+
+        self._pending = False
+
+        try:
+            size = GetOverlappedResult(
+                self.hDirectory, self._overlapped, False)
+        except WindowsAPIError as error:
+            if error.errno != library.ERROR_NOTIFY_ENUM_DIR:
+                raise
+            library.SetLastError(0)
+            size = 0
+
+        # Copy the changes out of the buffer before it's reused.
+        if size:
+            changes = parse_file_notify_information(
+                ffi.buffer(self._buffer, size))
+        else:
+            changes = [DirectoryChange(action=None, name=None)]
+
+        self._start()
+        return changes
+
+    def __iter__(self):
+        while self.hDirectory is not None:
+            for change in self.read():
+                yield change
+
+    def close(self):
+        """
+        Cancels the outstanding read then closes the directory handle and
+        the event.
+        """
+        if self.hDirectory is None:
+            return
+
+        _, library = dist.load()
+        hDirectory, self.hDirectory = self.hDirectory, None
+
+        # The buffer and OVERLAPPED structure must outlive the read.  Any
+        # changes the read returned are discarded.
+        if self._pending:
+            self._pending = False
+            try:
+                cancel_overlapped(hDirectory, self._overlapped)
+            except WindowsAPIError:
+                library.SetLastError(0)
+
+        CloseHandle(hDirectory)
+        CloseHandle(self.event)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
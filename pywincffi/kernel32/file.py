@@ -5,15 +5,47 @@ Files
 A module containing common Windows file functions for working with files.
 """
 
-from six import integer_types, text_type, binary_type
+from collections import namedtuple
+
+from six import integer_types, binary_type
 
 from pywincffi.core import dist
 from pywincffi.core.checks import NON_ZERO, input_check, error_check, NoneType
-from pywincffi.exceptions import WindowsAPIError
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.memory import VirtualAlloc, VirtualFree
 from pywincffi.wintypes import (
-    SECURITY_ATTRIBUTES, OVERLAPPED, HANDLE, wintype_to_cdata
+    SECURITY_ATTRIBUTES, OVERLAPPED, HANDLE, FILE_ALLOCATION_INFO,
+    FILE_END_OF_FILE_INFO, WIN32_FILE_ATTRIBUTE_DATA, wintype_to_cdata,
+    path_to_text, path_to_cdata
+)
+
+GetDiskFreeSpaceResult = namedtuple(
+    "GetDiskFreeSpaceResult",
+    ("lpSectorsPerCluster", "lpBytesPerSector", "lpNumberOfFreeClusters",
+     "lpTotalNumberOfClusters")
 )
 
+OverlappedRead = namedtuple(
+    "OverlappedRead", ("completed", "data", "buffer"))
+
+
+def _started(function, code):
+    """
+    Checks the result of an overlapped ``ReadFile`` or ``WriteFile``.
+    Returns True if the operation completed immediately and False if
+    it's pending.
+    """
+    if code != 0:
+        return True
+
+    ffi, library = dist.load()
+    errno, message = ffi.getwinerror()
+    if errno != library.ERROR_IO_PENDING:
+        raise WindowsAPIError(function, message, errno)
+    library.SetLastError(0)
+    return False
+
 
 def CreateFile(  # pylint: disable=too-many-arguments
         lpFileName, dwDesiredAccess, dwShareMode=None,
@@ -30,7 +62,9 @@ def CreateFile(  # pylint: disable=too-many-arguments
         https://msdn.microsoft.com/en-us/library/gg258116
 
     :param str lpFileName:
-        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.  A
+        :class:`pywincffi.wintypes.WidePath` or :class:`os.PathLike`
+        object may also be provided.
         The path to the file or device being created or opened.
 
     :param int dwDesiredAccess:
@@ -74,7 +108,7 @@ def CreateFile(  # pylint: disable=too-many-arguments
     if dwFlagsAndAttributes is None:
         dwFlagsAndAttributes = library.FILE_ATTRIBUTE_NORMAL
 
-    input_check("lpFileName", lpFileName, text_type)
+    lpFileName = path_to_cdata("lpFileName", lpFileName)
     input_check("dwDesiredAccess", dwDesiredAccess, integer_types)
     input_check("dwShareMode", dwShareMode, integer_types)
     input_check(
@@ -134,19 +168,32 @@ def WriteFile(hFile, lpBuffer, nNumberOfBytesToWrite=None, lpOverlapped=None):
 
     :keyword pywincffi.wintypes.OVERLAPPED lpOverlapped:
         See Microsoft's documentation for intended usage and below for
-        an example.
+        an example.  ``lpBuffer`` must be kept alive until the write
+        has completed.
 
         >>> from pywincffi.core import dist
-        >>> from pywincffi.kernel32 import WriteFile, CreateEvent
+        >>> from pywincffi.kernel32 import (
+        ...     WriteFile, CreateEvent, GetOverlappedResult)
         >>> from pywincffi.wintypes import OVERLAPPED
         >>> hEvent = CreateEvent(...)
         >>> lpOverlapped = OVERLAPPED()
         >>> lpOverlapped.hEvent = hEvent
-        >>> bytes_written = WriteFile(
-        ...     hFile, "Hello world", lpOverlapped=lpOverlapped)
+        >>> data = b"Hello world"
+        >>> if WriteFile(hFile, data, lpOverlapped=lpOverlapped):
+        ...     bytes_written = lpOverlapped.InternalHigh
+        ... else:
+        ...     bytes_written = GetOverlappedResult(
+        ...         hFile, lpOverlapped, True)
+
+    :raises WindowsAPIError:
+        Raised if the write fails.  When ``lpOverlapped`` is provided
+        an error number of ``ERROR_IO_PENDING`` is not considered a
+        failure.
 
     :returns:
-        Returns the number of bytes written.
+        Returns the number of bytes written.  When ``lpOverlapped`` is
+        provided returns True if the write completed immediately, so
+        there is no need to wait for it, or False if it's pending.
     """
     ffi, library = dist.load()
 
@@ -170,9 +217,10 @@ def WriteFile(hFile, lpBuffer, nNumberOfBytesToWrite=None, lpOverlapped=None):
         wintype_to_cdata(hFile), lpBuffer, nNumberOfBytesToWrite,
         bytes_written, wintype_to_cdata(lpOverlapped)
     )
-    expected = NON_ZERO if lpOverlapped is None else 0
-    error_check("WriteFile", code=code, expected=expected)
+    if lpOverlapped is not None:
+        return _started("WriteFile", code)
 
+    error_check("WriteFile", code=code, expected=NON_ZERO)
     return bytes_written[0]
 
 
@@ -212,17 +260,36 @@ def ReadFile(hFile, nNumberOfBytesToRead, lpOverlapped=None):
         an example.
 
         >>> from pywincffi.core import dist
-        >>> from pywincffi.kernel32 import ReadFile, CreateEvent
+        >>> from pywincffi.kernel32 import (
+        ...     ReadFile, CreateEvent, GetOverlappedResult)
         >>> from pywincffi.wintypes import OVERLAPPED
+        >>> ffi, _ = dist.load()
         >>> hEvent = CreateEvent(...)
         >>> lpOverlapped = OVERLAPPED()
         >>> lpOverlapped.hEvent = hEvent
-        >>> read_data = ReadFile(  # read 12 bytes from hFile
+        >>> result = ReadFile(  # read 12 bytes from hFile
         ...     hFile, 12, lpOverlapped=lpOverlapped)
+        >>> if result.completed:
+        ...     read_data = result.data
+        ... else:
+        ...     size = GetOverlappedResult(hFile, lpOverlapped, True)
+        ...     read_data = ffi.buffer(result.buffer, size)[:]
+
+    :raises WindowsAPIError:
+        Raised if the read fails.  When ``lpOverlapped`` is provided
+        an error number of ``ERROR_IO_PENDING`` is not considered a
+        failure.
 
     :returns:
         Returns the binary data read from ``hFile``
         Type is ``str`` on Python 2, ``bytes`` on Python 3.
+
+        When ``lpOverlapped`` is provided returns an
+        :class:`OverlappedRead` named tuple instead.  ``completed`` is
+        True if the read completed immediately, in which case ``data``
+        contains the data read, or False if it's pending and ``data`` is
+        None.  ``buffer`` is the ``char[]`` the data is read into which
+        must be kept alive until a pending read completes.
     """
     ffi, library = dist.load()
 
@@ -239,10 +306,94 @@ def ReadFile(hFile, nNumberOfBytesToRead, lpOverlapped=None):
         wintype_to_cdata(hFile), lpBuffer, nNumberOfBytesToRead, bytes_read,
         wintype_to_cdata(lpOverlapped)
     )
+
+    if lpOverlapped is not None:
+        if not _started("ReadFile", code):
+            return OverlappedRead(completed=False, data=None, buffer=lpBuffer)
+        return OverlappedRead(
+            completed=True, data=ffi.unpack(lpBuffer, bytes_read[0]),
+            buffer=lpBuffer)
+
     error_check("ReadFile", code=code, expected=NON_ZERO)
     return ffi.unpack(lpBuffer, bytes_read[0])
 
 
+def ReadFileInto(hFile, lpBuffer, nNumberOfBytesToRead=None,
+                 lpOverlapped=None):
+    """
+    Reads from ``hFile`` directly into an existing writable buffer,
+    such as a :class:`bytearray`, instead of allocating a new one like
+    :func:`ReadFile` does.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365467
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to read from.
+
+    :param lpBuffer:
+        The :class:`bytearray` or writable :class:`memoryview` to read
+        into.  A slice of a :class:`memoryview` may be used to read into
+        part of a larger buffer.
+
+    :keyword int nNumberOfBytesToRead:
+        The number of bytes to read.  Defaults to ``len(lpBuffer)``.
+
+    :keyword pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        See :func:`ReadFile`.  ``lpBuffer`` must not be used or freed
+        until the read has completed.
+
+    :raises InputError:
+        Raised if ``lpBuffer`` is read only or smaller than
+        ``nNumberOfBytesToRead``.
+
+    :rtype: int
+    :return:
+        Returns the number of bytes read into ``lpBuffer``.  A pending
+        overlapped read returns 0, use
+        :func:`pywincffi.kernel32.GetOverlappedResult` to get its size.
+    """
+    ffi, library = dist.load()
+
+    input_check("hFile", hFile, HANDLE)
+    input_check("lpBuffer", lpBuffer, (bytearray, memoryview))
+    input_check(
+        "nNumberOfBytesToRead", nNumberOfBytesToRead,
+        (NoneType, ) + integer_types)
+    input_check(
+        "lpOverlapped", lpOverlapped,
+        allowed_types=(NoneType, OVERLAPPED)
+    )
+
+    if isinstance(lpBuffer, memoryview) and lpBuffer.readonly:
+        raise InputError(
+            "lpBuffer", lpBuffer, message="`lpBuffer` must be writable")
+
+    # memoryview.nbytes doesn't exist on Python 2.7, the length of the
+    # cdata is the size in bytes on every version.
+    buffer_ = ffi.from_buffer(lpBuffer)
+    size = len(buffer_)
+    if nNumberOfBytesToRead is None:
+        nNumberOfBytesToRead = size
+
+    elif not 0 <= nNumberOfBytesToRead <= size:
+        raise InputError(
+            "nNumberOfBytesToRead", nNumberOfBytesToRead,
+            message="`nNumberOfBytesToRead` must be between 0 and %d" % size)
+
+    bytes_read = ffi.new("LPDWORD")
+    code = library.ReadFile(
+        wintype_to_cdata(hFile), buffer_,
+        nNumberOfBytesToRead, bytes_read, wintype_to_cdata(lpOverlapped)
+    )
+    if lpOverlapped is not None:
+        return bytes_read[0] if _started("ReadFile", code) else 0
+
+    error_check("ReadFile", code=code, expected=NON_ZERO)
+    return bytes_read[0]
+
+
 def MoveFileEx(lpExistingFileName, lpNewFileName, dwFlags=None):
     """
     Moves an existing file or directory, including its children,
@@ -253,11 +404,13 @@ def MoveFileEx(lpExistingFileName, lpNewFileName, dwFlags=None):
         https://msdn.microsoft.com/en-us/library/aa365240
 
     :param str lpExistingFileName:
-        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        Type is ``unicode`` on Python 2, ``str`` on Python 3 or a
+        :class:`pywincffi.wintypes.WidePath`.
         Name of the file or directory to perform the operation on.
 
     :param str lpNewFileName:
-        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        Type is ``unicode`` on Python 2, ``str`` on Python 3 or a
+        :class:`pywincffi.wintypes.WidePath`.
         Optional new name of the path or directory.  This value may be
         ``None``.
 
@@ -272,11 +425,12 @@ def MoveFileEx(lpExistingFileName, lpNewFileName, dwFlags=None):
         dwFlags = \
             library.MOVEFILE_REPLACE_EXISTING | library.MOVEFILE_WRITE_THROUGH
 
-    input_check("lpExistingFileName", lpExistingFileName, text_type)
+    lpExistingFileName = path_to_cdata(
+        "lpExistingFileName", lpExistingFileName)
     input_check("dwFlags", dwFlags, integer_types)
 
     if lpNewFileName is not None:
-        input_check("lpNewFileName", lpNewFileName, text_type)
+        lpNewFileName = path_to_cdata("lpNewFileName", lpNewFileName)
     else:
         lpNewFileName = ffi.NULL
 
@@ -288,6 +442,86 @@ def MoveFileEx(lpExistingFileName, lpNewFileName, dwFlags=None):
     error_check("MoveFileEx", code=code, expected=NON_ZERO)
 
 
+def CopyFileEx(
+        lpExistingFileName, lpNewFileName, lpProgressRoutine=None,
+        dwCopyFlags=0):
+    """
+    Copies an existing file to a new file, calling ``lpProgressRoutine``
+    as the copy progresses.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa363852
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import CopyFileEx
+    >>> _, library = dist.load()
+    >>> def progress(total_size, bytes_transferred):
+    ...     print("%d/%d" % (bytes_transferred, total_size))
+    >>> CopyFileEx(
+    ...     u"C:\\data\\large.bin", u"D:\\large.bin", progress,
+    ...     dwCopyFlags=library.COPY_FILE_NO_BUFFERING)
+
+    :param str lpExistingFileName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3 or a
+        :class:`pywincffi.wintypes.WidePath`.
+        The file to copy.
+
+    :param str lpNewFileName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3 or a
+        :class:`pywincffi.wintypes.WidePath`.
+        The name of the new file.  An existing file is replaced unless
+        ``COPY_FILE_FAIL_IF_EXISTS`` is provided.
+
+    :keyword lpProgressRoutine:
+        A callable which is called with the total size of the file and
+        the number of bytes copied so far.  It may return one of the
+        ``PROGRESS_*`` values, ``PROGRESS_CANCEL`` for example, otherwise
+        the copy continues.  An exception raised by the callable cancels
+        the copy and is raised by :func:`CopyFileEx`.
+
+    :keyword int dwCopyFlags:
+        Flags which control the copy such as ``COPY_FILE_NO_BUFFERING``
+        which is recommended for very large files.
+
+    :raises WindowsAPIError:
+        Raised if the copy fails or is cancelled, in which case the error
+        number will be ``ERROR_REQUEST_ABORTED``.
+    """
+    lpExistingFileName = path_to_cdata(
+        "lpExistingFileName", lpExistingFileName)
+    lpNewFileName = path_to_cdata("lpNewFileName", lpNewFileName)
+    input_check("dwCopyFlags", dwCopyFlags, integer_types)
+    ffi, library = dist.load()
+    errors = []
+
+    if lpProgressRoutine is None:
+        callback = ffi.NULL
+    else:
+        def progress(total_size, bytes_transferred, _):
+            try:
+                result = lpProgressRoutine(total_size, bytes_transferred)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+                return library.PROGRESS_CANCEL
+
+            if result is None:
+                return library.PROGRESS_CONTINUE
+            return result
+
+        callback = ffi.callback("COPY_PROGRESS_ROUTINE", progress)
+
+    code = library.copy_file_ex(
+        lpExistingFileName, lpNewFileName, callback, ffi.NULL, ffi.NULL,
+        ffi.cast("DWORD", dwCopyFlags))
+
+    if errors:
+        library.SetLastError(0)
+        raise errors[0]
+
+    error_check("CopyFileEx", code=code, expected=NON_ZERO)
+
+
 def LockFileEx(
         hFile, dwFlags, nNumberOfBytesToLockLow, nNumberOfBytesToLockHigh,
         lpOverlapped=None):
@@ -321,6 +555,15 @@ def LockFileEx(
         an input argument and may contain results after calling. If None is
         provided, a throw-away zero-filled instance will be created to
         support such call. See Microsoft's documentation for intended usage.
+        If ``hFile`` was opened with ``FILE_FLAG_OVERLAPPED`` the lock is
+        requested asynchronously and the ``hEvent`` member, if provided,
+        is signaled once the lock has been granted.
+
+    :raises WindowsAPIError:
+        Raised if the lock could not be requested.  When ``lpOverlapped``
+        is provided an error number of ``ERROR_IO_PENDING`` is not
+        considered a failure, use
+        :func:`pywincffi.kernel32.GetOverlappedResult` to wait for the lock.
     """
     input_check("hFile", hFile, HANDLE)
     input_check("dwFlags", dwFlags, integer_types)
@@ -331,6 +574,7 @@ def LockFileEx(
 
     ffi, library = dist.load()
 
+    pending_allowed = lpOverlapped is not None
     if lpOverlapped is None:
         # Required by Windows API, create a throw-away zero-filled instance.
         lpOverlapped = OVERLAPPED()
@@ -345,6 +589,12 @@ def LockFileEx(
         ffi.cast("DWORD", nNumberOfBytesToLockHigh),
         wintype_to_cdata(lpOverlapped)
     )
+
+    if pending_allowed and code == 0:
+        errno, _ = ffi.getwinerror()
+        if errno == library.ERROR_IO_PENDING:
+            return
+
     error_check("LockFileEx", code=code, expected=NON_ZERO)
 
 
@@ -399,3 +649,741 @@ def UnlockFileEx(
         wintype_to_cdata(lpOverlapped)
     )
     error_check("UnlockFileEx", code=code, expected=NON_ZERO)
+
+
+def SetFilePointerEx(hFile, liDistanceToMove, dwMoveMethod=None):
+    """
+    Moves the file pointer of ``hFile``.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365542
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file.
+
+    :param int liDistanceToMove:
+        The number of bytes to move the file pointer.  Unlike the
+        ``SetFilePointer`` function this accepts the full 64 bit range.
+
+    :keyword int dwMoveMethod:
+        The starting point for the move, ``FILE_BEGIN``, ``FILE_CURRENT``
+        or ``FILE_END``.  Defaults to ``FILE_BEGIN``.
+
+    :rtype: int
+    :return:
+        Returns the new position of the file pointer.
+    """
+    ffi, library = dist.load()
+
+    if dwMoveMethod is None:
+        dwMoveMethod = library.FILE_BEGIN
+
+    input_check("hFile", hFile, HANDLE)
+    input_check("liDistanceToMove", liDistanceToMove, integer_types)
+    input_check(
+        "dwMoveMethod", dwMoveMethod,
+        allowed_values=(
+            library.FILE_BEGIN, library.FILE_CURRENT, library.FILE_END))
+
+    distance = ffi.new("PLARGE_INTEGER")
+    distance.QuadPart = liDistanceToMove
+    lpNewFilePointer = ffi.new("PLARGE_INTEGER")
+
+    code = library.SetFilePointerEx(
+        wintype_to_cdata(hFile), distance[0], lpNewFilePointer,
+        ffi.cast("DWORD", dwMoveMethod))
+    error_check("SetFilePointerEx", code=code, expected=NON_ZERO)
+
+    return lpNewFilePointer.QuadPart
+
+
+def GetFileSizeEx(hFile):
+    """
+    Retrieves the size of ``hFile``.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364957
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file.  The handle must have been created with
+        the ``FILE_READ_ATTRIBUTES`` or ``GENERIC_READ`` access right.
+
+    :rtype: int
+    :return:
+        Returns the size of the file in bytes.
+    """
+    input_check("hFile", hFile, HANDLE)
+    ffi, library = dist.load()
+
+    lpFileSize = ffi.new("PLARGE_INTEGER")
+    code = library.GetFileSizeEx(wintype_to_cdata(hFile), lpFileSize)
+    error_check("GetFileSizeEx", code=code, expected=NON_ZERO)
+
+    return lpFileSize.QuadPart
+
+
+def GetFileAttributesEx(lpFileName):
+    """
+    Retrieves the attributes, timestamps and size of a file or directory
+    without opening it.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364946
+
+    :param str lpFileName:
+        The path to the file or directory.
+
+    :raises WindowsAPIError:
+        Raised if the attributes could not be retrieved, for example
+        ``ERROR_FILE_NOT_FOUND`` if the file does not exist.
+
+    :rtype: :class:`pywincffi.wintypes.WIN32_FILE_ATTRIBUTE_DATA`
+    """
+    lpFileName = path_to_cdata("lpFileName", lpFileName)
+    _, library = dist.load()
+
+    lpFileInformation = WIN32_FILE_ATTRIBUTE_DATA()
+    code = library.GetFileAttributesEx(
+        lpFileName, library.GetFileExInfoStandard,
+        wintype_to_cdata(lpFileInformation))
+    error_check("GetFileAttributesEx", code=code, expected=NON_ZERO)
+
+    return lpFileInformation
+
+
+def SetFileCompletionNotificationModes(FileHandle, Flags):
+    """
+    Changes how the system notifies the caller when an overlapped
+    operation on ``FileHandle`` completes immediately.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365538
+
+    :param pywincffi.wintypes.HANDLE FileHandle:
+        The handle to a file, pipe or socket opened for overlapped I/O.
+
+    :param int Flags:
+        ``FILE_SKIP_COMPLETION_PORT_ON_SUCCESS`` prevents a completion
+        packet from being queued to an I/O completion port when an
+        operation completes immediately.  ``FILE_SKIP_SET_EVENT_ON_HANDLE``
+        prevents the event of the handle itself from being signaled, the
+        ``hEvent`` of an ``OVERLAPPED`` structure is still signaled.
+        Neither mode can be turned off again once set.
+    """
+    input_check("FileHandle", FileHandle, HANDLE)
+    input_check("Flags", Flags, integer_types)
+
+    ffi, library = dist.load()
+    code = library.SetFileCompletionNotificationModes(
+        wintype_to_cdata(FileHandle), ffi.cast("UCHAR", Flags))
+    error_check(
+        "SetFileCompletionNotificationModes", code=code, expected=NON_ZERO)
+
+
+def SetEndOfFile(hFile):
+    """
+    Sets the physical file size for ``hFile`` to the current position of
+    the file pointer.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365531
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file.  The handle must have been created with
+        the ``GENERIC_WRITE`` access right.
+    """
+    input_check("hFile", hFile, HANDLE)
+    _, library = dist.load()
+    code = library.SetEndOfFile(wintype_to_cdata(hFile))
+    error_check("SetEndOfFile", code=code, expected=NON_ZERO)
+
+
+def SetFileInformationByHandle(
+        hFile, FileInformationClass, lpFileInformation, dwBufferSize=None):
+    """
+    Sets the file information for ``hFile``.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365539
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import SetFileInformationByHandle
+    >>> from pywincffi.wintypes import FILE_ALLOCATION_INFO
+    >>> _, library = dist.load()
+    >>> info = FILE_ALLOCATION_INFO()
+    >>> info.AllocationSize = 1024 * 1024 * 64
+    >>> SetFileInformationByHandle(hFile, library.FileAllocationInfo, info)
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file.
+
+    :param int FileInformationClass:
+        The type of information being set, ``FileAllocationInfo`` or
+        ``FileEndOfFileInfo`` for example.  This must match the type of
+        ``lpFileInformation``.
+
+    :type lpFileInformation: FILE_ALLOCATION_INFO or FILE_END_OF_FILE_INFO
+    :param lpFileInformation:
+        The information to set, see :mod:`pywincffi.wintypes`.
+
+    :keyword int dwBufferSize:
+        The size of ``lpFileInformation`` in bytes.  Defaults to the size
+        of the underlying structure.
+    """
+    input_check("hFile", hFile, HANDLE)
+    input_check(
+        "FileInformationClass", FileInformationClass, integer_types)
+    input_check(
+        "lpFileInformation", lpFileInformation,
+        (FILE_ALLOCATION_INFO, FILE_END_OF_FILE_INFO))
+
+    ffi, library = dist.load()
+    lpFileInformation = wintype_to_cdata(lpFileInformation)
+
+    if dwBufferSize is None:
+        dwBufferSize = ffi.sizeof(lpFileInformation[0])
+
+    input_check("dwBufferSize", dwBufferSize, integer_types)
+
+    code = library.SetFileInformationByHandle(
+        wintype_to_cdata(hFile),
+        FileInformationClass,
+        lpFileInformation,
+        ffi.cast("DWORD", dwBufferSize)
+    )
+    error_check("SetFileInformationByHandle", code=code, expected=NON_ZERO)
+
+
+def GetFileInformationByHandleEx(
+        hFile, FileInformationClass, lpFileInformation, dwBufferSize=None):
+    """
+    Retrieves file information for ``hFile``.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364953
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import GetFileInformationByHandleEx
+    >>> ffi, library = dist.load()
+    >>> buffer_ = ffi.new("char[]", 65536)
+    >>> GetFileInformationByHandleEx(
+    ...     hDirectory, library.FileIdBothDirectoryInfo, buffer_)
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file or directory.
+
+    :param int FileInformationClass:
+        The type of information to retrieve, ``FileIdBothDirectoryInfo``
+        for example.
+
+    :param lpFileInformation:
+        A cdata object, such as one created with
+        ``ffi.new("char[]", size)``, which will receive the information.
+
+    :keyword int dwBufferSize:
+        The size of ``lpFileInformation`` in bytes.  Defaults to the size
+        of the cdata object.
+
+    :raises WindowsAPIError:
+        Raised if the underlying function fails.  When enumerating a
+        directory the error number will be ``ERROR_NO_MORE_FILES`` once
+        every entry has been returned.
+    """
+    input_check("hFile", hFile, HANDLE)
+    input_check(
+        "FileInformationClass", FileInformationClass, integer_types)
+
+    ffi, library = dist.load()
+    input_check("lpFileInformation", lpFileInformation, ffi.CData)
+
+    if dwBufferSize is None:
+        dwBufferSize = ffi.sizeof(lpFileInformation)
+
+    input_check("dwBufferSize", dwBufferSize, integer_types)
+
+    code = library.GetFileInformationByHandleEx(
+        wintype_to_cdata(hFile),
+        FileInformationClass,
+        lpFileInformation,
+        ffi.cast("DWORD", dwBufferSize)
+    )
+    error_check(
+        "GetFileInformationByHandleEx", code=code, expected=NON_ZERO)
+
+
+def preallocate(hFile, size):
+    """
+    Reserves ``size`` bytes of disk space for ``hFile`` with a single call
+    so a file which grows through many small writes is not extended, and
+    fragmented, a few kilobytes at a time.  The logical size of the file
+    does not change.
+
+    Space which is allocated beyond the end of the file is released when
+    the last handle to the file is closed.  Use :func:`truncate` to set
+    the final size if the file was extended past the data written.
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file.  The handle must have been created with
+        the ``GENERIC_WRITE`` access right.
+
+    :param int size:
+        The number of bytes to reserve.
+    """
+    input_check("size", size, integer_types)
+    _, library = dist.load()
+    info = FILE_ALLOCATION_INFO()
+    info.AllocationSize = size
+    SetFileInformationByHandle(hFile, library.FileAllocationInfo, info)
+
+
+def truncate(hFile, size):
+    """
+    Sets the end of ``hFile`` to ``size`` bytes, extending or truncating
+    the file as needed.  Unlike :func:`SetEndOfFile` the file pointer
+    is not used or moved.
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to the file.  The handle must have been created with
+        the ``GENERIC_WRITE`` access right.
+
+    :param int size:
+        The new size of the file in bytes.
+    """
+    input_check("size", size, integer_types)
+    _, library = dist.load()
+    info = FILE_END_OF_FILE_INFO()
+    info.EndOfFile = size
+    SetFileInformationByHandle(hFile, library.FileEndOfFileInfo, info)
+
+
+class SegmentArray(object):
+    """
+    A ``NULL`` terminated array of ``FILE_SEGMENT_ELEMENT`` structures
+    for :func:`ReadFileScatter` and :func:`WriteFileGather`.  The array is
+    built once and may be reused for any number of calls.  Each buffer must
+    be exactly one system page and page aligned, see
+    :class:`pywincffi.kernel32.PageAllocator`.
+
+    :param list buffers:
+        A list or tuple of page buffers (``char *`` or ``void *`` cdata).
+    """
+    def __init__(self, buffers):
+        input_check("buffers", buffers, (list, tuple))
+        ffi, _ = dist.load()
+        self._cdata = ffi.new("FILE_SEGMENT_ELEMENT[]", len(buffers) + 1)
+        self.buffers = []
+        self.update(buffers)
+
+    def update(self, buffers):
+        """
+        Replaces the buffers in the array in place.  ``buffers`` may not
+        be longer than the list the array was constructed with.
+        """
+        input_check("buffers", buffers, (list, tuple))
+
+        if len(buffers) >= len(self._cdata):
+            raise InputError(
+                "buffers", buffers,
+                message="Expected at most %d buffers, got %d" % (
+                    len(self._cdata) - 1, len(buffers)))
+
+        ffi, _ = dist.load()
+        for index, buffer_ in enumerate(buffers):
+            self._cdata[index].Alignment = ffi.cast("uintptr_t", buffer_)
+
+        # The array must always be terminated by a NULL element.
+        self._cdata[len(buffers)].Alignment = 0
+        self.buffers = list(buffers)
+
+    def __len__(self):
+        return len(self.buffers)
+
+
+def _scatter_gather(function, hFile, aSegmentArray, nNumberOfBytes,
+                    lpOverlapped):
+    """
+    Shared implementation of :func:`ReadFileScatter` and
+    :func:`WriteFileGather`.
+    """
+    input_check("hFile", hFile, HANDLE)
+    input_check("aSegmentArray", aSegmentArray, (list, tuple, SegmentArray))
+    input_check("lpOverlapped", lpOverlapped, OVERLAPPED)
+
+    if not isinstance(aSegmentArray, SegmentArray):
+        aSegmentArray = SegmentArray(aSegmentArray)
+
+    ffi, library = dist.load()
+
+    code = getattr(library, function)(
+        wintype_to_cdata(hFile),
+        wintype_to_cdata(aSegmentArray),
+        ffi.cast("DWORD", nNumberOfBytes),
+        ffi.NULL,  # "_Reserved_"
+        wintype_to_cdata(lpOverlapped)
+    )
+    return _started(function, code)
+
+
+def ReadFileScatter(hFile, aSegmentArray, nNumberOfBytesToRead, lpOverlapped):
+    """
+    Reads data from ``hFile`` and stores it in an array of page buffers
+    using a single system call.
+
+    ``hFile`` must have been opened with ``FILE_FLAG_NO_BUFFERING`` and
+    ``FILE_FLAG_OVERLAPPED``.  The read is asynchronous; use
+    :func:`pywincffi.kernel32.GetOverlappedResult` to wait for it and to
+    retrieve the number of bytes read.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365469
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to read from.
+
+    :type aSegmentArray: list, tuple or :class:`SegmentArray`
+    :param aSegmentArray:
+        The page buffers to read into.  Passing a prebuilt
+        :class:`SegmentArray` avoids rebuilding the array on every call.
+
+    :param int nNumberOfBytesToRead:
+        The total number of bytes to read.  This must be a multiple of
+        the volume's sector size.
+
+    :param pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        The ``Offset`` and ``OffsetHigh`` members specify where in the
+        file to start reading.
+
+    :raises WindowsAPIError:
+        Raised if the read fails for any reason other than
+        ``ERROR_IO_PENDING``.
+
+    :rtype: bool
+    :return:
+        Returns True if the read completed immediately.  The number of
+        bytes read is then available without waiting, from the
+        ``InternalHigh`` member of ``lpOverlapped`` or
+        :func:`pywincffi.kernel32.GetOverlappedResult` with ``bWait``
+        set to False.  Returns False if the read is pending.
+    """
+    return _scatter_gather(
+        "ReadFileScatter", hFile, aSegmentArray, nNumberOfBytesToRead,
+        lpOverlapped)
+
+
+def WriteFileGather(
+        hFile, aSegmentArray, nNumberOfBytesToWrite, lpOverlapped):
+    """
+    Writes data from an array of page buffers to ``hFile`` using a single
+    system call.
+
+    ``hFile`` must have been opened with ``FILE_FLAG_NO_BUFFERING`` and
+    ``FILE_FLAG_OVERLAPPED``.  The write is asynchronous; use
+    :func:`pywincffi.kernel32.GetOverlappedResult` to wait for it and to
+    retrieve the number of bytes written.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365749
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle to write to.
+
+    :type aSegmentArray: list, tuple or :class:`SegmentArray`
+    :param aSegmentArray:
+        The page buffers to write from.  Passing a prebuilt
+        :class:`SegmentArray` avoids rebuilding the array on every call.
+
+    :param int nNumberOfBytesToWrite:
+        The total number of bytes to write.  This must be a multiple of
+        the volume's sector size.
+
+    :param pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        The ``Offset`` and ``OffsetHigh`` members specify where in the
+        file to start writing.
+
+    :raises WindowsAPIError:
+        Raised if the write fails for any reason other than
+        ``ERROR_IO_PENDING``.
+
+    :rtype: bool
+    :return:
+        Returns True if the write completed immediately and False if it
+        is pending, see :func:`ReadFileScatter`.
+    """
+    return _scatter_gather(
+        "WriteFileGather", hFile, aSegmentArray, nNumberOfBytesToWrite,
+        lpOverlapped)
+
+
+def GetVolumePathName(lpszFileName):
+    """
+    Retrieves the volume mount point where ``lpszFileName`` is mounted.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364996
+
+    :param str lpszFileName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        The path to a file or directory.  The path does not need to exist.
+
+    :rtype: str
+    :return:
+        Returns the volume mount point, ``C:\\`` for example.
+    """
+    lpszFileName = path_to_cdata("lpszFileName", lpszFileName)
+    ffi, library = dist.load()
+
+    # The mount point can never be longer than the input path plus
+    # a trailing backslash and the terminating NULL character.
+    cchBufferLength = max(len(lpszFileName) + 2, library.MAX_PATH)
+    lpszVolumePathName = ffi.new("wchar_t[%d]" % cchBufferLength)
+    code = library.GetVolumePathName(
+        lpszFileName, lpszVolumePathName, cchBufferLength)
+    error_check("GetVolumePathName", code=code, expected=NON_ZERO)
+    return ffi.string(lpszVolumePathName)
+
+
+def GetDiskFreeSpace(lpRootPathName=None):
+    """
+    Retrieves information about the specified disk, including its sector
+    size which is required when working with ``FILE_FLAG_NO_BUFFERING``.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa364935
+
+    :keyword str lpRootPathName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        The root directory of the disk, ``C:\\`` for example.  If not
+        provided the root of the current directory will be used.  See
+        :func:`GetVolumePathName` to determine the root for a given path.
+
+    :rtype: :class:`GetDiskFreeSpaceResult`
+    """
+    ffi, library = dist.load()
+
+    if lpRootPathName is None:
+        lpRootPathName = ffi.NULL
+    else:
+        lpRootPathName = path_to_cdata("lpRootPathName", lpRootPathName)
+
+    lpSectorsPerCluster = ffi.new("LPDWORD")
+    lpBytesPerSector = ffi.new("LPDWORD")
+    lpNumberOfFreeClusters = ffi.new("LPDWORD")
+    lpTotalNumberOfClusters = ffi.new("LPDWORD")
+    code = library.GetDiskFreeSpace(
+        lpRootPathName, lpSectorsPerCluster, lpBytesPerSector,
+        lpNumberOfFreeClusters, lpTotalNumberOfClusters)
+    error_check("GetDiskFreeSpace", code=code, expected=NON_ZERO)
+
+    return GetDiskFreeSpaceResult(
+        lpSectorsPerCluster=lpSectorsPerCluster[0],
+        lpBytesPerSector=lpBytesPerSector[0],
+        lpNumberOfFreeClusters=lpNumberOfFreeClusters[0],
+        lpTotalNumberOfClusters=lpTotalNumberOfClusters[0]
+    )
+
+
+def sector_size(path):
+    """
+    Returns the sector size, in bytes, of the volume ``path`` resides on.
+    Offsets, sizes and buffer addresses used with a handle opened with
+    ``FILE_FLAG_NO_BUFFERING`` must be multiples of this value.
+
+    :param str path:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        A path to a file or directory on the volume.
+    """
+    return GetDiskFreeSpace(GetVolumePathName(path)).lpBytesPerSector
+
+
+class DirectFile(object):
+    """
+    Reads a file which has been opened with ``FILE_FLAG_NO_BUFFERING`` so
+    large, single pass reads bypass the system cache instead of evicting
+    other data from it.
+
+    Unbuffered I/O requires that file offsets, read sizes and buffer
+    addresses are all aligned to the volume's sector size.  This class
+    reads into a sector aligned buffer allocated with
+    :func:`pywincffi.kernel32.VirtualAlloc` and expands every request to
+    sector boundaries so callers may read any range, including a partial
+    sector at the end of the file.
+
+    >>> from pywincffi.kernel32 import DirectFile
+    >>> with DirectFile(u"C:\\data\\large.bin") as file_:
+    ...     header = file_.read(0, 16)
+    ...     for chunk in file_.scan():
+    ...         pass
+
+    :param str path:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        The path to the file to read.
+
+    :keyword int buffer_size:
+        The size of the aligned read buffer.  This is rounded up to a
+        multiple of the sector size and is also the size of the chunks
+        produced by :meth:`scan`.  Defaults to 1 MiB.
+
+    :keyword int dwShareMode:
+        Passed to :func:`CreateFile`.  Defaults to ``FILE_SHARE_READ``.
+
+    :keyword int dwFlagsAndAttributes:
+        Additional flags, such as ``FILE_FLAG_SEQUENTIAL_SCAN``, to combine
+        with ``FILE_FLAG_NO_BUFFERING`` when opening the file.
+    """
+    def __init__(self, path, buffer_size=1048576, dwShareMode=None,
+                 dwFlagsAndAttributes=0):
+        path_to_text("path", path)
+        input_check("buffer_size", buffer_size, integer_types)
+        input_check(
+            "dwFlagsAndAttributes", dwFlagsAndAttributes, integer_types)
+
+        if buffer_size < 1:
+            raise InputError(
+                "buffer_size", buffer_size,
+                message="`buffer_size` must be greater than zero")
+
+        ffi, library = dist.load()
+        self.path = path
+        self.sector_size = sector_size(path)
+        self.buffer_size = self._align_up(buffer_size)
+        self.handle = CreateFile(
+            path, library.GENERIC_READ, dwShareMode=dwShareMode,
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=library.FILE_FLAG_NO_BUFFERING |
+            dwFlagsAndAttributes)
+
+        try:
+            self._address = VirtualAlloc(
+                None, self.buffer_size,
+                library.MEM_COMMIT | library.MEM_RESERVE,
+                library.PAGE_READWRITE)
+        except WindowsAPIError:
+            CloseHandle(self.handle)
+            raise
+
+        self._buffer = ffi.cast("char *", self._address)
+        self._bytes_read = ffi.new("LPDWORD")
+        self._overlapped = OVERLAPPED()
+
+    def _align_up(self, value):
+        """Rounds ``value`` up to a multiple of the sector size."""
+        return -(-value // self.sector_size) * self.sector_size
+
+    def _read_aligned(self, offset, size):
+        """
+        Reads ``size`` bytes at ``offset`` into the aligned buffer and
+        returns the number of bytes read.  Both values must already be
+        sector aligned.  Reads that start at or past the end of the file
+        return ``0``.
+        """
+        ffi, library = dist.load()
+
+        # The OVERLAPPED structure provides the file offset for the read.
+        # The handle is synchronous so the read still completes before
+        # ReadFile returns.
+        self._overlapped.Offset = offset & 0xFFFFFFFF
+        self._overlapped.OffsetHigh = offset >> 32
+
+        code = library.ReadFile(
+            wintype_to_cdata(self.handle), self._buffer, size,
+            self._bytes_read, wintype_to_cdata(self._overlapped))
+
+        if code == 0:
+            errno, message = ffi.getwinerror()
+            if errno == library.ERROR_HANDLE_EOF:
+                library.SetLastError(0)
+                return 0
+            raise WindowsAPIError("ReadFile", message, errno)
+
+        return self._bytes_read[0]
+
+    def read(self, offset, size):
+        """
+        Returns up to ``size`` bytes starting at ``offset``.  Fewer bytes
+        are returned if the end of the file is reached.
+
+        :param int offset:
+            The position in the file to start reading from.  This does
+            not need to be aligned.
+
+        :param int size:
+            The number of bytes to read.  This does not need to be
+            aligned.
+
+        :raises InputError:
+            Raised if ``offset`` or ``size`` is negative.
+        """
+        input_check("offset", offset, integer_types)
+        input_check("size", size, integer_types)
+
+        for name, value in (("offset", offset), ("size", size)):
+            if value < 0:
+                raise InputError(
+                    name, value, message="`%s` must not be negative" % name)
+
+        ffi, _ = dist.load()
+
+        end = offset + size
+        position = offset - (offset % self.sector_size)
+        chunks = []
+
+        while position < end:
+            requested = min(self.buffer_size, self._align_up(end - position))
+            bytes_read = self._read_aligned(position, requested)
+            start = max(offset - position, 0)
+            stop = min(bytes_read, end - position)
+
+            if stop > start:
+                chunks.append(ffi.buffer(self._buffer, bytes_read)[start:stop])
+
+            # A short read means the end of the file was reached.
+            if bytes_read < requested:
+                break
+
+            position += bytes_read
+
+        return b"".join(chunks)
+
+    def scan(self):
+        """
+        Yields the contents of the file, from start to end, in chunks
+        of ``buffer_size`` bytes.  The last chunk may be shorter.
+        """
+        ffi, _ = dist.load()
+        position = 0
+
+        while True:
+            bytes_read = self._read_aligned(position, self.buffer_size)
+            if bytes_read:
+                yield ffi.buffer(self._buffer, bytes_read)[:]
+
+            if bytes_read < self.buffer_size:
+                break
+
+            position += bytes_read
+
+    def close(self):
+        """Closes the file handle and releases the aligned buffer."""
+        _, library = dist.load()
+
+        if self._address is not None:
+            VirtualFree(self._address, 0, library.MEM_RELEASE)
+            self._address = None
+            CloseHandle(self.handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
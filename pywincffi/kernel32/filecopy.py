@@ -0,0 +1,327 @@
+"""
+Copying Files
+-------------
+
+Provides :func:`copyfile` which copies large files with several
+overlapped reads and writes in flight at once, bypassing the system
+cache when both volumes allow it.
+"""
+
+import time
+from collections import deque, namedtuple
+
+from six import integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check, NoneType
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.events import CreateEvent
+from pywincffi.kernel32.file import (
+    CreateFile, CopyFileEx, GetFileSizeEx, preallocate, truncate,
+    sector_size)
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.memory import VirtualAlloc, VirtualFree
+from pywincffi.kernel32.overlapped import GetOverlappedResult
+from pywincffi.wintypes import OVERLAPPED, wintype_to_cdata, path_to_text
+
+CopyProgress = namedtuple(
+    "CopyProgress",
+    ("bytes_copied", "total_bytes", "seconds", "bytes_per_second"))
+
+
+class _Chunk(object):  # pylint: disable=too-few-public-methods
+    """
+    A buffer and the ``OVERLAPPED`` structure used to read a chunk of
+    the source and then write it to the destination.
+    """
+    def __init__(self, buffer_):
+        self.buffer = buffer_
+        self.overlapped = OVERLAPPED()
+        self.overlapped.hEvent = CreateEvent(True, False)
+        self.hFile = None
+        self.offset = 0
+        self.length = 0
+        self.writing = False
+        self.pending = False
+        self.transferred = 0
+
+
+def _start(function, hFile, chunk, size):
+    """
+    Starts an overlapped ``ReadFile`` or ``WriteFile`` of ``size`` bytes
+    between ``chunk``'s buffer and ``chunk.offset`` in ``hFile``.
+    """
+    ffi, library = dist.load()
+    chunk.hFile = hFile
+    chunk.writing = function == "WriteFile"
+    chunk.overlapped.Offset = chunk.offset & 0xFFFFFFFF
+    chunk.overlapped.OffsetHigh = chunk.offset >> 32
+    chunk.transferred = 0
+
+    code = getattr(library, function)(
+        wintype_to_cdata(hFile), chunk.buffer, size, ffi.NULL,
+        wintype_to_cdata(chunk.overlapped))
+
+    # The operation completed immediately, usually because the data was
+    # in the system cache, so there's no need to wait for it.
+    if code != 0:
+        chunk.transferred = int(chunk.overlapped.InternalHigh)
+        chunk.pending = False
+        return
+
+    errno, message = ffi.getwinerror()
+
+    # The source was truncated while it was being copied.
+    if errno == library.ERROR_HANDLE_EOF:
+        library.SetLastError(0)
+        return
+
+    if errno != library.ERROR_IO_PENDING:
+        raise WindowsAPIError(function, message, errno)
+    library.SetLastError(0)
+    chunk.pending = True
+
+
+def _wait(chunk):
+    """Waits for ``chunk``'s operation and returns the bytes transferred"""
+    _, library = dist.load()
+
+    if not chunk.pending:
+        return chunk.transferred
+
+    chunk.pending = False
+    try:
+        return GetOverlappedResult(chunk.hFile, chunk.overlapped, True)
+    except WindowsAPIError as error:
+        if error.errno != library.ERROR_HANDLE_EOF:
+            raise
+        library.SetLastError(0)
+        return 0
+
+
+def _unbuffered_alignment(source, destination):
+    """
+    Returns the size, in bytes, which offsets and lengths must be
+    multiples of to copy from ``source`` to ``destination`` without
+    buffering.  Returns None if the sector size of either volume could
+    not be determined, for example because it's a network share.
+    """
+    _, library = dist.load()
+
+    try:
+        sizes = (sector_size(source), sector_size(destination))
+    except WindowsAPIError:
+        library.SetLastError(0)
+        return None
+
+    # Sector sizes are powers of two so the larger is a multiple of both.
+    return max(sizes)
+
+
+def _pipeline(hSource, hDestination, size, chunk_size, max_in_flight,
+              alignment, report):
+    """
+    Copies ``size`` bytes from ``hSource`` to ``hDestination`` and returns
+    the number of bytes copied.  Each chunk is written as soon as its read
+    completes and the chunk is then reused to read the next unread range.
+    """
+    ffi, library = dist.load()
+    count = max(1, min(max_in_flight, -(-size // chunk_size)))
+    address = VirtualAlloc(
+        None, chunk_size * count, library.MEM_COMMIT | library.MEM_RESERVE,
+        library.PAGE_READWRITE)
+    base = ffi.cast("char *", address)
+    chunks = []
+    queue = deque()
+    next_offset = copied = 0
+
+    try:
+        for index in range(count):
+            chunks.append(_Chunk(base + index * chunk_size))
+
+        for chunk in chunks:
+            if next_offset >= size:
+                break
+            chunk.offset = next_offset
+            next_offset += chunk_size
+            _start("ReadFile", hSource, chunk, chunk_size)
+            queue.append(chunk)
+
+        while queue:
+            chunk = queue.popleft()
+            transferred = _wait(chunk)
+
+            if not chunk.writing:
+                if transferred == 0:
+                    continue
+
+                # Unbuffered writes must be whole sectors, the destination
+                # is truncated to the size of the source afterwards.
+                chunk.length = transferred
+                if alignment is not None:
+                    transferred = -(-transferred // alignment) * alignment
+                _start("WriteFile", hDestination, chunk, transferred)
+                queue.append(chunk)
+                continue
+
+            copied += chunk.length
+            report(copied, size)
+
+            if next_offset < size:
+                chunk.offset = next_offset
+                next_offset += chunk_size
+                _start("ReadFile", hSource, chunk, chunk_size)
+                queue.append(chunk)
+
+        return copied
+
+    finally:
+        # The buffers can't be released while the system may still be
+        # reading into or writing from them.
+        for chunk in queue:
+            try:
+                _wait(chunk)
+            except WindowsAPIError:
+                library.SetLastError(0)
+
+        for chunk in chunks:
+            CloseHandle(chunk.overlapped.hEvent)
+
+        VirtualFree(address, 0, library.MEM_RELEASE)
+
+
+def copyfile(  # pylint: disable=too-many-arguments,too-many-locals
+        source, destination, chunk_size=1048576, max_in_flight=4,
+        unbuffered=None, use_copy_file_ex=False, progress=None):
+    """
+    Copies ``source`` to ``destination``, replacing ``destination`` if it
+    exists, and returns the number of bytes copied.
+
+    The destination is preallocated and the file is copied in chunks of
+    ``chunk_size`` bytes with up to ``max_in_flight`` overlapped reads and
+    writes outstanding, so reading the next chunk overlaps with writing the
+    previous one.  When both volumes report their sector size the copy is
+    made with ``FILE_FLAG_NO_BUFFERING`` so copying a large file does not
+    evict everything else from the system cache.
+
+    >>> from pywincffi.kernel32 import copyfile
+    >>> def progress(status):
+    ...     print("%.1f MiB/s" % (status.bytes_per_second / 1048576))
+    >>> copyfile(
+    ...     u"C:\\\\data\\\\large.bin", u"D:\\\\large.bin",
+    ...     chunk_size=4194304, progress=progress)
+
+    :param str source:
+        The file to copy, see :class:`pywincffi.wintypes.WidePath` for the
+        types of path accepted.
+
+    :param str destination:
+        The file to copy to.
+
+    :keyword int chunk_size:
+        The size of each read and write.  For unbuffered copies this is
+        rounded up to a multiple of the sector size.
+
+    :keyword int max_in_flight:
+        The number of chunks, and so buffers, in use at once.
+
+    :keyword bool unbuffered:
+        If True, the copy must bypass the system cache and
+        :class:`pywincffi.exceptions.InputError` is raised if the sector
+        size of either volume is unknown.  If False the system cache is
+        always used.  By default the cache is bypassed when possible.
+
+    :keyword bool use_copy_file_ex:
+        If True, the copy is made by :func:`pywincffi.kernel32.CopyFileEx`
+        which also copies attributes and alternate data streams.
+        ``unbuffered`` selects ``COPY_FILE_NO_BUFFERING`` and
+        ``chunk_size`` and ``max_in_flight`` are not used.
+
+    :keyword progress:
+        A callable which is called with a :class:`CopyProgress` named tuple
+        each time a chunk has been written.
+
+    :rtype: int
+    """
+    input_check("chunk_size", chunk_size, integer_types)
+    input_check("max_in_flight", max_in_flight, integer_types)
+    input_check("unbuffered", unbuffered, (NoneType, bool))
+    input_check("use_copy_file_ex", use_copy_file_ex, bool)
+    _, library = dist.load()
+
+    for name, value in (("chunk_size", chunk_size),
+                        ("max_in_flight", max_in_flight)):
+        if value < 1:
+            raise InputError(
+                name, value, message="`%s` must be at least 1" % name)
+
+    started = time.time()
+    copied = [0]
+
+    def report(bytes_copied, total_bytes):
+        copied[0] = bytes_copied
+        if progress is not None:
+            seconds = time.time() - started
+            rate = bytes_copied / seconds if seconds > 0 else 0.0
+            progress(CopyProgress(
+                bytes_copied=bytes_copied, total_bytes=total_bytes,
+                seconds=seconds, bytes_per_second=rate))
+
+    if use_copy_file_ex:
+        flags = 0 if unbuffered is False else library.COPY_FILE_NO_BUFFERING
+        CopyFileEx(
+            source, destination,
+            lambda total_size, bytes_transferred: report(
+                bytes_transferred, total_size),
+            dwCopyFlags=flags)
+        return copied[0]
+
+    alignment = None
+    if unbuffered is not False:
+        alignment = _unbuffered_alignment(
+            path_to_text("source", source),
+            path_to_text("destination", destination))
+
+        if alignment is None and unbuffered:
+            raise InputError(
+                "unbuffered", unbuffered,
+                message="The sector size of `source` or `destination` "
+                        "could not be determined")
+
+    flags = library.FILE_FLAG_OVERLAPPED
+    if alignment is not None:
+        flags |= library.FILE_FLAG_NO_BUFFERING
+        chunk_size = -(-chunk_size // alignment) * alignment
+
+    hSource = CreateFile(
+        source, library.GENERIC_READ, dwShareMode=library.FILE_SHARE_READ,
+        dwCreationDisposition=library.OPEN_EXISTING,
+        dwFlagsAndAttributes=flags | library.FILE_FLAG_SEQUENTIAL_SCAN)
+
+    try:
+        size = GetFileSizeEx(hSource)
+        hDestination = CreateFile(
+            destination, library.GENERIC_WRITE, dwShareMode=0,
+            dwCreationDisposition=library.CREATE_ALWAYS,
+            dwFlagsAndAttributes=flags)
+
+        # CreateFile() sets ERROR_ALREADY_EXISTS if the destination
+        # was replaced.
+        library.SetLastError(0)
+
+        try:
+            if size:
+                preallocate(hDestination, size)
+
+            copied = _pipeline(
+                hSource, hDestination, size, chunk_size, max_in_flight,
+                alignment, report)
+
+            if alignment is not None:
+                truncate(hDestination, copied)
+        finally:
+            CloseHandle(hDestination)
+    finally:
+        CloseHandle(hSource)
+
+    return copied
@@ -0,0 +1,307 @@
+"""
+Handle Cache
+------------
+
+A bounded cache of file handles opened with
+:func:`pywincffi.kernel32.CreateFile` so code which repeatedly opens the
+same files does not pay for path parsing, access checks and a new handle
+every time.
+"""
+
+import threading
+from collections import namedtuple
+
+from six import integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32.file import CreateFile
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.wintypes import WidePath, path_to_text
+
+HandleCacheStats = namedtuple(
+    "HandleCacheStats", ("hits", "misses", "evictions", "open", "leased"))
+
+
+class _Entry(object):  # pylint: disable=too-few-public-methods
+    """
+    A cached handle.  Entries which are not leased are kept in a doubly
+    linked list, least recently used first, so the next entry to evict
+    can be found without a scan.
+    """
+    __slots__ = ("key", "handle", "refs", "evicted", "prev", "next")
+
+    def __init__(self, key, handle):
+        self.key = key
+        self.handle = handle
+        self.refs = 0
+        self.evicted = False
+        self.prev = self.next = None
+
+
+class HandleLease(object):
+    """
+    A reference to a handle owned by a :class:`HandleCache`.  The handle
+    must not be closed by the caller and must not be used after the lease
+    has been released.
+    """
+    def __init__(self, cache, entry):
+        self._cache = cache
+        self._entry = entry
+
+    @property
+    def handle(self):
+        """The leased :class:`pywincffi.wintypes.HANDLE`"""
+        if self._entry is None:
+            raise ValueError("The lease has been released")
+        return self._entry.handle
+
+    def release(self):
+        """Returns the handle to the cache.  Calling this twice is a no-op."""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._cache._release(entry)  # pylint: disable=protected-access
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.release()
+
+
+class HandleCache(object):
+    """
+    Caches up to ``max_handles`` open file handles keyed by path, access
+    mode, share mode and flags.  Handles are handed out as reference
+    counted :class:`HandleLease` objects.  Once the cache is full the least
+    recently used handle which isn't leased is closed.
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import HandleCache, ReadFile
+    >>> _, library = dist.load()
+    >>> cache = HandleCache(max_handles=1024)
+    >>> path = u"C:\\\\data\\\\index.bin"
+    >>> with cache.lease(path, library.GENERIC_READ) as lease:
+    ...     header = ReadFile(lease.handle, 512)
+
+    Because handles are shared, code using a lease should not rely on the
+    file pointer; use ``OVERLAPPED`` offsets or
+    :func:`pywincffi.kernel32.SetFilePointerEx` immediately before each
+    read or write.
+
+    :keyword int max_handles:
+        The number of handles to keep open.  Leased handles are never
+        closed so the cache may exceed this while they are in use.
+    """
+    def __init__(self, max_handles=128):
+        input_check("max_handles", max_handles, integer_types)
+
+        if max_handles < 1:
+            raise InputError(
+                "max_handles", max_handles,
+                message="`max_handles` must be at least 1")
+
+        self.max_handles = max_handles
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._idle = _Entry(None, None)
+        self._idle.prev = self._idle.next = self._idle
+
+    def _unlink(self, entry):
+        """Removes ``entry`` from the idle list"""
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+        entry.prev = entry.next = None
+
+    def _link(self, entry):
+        """Appends ``entry`` to the idle list as the most recently used"""
+        entry.prev = self._idle.prev
+        entry.next = self._idle
+        self._idle.prev.next = entry
+        self._idle.prev = entry
+
+    def _evict(self):
+        """
+        Evicts idle entries until the cache is within ``max_handles``
+        and returns the handles which should be closed.
+        """
+        handles = []
+        while (len(self._entries) > self.max_handles and
+               self._idle.next is not self._idle):
+            entry = self._idle.next
+            self._unlink(entry)
+            del self._entries[entry.key]
+            entry.evicted = True
+            handles.append(entry.handle)
+            self.evictions += 1
+        return handles
+
+    @staticmethod
+    def _key_path(path):
+        """
+        Returns the path used in the cache key.  A :class:`WidePath` is
+        kept as is since it compares and hashes equal to its text.
+        """
+        if isinstance(path, WidePath):
+            return path
+        return path_to_text("path", path)
+
+    @staticmethod
+    def _close(handles):
+        """
+        Closes ``handles``.  Called once the lock has been released so
+        closing an evicted handle never blocks other leases.
+        """
+        for handle in handles:
+            CloseHandle(handle)
+
+    def lease(self, path, dwDesiredAccess, dwShareMode=None,
+              dwFlagsAndAttributes=0):
+        """
+        Returns a :class:`HandleLease` for ``path`` opening it with
+        :func:`pywincffi.kernel32.CreateFile` if a matching handle is not
+        already cached.  Files are always opened with ``OPEN_EXISTING``.
+
+        :param str path:
+            The path to the file.  Passing the same
+            :class:`pywincffi.wintypes.WidePath` for every lease avoids
+            converting the path each time the file has to be reopened.
+
+        :param int dwDesiredAccess:
+            The requested access, ``GENERIC_READ`` for example.
+
+        :keyword int dwShareMode:
+            The sharing mode of the file.  Defaults to
+            ``FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE`` so
+            cached handles don't prevent other processes from modifying,
+            renaming or deleting the file.
+
+        :keyword int dwFlagsAndAttributes:
+            The file flags, ``FILE_FLAG_OVERLAPPED`` for example.
+
+        :rtype: :class:`HandleLease`
+        """
+        _, library = dist.load()
+
+        if dwShareMode is None:
+            dwShareMode = (
+                library.FILE_SHARE_READ | library.FILE_SHARE_WRITE |
+                library.FILE_SHARE_DELETE)
+
+        path = self._key_path(path)
+        input_check("dwDesiredAccess", dwDesiredAccess, integer_types)
+        input_check("dwShareMode", dwShareMode, integer_types)
+        input_check(
+            "dwFlagsAndAttributes", dwFlagsAndAttributes, integer_types)
+
+        key = (path, dwDesiredAccess, dwShareMode, dwFlagsAndAttributes)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return self._acquire(entry)
+            self.misses += 1
+
+        # Opening the file may be slow so it's done without the lock.  If
+        # another thread opened the same file meanwhile its handle is used.
+        handle = CreateFile(
+            path, dwDesiredAccess, dwShareMode=dwShareMode,
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=dwFlagsAndAttributes)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(key, handle)
+                handle = None
+
+            lease = self._acquire(entry)
+            evicted = self._evict()
+
+        if handle is not None:
+            evicted.append(handle)
+
+        self._close(evicted)
+        return lease
+
+    def _acquire(self, entry):
+        """Leases ``entry``, the lock must be held"""
+        if entry.refs == 0 and entry.prev is not None:
+            self._unlink(entry)
+        entry.refs += 1
+        return HandleLease(self, entry)
+
+    def _release(self, entry):
+        """Called by :meth:`HandleLease.release`"""
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs:
+                return
+
+            if entry.evicted:
+                evicted = [entry.handle]
+            else:
+                self._link(entry)
+                evicted = self._evict()
+
+        self._close(evicted)
+
+    def invalidate(self, path):
+        """
+        Removes every handle for ``path`` from the cache, for example
+        after the file has been replaced.  Handles which are leased are
+        closed once released.
+        """
+        path = self._key_path(path)
+
+        evicted = []
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                entry = self._entries.pop(key)
+                entry.evicted = True
+                if entry.refs == 0:
+                    self._unlink(entry)
+                    evicted.append(entry.handle)
+
+        self._close(evicted)
+
+    @property
+    def stats(self):
+        """
+        Returns the cache statistics as a :class:`HandleCacheStats`
+        named tuple.  ``open`` is the number of cached handles and
+        ``leased`` is the number of those which are in use.
+        """
+        with self._lock:
+            leased = sum(
+                1 for entry in self._entries.values() if entry.refs)
+            return HandleCacheStats(
+                hits=self.hits, misses=self.misses, evictions=self.evictions,
+                open=len(self._entries), leased=leased)
+
+    def close(self):
+        """
+        Closes every cached handle.  Handles which are leased are closed
+        once released.
+        """
+        evicted = []
+        with self._lock:
+            for entry in self._entries.values():
+                entry.evicted = True
+                if entry.refs == 0:
+                    self._unlink(entry)
+                    evicted.append(entry.handle)
+            self._entries.clear()
+
+        self._close(evicted)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,443 @@
+"""
+Memory
+------
+
+A module containing Windows functions for allocating and releasing
+virtual memory and for sharing memory between processes with file
+mappings.
+"""
+
+import threading
+
+from six import integer_types, text_type
+
+from pywincffi.core import dist
+from pywincffi.core.checks import (
+    NON_ZERO, NoneType, input_check, error_check)
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.wintypes import (
+    HANDLE, SECURITY_ATTRIBUTES, SYSTEM_INFO, wintype_to_cdata)
+
+
+def VirtualAlloc(lpAddress, dwSize, flAllocationType, flProtect):
+    """
+    Reserves, commits, or changes the state of a region of pages in the
+    virtual address space of the calling process.  Memory allocated by this
+    function is automatically initialized to zero and is aligned to the
+    system's allocation granularity.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa366887
+
+    :param lpAddress:
+        The starting address of the region to allocate.  Pass ``None``
+        to let the system determine where to allocate the region.
+
+    :param int dwSize:
+        The size of the region, in bytes.
+
+    :param int flAllocationType:
+        The type of memory allocation such as ``MEM_COMMIT`` and/or
+        ``MEM_RESERVE``.
+
+    :param int flProtect:
+        The memory protection for the region of pages to be allocated,
+        ``PAGE_READWRITE`` for example.
+
+    :raises WindowsAPIError:
+        Raised if the underlying function returns ``NULL``.
+
+    :return:
+        Returns a ``void *`` cdata object pointing at the base address of
+        the allocated region.  The region must be released using
+        :func:`VirtualFree`.
+    """
+    input_check("dwSize", dwSize, integer_types)
+    input_check("flAllocationType", flAllocationType, integer_types)
+    input_check("flProtect", flProtect, integer_types)
+
+    ffi, library = dist.load()
+
+    if lpAddress is None:
+        lpAddress = ffi.NULL
+
+    address = library.VirtualAlloc(
+        lpAddress,
+        ffi.cast("SIZE_T", dwSize),
+        ffi.cast("DWORD", flAllocationType),
+        ffi.cast("DWORD", flProtect)
+    )
+
+    if address == ffi.NULL:
+        errno, message = ffi.getwinerror()
+        raise WindowsAPIError("VirtualAlloc", message, errno)
+
+    return address
+
+
+def VirtualFree(lpAddress, dwSize, dwFreeType):
+    """
+    Releases, decommits, or releases and decommits a region of pages
+    within the virtual address space of the calling process.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa366892
+
+    :param lpAddress:
+        The base address returned by :func:`VirtualAlloc`.
+
+    :param int dwSize:
+        The size of the region to be freed, in bytes.  This must be ``0``
+        if ``dwFreeType`` is ``MEM_RELEASE``.
+
+    :param int dwFreeType:
+        The type of free operation, ``MEM_DECOMMIT`` or ``MEM_RELEASE``.
+    """
+    input_check("dwSize", dwSize, integer_types)
+
+    ffi, library = dist.load()
+    input_check(
+        "dwFreeType", dwFreeType,
+        allowed_values=(library.MEM_DECOMMIT, library.MEM_RELEASE))
+
+    code = library.VirtualFree(
+        lpAddress,
+        ffi.cast("SIZE_T", dwSize),
+        ffi.cast("DWORD", dwFreeType)
+    )
+    error_check("VirtualFree", code=code, expected=NON_ZERO)
+
+
+def GetSystemInfo():
+    """
+    Retrieves information about the current system such as the page size
+    and allocation granularity.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms724381
+
+    :rtype: :class:`pywincffi.wintypes.SYSTEM_INFO`
+    """
+    _, library = dist.load()
+    lpSystemInfo = SYSTEM_INFO()
+    library.GetSystemInfo(wintype_to_cdata(lpSystemInfo))
+    return lpSystemInfo
+
+
+def CreateFileMapping(
+        hFile, flProtect, dwMaximumSize, lpName=None, lpAttributes=None):
+    """
+    Creates or opens a named or unnamed file mapping object.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa366537
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import CreateFileMapping, MapViewOfFile
+    >>> _, library = dist.load()
+    >>> hMapping = CreateFileMapping(
+    ...     None, library.PAGE_READWRITE, 1048576, lpName=u"Local\\agent")
+    >>> address = MapViewOfFile(hMapping, library.FILE_MAP_ALL_ACCESS)
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The file to map.  If None the mapping is backed by the paging
+        file, which is how memory is shared between processes.
+
+    :param int flProtect:
+        The protection of the mapping, ``PAGE_READWRITE`` for example.
+
+    :param int dwMaximumSize:
+        The size of the mapping in bytes.  If ``hFile`` is provided
+        ``0`` maps the whole file.
+
+    :keyword str lpName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        The name of the mapping.  If a mapping with this name already
+        exists it is opened instead and ``dwMaximumSize`` is ignored.
+
+    :keyword pywincffi.wintypes.SECURITY_ATTRIBUTES lpAttributes:
+        If not provided the handle can't be inherited.
+
+    :returns:
+        Returns a :class:`pywincffi.wintypes.HANDLE` to the mapping.
+    """
+    ffi, library = dist.load()
+
+    if hFile is None:
+        hFile = ffi.cast("HANDLE", library.INVALID_HANDLE_VALUE)
+    else:
+        input_check("hFile", hFile, HANDLE)
+        hFile = wintype_to_cdata(hFile)
+
+    if lpName is None:
+        lpName = ffi.NULL
+    else:
+        input_check("lpName", lpName, text_type)
+
+    input_check("flProtect", flProtect, integer_types)
+    input_check("dwMaximumSize", dwMaximumSize, integer_types)
+    input_check(
+        "lpAttributes", lpAttributes,
+        allowed_types=(NoneType, SECURITY_ATTRIBUTES)
+    )
+
+    handle = library.CreateFileMapping(
+        hFile,
+        wintype_to_cdata(lpAttributes),
+        ffi.cast("DWORD", flProtect),
+        ffi.cast("DWORD", dwMaximumSize >> 32),
+        ffi.cast("DWORD", dwMaximumSize & 0xFFFFFFFF),
+        lpName
+    )
+
+    try:
+        error_check("CreateFileMapping")
+    except WindowsAPIError as error:
+        if error.errno != library.ERROR_ALREADY_EXISTS:
+            raise
+
+    return HANDLE(handle)
+
+
+def OpenFileMapping(dwDesiredAccess, bInheritHandle, lpName):
+    """
+    Opens an existing named file mapping object.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa366791
+
+    :param int dwDesiredAccess:
+        The access to the mapping, ``FILE_MAP_ALL_ACCESS`` for example.
+
+    :param bool bInheritHandle:
+        If True the handle can be inherited by child processes.
+
+    :param str lpName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        The name of the mapping.
+
+    :returns:
+        Returns a :class:`pywincffi.wintypes.HANDLE` to the mapping.
+    """
+    input_check("dwDesiredAccess", dwDesiredAccess, integer_types)
+    input_check("bInheritHandle", bInheritHandle, bool)
+    input_check("lpName", lpName, text_type)
+
+    ffi, library = dist.load()
+
+    handle = library.OpenFileMapping(
+        ffi.cast("DWORD", dwDesiredAccess),
+        ffi.cast("BOOL", bInheritHandle),
+        lpName
+    )
+    error_check("OpenFileMapping")
+    return HANDLE(handle)
+
+
+def MapViewOfFile(
+        hFileMappingObject, dwDesiredAccess, dwFileOffset=0,
+        dwNumberOfBytesToMap=0):
+    """
+    Maps a view of a file mapping into the address space of the calling
+    process.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa366761
+
+    :param pywincffi.wintypes.HANDLE hFileMappingObject:
+        A handle returned by :func:`CreateFileMapping` or
+        :func:`OpenFileMapping`.
+
+    :param int dwDesiredAccess:
+        The access to the view, ``FILE_MAP_READ`` or ``FILE_MAP_WRITE``
+        for example.
+
+    :keyword int dwFileOffset:
+        The offset where the view begins.  This must be a multiple of the
+        allocation granularity reported by :func:`GetSystemInfo`.
+
+    :keyword int dwNumberOfBytesToMap:
+        The number of bytes to map.  ``0``, the default, maps from
+        ``dwFileOffset`` to the end of the mapping.
+
+    :raises WindowsAPIError:
+        Raised if the underlying function returns ``NULL``.
+
+    :return:
+        Returns a ``void *`` cdata object pointing at the view.  The view
+        must be unmapped using :func:`UnmapViewOfFile`.
+    """
+    input_check("hFileMappingObject", hFileMappingObject, HANDLE)
+    input_check("dwDesiredAccess", dwDesiredAccess, integer_types)
+    input_check("dwFileOffset", dwFileOffset, integer_types)
+    input_check(
+        "dwNumberOfBytesToMap", dwNumberOfBytesToMap, integer_types)
+
+    ffi, library = dist.load()
+
+    address = library.MapViewOfFile(
+        wintype_to_cdata(hFileMappingObject),
+        ffi.cast("DWORD", dwDesiredAccess),
+        ffi.cast("DWORD", dwFileOffset >> 32),
+        ffi.cast("DWORD", dwFileOffset & 0xFFFFFFFF),
+        ffi.cast("SIZE_T", dwNumberOfBytesToMap)
+    )
+
+    if address == ffi.NULL:
+        errno, message = ffi.getwinerror()
+        raise WindowsAPIError("MapViewOfFile", message, errno)
+
+    return address
+
+
+def UnmapViewOfFile(lpBaseAddress):
+    """
+    Unmaps a view mapped by :func:`MapViewOfFile`.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa366882
+
+    :param lpBaseAddress:
+        The address returned by :func:`MapViewOfFile`.
+    """
+    _, library = dist.load()
+    code = library.UnmapViewOfFile(lpBaseAddress)
+    error_check("UnmapViewOfFile", code=code, expected=NON_ZERO)
+
+
+class PageAllocator(object):
+    """
+    Hands out page aligned, fixed size buffers which are carved out of
+    one or more arenas allocated with :func:`VirtualAlloc`.  Released
+    buffers are kept on a free list and handed out again by later calls to
+    :meth:`acquire` so steady state I/O does not allocate memory.
+
+    The buffers are suitable for :func:`pywincffi.kernel32.ReadFileScatter`
+    and :func:`pywincffi.kernel32.WriteFileGather`:
+
+    >>> from pywincffi.kernel32 import PageAllocator, SegmentArray
+    >>> allocator = PageAllocator()
+    >>> pages = allocator.acquire(4)
+    >>> segments = SegmentArray(pages)
+
+    :keyword int arena_pages:
+        The number of pages allocated by each arena.  A new arena is
+        allocated once every page in the existing arenas is in use.
+
+    :keyword int page_size:
+        The size of each buffer in bytes.  This must be a power of two
+        no larger than the allocation granularity.  Defaults to the
+        system page size reported by :func:`GetSystemInfo`.
+    """
+    def __init__(self, arena_pages=256, page_size=None):
+        input_check("arena_pages", arena_pages, integer_types)
+
+        if page_size is None:
+            page_size = GetSystemInfo().dwPageSize
+
+        input_check("page_size", page_size, integer_types)
+
+        if arena_pages < 1:
+            raise InputError(
+                "arena_pages", arena_pages,
+                message="`arena_pages` must be at least 1")
+
+        if page_size < 1 or page_size & (page_size - 1):
+            raise InputError(
+                "page_size", page_size,
+                message="`page_size` must be a power of two")
+
+        self.arena_pages = arena_pages
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._arenas = []
+        self._free = []
+        self._in_use = set()
+
+    def _allocate_arena(self):
+        """Allocates a new arena and adds its pages to the free list."""
+        ffi, library = dist.load()
+        address = VirtualAlloc(
+            None, self.arena_pages * self.page_size,
+            library.MEM_COMMIT | library.MEM_RESERVE, library.PAGE_READWRITE)
+        self._arenas.append(address)
+
+        base = ffi.cast("char *", address)
+        for index in range(self.arena_pages - 1, -1, -1):
+            self._free.append(base + (index * self.page_size))
+
+    @property
+    def in_use(self):
+        """The number of buffers currently handed out."""
+        return len(self._in_use)
+
+    def acquire(self, count=1):
+        """
+        Returns a list of ``count`` page buffers.  Each buffer is a
+        ``char *`` cdata object pointing at ``page_size`` bytes.
+        """
+        input_check("count", count, integer_types)
+        ffi, _ = dist.load()
+
+        with self._lock:
+            while len(self._free) < count:
+                self._allocate_arena()
+
+            pages = [self._free.pop() for _ in range(count)]
+            for page in pages:
+                self._in_use.add(int(ffi.cast("uintptr_t", page)))
+
+        return pages
+
+    def release(self, pages):
+        """
+        Returns buffers previously handed out by :meth:`acquire` so they
+        can be reused.
+
+        :raises InputError:
+            Raised if one of the buffers was not handed out by this
+            allocator or has already been released.
+        """
+        ffi, _ = dist.load()
+
+        with self._lock:
+            for page in pages:
+                address = int(ffi.cast("uintptr_t", page))
+                if address not in self._in_use:
+                    raise InputError(
+                        "pages", page,
+                        message="%r was not acquired from this "
+                                "allocator" % page)
+                self._in_use.discard(address)
+                self._free.append(page)
+
+    def buffer(self, page):
+        """
+        Returns a writable ``ffi.buffer`` spanning ``page`` so it can be
+        filled or read without copying.
+        """
+        ffi, _ = dist.load()
+        return ffi.buffer(page, self.page_size)
+
+    def close(self):
+        """Releases every arena.  Outstanding buffers become invalid."""
+        _, library = dist.load()
+
+        with self._lock:
+            while self._arenas:
+                VirtualFree(self._arenas.pop(), 0, library.MEM_RELEASE)
+            self._free = []
+            self._in_use.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
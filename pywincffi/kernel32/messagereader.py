@@ -0,0 +1,177 @@
+"""
+Message Reader
+--------------
+
+Provides :class:`MessageReader` which reads whole messages from a pipe in
+``PIPE_READMODE_MESSAGE`` into a single reusable buffer.
+"""
+
+from six import integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.wintypes import HANDLE, wintype_to_cdata
+
+
+class MessageReader(object):
+    """
+    Reads messages from ``hNamedPipe`` which must be in
+    ``PIPE_READMODE_MESSAGE``, see
+    :func:`pywincffi.kernel32.SetNamedPipeHandleState`, and must not have
+    been opened with ``FILE_FLAG_OVERLAPPED``.
+
+    When a message is larger than the buffer ``ReadFile`` fails with
+    ``ERROR_MORE_DATA`` after reading the first part of it.  The reader
+    then asks ``PeekNamedPipe`` how much of the message is left, grows the
+    buffer once to fit the whole message and reads the rest directly
+    after the first part.  The buffer is kept for later messages so a
+    stream of similarly sized messages causes no further allocations.
+    Return codes are checked directly so reading a message which doesn't
+    fit does not raise and catch any exceptions.
+
+    >>> from pywincffi.kernel32 import MessageReader
+    >>> reader = MessageReader(hNamedPipe)
+    >>> for message in reader:
+    ...     handle(message)
+
+    :param pywincffi.wintypes.HANDLE hNamedPipe:
+        The handle to read from.
+
+    :keyword int buffer_size:
+        The initial size of the buffer.  Choosing a size which fits most
+        messages means most messages are read with a single call.
+    """
+    def __init__(self, hNamedPipe, buffer_size=4096):
+        input_check("hNamedPipe", hNamedPipe, HANDLE)
+        input_check("buffer_size", buffer_size, integer_types)
+
+        if buffer_size < 1:
+            raise InputError(
+                "buffer_size", buffer_size,
+                message="`buffer_size` must be at least 1")
+
+        ffi, _ = dist.load()
+        self.hNamedPipe = hNamedPipe
+        self.messages = 0
+        self.grows = 0
+        self._handle = wintype_to_cdata(hNamedPipe)
+        self._buffer = ffi.new("char[]", buffer_size)
+        self._size = buffer_size
+        self._bytes_read = ffi.new("LPDWORD")
+        self._bytes_left = ffi.new("LPDWORD")
+        self._bytes_available = ffi.new("LPDWORD")
+
+    @property
+    def buffer_size(self):
+        """The current size of the buffer in bytes"""
+        return self._size
+
+    def _grow(self, length, size):
+        """
+        Replaces the buffer with one of at least ``size`` bytes keeping
+        the first ``length`` bytes.
+        """
+        ffi, _ = dist.load()
+        size = max(size, self._size * 2)
+        buffer_ = ffi.new("char[]", size)
+        ffi.memmove(buffer_, self._buffer, length)
+        self._buffer = buffer_
+        self._size = size
+        self.grows += 1
+
+    def read_message(self):
+        """
+        Waits for the next message and returns it.
+
+        :raises WindowsAPIError:
+            Raised if the pipe could not be read for a reason other than
+            the other end having been closed.
+
+        :rtype: bytes
+        :return:
+            Returns the message or None once the other end of the pipe has
+            been closed and every message has been read.
+        """
+        ffi, library = dist.load()
+        length = 0
+
+        while True:
+            code = library.ReadFile(
+                self._handle, self._buffer + length, self._size - length,
+                self._bytes_read, ffi.NULL)
+            length += self._bytes_read[0]
+
+            if code != 0:
+                self.messages += 1
+                return ffi.buffer(self._buffer, length)[:]
+
+            errno, message = ffi.getwinerror()
+            if errno == library.ERROR_BROKEN_PIPE:
+                library.SetLastError(0)
+                return None
+
+            if errno != library.ERROR_MORE_DATA:
+                raise WindowsAPIError("ReadFile", message, errno)
+
+            code = library.PeekNamedPipe(
+                self._handle, ffi.NULL, 0, ffi.NULL, ffi.NULL,
+                self._bytes_left)
+            if code == 0:
+                errno, message = ffi.getwinerror()
+                raise WindowsAPIError("PeekNamedPipe", message, errno)
+
+            library.SetLastError(0)
+            if length + self._bytes_left[0] > self._size:
+                self._grow(length, length + self._bytes_left[0])
+
+    def read_messages(self, max_messages=64):
+        """
+        Waits for the next message then also reads the messages which are
+        already queued in the pipe, without waiting for more.
+
+        :keyword int max_messages:
+            The maximum number of messages to return.
+
+        :raises WindowsAPIError:
+            Raised if the pipe could not be read for a reason other than
+            the other end having been closed.
+
+        :rtype: list
+        :return:
+            Returns a list of messages.  The list is empty once the other
+            end of the pipe has been closed and every message has been
+            read.
+        """
+        ffi, library = dist.load()
+        input_check("max_messages", max_messages, integer_types)
+
+        messages = []
+        while len(messages) < max_messages:
+            if messages:
+                code = library.PeekNamedPipe(
+                    self._handle, ffi.NULL, 0, ffi.NULL,
+                    self._bytes_available, ffi.NULL)
+
+                # Whatever the error, a broken pipe for example, it's
+                # reported by the next call instead.
+                if code == 0:
+                    library.SetLastError(0)
+                    break
+                if not self._bytes_available[0]:
+                    break
+
+            message = self.read_message()
+            if message is None:
+                break
+            messages.append(message)
+
+        return messages
+
+    def __iter__(self):
+        while True:
+            messages = self.read_messages()
+            if not messages:
+                return
+            for message in messages:
+                yield message
@@ -0,0 +1,439 @@
+"""
+Pipe Multiplexer
+----------------
+
+Provides :class:`PipeMultiplexer` which reads from many pipes, the
+standard output and error of child processes for example, using
+overlapped reads serviced by a single thread.
+"""
+
+import binascii
+import itertools
+import os
+import threading
+from collections import namedtuple
+
+from six import integer_types
+from six.moves import queue
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.core.logger import get_logger
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.events import CreateEvent, ResetEvent, SetEvent
+from pywincffi.kernel32.file import CreateFile
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.overlapped import (
+    HasOverlappedIoCompleted, cancel_overlapped)
+from pywincffi.kernel32.pipe import CreateNamedPipe
+from pywincffi.kernel32.synchronization import WaitForMultipleObjects
+from pywincffi.wintypes import (
+    HANDLE, OVERLAPPED, SECURITY_ATTRIBUTES, wintype_to_cdata)
+
+logger = get_logger("kernel32.multiplexer")
+
+PipeChunk = namedtuple("PipeChunk", ("tag", "data"))
+
+_pipe_numbers = itertools.count()
+
+
+def create_overlapped_pipe(nSize=65536, inherit_writer=True):
+    """
+    Creates a pipe like :func:`pywincffi.kernel32.CreatePipe` except that
+    the read end is opened with ``FILE_FLAG_OVERLAPPED`` so it can be
+    attached to a :class:`PipeMultiplexer`.  Handles returned by
+    ``CreatePipe`` can't be read asynchronously, so this creates a
+    uniquely named pipe instead.
+
+    >>> from pywincffi.kernel32 import create_overlapped_pipe
+    >>> stdout_reader, stdout_writer = create_overlapped_pipe()
+
+    :keyword int nSize:
+        The size of the pipe's buffer in bytes.
+
+    :keyword bool inherit_writer:
+        If True, the default, the write end can be inherited by a child
+        process.
+
+    :return:
+        Returns a tuple of :class:`pywincffi.wintypes.HANDLE` containing
+        the reader and writer ends of the pipe.
+    """
+    input_check("nSize", nSize, integer_types)
+    input_check("inherit_writer", inherit_writer, bool)
+    _, library = dist.load()
+
+    name = u"\\\\.\\pipe\\pywincffi-%d-%d-%s" % (
+        os.getpid(), next(_pipe_numbers),
+        binascii.hexlify(os.urandom(4)).decode("ascii"))
+
+    reader = CreateNamedPipe(
+        name,
+        library.PIPE_ACCESS_INBOUND | library.FILE_FLAG_OVERLAPPED |
+        library.FILE_FLAG_FIRST_PIPE_INSTANCE,
+        library.PIPE_TYPE_BYTE | library.PIPE_READMODE_BYTE |
+        library.PIPE_WAIT | library.PIPE_REJECT_REMOTE_CLIENTS,
+        nMaxInstances=1, nOutBufferSize=nSize, nInBufferSize=nSize)
+
+    attributes = SECURITY_ATTRIBUTES()
+    attributes.bInheritHandle = inherit_writer
+
+    try:
+        writer = CreateFile(
+            name, library.GENERIC_WRITE, dwShareMode=0,
+            lpSecurityAttributes=attributes,
+            dwCreationDisposition=library.OPEN_EXISTING)
+    except WindowsAPIError:
+        CloseHandle(reader)
+        raise
+
+    return reader, writer
+
+
+class _Stream(object):  # pylint: disable=too-few-public-methods
+    """A pipe attached to a :class:`PipeMultiplexer`"""
+    def __init__(self, handle, tag, close, hEvent, chunk_size):
+        ffi, _ = dist.load()
+        self.handle = handle
+        self.tag = tag
+        self.close = close
+        self.overlapped = OVERLAPPED()
+        self.overlapped.hEvent = hEvent
+        self.buffer = ffi.new("char[]", chunk_size)
+        self.buffered = 0
+        self.pending = False
+        self.paused = False
+
+
+class _Group(object):  # pylint: disable=too-few-public-methods
+    """Streams sharing the event set when any of their reads complete"""
+    def __init__(self):
+        self.event = CreateEvent(True, False)
+        self.streams = []
+
+
+class PipeMultiplexer(object):
+    """
+    Reads from any number of pipes using a single thread.  Every attached
+    pipe always has an overlapped read outstanding.  Pipes are divided
+    into groups whose reads all signal the same event, so the thread
+    waits on one event per group with
+    :func:`pywincffi.kernel32.WaitForMultipleObjects` and, once an event
+    is signaled, only checks the reads of that group with
+    :func:`pywincffi.kernel32.HasOverlappedIoCompleted` which doesn't make
+    a system call.
+
+    Data is delivered as :class:`PipeChunk` named tuples containing the
+    tag given to :meth:`attach` and the bytes read.  A chunk with empty
+    ``data`` is delivered once the write end of a pipe has been closed,
+    after which the pipe is detached.
+
+    >>> from pywincffi.kernel32 import (
+    ...     PipeMultiplexer, create_overlapped_pipe)
+    >>> multiplexer = PipeMultiplexer()
+    >>> multiplexer.start()
+    >>> stdout_reader, stdout_writer = create_overlapped_pipe()
+    >>> multiplexer.attach(stdout_reader, (pid, "stdout"))
+    >>> chunk = multiplexer.queue.get()
+    >>> multiplexer.consumed(chunk)
+
+    :keyword callback:
+        A callable which is called with each :class:`PipeChunk` on the
+        multiplexer's thread.  It should return quickly because no other
+        pipe is read while it runs.  If not provided chunks are put on
+        :attr:`queue` instead.
+
+    :keyword int chunk_size:
+        The size of each pipe's read buffer.
+
+    :keyword int max_buffered:
+        When chunks are put on :attr:`queue`, the number of bytes of a
+        pipe which may be queued before the pipe is no longer read.  This
+        applies backpressure to the writer, whose writes block once the
+        pipe's buffer is full, until :meth:`consumed` has been called for
+        enough of its chunks.
+
+    :keyword int group_size:
+        The number of pipes which share an event.
+    """
+    def __init__(self, callback=None, chunk_size=65536,
+                 max_buffered=1048576, group_size=32):
+        input_check("chunk_size", chunk_size, integer_types)
+        input_check("max_buffered", max_buffered, integer_types)
+        input_check("group_size", group_size, integer_types)
+
+        if callback is not None and not callable(callback):
+            raise InputError(
+                "callback", callback, message="`callback` must be callable")
+
+        for name, value in (("chunk_size", chunk_size),
+                            ("max_buffered", max_buffered),
+                            ("group_size", group_size)):
+            if value < 1:
+                raise InputError(
+                    name, value, message="`%s` must be at least 1" % name)
+
+        ffi, _ = dist.load()
+        self.callback = callback
+        self.chunk_size = chunk_size
+        self.max_buffered = max_buffered
+        self.group_size = group_size
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._attaching = []
+        self._streams = {}
+        self._groups = []
+        self._control = None
+        self._stopping = False
+        self._thread = None
+        self._bytes_read = ffi.new("LPDWORD")
+
+    def start(self):
+        """Starts the thread which reads from the attached pipes"""
+        if self._thread is not None:
+            raise ValueError("The multiplexer has already been started")
+
+        self._control = CreateEvent(True, False)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def attach(self, hPipe, tag, close=True):
+        """
+        Starts reading from ``hPipe``.
+
+        :param pywincffi.wintypes.HANDLE hPipe:
+            The read end of a pipe opened with ``FILE_FLAG_OVERLAPPED``,
+            such as one returned by :func:`create_overlapped_pipe`.
+
+        :param tag:
+            A hashable value identifying the pipe which is included in
+            each :class:`PipeChunk`.  It must be unique among the attached
+            pipes.
+
+        :keyword bool close:
+            If True, ``hPipe`` is closed once the write end of the pipe
+            has been closed or the multiplexer is closed.
+        """
+        input_check("hPipe", hPipe, HANDLE)
+        input_check("close", close, bool)
+
+        with self._lock:
+            if self._control is None:
+                raise ValueError("The multiplexer has not been started")
+            if tag in self._streams:
+                raise InputError(
+                    "tag", tag, message="`tag` is already attached")
+            self._streams[tag] = None
+            self._attaching.append((hPipe, tag, close))
+
+        SetEvent(self._control)
+
+    def consumed(self, chunk):
+        """
+        Called once a chunk taken from :attr:`queue` has been processed so
+        a pipe which was paused because ``max_buffered`` bytes were queued
+        is read again.
+
+        :param PipeChunk chunk:
+            The chunk taken from :attr:`queue`.
+        """
+        wake = False
+        with self._lock:
+            stream = self._streams.get(chunk.tag)
+            if stream is not None:
+                stream.buffered -= len(chunk.data)
+                wake = (stream.paused and
+                        stream.buffered < self.max_buffered)
+
+        if wake:
+            SetEvent(self._control)
+
+    def _deliver(self, stream, data):
+        if self.callback is not None:
+            try:
+                self.callback(PipeChunk(stream.tag, data))
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Callback for %r failed", stream.tag)
+            return
+
+        with self._lock:
+            stream.buffered += len(data)
+        self.queue.put(PipeChunk(stream.tag, data))
+
+    def _read(self, stream):
+        """
+        Starts a read on ``stream`` unless too much of its data is queued.
+        Returns False if the pipe has been closed.
+        """
+        ffi, library = dist.load()
+
+        with self._lock:
+            stream.paused = stream.buffered >= self.max_buffered
+        if stream.paused:
+            return True
+
+        # A read which completes immediately also sets the group's event
+        # so its data is collected the same way as a pending read's.
+        # Starting a read resets the event the whole group shares, which
+        # would hide a read in the group that completed just before, so
+        # the event is set again below and the group is checked once more.
+        code = library.ReadFile(
+            wintype_to_cdata(stream.handle), stream.buffer, self.chunk_size,
+            ffi.NULL, wintype_to_cdata(stream.overlapped))
+        if code == 0:
+            errno, message = ffi.getwinerror()
+            library.SetLastError(0)
+            if errno != library.ERROR_IO_PENDING:
+                if errno != library.ERROR_BROKEN_PIPE:
+                    logger.error(
+                        "Failed to read %r: %s", stream.tag, message)
+                return False
+
+        stream.pending = True
+        SetEvent(stream.overlapped.hEvent)
+        return True
+
+    def _complete(self, stream):
+        """
+        Delivers the result of ``stream``'s read and starts the next one.
+        Returns False if the pipe has been closed.
+        """
+        ffi, library = dist.load()
+        stream.pending = False
+
+        code = library.GetOverlappedResult(
+            wintype_to_cdata(stream.handle),
+            wintype_to_cdata(stream.overlapped), self._bytes_read, False)
+        if code == 0:
+            errno, message = ffi.getwinerror()
+            library.SetLastError(0)
+            if errno != library.ERROR_MORE_DATA:
+                if errno != library.ERROR_BROKEN_PIPE:
+                    logger.error(
+                        "Failed to read %r: %s", stream.tag, message)
+                return False
+
+        if self._bytes_read[0]:
+            self._deliver(
+                stream, ffi.buffer(stream.buffer, self._bytes_read[0])[:])
+
+        return self._read(stream)
+
+    def _add(self, hPipe, tag, close):
+        """Adds a pipe to the first group with room for it"""
+        for group in self._groups:
+            if len(group.streams) < self.group_size:
+                break
+        else:
+            _, library = dist.load()
+            if len(self._groups) >= library.MAXIMUM_WAIT_OBJECTS - 1:
+                group = min(self._groups, key=lambda g: len(g.streams))
+            else:
+                group = _Group()
+                self._groups.append(group)
+
+        stream = _Stream(hPipe, tag, close, group.event, self.chunk_size)
+        group.streams.append(stream)
+        with self._lock:
+            self._streams[tag] = stream
+
+        if not self._read(stream):
+            self._remove(group, stream)
+
+    def _remove(self, group, stream):
+        """Detaches ``stream`` after its pipe has been closed"""
+        group.streams.remove(stream)
+        with self._lock:
+            del self._streams[stream.tag]
+
+        if stream.close:
+            CloseHandle(stream.handle)
+        self._deliver(stream, b"")
+
+    def _run(self):
+        _, library = dist.load()
+        first = 0
+
+        while True:
+            # The groups are rotated on each wait because the lowest
+            # signaled index is returned, which would otherwise let busy
+            # groups at the front starve the rest.
+            groups = self._groups[first:] + self._groups[:first]
+            handles = [self._control]
+            handles.extend(group.event for group in groups)
+            index = WaitForMultipleObjects(
+                handles, False, library.INFINITE) - library.WAIT_OBJECT_0
+            first = (first + 1) % len(self._groups) if self._groups else 0
+
+            if index == 0:
+                ResetEvent(self._control)
+                with self._lock:
+                    attaching, self._attaching = self._attaching, []
+                    stopping = self._stopping
+                if stopping:
+                    return
+
+                for hPipe, tag, close in attaching:
+                    self._add(hPipe, tag, close)
+
+                for group in self._groups:
+                    for stream in group.streams[:]:
+                        if stream.paused and not self._read(stream):
+                            self._remove(group, stream)
+                continue
+
+            # The event is reset before the reads are checked so a read
+            # completing during the check signals it again.  The reads are
+            # checked until a pass starts no new reads, see _read().
+            group = groups[index - 1]
+            ResetEvent(group.event)
+            for stream in group.streams[:]:
+                if (stream.pending and
+                        HasOverlappedIoCompleted(stream.overlapped) and
+                        not self._complete(stream)):
+                    self._remove(group, stream)
+
+    def close(self):
+        """
+        Stops the thread, cancels outstanding reads and closes the pipes
+        which were attached with ``close`` set to True.
+        """
+        if self._thread is None:
+            return
+
+        with self._lock:
+            self._stopping = True
+        SetEvent(self._control)
+        self._thread.join()
+
+        _, library = dist.load()
+        for group in self._groups:
+            for stream in group.streams:
+                if stream.pending:
+                    try:
+                        cancel_overlapped(stream.handle, stream.overlapped)
+                    except WindowsAPIError:
+                        # The read failed, the pipe is still closed below.
+                        library.SetLastError(0)
+                if stream.close:
+                    CloseHandle(stream.handle)
+            CloseHandle(group.event)
+
+        for hPipe, _, close in self._attaching:
+            if close:
+                CloseHandle(hPipe)
+
+        CloseHandle(self._control)
+        self._control = None
+        self._groups = []
+        self._attaching = []
+        self._streams = {}
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
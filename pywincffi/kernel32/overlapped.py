@@ -5,8 +5,12 @@ Overlapped
 A module containing Windows functions for working with OVERLAPPED objects.
 """
 
+from six import integer_types
+
 from pywincffi.core import dist
-from pywincffi.core.checks import NON_ZERO, input_check, error_check
+from pywincffi.core.checks import (
+    NON_ZERO, NoneType, input_check, error_check)
+from pywincffi.exceptions import WindowsAPIError
 from pywincffi.wintypes import HANDLE, OVERLAPPED, wintype_to_cdata
 
 
@@ -64,3 +68,200 @@ def GetOverlappedResult(hFile, lpOverlapped, bWait):
     error_check("GetOverlappedResult", result, NON_ZERO)
 
     return int(lpNumberOfBytesTransferred[0])
+
+
+def GetOverlappedResultEx(
+        hFile, lpOverlapped, dwMilliseconds, bAlertable=False):
+    """
+    Retrieves the results of an overlapped operation on the specified file,
+    named pipe, or communications device waiting at most ``dwMilliseconds``
+    for it to complete.
+
+    On versions of Windows older than Windows 8, which don't provide
+    this function, the wait is done with ``WaitForSingleObjectEx``
+    followed by :func:`GetOverlappedResult`.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/hh448542
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        A handle to the file, named pipe, or communications device.
+
+    :param pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        The OVERLAPPED object that was specified when the overlapped
+        operation was started.
+
+    :param int dwMilliseconds:
+        The number of milliseconds to wait.  ``0`` does not wait and
+        ``INFINITE`` waits until the operation completes.
+
+    :keyword bool bAlertable:
+        If True, the wait returns early when the system queues an I/O
+        completion routine or APC to the thread.
+
+    :raises WindowsAPIError:
+        Raised if the operation failed or did not complete in time.  The
+        error number is ``WAIT_TIMEOUT`` if the timeout expired,
+        ``ERROR_IO_INCOMPLETE`` if ``dwMilliseconds`` was ``0`` and the
+        operation is still pending or ``WAIT_IO_COMPLETION`` if an
+        alertable wait was interrupted.
+
+    :returns:
+        The number of bytes that were transferred by the operation.
+    """
+    input_check("hFile", hFile, HANDLE)
+    input_check("lpOverlapped", lpOverlapped, OVERLAPPED)
+    input_check("dwMilliseconds", dwMilliseconds, integer_types)
+    input_check("bAlertable", bAlertable, allowed_values=(True, False))
+
+    ffi, library = dist.load()
+
+    lpNumberOfBytesTransferred = ffi.new("DWORD[1]")
+
+    result = library.get_overlapped_result_ex(
+        wintype_to_cdata(hFile),
+        wintype_to_cdata(lpOverlapped),
+        lpNumberOfBytesTransferred,
+        ffi.cast("DWORD", dwMilliseconds),
+        ffi.cast("BOOL", bAlertable),
+    )
+
+    error_check("GetOverlappedResultEx", result, NON_ZERO)
+
+    return int(lpNumberOfBytesTransferred[0])
+
+
+def CancelIo(hFile):
+    """
+    Cancels all pending I/O operations issued by the calling thread for
+    ``hFile``.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa363791
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        A handle to the file, named pipe, or communications device.
+    """
+    input_check("hFile", hFile, HANDLE)
+
+    _, library = dist.load()
+    code = library.CancelIo(wintype_to_cdata(hFile))
+    error_check("CancelIo", code=code, expected=NON_ZERO)
+
+
+def CancelIoEx(hFile, lpOverlapped=None):
+    """
+    Cancels pending I/O operations for ``hFile`` issued by any thread in
+    the current process.  Cancellation is asynchronous, the canceled
+    operation completes with ``ERROR_OPERATION_ABORTED`` once the driver
+    has stopped using the buffer and ``OVERLAPPED`` structure.  Use
+    :func:`cancel_overlapped` to cancel an operation and wait for it.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa363792
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        A handle to the file, named pipe, or communications device.
+
+    :keyword pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        The OVERLAPPED object of the operation to cancel.  If not
+        provided every operation pending on ``hFile`` is canceled.
+
+    :raises WindowsAPIError:
+        Raised with ``ERROR_NOT_FOUND`` if there is no pending operation
+        to cancel.
+    """
+    input_check("hFile", hFile, HANDLE)
+    input_check("lpOverlapped", lpOverlapped, (NoneType, OVERLAPPED))
+
+    ffi, library = dist.load()
+
+    if lpOverlapped is None:
+        lpOverlapped = ffi.NULL
+    else:
+        lpOverlapped = wintype_to_cdata(lpOverlapped)
+
+    code = library.CancelIoEx(wintype_to_cdata(hFile), lpOverlapped)
+    error_check("CancelIoEx", code=code, expected=NON_ZERO)
+
+
+def cancel_overlapped(hFile, lpOverlapped):
+    """
+    Cancels the operation started with ``lpOverlapped`` and waits for it
+    to complete so the buffer and ``lpOverlapped`` may be reused or
+    freed.  An operation which completes before it could be canceled is
+    not an error.
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import (
+    ...     GetOverlappedResultEx, cancel_overlapped)
+    >>> from pywincffi.wintypes import OVERLAPPED, wintype_to_cdata
+    >>> ffi, library = dist.load()
+    >>> buffer_ = bytearray(4096)  # owned by the caller until it completes
+    >>> overlapped = OVERLAPPED()
+    >>> library.ReadFile(
+    ...     wintype_to_cdata(hPipe), ffi.from_buffer(buffer_), len(buffer_),
+    ...     ffi.NULL, wintype_to_cdata(overlapped))
+    >>> try:
+    ...     size = GetOverlappedResultEx(hPipe, overlapped, 5000)
+    ... except WindowsAPIError as error:
+    ...     if error.errno != library.WAIT_TIMEOUT:
+    ...         raise
+    ...     size = cancel_overlapped(hPipe, overlapped)
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The handle the operation was started on.
+
+    :param pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        The OVERLAPPED object of an operation which has been started.
+
+    :raises WindowsAPIError:
+        Raised if the operation completed with an error other than
+        ``ERROR_OPERATION_ABORTED``.
+
+    :returns:
+        Returns None if the operation was canceled or the number of bytes
+        transferred if it completed first.
+    """
+    _, library = dist.load()
+
+    try:
+        CancelIoEx(hFile, lpOverlapped)
+    except WindowsAPIError as error:
+        # The operation has already completed.
+        if error.errno != library.ERROR_NOT_FOUND:
+            raise
+        library.SetLastError(0)
+
+    try:
+        return GetOverlappedResult(hFile, lpOverlapped, True)
+    except WindowsAPIError as error:
+        if error.errno != library.ERROR_OPERATION_ABORTED:
+            raise
+        library.SetLastError(0)
+        return None
+
+
+def HasOverlappedIoCompleted(lpOverlapped):
+    """
+    Returns True if the operation started with ``lpOverlapped`` is no
+    longer pending.  Checking this right after starting an operation
+    tells the caller whether it completed immediately, in which case the
+    result can be retrieved without waiting on the event.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms683244
+
+    :param pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        The OVERLAPPED object that was specified when the overlapped
+        operation was started.
+
+    :rtype: bool
+    """
+    input_check("lpOverlapped", lpOverlapped, OVERLAPPED)
+    _, library = dist.load()
+    return lpOverlapped.Internal != library.STATUS_PENDING
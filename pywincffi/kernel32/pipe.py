@@ -5,13 +5,16 @@ Pipe
 A module for working with pipe objects in Windows.
 """
 
+import threading
 from collections import namedtuple
 
 from six import integer_types
 
 from pywincffi.core import dist
 from pywincffi.core.checks import NON_ZERO, input_check, error_check, NoneType
-from pywincffi.wintypes import SECURITY_ATTRIBUTES, HANDLE, wintype_to_cdata
+from pywincffi.exceptions import WindowsAPIError
+from pywincffi.wintypes import (
+    SECURITY_ATTRIBUTES, HANDLE, OVERLAPPED, wintype_to_cdata, path_to_cdata)
 
 PeekNamedPipeResult = namedtuple(
     "PeekNamedPipeResult",
@@ -19,6 +22,10 @@ PeekNamedPipeResult = namedtuple(
      "lpBytesLeftThisMessage")
 )
 
+# Each thread reuses the DWORD which receives the result of
+# pipe_bytes_available() so polling a pipe doesn't allocate.
+_available = threading.local()
+
 
 def CreatePipe(nSize=0, lpPipeAttributes=None):
     """
@@ -145,19 +152,25 @@ def PeekNamedPipe(hNamedPipe, nBufferSize):
         The handele to the pipe object we want to peek into.
 
     :param int nBufferSize:
-        The number of bytes to 'peek' into the pipe.
+        The number of bytes to 'peek' into the pipe.  If this is ``0`` no
+        buffer is allocated, :func:`pipe_bytes_available` is cheaper if
+        only ``lpTotalBytesAvail`` is needed.
 
     :rtype: PeekNamedPipeResult
     :return:
         Returns an instance of :class:`PeekNamedPipeResult` which
-        contains the buffer read, number of bytes read and the result.
+        contains the data read as bytes, ``str`` on Python 2, the
+        number of bytes read and the result.
     """
     input_check("hNamedPipe", hNamedPipe, HANDLE)
     input_check("nBufferSize", nBufferSize, integer_types)
     ffi, library = dist.load()
 
     # Outputs
-    lpBuffer = ffi.new("LPVOID[%d]" % nBufferSize)
+    if nBufferSize:
+        lpBuffer = ffi.new("char[]", nBufferSize)
+    else:
+        lpBuffer = ffi.NULL
     lpBytesRead = ffi.new("LPDWORD")
     lpTotalBytesAvail = ffi.new("LPDWORD")
     lpBytesLeftThisMessage = ffi.new("LPDWORD")
@@ -172,9 +185,243 @@ def PeekNamedPipe(hNamedPipe, nBufferSize):
     )
     error_check("PeekNamedPipe", code=code, expected=NON_ZERO)
 
+    if nBufferSize:
+        data = ffi.unpack(lpBuffer, lpBytesRead[0])
+    else:
+        data = b""
+
     return PeekNamedPipeResult(
-        lpBuffer=lpBuffer,
+        lpBuffer=data,
         lpBytesRead=lpBytesRead[0],
         lpTotalBytesAvail=lpTotalBytesAvail[0],
         lpBytesLeftThisMessage=lpBytesLeftThisMessage[0]
     )
+
+
+def pipe_bytes_available(hNamedPipe):
+    """
+    Returns the number of bytes which can be read from ``hNamedPipe``
+    without blocking.  This calls :func:`PeekNamedPipe` without a buffer
+    and reuses the output value for the calling thread so polling many
+    pipes doesn't allocate anything.
+
+    >>> from pywincffi.kernel32 import ReadFile, pipe_bytes_available
+    >>> ready = [pipe for pipe in pipes if pipe_bytes_available(pipe)]
+
+    :param pywincffi.wintypes.HANDLE hNamedPipe:
+        The handle to the read end of an anonymous pipe or to a named
+        pipe.
+
+    :raises WindowsAPIError:
+        Raised if the pipe could not be peeked.  ``ERROR_BROKEN_PIPE``
+        means the other end of the pipe has been closed.
+
+    :rtype: int
+    """
+    input_check("hNamedPipe", hNamedPipe, HANDLE)
+    ffi, library = dist.load()
+
+    # The value is recreated if the library has been replaced, by
+    # pywincffi.dev.benchmark.stand_in() for example.
+    if getattr(_available, "ffi", None) is not ffi:
+        _available.ffi = ffi
+        _available.lpTotalBytesAvail = ffi.new("LPDWORD")
+    lpTotalBytesAvail = _available.lpTotalBytesAvail
+
+    code = library.PeekNamedPipe(
+        wintype_to_cdata(hNamedPipe), ffi.NULL, 0, ffi.NULL,
+        lpTotalBytesAvail, ffi.NULL)
+    error_check("PeekNamedPipe", code=code, expected=NON_ZERO)
+
+    return lpTotalBytesAvail[0]
+
+
+def CreateNamedPipe(  # pylint: disable=too-many-arguments
+        lpName, dwOpenMode, dwPipeMode, nMaxInstances=None,
+        nOutBufferSize=65536, nInBufferSize=65536, nDefaultTimeOut=0,
+        lpSecurityAttributes=None):
+    """
+    Creates an instance of a named pipe and returns the server end of it.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365150
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import CreateNamedPipe
+    >>> _, library = dist.load()
+    >>> hNamedPipe = CreateNamedPipe(
+    ...     u"\\\\\\\\.\\\\pipe\\\\agent",
+    ...     library.PIPE_ACCESS_DUPLEX | library.FILE_FLAG_OVERLAPPED,
+    ...     library.PIPE_TYPE_BYTE | library.PIPE_REJECT_REMOTE_CLIENTS)
+
+    :param str lpName:
+        The name of the pipe in the form ``\\\\.\\pipe\\name``.
+
+    :param int dwOpenMode:
+        The access mode, ``PIPE_ACCESS_DUPLEX`` for example, combined with
+        flags such as ``FILE_FLAG_OVERLAPPED`` and
+        ``FILE_FLAG_FIRST_PIPE_INSTANCE``.
+
+    :param int dwPipeMode:
+        The type, read and wait modes such as ``PIPE_TYPE_MESSAGE |
+        PIPE_READMODE_MESSAGE | PIPE_WAIT``.
+
+    :keyword int nMaxInstances:
+        The maximum number of instances of the pipe.  Defaults to
+        ``PIPE_UNLIMITED_INSTANCES``.
+
+    :keyword int nOutBufferSize:
+        The number of bytes to reserve for the output buffer.
+
+    :keyword int nInBufferSize:
+        The number of bytes to reserve for the input buffer.
+
+    :keyword int nDefaultTimeOut:
+        The default time-out, in milliseconds, used by
+        :func:`WaitNamedPipe` when ``NMPWAIT_USE_DEFAULT_WAIT`` is passed.
+        ``0`` means 50 milliseconds.
+
+    :keyword pywincffi.wintypes.SECURITY_ATTRIBUTES lpSecurityAttributes:
+        The security attributes of the pipe.  By default the pipe gets a
+        default security descriptor and the handle can't be inherited.
+
+    :rtype: pywincffi.wintypes.HANDLE
+    """
+    ffi, library = dist.load()
+
+    if nMaxInstances is None:
+        nMaxInstances = library.PIPE_UNLIMITED_INSTANCES
+
+    lpName = path_to_cdata("lpName", lpName)
+    input_check("dwOpenMode", dwOpenMode, integer_types)
+    input_check("dwPipeMode", dwPipeMode, integer_types)
+    input_check("nMaxInstances", nMaxInstances, integer_types)
+    input_check("nOutBufferSize", nOutBufferSize, integer_types)
+    input_check("nInBufferSize", nInBufferSize, integer_types)
+    input_check("nDefaultTimeOut", nDefaultTimeOut, integer_types)
+    input_check(
+        "lpSecurityAttributes", lpSecurityAttributes,
+        allowed_types=(NoneType, SECURITY_ATTRIBUTES)
+    )
+
+    handle = library.CreateNamedPipe(
+        lpName, dwOpenMode, dwPipeMode, nMaxInstances, nOutBufferSize,
+        nInBufferSize, nDefaultTimeOut,
+        wintype_to_cdata(lpSecurityAttributes)
+    )
+
+    if handle == ffi.cast("HANDLE", library.INVALID_HANDLE_VALUE):
+        errno, message = ffi.getwinerror()
+        raise WindowsAPIError("CreateNamedPipe", message, errno)
+
+    return HANDLE(handle)
+
+
+def ConnectNamedPipe(hNamedPipe, lpOverlapped=None):
+    """
+    Waits for a client to connect to an instance of a named pipe.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365146
+
+    :param pywincffi.wintypes.HANDLE hNamedPipe:
+        The server end of a pipe created with :func:`CreateNamedPipe`.
+
+    :keyword pywincffi.wintypes.OVERLAPPED lpOverlapped:
+        If ``hNamedPipe`` was created with ``FILE_FLAG_OVERLAPPED`` this
+        must be provided and the function returns immediately.  The
+        ``hEvent`` member is signaled once a client connects.
+
+    :raises WindowsAPIError:
+        Raised if the pipe could not be connected.  ``ERROR_NO_DATA``
+        means a client connected and disconnected again, the instance
+        must be disconnected with :func:`DisconnectNamedPipe` before it
+        can be reused.
+
+    :rtype: bool
+    :return:
+        Returns True if a client is connected and False if the operation
+        is pending, in which case use
+        :func:`pywincffi.kernel32.GetOverlappedResult` to wait for it.
+    """
+    input_check("hNamedPipe", hNamedPipe, HANDLE)
+    input_check(
+        "lpOverlapped", lpOverlapped,
+        allowed_types=(NoneType, OVERLAPPED)
+    )
+
+    ffi, library = dist.load()
+    code = library.ConnectNamedPipe(
+        wintype_to_cdata(hNamedPipe), wintype_to_cdata(lpOverlapped))
+    if code != 0:
+        return True
+
+    # A client may connect between CreateNamedPipe() and ConnectNamedPipe()
+    # which isn't an error.
+    errno, message = ffi.getwinerror()
+    if errno == library.ERROR_PIPE_CONNECTED:
+        library.SetLastError(0)
+        return True
+
+    if lpOverlapped is not None and errno == library.ERROR_IO_PENDING:
+        library.SetLastError(0)
+        return False
+
+    raise WindowsAPIError("ConnectNamedPipe", message, errno)
+
+
+def DisconnectNamedPipe(hNamedPipe):
+    """
+    Disconnects the server end of a named pipe instance from a client so
+    the instance can be connected to another client with
+    :func:`ConnectNamedPipe`.  Data which the client has not read is
+    discarded, use :func:`pywincffi.kernel32.FlushFileBuffers` first to
+    wait until it has been read.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365166
+
+    :param pywincffi.wintypes.HANDLE hNamedPipe:
+        The server end of a pipe created with :func:`CreateNamedPipe`.
+    """
+    input_check("hNamedPipe", hNamedPipe, HANDLE)
+
+    _, library = dist.load()
+    code = library.DisconnectNamedPipe(wintype_to_cdata(hNamedPipe))
+    error_check("DisconnectNamedPipe", code=code, expected=NON_ZERO)
+
+
+def WaitNamedPipe(lpNamedPipeName, nTimeOut=None):
+    """
+    Waits until an instance of the named pipe is available to be opened
+    with :func:`pywincffi.kernel32.CreateFile`.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365800
+
+    :param str lpNamedPipeName:
+        The name of the pipe in the form ``\\\\.\\pipe\\name``.
+
+    :keyword int nTimeOut:
+        The number of milliseconds to wait, ``NMPWAIT_WAIT_FOREVER`` or
+        ``NMPWAIT_USE_DEFAULT_WAIT`` which is the default and uses the
+        time-out given to :func:`CreateNamedPipe`.
+
+    :raises WindowsAPIError:
+        Raised with ``ERROR_SEM_TIMEOUT`` if no instance became available
+        in time or ``ERROR_FILE_NOT_FOUND`` if the pipe does not exist.
+    """
+    _, library = dist.load()
+
+    if nTimeOut is None:
+        nTimeOut = library.NMPWAIT_USE_DEFAULT_WAIT
+
+    lpNamedPipeName = path_to_cdata("lpNamedPipeName", lpNamedPipeName)
+    input_check("nTimeOut", nTimeOut, integer_types)
+
+    code = library.WaitNamedPipe(lpNamedPipeName, nTimeOut)
+    error_check("WaitNamedPipe", code=code, expected=NON_ZERO)
@@ -0,0 +1,592 @@
+"""
+Named Pipe Server
+-----------------
+
+Provides :class:`NamedPipeServer` which keeps several overlapped instances
+of a named pipe listening at all times so a connecting client never waits
+for an instance to be created.  A single thread connects, reads from and
+writes to every client using overlapped I/O and only complete requests
+are handed to a small pool of worker threads.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from six import integer_types, binary_type
+from six.moves import queue
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.core.logger import get_logger
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.events import CreateEvent, ResetEvent, SetEvent
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.overlapped import (
+    HasOverlappedIoCompleted, cancel_overlapped)
+from pywincffi.kernel32.pipe import (
+    CreateNamedPipe, ConnectNamedPipe, DisconnectNamedPipe)
+from pywincffi.kernel32.synchronization import WaitForMultipleObjects
+from pywincffi.wintypes import OVERLAPPED, wintype_to_cdata, path_to_text
+
+logger = get_logger("kernel32.pipeserver")
+
+NamedPipeServerStats = namedtuple(
+    "NamedPipeServerStats",
+    ("connections", "active", "requests", "waiting", "failed",
+     "bytes_read", "bytes_written", "seconds", "bytes_per_second"))
+
+# What an instance of the pipe is doing.  Only instances which are
+# _HANDLING have no overlapped operation outstanding.
+_CONNECTING, _READING, _HANDLING, _WRITING = range(4)
+
+
+class _Group(object):  # pylint: disable=too-few-public-methods
+    """Instances sharing the event set when any of their operations end"""
+    def __init__(self):
+        self.event = CreateEvent(True, False)
+        self.instances = []
+
+
+class _Instance(object):  # pylint: disable=too-many-instance-attributes
+    """
+    An instance of the pipe along with the ``OVERLAPPED`` structure and
+    buffer used to connect it, read requests and write replies.
+    """
+    def __init__(self, handle, group, buffer_size):
+        ffi, _ = dist.load()
+        self.handle = handle
+        self.group = group
+        self.overlapped = OVERLAPPED()
+        self.overlapped.hEvent = group.event
+        self.buffer = ffi.new("char[]", buffer_size)
+        self.state = _CONNECTING
+        self.pending = False
+        self.connection = None
+        self.chunks = []
+        self.reply = None
+        self.written = 0
+
+
+class PipeConnection(object):
+    """
+    A client connected to a :class:`NamedPipeServer`.  The same object is
+    passed to the server's handler with each request from the client so
+    the handler may keep state for the client on it.
+
+    ``requests``, ``bytes_read`` and ``bytes_written`` count the requests
+    and bytes transferred so far.
+    """
+    def __init__(self, instance):
+        self._instance = instance
+        self.requests = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.closing = False
+
+    @property
+    def handle(self):
+        """The server end of the pipe, a :class:`pywincffi.wintypes.HANDLE`"""
+        return self._instance.handle
+
+    def close(self):
+        """
+        Disconnects the client once the reply to the current request has
+        been written.  Only call this from the server's handler.
+        """
+        self.closing = True
+
+
+class NamedPipeServer(object):  # pylint: disable=too-many-instance-attributes
+    """
+    Serves clients of the named pipe ``name``.  The server keeps
+    ``instances`` overlapped pipe instances listening and creates a
+    replacement as soon as a client connects to one of them.
+
+    A single thread performs every connect, read and write as overlapped
+    I/O.  Like :class:`pywincffi.kernel32.multiplexer.PipeMultiplexer` the
+    instances are divided into groups whose operations signal the same
+    event so the thread waits on one event per group with
+    :func:`pywincffi.kernel32.WaitForMultipleObjects` and checks the
+    operations of a signaled group with
+    :func:`pywincffi.kernel32.HasOverlappedIoCompleted`.
+
+    Once a request has been read, a message in message mode or whatever
+    a single read returned otherwise, ``handler`` is called with the
+    client's :class:`PipeConnection` and the request on one of
+    ``workers`` threads.  The bytes it returns are written to the client
+    before the next request is read.  A client only occupies a worker
+    while its request is handled so a few workers can serve thousands of
+    clients.  The client is disconnected after it closes its end of the
+    pipe, after the handler calls :meth:`PipeConnection.close` and the
+    reply has been written or if the handler raises an exception, which
+    is logged.
+
+    >>> from pywincffi.kernel32 import NamedPipeServer
+    >>> def echo(connection, request):
+    ...     return request
+    >>> server = NamedPipeServer(u"\\\\\\\\.\\\\pipe\\\\agent", echo)
+    >>> server.start()
+    >>> server.stats.connections
+
+    :param str name:
+        The name of the pipe in the form ``\\\\.\\pipe\\name``.
+
+    :param handler:
+        A callable which is called with a :class:`PipeConnection` and the
+        request as bytes.  It returns the reply as bytes or None if there
+        is nothing to write.
+
+    :keyword int instances:
+        The number of instances kept listening for clients.
+
+    :keyword int workers:
+        The number of threads calling ``handler``, which is the maximum
+        number of requests handled at the same time.  Requests wait in a
+        queue when every worker is busy.
+
+    :keyword int buffer_size:
+        The size of the pipe's buffers and of each instance's read buffer.
+        In message mode longer messages are read in several parts.
+
+    :keyword bool message_mode:
+        If True, the pipe is created with ``PIPE_TYPE_MESSAGE`` and
+        ``PIPE_READMODE_MESSAGE`` instead of as a byte stream.
+
+    :keyword int group_size:
+        The number of instances which share an event.
+    """
+    def __init__(  # pylint: disable=too-many-arguments
+            self, name, handler, instances=4, workers=4, buffer_size=65536,
+            message_mode=False, group_size=32):
+        ffi, _ = dist.load()
+        self.name = path_to_text("name", name)
+        input_check("instances", instances, integer_types)
+        input_check("workers", workers, integer_types)
+        input_check("buffer_size", buffer_size, integer_types)
+        input_check("message_mode", message_mode, bool)
+        input_check("group_size", group_size, integer_types)
+
+        if not callable(handler):
+            raise InputError(
+                "handler", handler, message="`handler` must be callable")
+
+        for name_, value in (("instances", instances),
+                             ("workers", workers),
+                             ("buffer_size", buffer_size),
+                             ("group_size", group_size)):
+            if value < 1:
+                raise InputError(
+                    name_, value, message="`%s` must be at least 1" % name_)
+
+        self.handler = handler
+        self.instances = instances
+        self.workers = workers
+        self.buffer_size = buffer_size
+        self.message_mode = message_mode
+        self.group_size = group_size
+        self.connections = 0
+        self.requests = 0
+        self.failed = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._active = 0
+        self._waiting = 0
+        self._started = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._replies = []
+        self._stopping = False
+        self._threads = []
+        self._groups = []
+        self._control = None
+        self._transferred = ffi.new("LPDWORD")
+
+    def _group(self):
+        """Returns the first group with room for another instance"""
+        for group in self._groups:
+            if len(group.instances) < self.group_size:
+                return group
+
+        _, library = dist.load()
+        if len(self._groups) >= library.MAXIMUM_WAIT_OBJECTS - 1:
+            return min(self._groups, key=lambda g: len(g.instances))
+
+        group = _Group()
+        self._groups.append(group)
+        return group
+
+    def _create(self):
+        """Creates a new instance of the pipe and starts it listening"""
+        _, library = dist.load()
+
+        if self.message_mode:
+            mode = library.PIPE_TYPE_MESSAGE | library.PIPE_READMODE_MESSAGE
+        else:
+            mode = library.PIPE_TYPE_BYTE | library.PIPE_READMODE_BYTE
+
+        handle = CreateNamedPipe(
+            self.name,
+            library.PIPE_ACCESS_DUPLEX | library.FILE_FLAG_OVERLAPPED,
+            mode | library.PIPE_WAIT | library.PIPE_REJECT_REMOTE_CLIENTS,
+            nOutBufferSize=self.buffer_size, nInBufferSize=self.buffer_size)
+
+        group = self._group()
+        instance = _Instance(handle, group, self.buffer_size)
+        group.instances.append(instance)
+
+        # A client may already be waiting, in which case the instance is
+        # connected without an outstanding operation.  Either way the
+        # group's event is set, see _start().
+        try:
+            instance.pending = not ConnectNamedPipe(
+                handle, instance.overlapped)
+        except WindowsAPIError:
+            self._remove(instance)
+            raise
+
+        SetEvent(group.event)
+
+    def _start(self, instance, function, data, size):
+        """
+        Starts an overlapped ``ReadFile`` or ``WriteFile`` on ``instance``.
+        Returns False if the client has disconnected.
+        """
+        ffi, library = dist.load()
+
+        # An operation which completes immediately also sets the group's
+        # event so its result is collected the same way as a pending
+        # operation's.  Starting an operation resets the event the whole
+        # group shares, which would hide an operation in the group that
+        # completed just before, so the event is set again below and the
+        # group is checked once more.
+        code = getattr(library, function)(
+            wintype_to_cdata(instance.handle), data, size, ffi.NULL,
+            wintype_to_cdata(instance.overlapped))
+        if code == 0:
+            errno, message = ffi.getwinerror()
+            library.SetLastError(0)
+            if errno not in (library.ERROR_IO_PENDING,
+                             library.ERROR_MORE_DATA):
+                if errno not in (library.ERROR_BROKEN_PIPE,
+                                 library.ERROR_NO_DATA):
+                    logger.error(
+                        "%s on %s failed: %s", function, self.name, message)
+                return False
+
+        instance.pending = True
+        SetEvent(instance.group.event)
+        return True
+
+    def _read(self, instance):
+        """Starts reading the next request, or part of it, from the client"""
+        instance.state = _READING
+        return self._start(
+            instance, "ReadFile", instance.buffer, self.buffer_size)
+
+    def _write(self, instance):
+        """Starts writing the rest of the reply to the client"""
+        instance.state = _WRITING
+        data = instance.reply[instance.written:]
+        return self._start(instance, "WriteFile", data, len(data))
+
+    def _connected(self, instance):
+        """
+        Handles a client connecting to ``instance``.  Returns False if the
+        client disconnected before it could be accepted.
+        """
+        _, library = dist.load()
+        connected = not instance.pending or self._result(instance)[0]
+
+        with self._lock:
+            if connected:
+                self.connections += 1
+                self._active += 1
+                instance.connection = PipeConnection(instance)
+            else:
+                self.failed += 1
+
+        # Keep the number of listening instances constant.  The instance
+        # isn't replaced if this fails, so clients are still served by the
+        # remaining listening instances.
+        try:
+            self._create()
+        except WindowsAPIError as error:
+            logger.error("Failed to create %s: %s", self.name, error)
+            library.SetLastError(0)
+
+        return connected and self._read(instance)
+
+    def _result(self, instance):
+        """
+        Returns a tuple containing False if the operation on ``instance``
+        failed, the bytes transferred and True if more of a message
+        remains to be read.
+        """
+        ffi, library = dist.load()
+        instance.pending = False
+
+        code = library.GetOverlappedResult(
+            wintype_to_cdata(instance.handle),
+            wintype_to_cdata(instance.overlapped), self._transferred, False)
+        if code != 0:
+            return True, self._transferred[0], False
+
+        errno, message = ffi.getwinerror()
+        library.SetLastError(0)
+        if errno == library.ERROR_MORE_DATA:
+            return True, self._transferred[0], True
+
+        if errno not in (library.ERROR_BROKEN_PIPE, library.ERROR_NO_DATA):
+            logger.error("Operation on %s failed: %s", self.name, message)
+        return False, 0, False
+
+    def _complete(self, instance):
+        """
+        Collects the result of the operation on ``instance`` and starts
+        the next one, or queues a complete request for the workers.
+        Returns False if the client should be disconnected.
+        """
+        ffi, _ = dist.load()
+
+        if instance.state == _CONNECTING:
+            return self._connected(instance)
+
+        success, transferred, more = self._result(instance)
+        if not success:
+            return False
+
+        connection = instance.connection
+        if instance.state == _WRITING:
+            instance.written += transferred
+            with self._lock:
+                connection.bytes_written += transferred
+                self.bytes_written += transferred
+
+            if instance.written < len(instance.reply):
+                return self._write(instance)
+
+            # The reply has been written, which is the only point the
+            # client may be disconnected without discarding it.
+            instance.reply = None
+            return not connection.closing and self._read(instance)
+
+        if transferred:
+            instance.chunks.append(ffi.buffer(instance.buffer, transferred)[:])
+            with self._lock:
+                connection.bytes_read += transferred
+                self.bytes_read += transferred
+
+        if more:
+            return self._read(instance)
+
+        request = b"".join(instance.chunks)
+        instance.chunks = []
+        if not request and not self.message_mode:
+            return self._read(instance)
+
+        instance.state = _HANDLING
+        with self._lock:
+            connection.requests += 1
+            self.requests += 1
+            self._waiting += 1
+        self._queue.put((instance, request))
+        return True
+
+    def _replied(self, instance, reply):
+        """
+        Writes the reply of a handled request.  Returns False if the
+        client should be disconnected.
+        """
+        if reply:
+            instance.reply = reply
+            instance.written = 0
+            return self._write(instance)
+
+        return not instance.connection.closing and self._read(instance)
+
+    def _remove(self, instance):
+        """Removes ``instance`` from its group and closes it"""
+        instance.group.instances.remove(instance)
+        CloseHandle(instance.handle)
+
+    def _disconnect(self, instance):
+        """Disconnects the client of ``instance`` and closes the instance"""
+        if instance.connection is not None:
+            try:
+                DisconnectNamedPipe(instance.handle)
+            except WindowsAPIError:
+                # The client has already disconnected.
+                _, library = dist.load()
+                library.SetLastError(0)
+
+            with self._lock:
+                self._active -= 1
+
+        self._remove(instance)
+
+    def start(self):
+        """
+        Creates the listening pipe instances and starts the threads.
+        Creating the instances here means clients can connect as soon as
+        this returns.
+        """
+        if self._started is not None:
+            raise ValueError("The server has already been started")
+
+        self._started = time.time()
+        self._control = CreateEvent(True, False)
+
+        try:
+            for _ in range(self.instances):
+                self._create()
+        except WindowsAPIError:
+            self.close()
+            raise
+
+        self._threads.append(threading.Thread(target=self._run))
+        for _ in range(self.workers):
+            self._threads.append(threading.Thread(target=self._serve))
+
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def _run(self):
+        """
+        Performs every connect, read and write.  The control event is set
+        when a worker has a reply and when the server is closing.
+        """
+        _, library = dist.load()
+        first = 0
+
+        while True:
+            # The groups are rotated on each wait because the lowest
+            # signaled index is returned, which would otherwise let busy
+            # groups at the front starve the rest.
+            groups = self._groups[first:] + self._groups[:first]
+            handles = [self._control]
+            handles.extend(group.event for group in groups)
+            index = WaitForMultipleObjects(
+                handles, False, library.INFINITE) - library.WAIT_OBJECT_0
+            first = (first + 1) % len(self._groups) if self._groups else 0
+
+            if index == 0:
+                ResetEvent(self._control)
+                with self._lock:
+                    replies, self._replies = self._replies, []
+                    stopping = self._stopping
+                if stopping:
+                    return
+
+                for instance, reply in replies:
+                    if not self._replied(instance, reply):
+                        self._disconnect(instance)
+                continue
+
+            # The event is reset before the operations are checked so one
+            # ending during the check signals it again.
+            group = groups[index - 1]
+            ResetEvent(group.event)
+            for instance in group.instances[:]:
+                if instance.state == _HANDLING or (
+                        instance.pending and
+                        not HasOverlappedIoCompleted(instance.overlapped)):
+                    continue
+                if not self._complete(instance):
+                    self._disconnect(instance)
+
+    def _serve(self):
+        """Calls the handler for each request taken from the queue"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            instance, request = item
+            with self._lock:
+                self._waiting -= 1
+
+            connection = instance.connection
+            try:
+                reply = self.handler(connection, request)
+                input_check("reply", reply, (binary_type, type(None)))
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Handler for %s failed", self.name)
+                connection.closing = True
+                reply = None
+                with self._lock:
+                    self.failed += 1
+
+            with self._lock:
+                self._replies.append((instance, reply))
+            SetEvent(self._control)
+
+    @property
+    def stats(self):
+        """
+        Returns the server statistics as a :class:`NamedPipeServerStats`
+        named tuple.  ``active`` is the number of clients currently
+        connected, ``requests`` the number of requests read,
+        ``waiting`` the number of those queued for a free worker, which
+        stays above zero if ``workers`` is too small, and ``failed``
+        counts clients which disconnected before being accepted and
+        handlers which raised an exception.
+        """
+        with self._lock:
+            seconds = time.time() - self._started if self._started else 0.0
+            transferred = self.bytes_read + self.bytes_written
+            return NamedPipeServerStats(
+                connections=self.connections, active=self._active,
+                requests=self.requests, waiting=self._waiting,
+                failed=self.failed, bytes_read=self.bytes_read,
+                bytes_written=self.bytes_written, seconds=seconds,
+                bytes_per_second=transferred / seconds if seconds else 0.0)
+
+    def close(self):
+        """
+        Stops the server thread, waits for the handlers of requests
+        already read to return, cancels outstanding operations and closes
+        every instance, disconnecting its client.
+        """
+        if self._control is None:
+            return
+
+        with self._lock:
+            self._stopping = True
+        SetEvent(self._control)
+        for thread in self._threads[:1]:
+            thread.join()
+
+        for _ in self._threads[1:]:
+            self._queue.put(None)
+        for thread in self._threads[1:]:
+            thread.join()
+
+        _, library = dist.load()
+        for group in self._groups:
+            for instance in group.instances:
+                if instance.pending:
+                    try:
+                        cancel_overlapped(instance.handle, instance.overlapped)
+                    except WindowsAPIError:
+                        library.SetLastError(0)
+                CloseHandle(instance.handle)
+            CloseHandle(group.event)
+
+        with self._lock:
+            self._active = 0
+            self._waiting = 0
+            self._replies = []
+
+        CloseHandle(self._control)
+        self._control = None
+        self._groups = []
+        self._threads = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,481 @@
+"""
+Byte Range Locks
+----------------
+
+Provides :class:`RangeLockManager` which coordinates access to regions of
+a file shared between processes using asynchronous
+:func:`pywincffi.kernel32.LockFileEx` requests.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from six import integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32.events import CreateEvent
+from pywincffi.kernel32.file import LockFileEx, UnlockFileEx
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.overlapped import (
+    GetOverlappedResult, cancel_overlapped)
+from pywincffi.kernel32.synchronization import WaitForSingleObject
+from pywincffi.wintypes import HANDLE, OVERLAPPED
+
+MAX_OFFSET = (1 << 64) - 1
+
+RangeLockStats = namedtuple(
+    "RangeLockStats",
+    ("acquired", "nested", "contended", "failed", "wait_seconds",
+     "max_wait_seconds"))
+
+
+def coalesce(ranges):
+    """
+    Returns ``ranges``, a list of ``(start, end)`` tuples, sorted with
+    overlapping and adjacent ranges merged.
+
+    >>> coalesce([(100, 200), (0, 100), (300, 400)])
+    [(0, 200), (300, 400)]
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _find(intervals, start):
+    """
+    Returns the index of the interval in the coalesced ``intervals``
+    which starts at or before ``start`` or -1.
+    """
+    return bisect_right(intervals, (start, MAX_OFFSET + 1)) - 1
+
+
+def _covers(intervals, start, end):
+    """True if a single coalesced interval contains ``[start, end)``"""
+    index = _find(intervals, start)
+    return index >= 0 and intervals[index][1] >= end
+
+
+def _overlaps(intervals, start, end):
+    """True if any coalesced interval intersects ``[start, end)``"""
+    index = _find(intervals, start)
+    if index >= 0 and intervals[index][1] > start:
+        return True
+    return index + 1 < len(intervals) and intervals[index + 1][0] < end
+
+
+class RangeLock(object):  # pylint: disable=too-many-instance-attributes
+    """
+    A lock on ``length`` bytes of a file starting at ``offset`` as
+    returned by :meth:`RangeLockManager.acquire`.  The lock may still be
+    pending, see :meth:`wait`.  Using the lock as a context manager waits
+    for it and releases it on exit.
+    """
+    # pylint: disable=protected-access
+    def __init__(self, manager, offset, length, exclusive, owner):
+        self._manager = manager
+        self.offset = offset
+        self.length = length
+        self.exclusive = exclusive
+        self.owner = owner
+        self.acquired = False
+        self.released = False
+        self.requested = time.time()
+        self._overlapped = None
+        self._parents = []
+        self._dependents = 0
+
+    @property
+    def end(self):
+        """The offset of the first byte after the locked range"""
+        return self.offset + self.length
+
+    @property
+    def event(self):
+        """
+        The event which is signaled once the lock is granted or None if
+        the lock was granted without a request to the system.  The event
+        can be passed to a wait function alongside other handles.
+        """
+        if self._overlapped is None:
+            return None
+        return self._overlapped.hEvent
+
+    def wait(self, timeout=None):
+        """
+        Waits for the lock to be granted.
+
+        :keyword float timeout:
+            The number of seconds to wait.  By default this waits until
+            the lock is granted.
+
+        :raises WindowsAPIError:
+            Raised with ``ERROR_LOCK_VIOLATION`` if the lock was requested
+            with ``fail_immediately`` and the range is already locked.
+
+        :rtype: bool
+        :return:
+            Returns True if the lock has been granted, False on timeout.
+        """
+        if self.acquired:
+            return True
+        return self._manager._wait(self, timeout)
+
+    def release(self):
+        """
+        Releases the lock.  Calling this more than once is a no-op.
+
+        :raises ValueError:
+            Raised if the lock is still pending, use :meth:`cancel`
+            instead.
+        """
+        self._manager._release(self)
+
+    def cancel(self):
+        """
+        Withdraws a pending request.  If the lock was granted before the
+        request could be canceled, or had already been granted, it is
+        released instead.
+        """
+        if not self.acquired and self._overlapped is not None:
+            self._manager._cancel(self)
+
+        if self.acquired:
+            self.release()
+
+    def __enter__(self):
+        self.wait()
+        return self
+
+    def __exit__(self, *_):
+        self.release()
+
+    def __repr__(self):
+        return "<%s offset=%d length=%d exclusive=%r acquired=%r>" % (
+            self.__class__.__name__, self.offset, self.length,
+            self.exclusive, self.acquired)
+
+
+class RangeLockManager(object):
+    """
+    Issues overlapped :func:`pywincffi.kernel32.LockFileEx` requests for
+    64-bit byte ranges of ``hFile`` so a thread waiting for a range can
+    wait on an event, alongside other handles, instead of blocking in
+    ``LockFileEx``.
+
+    The ranges held by each owner are kept in an interval index in which
+    adjacent ranges are coalesced.  A request by an owner which already
+    holds the whole range, even through several adjacent locks, is granted
+    without calling the system.  This avoids the deadlock Windows would
+    otherwise cause by blocking a handle on its own exclusive lock.
+
+    >>> from pywincffi.kernel32 import RangeLockManager
+    >>> locks = RangeLockManager(hFile)
+    >>> with locks.acquire(1 << 33, 4096):
+    ...     pass  # write the record at 8GiB
+    >>> locks.stats.max_wait_seconds
+    0.0
+
+    :param pywincffi.wintypes.HANDLE hFile:
+        The file to lock.  For asynchronous requests the handle must have
+        been opened with ``FILE_FLAG_OVERLAPPED``, otherwise
+        :meth:`acquire` blocks until the lock is granted.
+    """
+    # pylint: disable=protected-access
+    def __init__(self, hFile):
+        input_check("hFile", hFile, HANDLE)
+        self.hFile = hFile
+        self.acquired = 0
+        self.nested = 0
+        self.contended = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._lock = threading.Lock()
+        self._held = {}
+        self._index = {}
+
+    def _update_index(self, owner):
+        """Rebuilds the coalesced ranges held by ``owner``"""
+        locks = self._held.get(owner)
+        if not locks:
+            self._held.pop(owner, None)
+            self._index.pop(owner, None)
+            return
+
+        self._index[owner] = (
+            coalesce([(lock.offset, lock.end) for lock in locks]),
+            coalesce([
+                (lock.offset, lock.end) for lock in locks if lock.exclusive]))
+
+    def _granted(self, lock):
+        """Records that ``lock`` was granted, the lock must be held"""
+        waited = time.time() - lock.requested
+        lock.acquired = True
+        self.acquired += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self._held.setdefault(lock.owner, []).append(lock)
+        self._update_index(lock.owner)
+
+    def acquire(  # pylint: disable=too-many-arguments
+            self, offset, length, exclusive=True, owner=None, wait=True,
+            fail_immediately=False):
+        """
+        Requests a lock on ``length`` bytes starting at ``offset``.
+
+        :param int offset:
+            The first byte to lock, up to 2 ** 64 - 1.
+
+        :param int length:
+            The number of bytes to lock.
+
+        :keyword bool exclusive:
+            If True, request an exclusive lock.  Otherwise a shared lock is
+            requested.
+
+        :keyword owner:
+            A hashable object identifying the holder of the lock.  Requests
+            from the same owner are checked against the ranges it already
+            holds.
+
+        :keyword bool wait:
+            If True, wait for the lock to be granted.  If False, return as
+            soon as the lock has been requested; use :meth:`RangeLock.wait`
+            or :attr:`RangeLock.event` to wait for it.
+
+        :keyword bool fail_immediately:
+            If True, the request fails if the range is already locked.
+
+        :raises InputError:
+            Raised if ``owner`` already holds part, but not all, of the
+            range or holds a shared lock on a range an exclusive lock was
+            requested for.
+
+        :raises WindowsAPIError:
+            Raised if the request fails.  If the range is locked and
+            ``fail_immediately`` is True the error number is
+            ``ERROR_LOCK_VIOLATION``.
+
+        :rtype: :class:`RangeLock`
+        """
+        input_check("offset", offset, integer_types)
+        input_check("length", length, integer_types)
+        input_check("exclusive", exclusive, bool)
+
+        if offset < 0 or length < 1 or offset + length - 1 > MAX_OFFSET:
+            raise InputError(
+                "length", length,
+                message="The range must be between 0 and 2 ** 64 - 1")
+
+        lock = RangeLock(self, offset, length, exclusive, owner)
+
+        with self._lock:
+            if self._request_nested(lock):
+                return lock
+
+        self._request(lock, fail_immediately)
+
+        if wait:
+            lock.wait()
+        return lock
+
+    def _request_nested(self, lock):
+        """
+        Grants ``lock`` without calling the system if its owner already
+        holds the range.  Returns False if a request must be made.
+        """
+        ranges, exclusive_ranges = self._index.get(lock.owner, ([], []))
+        if not _overlaps(ranges, lock.offset, lock.end):
+            return False
+
+        covering = exclusive_ranges if lock.exclusive else ranges
+        if not _covers(covering, lock.offset, lock.end):
+            raise InputError(
+                "offset", lock.offset,
+                message="The owner %r already holds part of the range, "
+                        "or only a shared lock on it" % (lock.owner, ))
+
+        lock._parents = [
+            held for held in self._held[lock.owner]
+            if held.offset < lock.end and lock.offset < held.end and
+            (held.exclusive or not lock.exclusive)]
+        for parent in lock._parents:
+            parent._dependents += 1
+
+        lock.acquired = True
+        self.nested += 1
+        return True
+
+    def _request(self, lock, fail_immediately):
+        """Calls LockFileEx for ``lock``"""
+        ffi, library = dist.load()
+
+        flags = 0
+        if lock.exclusive:
+            flags |= library.LOCKFILE_EXCLUSIVE_LOCK
+        if fail_immediately:
+            flags |= library.LOCKFILE_FAIL_IMMEDIATELY
+
+        overlapped = OVERLAPPED()
+        overlapped.Offset = lock.offset & 0xFFFFFFFF
+        overlapped.OffsetHigh = lock.offset >> 32
+        overlapped.hEvent = CreateEvent(True, False)
+        lock._overlapped = overlapped
+
+        # LockFileEx() does not clear the last error when the lock is
+        # granted immediately.
+        library.SetLastError(0)
+        try:
+            LockFileEx(
+                self.hFile, flags, lock.length & 0xFFFFFFFF,
+                lock.length >> 32, lpOverlapped=overlapped)
+        except WindowsAPIError:
+            self._finish(lock, False)
+            raise
+
+        errno, _ = ffi.getwinerror()
+        if errno == library.ERROR_IO_PENDING:
+            library.SetLastError(0)
+            with self._lock:
+                self.contended += 1
+        else:
+            with self._lock:
+                self._granted(lock)
+
+    def _finish(self, lock, granted):
+        """
+        Records the result of a request which is no longer pending and
+        closes its event if the lock was not granted.
+        """
+        with self._lock:
+            if granted:
+                self._granted(lock)
+            else:
+                self.failed += 1
+
+        if not lock.acquired and lock._overlapped is not None:
+            CloseHandle(lock._overlapped.hEvent)
+            lock._overlapped = None
+
+    def _wait(self, lock, timeout):
+        """Called by :meth:`RangeLock.wait`"""
+        _, library = dist.load()
+
+        if lock._overlapped is None:
+            raise ValueError("The lock request failed or was released")
+
+        if timeout is None:
+            milliseconds = library.INFINITE
+        else:
+            milliseconds = max(0, int(timeout * 1000))
+
+        result = WaitForSingleObject(lock.event, milliseconds)
+        if result == library.WAIT_TIMEOUT:
+            return False
+
+        try:
+            GetOverlappedResult(self.hFile, lock._overlapped, False)
+        except WindowsAPIError:
+            self._finish(lock, False)
+            raise
+
+        self._finish(lock, True)
+        return True
+
+    def _cancel(self, lock):
+        """Called by :meth:`RangeLock.cancel`"""
+        try:
+            granted = (
+                cancel_overlapped(self.hFile, lock._overlapped) is not None)
+        except WindowsAPIError:
+            self._finish(lock, False)
+            raise
+
+        self._finish(lock, granted)
+
+    def _release(self, lock):
+        """Called by :meth:`RangeLock.release`"""
+        if lock.released:
+            return
+
+        if not lock.acquired:
+            raise ValueError("The lock is still pending")
+
+        unlock = []
+        with self._lock:
+            lock.released = True
+            for parent in lock._parents:
+                parent._dependents -= 1
+
+            # A range stays locked, and indexed, until it and every lock
+            # nested inside of it have been released.
+            held = self._held.get(lock.owner, [])
+            for candidate in lock._parents or [lock]:
+                if (candidate.released and candidate._dependents <= 0 and
+                        candidate in held):
+                    held.remove(candidate)
+                    unlock.append(candidate)
+
+            if unlock:
+                self._update_index(lock.owner)
+
+        self._unlock(unlock)
+
+    def _unlock(self, locks):
+        """Unlocks the ranges of ``locks`` and closes their events"""
+        for lock in locks:
+            UnlockFileEx(
+                self.hFile, lock.length & 0xFFFFFFFF, lock.length >> 32,
+                lpOverlapped=lock._overlapped)
+            CloseHandle(lock.event)
+
+    def held(self, owner=None):
+        """
+        Returns the ranges held by ``owner`` as a list of ``(offset,
+        length)`` tuples with adjacent ranges coalesced.
+        """
+        with self._lock:
+            ranges, _ = self._index.get(owner, ([], []))
+            return [(start, end - start) for start, end in ranges]
+
+    @property
+    def stats(self):
+        """
+        Returns a :class:`RangeLockStats` named tuple.  ``contended`` is
+        the number of requests which had to wait, ``failed`` includes
+        requests which were canceled and ``wait_seconds`` is the total
+        time spent waiting for locks to be granted.
+        """
+        with self._lock:
+            return RangeLockStats(
+                acquired=self.acquired, nested=self.nested,
+                contended=self.contended, failed=self.failed,
+                wait_seconds=self.wait_seconds,
+                max_wait_seconds=self.max_wait_seconds)
+
+    def close(self):
+        """Releases every lock which has been granted"""
+        # Locks nested inside of these can't outlive the manager so the
+        # ranges are unlocked even if nested locks are still held.  This
+        # includes ranges whose own lock was released while nested locks
+        # kept them locked.
+        with self._lock:
+            locks = [
+                lock for owner in self._held.values() for lock in owner]
+            for lock in locks:
+                lock.released = True
+                lock._dependents = 0
+            self._held.clear()
+            self._index.clear()
+
+        self._unlock(locks)
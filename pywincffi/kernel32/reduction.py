@@ -0,0 +1,106 @@
+"""
+Handle Reduction
+----------------
+
+Registers a :mod:`multiprocessing` reduction for
+:class:`pywincffi.wintypes.HANDLE` so handles to files, events, pipes and
+other objects can be passed to child processes and pool workers instead
+of being reopened by name.  The reduction is registered when
+:mod:`pywincffi.kernel32` is imported and only applies to objects pickled
+by :mod:`multiprocessing`.
+
+>>> from multiprocessing import Pool
+>>> from pywincffi.kernel32 import CreateEvent
+>>> hEvent = CreateEvent(True, False)
+>>> pool = Pool()
+>>> pool.apply(worker, (hEvent, ))
+
+Each time a handle is pickled it's duplicated and the receiving process
+owns the duplicate, which it should close with
+:func:`pywincffi.kernel32.CloseHandle`.  A pickled handle can only be
+unpickled once and its duplicate leaks if it's never unpickled.
+"""
+
+import os
+
+from pywincffi.core import dist
+from pywincffi.kernel32.handle import CloseHandle, DuplicateHandle
+from pywincffi.kernel32.process import GetCurrentProcess, OpenProcess
+from pywincffi.wintypes import HANDLE, wintype_to_cdata
+
+try:
+    from multiprocessing.context import get_spawning_popen
+    from multiprocessing.reduction import ForkingPickler
+except ImportError:  # pragma: no cover
+    # Python 2
+    from multiprocessing.forking import ForkingPickler
+    get_spawning_popen = None  # pylint: disable=invalid-name
+
+
+def _value(handle):
+    """Returns the integer value of ``handle``"""
+    ffi, _ = dist.load()
+    return int(ffi.cast("intptr_t", wintype_to_cdata(handle)))
+
+
+def reduce_handle(handle):
+    """
+    Duplicates ``handle`` for the process which will unpickle it.  While
+    :mod:`multiprocessing` spawns a child the handle is duplicated
+    straight into the child by the ``duplicate_for_child()`` method of
+    the spawning ``Popen`` object.  Otherwise, for example when sending a
+    task to a pool worker, the receiver is not known yet so the duplicate
+    is kept in this process and :func:`rebuild_handle` moves it into the
+    receiver.
+
+    :param pywincffi.wintypes.HANDLE handle:
+        The handle to pickle.
+
+    :rtype: tuple
+    :return:
+        Returns :func:`rebuild_handle` and its arguments.
+    """
+    _, library = dist.load()
+    popen = get_spawning_popen() if get_spawning_popen is not None else None
+
+    if popen is not None:
+        duplicate = popen.duplicate_for_child(_value(handle))
+        return rebuild_handle, (duplicate, None)
+
+    hCurrentProcess = GetCurrentProcess()
+    duplicate = DuplicateHandle(
+        hCurrentProcess, handle, hCurrentProcess, 0, False,
+        library.DUPLICATE_SAME_ACCESS)
+    return rebuild_handle, (_value(duplicate), os.getpid())
+
+
+def rebuild_handle(value, source_pid):
+    """
+    Rebuilds a handle pickled by :func:`reduce_handle`.
+
+    :param int value:
+        The value of the duplicated handle.
+
+    :param int source_pid:
+        The process which owns the duplicate or None if it was
+        duplicated into this process already.  If it's another process
+        the duplicate is moved into this one.
+
+    :rtype: pywincffi.wintypes.HANDLE
+    """
+    ffi, library = dist.load()
+    handle = HANDLE(ffi.cast("HANDLE", value))
+
+    if source_pid is None or source_pid == os.getpid():
+        return handle
+
+    hSourceProcess = OpenProcess(library.PROCESS_DUP_HANDLE, False, source_pid)
+    try:
+        return DuplicateHandle(
+            hSourceProcess, handle, GetCurrentProcess(), 0, False,
+            library.DUPLICATE_CLOSE_SOURCE | library.DUPLICATE_SAME_ACCESS)
+    finally:
+        CloseHandle(hSourceProcess)
+
+
+ForkingPickler.register(HANDLE, reduce_handle)
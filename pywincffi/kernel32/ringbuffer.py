@@ -0,0 +1,349 @@
+"""
+Shared Memory Ring Buffer
+-------------------------
+
+Provides :class:`SharedRingBuffer`, a message queue between processes
+stored in a named file mapping.  Writing and reading a message does not
+make a system call unless the reader is waiting for a message or the
+writer is waiting for space.
+"""
+
+import time
+
+from six import integer_types, text_type, binary_type
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check, NoneType
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.events import CreateEvent, SetEvent
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.memory import (
+    CreateFileMapping, MapViewOfFile, UnmapViewOfFile)
+from pywincffi.kernel32.synchronization import (
+    CreateMutex, ReleaseMutex, WaitForSingleObject)
+
+MAGIC = 0x676E6952636E6977
+
+# Offsets of the fields in the header.  The positions are on separate
+# cache lines so the writer and the reader don't contend for one.
+_CAPACITY = 8
+_FLAGS = 16
+_HEAD = 64
+_TAIL = 128
+_READER_WAITING = 192
+_WRITER_WAITING = 224
+_HEADER_SIZE = 256
+
+_MULTIPLE_WRITERS = 1
+_WRAP = 0xFFFFFFFF
+
+
+def _record_size(size):
+    """The space used by a message of ``size`` bytes and its length"""
+    return (size + 11) & ~7
+
+
+class SharedRingBuffer(object):
+    """
+    A ring buffer of messages in the named file mapping ``name`` which
+    one process, or several if ``multiple_writers`` is True, writes to
+    and one process reads from.
+
+    Each message is stored contiguously, wrapping to the start of the
+    buffer if it doesn't fit before the end, so the writer fills and the
+    reader reads it through a :class:`memoryview` of the shared memory
+    without further copies.  The read and write positions are only
+    updated by the reader and writer respectively.  Named events are set
+    only when the other side has announced that it's waiting, with an
+    interlocked exchange so a wakeup can't be missed.
+
+    The positions are read and written with ordinary loads and stores so
+    this relies on the ordering guarantees of x86 and x64 processors.
+
+    >>> from pywincffi.kernel32 import SharedRingBuffer
+    >>> writer = SharedRingBuffer(u"Local\\\\telemetry", capacity=1048576)
+    >>> writer.write(b"sample")
+
+    And in another process:
+
+    >>> reader = SharedRingBuffer(u"Local\\\\telemetry")
+    >>> message = reader.read()
+    >>> process(message)
+    >>> reader.release()
+
+    :param str name:
+        The name of the file mapping.  The events, and the mutex used by
+        multiple writers, are named after it.
+
+    :keyword int capacity:
+        The size of the buffer in bytes, a power of two of at least 64.
+        If provided the mapping is created, otherwise an existing ring
+        buffer is opened.
+
+    :keyword bool multiple_writers:
+        If True, writers take a named mutex so several processes may
+        write.  Only used when the buffer is created.
+    """
+    def __init__(self, name, capacity=None, multiple_writers=False):
+        input_check("name", name, text_type)
+        input_check("capacity", capacity, (NoneType, ) + integer_types)
+        input_check("multiple_writers", multiple_writers, bool)
+
+        if capacity is not None and (
+                capacity < 64 or capacity & (capacity - 1)):
+            raise InputError(
+                "capacity", capacity,
+                message="`capacity` must be a power of two of at least 64")
+
+        ffi, library = dist.load()
+        self.name = name
+        self._mutex = None
+        self._reserved = None
+        self._released = None
+
+        self._mapping = CreateFileMapping(
+            None, library.PAGE_READWRITE,
+            _HEADER_SIZE + (capacity or 0), lpName=name)
+        library.SetLastError(0)
+
+        try:
+            self._address = MapViewOfFile(
+                self._mapping, library.FILE_MAP_ALL_ACCESS)
+        except WindowsAPIError:
+            CloseHandle(self._mapping)
+            raise
+
+        base = ffi.cast("char *", self._address)
+        header = ffi.cast("unsigned long long *", base)
+
+        # A new mapping is zero filled.
+        if header[0] != MAGIC:
+            if capacity is None:
+                self._close_mapping()
+                raise InputError(
+                    "capacity", capacity,
+                    message="%r is not a ring buffer, `capacity` must be "
+                            "provided to create it" % name)
+            header[_CAPACITY // 8] = capacity
+            header[_FLAGS // 8] = _MULTIPLE_WRITERS if multiple_writers else 0
+            header[0] = MAGIC
+
+        self.capacity = int(header[_CAPACITY // 8])
+        self.multiple_writers = bool(header[_FLAGS // 8] & _MULTIPLE_WRITERS)
+        self._mask = self.capacity - 1
+        self._data = base + _HEADER_SIZE
+        self._head = ffi.cast("unsigned long long *", base + _HEAD)
+        self._tail = ffi.cast("unsigned long long *", base + _TAIL)
+        self._reader_waiting = ffi.cast("LONG *", base + _READER_WAITING)
+        self._writer_waiting = ffi.cast("LONG *", base + _WRITER_WAITING)
+
+        self._data_event = CreateEvent(False, False, lpName=name + u"-data")
+        self._space_event = CreateEvent(False, False, lpName=name + u"-space")
+        if self.multiple_writers:
+            self._mutex = CreateMutex(False, lpName=name + u"-write")
+        library.SetLastError(0)
+
+    @property
+    def max_message_size(self):
+        """The size of the largest message which can be written"""
+        return self.capacity // 2 - 4
+
+    def _wait(self, event, deadline):
+        """
+        Waits for ``event`` until ``deadline``.  Returns False if the
+        deadline passed.
+        """
+        _, library = dist.load()
+
+        if deadline is None:
+            milliseconds = library.INFINITE
+        else:
+            milliseconds = max(0, int((deadline - time.time()) * 1000))
+
+        result = WaitForSingleObject(event, milliseconds)
+        return result != library.WAIT_TIMEOUT
+
+    def reserve(self, size, timeout=None):
+        """
+        Reserves space for a message of ``size`` bytes and returns a
+        writable :class:`memoryview` of it.  The message is not visible
+        to the reader until :meth:`commit` is called.
+
+        :param int size:
+            The size of the message, at most :attr:`max_message_size`.
+
+        :keyword float timeout:
+            The number of seconds to wait for space.  By default this
+            waits until the reader has made enough space.
+
+        :rtype: memoryview
+        :return:
+            Returns None if there was not enough space in time.
+        """
+        input_check("size", size, integer_types)
+
+        if not 0 <= size <= self.max_message_size:
+            raise InputError(
+                "size", size,
+                message="`size` must be between 0 and %d" % (
+                    self.max_message_size))
+
+        ffi, library = dist.load()
+        deadline = None if timeout is None else time.time() + timeout
+
+        if self._mutex is not None and not self._wait(self._mutex, deadline):
+            return None
+
+        record = _record_size(size)
+        while True:
+            head = self._head[0]
+            offset = head & self._mask
+            padding = self.capacity - offset
+            if padding >= record:
+                padding = 0
+
+            if self.capacity - (head - self._tail[0]) >= padding + record:
+                break
+
+            # Announce that we're waiting then check again in case the
+            # reader made space in the meantime.
+            library.InterlockedExchange(self._writer_waiting, 1)
+            if self.capacity - (head - self._tail[0]) >= padding + record:
+                continue
+
+            if not self._wait(self._space_event, deadline):
+                library.InterlockedExchange(self._writer_waiting, 0)
+                if self._mutex is not None:
+                    ReleaseMutex(self._mutex)
+                return None
+
+        lengths = ffi.cast("DWORD *", self._data + offset)
+        if padding:
+            lengths[0] = _WRAP
+            offset = 0
+            lengths = ffi.cast("DWORD *", self._data)
+
+        lengths[0] = size
+        self._reserved = head + padding + record
+        return memoryview(ffi.buffer(self._data + offset + 4, size))
+
+    def commit(self):
+        """Makes the message returned by :meth:`reserve` visible"""
+        _, library = dist.load()
+
+        if self._reserved is None:
+            raise ValueError("No message has been reserved")
+
+        self._head[0] = self._reserved
+        self._reserved = None
+
+        if library.InterlockedExchange(self._reader_waiting, 0):
+            SetEvent(self._data_event)
+
+        if self._mutex is not None:
+            ReleaseMutex(self._mutex)
+
+    def write(self, data, timeout=None):
+        """
+        Copies ``data`` into the buffer as a single message.
+
+        :param bytes data:
+            The message.
+
+        :keyword float timeout:
+            The number of seconds to wait for space.
+
+        :rtype: bool
+        :return:
+            Returns False if there was not enough space in time.
+        """
+        input_check("data", data, binary_type)
+
+        view = self.reserve(len(data), timeout=timeout)
+        if view is None:
+            return False
+
+        view[:] = data
+        self.commit()
+        return True
+
+    def read(self, timeout=None):
+        """
+        Returns a read only :class:`memoryview` of the next message.  The
+        view is valid until :meth:`release` is called, which happens
+        implicitly on the next call to :meth:`read`.
+
+        :keyword float timeout:
+            The number of seconds to wait for a message.  By default this
+            waits until a message is written.
+
+        :rtype: memoryview
+        :return:
+            Returns None if no message was written in time.
+        """
+        ffi, library = dist.load()
+        self.release()
+        deadline = None if timeout is None else time.time() + timeout
+
+        while True:
+            tail = self._tail[0]
+            if self._head[0] == tail:
+                library.InterlockedExchange(self._reader_waiting, 1)
+                if self._head[0] != tail:
+                    continue
+                if not self._wait(self._data_event, deadline):
+                    library.InterlockedExchange(self._reader_waiting, 0)
+                    return None
+                continue
+
+            offset = tail & self._mask
+            size = ffi.cast("DWORD *", self._data + offset)[0]
+            if size == _WRAP:
+                self._tail[0] = tail + self.capacity - offset
+                continue
+
+            self._released = tail + _record_size(size)
+            view = memoryview(ffi.buffer(self._data + offset + 4, size))
+            return view.toreadonly() if hasattr(view, "toreadonly") else view
+
+    def release(self):
+        """
+        Releases the message returned by :meth:`read` so its space can be
+        reused by the writer.
+        """
+        _, library = dist.load()
+
+        if self._released is None:
+            return
+
+        self._tail[0] = self._released
+        self._released = None
+
+        if library.InterlockedExchange(self._writer_waiting, 0):
+            SetEvent(self._space_event)
+
+    def _close_mapping(self):
+        """Unmaps the view and closes the handle to the mapping"""
+        UnmapViewOfFile(self._address)
+        CloseHandle(self._mapping)
+
+    def close(self):
+        """
+        Unmaps the buffer and closes the handles.  The mapping is
+        destroyed once every process has closed it.
+        """
+        if self._address is None:
+            return
+
+        self._close_mapping()
+        CloseHandle(self._data_event)
+        CloseHandle(self._space_event)
+        if self._mutex is not None:
+            CloseHandle(self._mutex)
+        self._address = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
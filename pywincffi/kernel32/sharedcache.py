@@ -0,0 +1,467 @@
+"""
+Shared Memory Cache
+-------------------
+
+Provides :class:`SharedCache`, a fixed capacity key/value cache stored in
+a named file mapping so processes on the same host can share a single
+copy of the cached data.
+"""
+
+import time
+import zlib
+
+from six import integer_types, text_type, binary_type
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check, NoneType
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32.handle import CloseHandle
+from pywincffi.kernel32.memory import (
+    CreateFileMapping, MapViewOfFile, UnmapViewOfFile)
+from pywincffi.kernel32.synchronization import (
+    CreateMutex, ReleaseMutex, WaitForSingleObject)
+
+MAGIC = 0x6568636143636E77
+
+# Offsets of the fields in the header, each an unsigned long long.
+_BUCKETS = 1
+_WAYS = 2
+_KEY_SIZE = 3
+_VALUE_SIZE = 4
+_EVICTIONS = 5
+_HEADER_SIZE = 64
+
+# Offsets of the fields of a slot.  ``sequence`` is odd while the slot is
+# being written, ``used`` and ``referenced`` are LONGs.
+_SEQUENCE = 0
+_HASH = 8
+_KEY_LENGTH = 16
+_VALUE_LENGTH = 20
+_USED = 24
+_REFERENCED = 28
+_SLOT_HEADER_SIZE = 32
+
+# The number of times a reader yields while a slot is being written before
+# it gives up on the slot.  A writer which died mid-write leaves the
+# sequence odd until the next writer takes the abandoned mutex.
+_MAX_SPINS = 1000
+
+
+def _align(size):
+    """Rounds ``size`` up to a multiple of the cache line size"""
+    return (size + 63) & ~63
+
+
+def _hash(key):
+    """
+    Returns the bucket hash and a 64-bit hash of ``key``.  :func:`hash`
+    can't be used because it differs between processes.
+    """
+    low = zlib.crc32(key) & 0xFFFFFFFF
+    return low, low | (zlib.adler32(key) & 0xFFFFFFFF) << 32
+
+
+class SharedCacheValue(object):
+    """
+    A value returned by :meth:`SharedCache.lookup`.  :attr:`view` is a
+    :class:`memoryview` of the shared memory which is overwritten if the
+    entry is replaced or evicted, so check :meth:`valid` after using it.
+    """
+    __slots__ = ("view", "_sequence", "_expected")
+
+    def __init__(self, view, sequence, expected):
+        self.view = view
+        self._sequence = sequence
+        self._expected = expected
+
+    def valid(self):
+        """Returns True if the entry has not changed since it was read"""
+        return self._sequence[0] == self._expected
+
+
+class SharedCache(object):
+    """
+    A cache of ``bytes`` keys and values stored in the named file mapping
+    ``name``.  Every process using the same name shares the entries.
+
+    The cache is a hash table of buckets holding ``ways`` slots each.
+    Reads don't take a lock.  Each slot has a sequence number which a
+    writer makes odd before changing the slot and even afterwards, so a
+    reader retries if the number was odd or changed while it read the
+    slot.  Writers take a named mutex.  When a bucket is full the entry
+    to replace is chosen with the CLOCK algorithm: reads mark a slot as
+    referenced and the writer skips, and unmarks, referenced slots.
+
+    Like :class:`pywincffi.kernel32.SharedRingBuffer` this relies on the
+    ordering guarantees of x86 and x64 processors.
+
+    >>> from pywincffi.kernel32 import SharedCache
+    >>> cache = SharedCache(u"Local\\\\lookups", slots=65536)
+    >>> cache.set(b"key", b"value")
+    >>> value = cache.get(b"key")
+
+    :param str name:
+        The name of the file mapping.  The mutex is named after it.
+
+    :keyword int slots:
+        The number of entries the cache holds, rounded down to a multiple
+        of ``ways``.  If provided and the cache doesn't exist yet, it's
+        created, otherwise the existing cache is opened and the sizes
+        stored in it are used.
+
+    :keyword int key_size:
+        The maximum size of a key in bytes.
+
+    :keyword int value_size:
+        The maximum size of a value in bytes.
+
+    :keyword int ways:
+        The number of slots in each bucket, at most 255 because each
+        bucket's CLOCK hand is stored in a single byte.
+    """
+    def __init__(  # pylint: disable=too-many-arguments
+            self, name, slots=None, key_size=64, value_size=1024, ways=8):
+        input_check("name", name, text_type)
+        input_check("slots", slots, (NoneType, ) + integer_types)
+        input_check("key_size", key_size, integer_types)
+        input_check("value_size", value_size, integer_types)
+        input_check("ways", ways, integer_types)
+
+        for name_, value in (("key_size", key_size),
+                             ("value_size", value_size),
+                             ("ways", ways)):
+            if value < 1:
+                raise InputError(
+                    name_, value, message="`%s` must be at least 1" % name_)
+
+        if ways > 255:
+            raise InputError(
+                "ways", ways, message="`ways` must be at most 255")
+
+        if slots is not None and slots < ways:
+            raise InputError(
+                "slots", slots, message="`slots` must be at least `ways`")
+
+        ffi, library = dist.load()
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+        size = 0
+        if slots is not None:
+            buckets = slots // ways
+            size = (
+                _HEADER_SIZE + _align(buckets) +
+                buckets * ways * _align(
+                    _SLOT_HEADER_SIZE + key_size + value_size))
+
+        self._mapping = CreateFileMapping(
+            None, library.PAGE_READWRITE, max(size, _HEADER_SIZE),
+            lpName=name)
+        library.SetLastError(0)
+
+        try:
+            self._address = MapViewOfFile(
+                self._mapping, library.FILE_MAP_ALL_ACCESS)
+        except WindowsAPIError:
+            CloseHandle(self._mapping)
+            raise
+
+        base = ffi.cast("char *", self._address)
+        self._header = ffi.cast("unsigned long long *", base)
+
+        # The mutex is taken before the header is initialized so two
+        # processes creating the cache at once don't both initialize it.
+        self._mutex = CreateMutex(False, lpName=name + u"-write")
+        library.SetLastError(0)
+
+        result = WaitForSingleObject(self._mutex, library.INFINITE)
+        try:
+            if self._header[0] != MAGIC and slots is not None:
+                self._header[_BUCKETS] = buckets
+                self._header[_WAYS] = ways
+                self._header[_KEY_SIZE] = key_size
+                self._header[_VALUE_SIZE] = value_size
+                self._header[0] = MAGIC
+
+            if self._header[0] == MAGIC:
+                self.buckets = int(self._header[_BUCKETS])
+                self.ways = int(self._header[_WAYS])
+                self.key_size = int(self._header[_KEY_SIZE])
+                self.value_size = int(self._header[_VALUE_SIZE])
+                self._hands = ffi.cast(
+                    "unsigned char *", base + _HEADER_SIZE)
+                self._slots = base + _HEADER_SIZE + _align(self.buckets)
+                self._slot_size = _align(
+                    _SLOT_HEADER_SIZE + self.key_size + self.value_size)
+
+                if result == library.WAIT_ABANDONED:
+                    self._repair()
+        finally:
+            ReleaseMutex(self._mutex)
+
+        if self._header[0] != MAGIC:
+            self.close()
+            raise InputError(
+                "slots", slots,
+                message="%r is not a cache, `slots` must be provided to "
+                        "create it" % name)
+
+    @property
+    def evictions(self):
+        """The number of entries evicted by every process"""
+        return int(self._header[_EVICTIONS])
+
+    def _lock(self, timeout=None):
+        """
+        Takes the mutex.  If a process died while holding it, slots it
+        was writing are discarded.  Returns False if ``timeout`` expired.
+        """
+        _, library = dist.load()
+        result = WaitForSingleObject(
+            self._mutex,
+            library.INFINITE if timeout is None else int(timeout * 1000))
+
+        if result == library.WAIT_TIMEOUT:
+            return False
+
+        if result == library.WAIT_ABANDONED:
+            self._repair()
+        return True
+
+    def _repair(self):
+        """Empties any slot left half written"""
+        ffi, _ = dist.load()
+        for index in range(self.buckets * self.ways):
+            slot = self._slots + index * self._slot_size
+            sequence = ffi.cast("unsigned long long *", slot + _SEQUENCE)
+            if sequence[0] & 1:
+                ffi.cast("LONG *", slot + _USED)[0] = 0
+                sequence[0] += 1
+
+    def _slot(self, bucket, way):
+        """Returns a pointer to slot ``way`` of ``bucket``"""
+        return self._slots + (bucket * self.ways + way) * self._slot_size
+
+    def _find(self, key, full_hash, bucket):
+        """
+        Returns the slot holding ``key``, its sequence pointer and the
+        sequence number it was read at, or None.  A slot which stays
+        half written for ``_MAX_SPINS`` attempts is skipped, so a key in
+        it is a miss until a writer repairs the slot.
+        """
+        ffi, _ = dist.load()
+        length = len(key)
+
+        for way in range(self.ways):
+            slot = self._slot(bucket, way)
+            sequence = ffi.cast("unsigned long long *", slot)
+            spins = 0
+            while True:
+                expected = sequence[0]
+                if expected & 1:
+                    spins += 1
+                    if spins >= _MAX_SPINS:
+                        break
+                    time.sleep(0)
+                    continue
+
+                fields = ffi.cast("unsigned long long *", slot)
+                lengths = ffi.cast("DWORD *", slot + _KEY_LENGTH)
+                found = (
+                    ffi.cast("LONG *", slot + _USED)[0] and
+                    fields[_HASH // 8] == full_hash and
+                    lengths[0] == length and
+                    ffi.buffer(slot + _SLOT_HEADER_SIZE, length)[:] == key)
+
+                if sequence[0] != expected:
+                    continue
+                if found:
+                    return slot, sequence, expected
+                break
+
+        return None
+
+    def lookup(self, key):
+        """
+        Returns the value of ``key`` as a :class:`SharedCacheValue` whose
+        ``view`` refers to the shared memory, or None if ``key`` is not
+        cached.
+
+        :param bytes key:
+            The key to look up.
+        """
+        ffi, _ = dist.load()
+        input_check("key", key, binary_type)
+        bucket_hash, full_hash = _hash(key)
+
+        while True:
+            found = self._find(key, full_hash, bucket_hash % self.buckets)
+            if found is None:
+                self.misses += 1
+                return None
+
+            slot, sequence, expected = found
+            length = ffi.cast("DWORD *", slot + _VALUE_LENGTH)[0]
+            view = memoryview(ffi.buffer(
+                slot + _SLOT_HEADER_SIZE + self.key_size, length))
+
+            # The slot may have been replaced after it was found.
+            if sequence[0] == expected:
+                ffi.cast("LONG *", slot + _REFERENCED)[0] = 1
+                self.hits += 1
+                return SharedCacheValue(view, sequence, expected)
+
+    def get(self, key, default=None):
+        """
+        Returns a copy of the value of ``key`` or ``default`` if it's not
+        cached.
+
+        :param bytes key:
+            The key to look up.
+        """
+        while True:
+            value = self.lookup(key)
+            if value is None:
+                return default
+
+            data = value.view.tobytes()
+            if value.valid():
+                return data
+
+    def set(self, key, value, timeout=None):
+        """
+        Stores ``value`` for ``key``, replacing the existing value or, if
+        the bucket is full, evicting an entry which has not been read
+        recently.
+
+        :param bytes key:
+            The key, at most ``key_size`` bytes.
+
+        :param bytes value:
+            The value, at most ``value_size`` bytes.
+
+        :keyword float timeout:
+            The number of seconds to wait for other writers.
+
+        :rtype: bool
+        :return:
+            Returns False if the mutex could not be taken in time.
+        """
+        ffi, _ = dist.load()
+        input_check("key", key, binary_type)
+        input_check("value", value, binary_type)
+
+        for name, data, limit in (("key", key, self.key_size),
+                                  ("value", value, self.value_size)):
+            if len(data) > limit:
+                raise InputError(
+                    name, data,
+                    message="`%s` must be at most %d bytes" % (name, limit))
+
+        bucket_hash, full_hash = _hash(key)
+        bucket = bucket_hash % self.buckets
+
+        if not self._lock(timeout):
+            return False
+
+        try:
+            found = self._find(key, full_hash, bucket)
+            slot = found[0] if found is not None else self._victim(bucket)
+
+            fields = ffi.cast("unsigned long long *", slot)
+            fields[_SEQUENCE] += 1
+            fields[_HASH // 8] = full_hash
+            lengths = ffi.cast("DWORD *", slot + _KEY_LENGTH)
+            lengths[0] = len(key)
+            lengths[1] = len(value)
+            ffi.memmove(slot + _SLOT_HEADER_SIZE, key, len(key))
+            ffi.memmove(
+                slot + _SLOT_HEADER_SIZE + self.key_size, value, len(value))
+            flags = ffi.cast("LONG *", slot + _USED)
+            flags[0] = 1
+            flags[1] = 0
+            fields[_SEQUENCE] += 1
+        finally:
+            ReleaseMutex(self._mutex)
+
+        return True
+
+    def _victim(self, bucket):
+        """
+        Returns the slot to store a new entry in, an empty slot if there
+        is one otherwise the next slot after the bucket's hand which has
+        not been referenced.  The mutex must be held.
+        """
+        ffi, _ = dist.load()
+
+        for way in range(self.ways):
+            slot = self._slot(bucket, way)
+            if not ffi.cast("LONG *", slot + _USED)[0]:
+                return slot
+
+        hand = self._hands[bucket] % self.ways
+        while True:
+            slot = self._slot(bucket, hand)
+            hand = (hand + 1) % self.ways
+            referenced = ffi.cast("LONG *", slot + _REFERENCED)
+            if referenced[0]:
+                referenced[0] = 0
+                continue
+
+            self._hands[bucket] = hand
+            self._header[_EVICTIONS] += 1
+            return slot
+
+    def delete(self, key, timeout=None):
+        """
+        Removes ``key`` from the cache.
+
+        :param bytes key:
+            The key to remove.
+
+        :keyword float timeout:
+            The number of seconds to wait for other writers.
+
+        :rtype: bool
+        :return:
+            Returns True if ``key`` was removed.
+        """
+        ffi, _ = dist.load()
+        input_check("key", key, binary_type)
+        bucket_hash, full_hash = _hash(key)
+
+        if not self._lock(timeout):
+            return False
+
+        try:
+            found = self._find(key, full_hash, bucket_hash % self.buckets)
+            if found is None:
+                return False
+
+            slot, sequence, _ = found
+            sequence[0] += 1
+            ffi.cast("LONG *", slot + _USED)[0] = 0
+            sequence[0] += 1
+            return True
+        finally:
+            ReleaseMutex(self._mutex)
+
+    def close(self):
+        """
+        Unmaps the cache and closes the handles.  The cache is destroyed
+        once every process has closed it.
+        """
+        if self._address is None:
+            return
+
+        UnmapViewOfFile(self._address)
+        CloseHandle(self._mapping)
+        CloseHandle(self._mutex)
+        self._address = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -11,12 +11,13 @@ library.
     :mod:`pywincffi.user32.synchronization`
 """
 
-from six import integer_types
+from six import integer_types, text_type
 
 from pywincffi.core import dist
-from pywincffi.core.checks import input_check, error_check
-from pywincffi.exceptions import WindowsAPIError
-from pywincffi.wintypes import HANDLE, wintype_to_cdata
+from pywincffi.core.checks import (
+    NON_ZERO, NoneType, input_check, error_check)
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.wintypes import SECURITY_ATTRIBUTES, HANDLE, wintype_to_cdata
 
 
 def WaitForSingleObject(hHandle, dwMilliseconds):
@@ -50,3 +51,185 @@ def WaitForSingleObject(hHandle, dwMilliseconds):
     error_check("WaitForSingleObject")
 
     return result
+
+
+def WaitForMultipleObjects(
+        lpHandles, bWaitAll, dwMilliseconds, nCount=None):
+    """
+    Waits until one or all of the specified objects are in a signaled
+    state or ``dwMilliseconds`` elapses.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms687025
+
+    :param list lpHandles:
+        A list or tuple of :class:`pywincffi.wintypes.HANDLE` to wait on.
+        At most ``MAXIMUM_WAIT_OBJECTS`` handles may be provided.
+
+    :param bool bWaitAll:
+        If True, wait for every object to be signaled.  Otherwise return
+        as soon as any object is signaled.
+
+    :param int dwMilliseconds:
+        The time-out interval.
+
+    :keyword int nCount:
+        The number of object handles in ``lpHandles``.  By default this
+        will be determined by checking the length of ``lpHandles``.  If
+        provided only the first ``nCount`` handles are waited on.
+
+    :raises InputError:
+        Raised if ``nCount`` is less than 1 or greater than the length of
+        ``lpHandles`` or ``MAXIMUM_WAIT_OBJECTS``.
+
+    :raises WindowsAPIError:
+        Raised if the underlying Windows function returns ``WAIT_FAILED``.
+
+    :rtype: int
+    :return:
+        Returns ``WAIT_OBJECT_0`` plus the index of the signaled object,
+        ``WAIT_ABANDONED_0`` plus the index of an abandoned mutex or
+        ``WAIT_TIMEOUT``.
+    """
+    input_check("lpHandles", lpHandles, (list, tuple))
+
+    if nCount is None:
+        nCount = len(lpHandles)
+
+    input_check("bWaitAll", bWaitAll, bool)
+    input_check("dwMilliseconds", dwMilliseconds, integer_types)
+    input_check("nCount", nCount, integer_types)
+
+    ffi, library = dist.load()
+
+    maximum = min(len(lpHandles), library.MAXIMUM_WAIT_OBJECTS)
+    if not 0 < nCount <= maximum:
+        raise InputError(
+            "nCount", nCount,
+            message="`nCount` must be between 1 and %d" % maximum)
+
+    lpHandles_cdata = ffi.new("HANDLE[]", nCount)
+    for i, handle in enumerate(lpHandles[:nCount]):
+        input_check("lpHandles[%d]" % i, handle, HANDLE)
+        lpHandles_cdata[i] = wintype_to_cdata(handle)
+
+    code = library.WaitForMultipleObjects(
+        nCount, lpHandles_cdata, bWaitAll, ffi.cast("DWORD", dwMilliseconds))
+
+    if code == library.WAIT_FAILED:
+        errno, message = ffi.getwinerror()
+        raise WindowsAPIError("WaitForMultipleObjects", message, errno)
+
+    return code
+
+
+def CreateMutex(bInitialOwner, lpMutexAttributes=None, lpName=None):
+    """
+    Creates or opens a named or unnamed mutex object.  A mutex is
+    acquired with :func:`WaitForSingleObject` and released with
+    :func:`ReleaseMutex`.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms682411
+
+    :param bool bInitialOwner:
+        If True and the mutex is created, rather than opened, the calling
+        thread owns it.
+
+    :keyword pywincffi.wintypes.SECURITY_ATTRIBUTES lpMutexAttributes:
+        If not provided the handle can't be inherited.
+
+    :keyword str lpName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        The optional name of the mutex.  If a mutex with this name
+        already exists it is opened instead.
+
+    :returns:
+        Returns a :class:`pywincffi.wintypes.HANDLE` to the mutex.
+    """
+    input_check("bInitialOwner", bInitialOwner, bool)
+    input_check(
+        "lpMutexAttributes", lpMutexAttributes,
+        allowed_types=(NoneType, SECURITY_ATTRIBUTES)
+    )
+
+    ffi, library = dist.load()
+
+    if lpName is None:
+        lpName = ffi.NULL
+    else:
+        input_check("lpName", lpName, text_type)
+
+    handle = library.CreateMutex(
+        wintype_to_cdata(lpMutexAttributes),
+        ffi.cast("BOOL", bInitialOwner),
+        lpName
+    )
+
+    try:
+        error_check("CreateMutex")
+    except WindowsAPIError as error:
+        if error.errno != library.ERROR_ALREADY_EXISTS:
+            raise
+
+    return HANDLE(handle)
+
+
+def OpenMutex(dwDesiredAccess, bInheritHandle, lpName):
+    """
+    Opens an existing named mutex.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms684315
+
+    :param int dwDesiredAccess:
+        The access to the mutex, ``SYNCHRONIZE | MUTEX_MODIFY_STATE``
+        is required to acquire and release it.
+
+    :param bool bInheritHandle:
+        If True the handle can be inherited by child processes.
+
+    :param str lpName:
+        Type is ``unicode`` on Python 2, ``str`` on Python 3.
+
+    :returns:
+        Returns a :class:`pywincffi.wintypes.HANDLE` to the mutex.
+    """
+    input_check("dwDesiredAccess", dwDesiredAccess, integer_types)
+    input_check("bInheritHandle", bInheritHandle, bool)
+    input_check("lpName", lpName, text_type)
+
+    ffi, library = dist.load()
+
+    handle = library.OpenMutex(
+        ffi.cast("DWORD", dwDesiredAccess),
+        ffi.cast("BOOL", bInheritHandle),
+        lpName
+    )
+    error_check("OpenMutex")
+    return HANDLE(handle)
+
+
+def ReleaseMutex(hMutex):
+    """
+    Releases a mutex owned by the calling thread.
+
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms685066
+
+    :param pywincffi.wintypes.HANDLE hMutex:
+        A handle to the mutex.
+
+    :raises WindowsAPIError:
+        Raised with ``ERROR_NOT_OWNER`` if the calling thread does not
+        own the mutex.
+    """
+    input_check("hMutex", hMutex, HANDLE)
+
+    _, library = dist.load()
+    code = library.ReleaseMutex(wintype_to_cdata(hMutex))
+    error_check("ReleaseMutex", code=code, expected=NON_ZERO)
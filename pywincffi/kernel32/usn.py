@@ -0,0 +1,276 @@
+"""
+USN Journal
+-----------
+
+Provides access to the NTFS update sequence number (USN) change journal
+which records every change made to the files on a volume.  An indexer can
+store the :class:`UsnCheckpoint` returned by :class:`UsnJournal` and later
+resume from it to process only the changes made since.
+
+The parsing functions in this module only depend on :mod:`struct` so
+records captured from a volume can be decoded on any platform.
+"""
+
+import struct
+from collections import namedtuple
+
+from six import text_type, integer_types
+
+from pywincffi.core import dist
+from pywincffi.core.checks import input_check
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32.device import DeviceIoControl
+from pywincffi.kernel32.directory import FILETIME_EPOCH_OFFSET
+from pywincffi.kernel32.file import CreateFile
+from pywincffi.kernel32.handle import CloseHandle
+
+# Structures passed to and returned by the FSCTL_*_USN_* control codes.
+#   https://docs.microsoft.com/en-us/windows/win32/api/winioctl/ns-winioctl-usn_journal_data_v0
+#   https://docs.microsoft.com/en-us/windows/win32/api/winioctl/ns-winioctl-read_usn_journal_data_v0
+#   https://docs.microsoft.com/en-us/windows/win32/api/winioctl/ns-winioctl-mft_enum_data_v0
+USN_JOURNAL_DATA = struct.Struct("<Q4qQQ")
+READ_USN_JOURNAL_DATA = struct.Struct("<qLLQQQ")
+MFT_ENUM_DATA = struct.Struct("<Qqq")
+
+# The record header shared by every version followed by the fixed size
+# portions of USN_RECORD_V2 and USN_RECORD_V3.
+#   https://msdn.microsoft.com/en-us/library/aa365722
+#   https://docs.microsoft.com/en-us/windows/win32/api/winioctl/ns-winioctl-usn_record_v3
+USN_RECORD_HEADER = struct.Struct("<LHH")
+USN_RECORD_V2 = struct.Struct("<LHHQQqqLLLLHH")
+USN_RECORD_V3 = struct.Struct("<LHH16s16sqqLLLLHH")
+
+UsnJournalData = namedtuple(
+    "UsnJournalData",
+    ("journal_id", "first_usn", "next_usn", "lowest_valid_usn", "max_usn",
+     "maximum_size", "allocation_delta"))
+
+UsnRecord = namedtuple(
+    "UsnRecord",
+    ("major_version", "file_reference_number",
+     "parent_file_reference_number", "usn", "timestamp", "reason",
+     "source_info", "security_id", "attributes", "name"))
+
+UsnRecords = namedtuple("UsnRecords", ("next", "records"))
+
+UsnCheckpoint = namedtuple("UsnCheckpoint", ("journal_id", "usn"))
+
+
+def _file_id_128(data):
+    """Converts a little endian FILE_ID_128 into an integer"""
+    low, high = struct.unpack("<2Q", data)
+    return (high << 64) + low
+
+
+def parse_usn_journal_data(data):
+    """
+    Parses the ``USN_JOURNAL_DATA`` structure returned by
+    ``FSCTL_QUERY_USN_JOURNAL``.
+
+    :rtype: :class:`UsnJournalData`
+    """
+    return UsnJournalData(*USN_JOURNAL_DATA.unpack_from(data, 0))
+
+
+def parse_usn_records(data):
+    """
+    Parses the output of ``FSCTL_READ_USN_JOURNAL`` or
+    ``FSCTL_ENUM_USN_DATA``: a 64-bit value followed by zero or more
+    ``USN_RECORD_V2`` or ``USN_RECORD_V3`` records.  Records of any other
+    version are skipped.
+
+    :param data:
+        A buffer, such as ``ffi.buffer(...)`` or ``bytes``, containing
+        only the bytes returned by the control code.
+
+    :rtype: :class:`UsnRecords`
+    :return:
+        Returns a named tuple containing ``next``, the USN or file
+        reference number to start the next call from, and a list of
+        :class:`UsnRecord` objects.  The file reference numbers of
+        version 3 records are 128-bit integers.
+    """
+    next_, = struct.unpack_from("<q", data, 0)
+    records = []
+    offset = 8
+
+    while offset + USN_RECORD_HEADER.size <= len(data):
+        length, major_version, _ = USN_RECORD_HEADER.unpack_from(data, offset)
+        if length == 0:
+            break
+
+        if major_version in (2, 3):
+            if major_version == 2:
+                fields = list(USN_RECORD_V2.unpack_from(data, offset))
+            else:
+                fields = list(USN_RECORD_V3.unpack_from(data, offset))
+                fields[3] = _file_id_128(fields[3])
+                fields[4] = _file_id_128(fields[4])
+
+            name_length, name_offset = fields[11:13]
+            start = offset + name_offset
+            records.append(UsnRecord(
+                major_version=major_version,
+                file_reference_number=fields[3],
+                parent_file_reference_number=fields[4],
+                usn=fields[5],
+                timestamp=(fields[6] - FILETIME_EPOCH_OFFSET) / 10000000.0,
+                reason=fields[7],
+                source_info=fields[8],
+                security_id=fields[9],
+                attributes=fields[10],
+                name=data[start:start + name_length].decode("utf-16-le")))
+
+        offset += length
+
+    return UsnRecords(next=next_, records=records)
+
+
+class UsnJournal(object):
+    """
+    Reads the USN change journal of a volume using
+    :func:`pywincffi.kernel32.DeviceIoControl`.  A single output buffer is
+    reused for every call.  Opening a volume requires administrative
+    privileges.
+
+    >>> from pywincffi.kernel32 import UsnJournal
+    >>> with UsnJournal(u"C:") as journal:
+    ...     for record in journal.read(checkpoint):
+    ...         index(record)
+    ...     checkpoint = journal.checkpoint  # store for the next run
+
+    :param str volume:
+        The volume to open, ``C:`` for example.
+
+    :keyword int buffer_size:
+        The size of the output buffer in bytes.
+    """
+    def __init__(self, volume, buffer_size=65536):
+        input_check("volume", volume, text_type)
+        input_check("buffer_size", buffer_size, integer_types)
+        ffi, library = dist.load()
+
+        self.volume = volume
+        self.checkpoint = None
+        self._buffer = ffi.new("char[]", buffer_size)
+        self.hVolume = CreateFile(
+            u"\\\\.\\" + volume.rstrip(u"\\"), library.GENERIC_READ,
+            dwShareMode=library.FILE_SHARE_READ | library.FILE_SHARE_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING)
+
+    def _control(self, code, data):
+        """Sends ``code`` and returns the output as a buffer"""
+        ffi, _ = dist.load()
+        size = DeviceIoControl(self.hVolume, code, data, self._buffer)
+        return ffi.buffer(self._buffer, size)
+
+    def query(self):
+        """
+        Returns information about the journal.
+
+        :raises WindowsAPIError:
+            Raised with ``ERROR_JOURNAL_NOT_ACTIVE`` if the volume does not
+            have an active journal.
+
+        :rtype: :class:`UsnJournalData`
+        """
+        _, library = dist.load()
+        return parse_usn_journal_data(
+            self._control(library.FSCTL_QUERY_USN_JOURNAL, None))
+
+    def read(self, checkpoint=None, reason_mask=0xFFFFFFFF,
+             return_only_on_close=False):
+        """
+        Yields a :class:`UsnRecord` for every change made after
+        ``checkpoint`` until the end of the journal is reached.
+        :attr:`checkpoint` is updated after each batch of records has been
+        yielded so a reader which stops early will see the unfinished
+        batch again when it resumes.
+
+        :keyword UsnCheckpoint checkpoint:
+            Where to resume from.  By default only changes made after this
+            call are returned.
+
+        :keyword int reason_mask:
+            The ``USN_REASON_*`` flags to return records for.
+
+        :keyword bool return_only_on_close:
+            If True, only return the record written when the last handle
+            to a changed file is closed.
+
+        :raises InputError:
+            Raised if ``checkpoint`` belongs to a different journal or
+            refers to records which have been purged.  The volume must be
+            rescanned, see :meth:`enumerate`.
+        """
+        _, library = dist.load()
+        journal = self.query()
+
+        if checkpoint is None:
+            checkpoint = UsnCheckpoint(journal.journal_id, journal.next_usn)
+
+        input_check("checkpoint", checkpoint, UsnCheckpoint)
+
+        if (checkpoint.journal_id != journal.journal_id or
+                checkpoint.usn < journal.lowest_valid_usn):
+            raise InputError(
+                "checkpoint", checkpoint,
+                message="The journal was reset or purged after %r, the "
+                        "volume must be rescanned" % (checkpoint, ))
+
+        self.checkpoint = checkpoint
+        while True:
+            request = READ_USN_JOURNAL_DATA.pack(
+                self.checkpoint.usn, reason_mask, int(return_only_on_close),
+                0, 0, journal.journal_id)
+            result = parse_usn_records(
+                self._control(library.FSCTL_READ_USN_JOURNAL, request))
+
+            for record in result.records:
+                yield record
+
+            self.checkpoint = UsnCheckpoint(journal.journal_id, result.next)
+
+            if not result.records:
+                return
+
+    def enumerate(self, low_usn=0, high_usn=None):
+        """
+        Yields a :class:`UsnRecord` for every file and directory on the
+        volume whose last change falls between ``low_usn`` and
+        ``high_usn``.  This is used to build the initial index before
+        calling :meth:`read` with a checkpoint taken from :meth:`query`.
+        """
+        _, library = dist.load()
+
+        if high_usn is None:
+            high_usn = self.query().next_usn
+
+        start = 0
+        while True:
+            request = MFT_ENUM_DATA.pack(start, low_usn, high_usn)
+            try:
+                result = parse_usn_records(
+                    self._control(library.FSCTL_ENUM_USN_DATA, request))
+            except WindowsAPIError as error:
+                if error.errno != library.ERROR_HANDLE_EOF:
+                    raise
+                library.SetLastError(0)
+                return
+
+            for record in result.records:
+                yield record
+
+            start = result.next
+
+    def close(self):
+        """Closes the volume handle"""
+        if self.hVolume is not None:
+            hVolume, self.hVolume = self.hVolume, None
+            CloseHandle(hVolume)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -8,6 +8,8 @@ used across the exposed APIs.
 from pywincffi.wintypes.functions import (
     wintype_to_cdata, handle_from_file, socket_from_object)
 from pywincffi.wintypes.objects import WrappedObject, HANDLE, WSAEVENT, SOCKET
+from pywincffi.wintypes.paths import WidePath, path_to_text, path_to_cdata
 from pywincffi.wintypes.structures import (
     SECURITY_ATTRIBUTES, OVERLAPPED, FILETIME, LPWSANETWORKEVENTS,
-    PROCESS_INFORMATION, STARTUPINFO)
+    PROCESS_INFORMATION, STARTUPINFO, SYSTEM_INFO, FILE_ALLOCATION_INFO,
+    FILE_END_OF_FILE_INFO, WIN32_FIND_DATA, WIN32_FILE_ATTRIBUTE_DATA)
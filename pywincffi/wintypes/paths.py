@@ -0,0 +1,154 @@
+"""
+Paths
+-----
+
+Provides :class:`WidePath` and the functions the API wrappers use to
+accept paths as ``unicode``/``str``, :class:`WidePath` or any object
+implementing ``__fspath__`` (:class:`os.PathLike`).
+"""
+
+import ntpath
+
+from six import text_type
+
+from pywincffi.core import dist
+from pywincffi.exceptions import InputError
+
+# Paths this long or longer can't be used with the ANSI path limits of
+# some functions, such as CreateDirectory, without the \\?\ prefix.
+#   https://msdn.microsoft.com/en-us/library/aa365247
+LONG_PATH_LENGTH = 248
+LONG_PATH_PREFIX = u"\\\\?\\"
+DEVICE_PATH_PREFIX = u"\\\\.\\"
+
+
+class WidePath(object):
+    """
+    A path which has been normalized and converted to a ``wchar_t[]``
+    once so it can be passed to the path taking functions in
+    :mod:`pywincffi.kernel32` repeatedly without being converted on
+    every call.
+
+    The path is normalized with :func:`ntpath.normpath`.  Paths which are
+    :data:`LONG_PATH_LENGTH` characters or longer are made absolute and
+    given the ``\\\\?\\`` prefix, or ``\\\\?\\UNC\\`` for network paths,
+    so they aren't limited to ``MAX_PATH`` characters.  Paths which
+    already start with ``\\\\?\\`` or ``\\\\.\\`` are used as is.
+
+    >>> from pywincffi.core import dist
+    >>> from pywincffi.kernel32 import CreateFile, CloseHandle
+    >>> from pywincffi.wintypes import WidePath
+    >>> _, library = dist.load()
+    >>> path = WidePath(u"C:\\\\data\\\\index.bin")
+    >>> for _ in range(1000):
+    ...     CloseHandle(CreateFile(
+    ...         path, library.GENERIC_READ,
+    ...         dwCreationDisposition=library.OPEN_EXISTING))
+
+    :param path:
+        The path as ``unicode`` on Python 2, ``str`` on Python 3 or an
+        :class:`os.PathLike` object.
+    """
+    def __init__(self, path):
+        ffi, _ = dist.load()
+        self.path = self.normalize(path_to_text("path", path))
+        self._cdata = ffi.new("wchar_t[]", self.path)
+
+    @staticmethod
+    def normalize(path):
+        """
+        Returns ``path`` normalized as described above.
+
+        :param str path:
+            Type is ``unicode`` on Python 2, ``str`` on Python 3.
+        """
+        if path.startswith((LONG_PATH_PREFIX, DEVICE_PATH_PREFIX)):
+            return path
+
+        path = ntpath.normpath(path)
+        if len(path) < LONG_PATH_LENGTH:
+            return path
+
+        # The prefix disables normalization by Windows so the path must
+        # be made absolute first, including drive relative paths such as
+        # ``C:data`` and rooted paths without a drive such as ``\data``.
+        if not ntpath.isabs(path) or not ntpath.splitdrive(path)[0]:
+            path = ntpath.abspath(path)
+
+        if path.startswith(u"\\\\"):
+            return LONG_PATH_PREFIX + u"UNC\\" + path[2:]
+        return LONG_PATH_PREFIX + path
+
+    def __fspath__(self):
+        return self.path
+
+    def __len__(self):
+        return len(self.path)
+
+    def __eq__(self, other):
+        if isinstance(other, WidePath):
+            return self.path == other.path
+        return self.path == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.path)
+
+
+def path_to_text(name, path):
+    """
+    Returns ``path`` as ``unicode`` on Python 2 or ``str`` on Python 3.
+    Used internally by wrappers which need the text of a path.
+
+    :param str name:
+        The name of the argument, used in error messages.
+
+    :param path:
+        A ``unicode``/``str``, :class:`WidePath` or :class:`os.PathLike`
+        object.
+
+    :raises pywincffi.exceptions.InputError:
+        Raised if ``path`` is not a path or is a path of bytes.
+    """
+    if isinstance(path, text_type):
+        return path
+
+    if isinstance(path, WidePath):
+        return path.path
+
+    fspath = getattr(type(path), "__fspath__", None)
+    if fspath is not None:
+        text = fspath(path)
+        if isinstance(text, text_type):
+            return text
+
+    raise InputError(
+        name, path,
+        message="Expected %r, %r or an os.PathLike object for `%s`" % (
+            text_type, WidePath, name))
+
+
+def path_to_cdata(name, path):
+    """
+    Returns a value for ``path`` which can be passed to a library function
+    expecting ``LPCWSTR``.  For a :class:`WidePath` this is its cached
+    ``wchar_t[]`` so no conversion is done by cffi.
+
+    :param str name:
+        The name of the argument, used in error messages.
+
+    :param path:
+        A ``unicode``/``str``, :class:`WidePath` or :class:`os.PathLike`
+        object.
+
+    :raises pywincffi.exceptions.InputError:
+        Raised if ``path`` is not a path or is a path of bytes.
+    """
+    if isinstance(path, WidePath):
+        return path._cdata  # pylint: disable=protected-access
+    return path_to_text(name, path)
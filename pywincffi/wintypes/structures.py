@@ -170,3 +170,108 @@ class STARTUPINFO(CFFICDataWrapper):
         if not isinstance(handle, HANDLE):
             raise TypeError("%r must be a HANDLE object" % handle)
         self._cdata.hStdError = handle._cdata[0]
+
+
+# pylint: disable=too-few-public-methods
+class SYSTEM_INFO(CFFICDataWrapper):
+    """
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/ms724958
+    """
+    def __init__(self):
+        ffi, _ = dist.load()
+        super(SYSTEM_INFO, self).__init__("SYSTEM_INFO *", ffi)
+
+
+# pylint: disable=too-few-public-methods
+class FILE_ALLOCATION_INFO(CFFICDataWrapper):
+    """
+    .. seealso::
+
+        https://docs.microsoft.com/en-us/windows/win32/api/winbase/ns-winbase-file_allocation_info
+    """
+    def __init__(self):
+        ffi, _ = dist.load()
+        super(FILE_ALLOCATION_INFO, self).__init__(
+            "FILE_ALLOCATION_INFO *", ffi)
+
+    @property
+    def AllocationSize(self):
+        """The allocation size, in bytes, as an integer."""
+        return self._cdata.AllocationSize.QuadPart
+
+    # pylint: disable=missing-docstring
+    @AllocationSize.setter
+    def AllocationSize(self, value):
+        self._cdata.AllocationSize.QuadPart = value
+
+
+# pylint: disable=too-few-public-methods
+class FILE_END_OF_FILE_INFO(CFFICDataWrapper):
+    """
+    .. seealso::
+
+        https://docs.microsoft.com/en-us/windows/win32/api/winbase/ns-winbase-file_end_of_file_info
+    """
+    def __init__(self):
+        ffi, _ = dist.load()
+        super(FILE_END_OF_FILE_INFO, self).__init__(
+            "FILE_END_OF_FILE_INFO *", ffi)
+
+    @property
+    def EndOfFile(self):
+        """The end of file position, in bytes, as an integer."""
+        return self._cdata.EndOfFile.QuadPart
+
+    # pylint: disable=missing-docstring
+    @EndOfFile.setter
+    def EndOfFile(self, value):
+        self._cdata.EndOfFile.QuadPart = value
+
+
+# pylint: disable=too-few-public-methods
+class WIN32_FIND_DATA(CFFICDataWrapper):
+    """
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365740
+    """
+    def __init__(self):
+        ffi, _ = dist.load()
+        super(WIN32_FIND_DATA, self).__init__("WIN32_FIND_DATA *", ffi)
+
+    @property
+    def cFileName(self):
+        """The name of the file as a string."""
+        ffi, _ = dist.load()
+        return ffi.string(self._cdata.cFileName)
+
+    @property
+    def nFileSize(self):
+        """
+        The size of the file, in bytes, combined from ``nFileSizeHigh``
+        and ``nFileSizeLow``.
+        """
+        return (self._cdata.nFileSizeHigh << 32) + self._cdata.nFileSizeLow
+
+
+# pylint: disable=too-few-public-methods
+class WIN32_FILE_ATTRIBUTE_DATA(CFFICDataWrapper):
+    """
+    .. seealso::
+
+        https://msdn.microsoft.com/en-us/library/aa365739
+    """
+    def __init__(self):
+        ffi, _ = dist.load()
+        super(WIN32_FILE_ATTRIBUTE_DATA, self).__init__(
+            "WIN32_FILE_ATTRIBUTE_DATA *", ffi)
+
+    @property
+    def nFileSize(self):
+        """
+        The size of the file, in bytes, combined from ``nFileSizeHigh``
+        and ``nFileSizeLow``.
+        """
+        return (self._cdata.nFileSizeHigh << 32) + self._cdata.nFileSizeLow
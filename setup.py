@@ -30,6 +30,9 @@ requirements = [
     "six"
 ]
 
+if sys.version_info[0] < 3:
+    requirements.append("futures")
+
 ROOT = dirname(abspath(__file__))
 DISTS = join(ROOT, "dist")
 
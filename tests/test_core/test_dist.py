@@ -14,7 +14,8 @@ from pywincffi.core.dist import (
     MODULE_NAME, HEADER_FILES, SOURCE_FILES, LIBRARIES, LibraryWrapper, Loader,
     _import_path, _ffi, _compile, _read, load)
 from pywincffi.dev.testutil import TestCase
-from pywincffi.exceptions import ResourceNotFoundError, InternalError
+from pywincffi.exceptions import (
+    ResourceNotFoundError, InternalError, ConfigurationError)
 
 
 class TestDistConstants(TestCase):
@@ -262,6 +263,22 @@ class TestLoad(TestCase):
         self.assertEqual(library.a, FakeModule.lib.a)
         self.assertEqual(library.b, FakeModule.lib.b)
 
+    def test_posix_backend(self):
+        if os.name == "nt":
+            self.skipTest("The posix backend requires a POSIX host")
+
+        from pywincffi.dev.posix import PosixLibrary
+        with patch.dict(os.environ, {"PYWINCFFI_BACKEND": "posix"}):
+            ffi, library = load()
+
+        self.assertIsInstance(library, PosixLibrary)
+        self.assertIs(ffi, library.ffi)
+
+    def test_unknown_backend(self):
+        with patch.dict(os.environ, {"PYWINCFFI_BACKEND": "unknown"}):
+            with self.assertRaises(ConfigurationError):
+                load()
+
     def test_compiled(self):
         # Python 3.5 changes the behavior of None in sys.modules. So
         # long as other Python versions pass, skipping this should
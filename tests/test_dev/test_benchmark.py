@@ -0,0 +1,167 @@
+import errno
+import json
+import os
+import tempfile
+
+from six import text_type
+
+from pywincffi.core import dist
+from pywincffi.dev.benchmark import (
+    BenchmarkResult, StandInLibrary, measure, stand_in, write_results)
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import WindowsAPIError
+from pywincffi.kernel32 import (
+    CreateFile, CloseHandle, CreatePipe, WriteFile, ReadFile, PeekNamedPipe,
+    SetFilePointerEx, pipe_bytes_available)
+from pywincffi.wintypes import wintype_to_cdata
+
+
+class TestBenchmarkResult(TestCase):
+    """
+    Tests for :class:`pywincffi.dev.benchmark.BenchmarkResult`
+    """
+    def test_rates(self):
+        result = BenchmarkResult(
+            name="test", seconds=2.0, operations=10, bytes=4096,
+            parameters={})
+        self.assertEqual(result.operations_per_second, 5.0)
+        self.assertEqual(result.bytes_per_second, 2048.0)
+
+    def test_zero_seconds(self):
+        result = BenchmarkResult(
+            name="test", seconds=0, operations=10, bytes=4096,
+            parameters={})
+        self.assertEqual(result.operations_per_second, 0.0)
+
+    def test_measure_passes_parameters(self):
+        calls = []
+        result = measure(
+            "test", lambda **kwargs: calls.append(kwargs), operations=1,
+            repeat=3, size=4)
+        self.assertEqual(calls, [{"size": 4}] * 3)
+        self.assertEqual(result.parameters, {"size": 4})
+
+    def test_write_results(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        result = BenchmarkResult(
+            name="test", seconds=1.0, operations=10, bytes=0, parameters={})
+        write_results([result], path)
+
+        with open(path, "r") as file_:
+            data = json.load(file_)
+
+        self.assertEqual(data[0]["name"], "test")
+        self.assertEqual(data[0]["operations_per_second"], 10.0)
+
+
+class TestStandIn(TestCase):
+    """
+    Tests for :func:`pywincffi.dev.benchmark.stand_in`
+    """
+    def setUp(self):
+        super(TestStandIn, self).setUp()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.path = text_type(path)
+        self.addCleanup(os.remove, path)
+
+    def test_replaces_library(self):
+        with stand_in() as library:
+            self.assertIsInstance(library, StandInLibrary)
+            self.assertIs(dist.load()[1], library)
+
+    def test_write_and_read(self):
+        with stand_in() as library:
+            hFile = CreateFile(
+                self.path, library.GENERIC_READ | library.GENERIC_WRITE,
+                dwCreationDisposition=library.OPEN_EXISTING)
+            try:
+                self.assertEqual(WriteFile(hFile, b"hello world"), 11)
+                self.assertEqual(SetFilePointerEx(hFile, 6), 6)
+                self.assertEqual(ReadFile(hFile, 5), b"world")
+            finally:
+                CloseHandle(hFile)
+
+    def test_error(self):
+        with stand_in() as library:
+            with self.assertRaises(WindowsAPIError):
+                CreateFile(
+                    self.path + u".missing", library.GENERIC_READ,
+                    dwCreationDisposition=library.OPEN_EXISTING)
+
+    def test_access_denied(self):
+        with stand_in() as library:
+            with self.assertRaises(WindowsAPIError) as error:
+                CreateFile(
+                    text_type(os.path.dirname(self.path)),
+                    library.GENERIC_WRITE,
+                    dwCreationDisposition=library.OPEN_EXISTING)
+            self.assertEqual(
+                error.exception.errno, library.ERROR_ACCESS_DENIED)
+
+    def test_unknown_errno(self):
+        def fail():
+            raise OSError(errno.ENOTEMPTY, "Directory not empty")
+
+        library = StandInLibrary()
+        self.assertIsNone(
+            library._call(fail))  # pylint: disable=protected-access
+        self.assertEqual(library.last_error, library.ERROR_GEN_FAILURE)
+
+    def test_pipe(self):
+        with stand_in():
+            reader, writer = CreatePipe(nSize=65536)
+            try:
+                self.assertEqual(pipe_bytes_available(reader), 0)
+                WriteFile(writer, b"hello world")
+                self.assertEqual(pipe_bytes_available(reader), 11)
+                self.assertEqual(ReadFile(reader, 11), b"hello world")
+            finally:
+                CloseHandle(reader)
+                CloseHandle(writer)
+
+    def test_peek_data_unsupported(self):
+        with stand_in() as library:
+            reader, writer = CreatePipe()
+            try:
+                with self.assertRaises(WindowsAPIError) as error:
+                    PeekNamedPipe(reader, 4)
+                self.assertEqual(
+                    error.exception.errno, library.ERROR_INVALID_PARAMETER)
+            finally:
+                CloseHandle(reader)
+                CloseHandle(writer)
+
+    def test_overlapped_unsupported(self):
+        with stand_in() as library:
+            ffi = library.ffi
+            reader, writer = CreatePipe()
+            buffer_ = ffi.new("char[]", 4)
+            transferred = ffi.new("LPDWORD")
+            overlapped = ffi.new("char[]", 32)
+            try:
+                for function, handle in ((library.WriteFile, writer),
+                                         (library.ReadFile, reader)):
+                    self.assertEqual(
+                        function(
+                            wintype_to_cdata(handle), buffer_, 4,
+                            transferred, overlapped), 0)
+                    self.assertEqual(
+                        library.last_error, library.ERROR_NOT_SUPPORTED)
+            finally:
+                CloseHandle(reader)
+                CloseHandle(writer)
+
+    def test_broken_pipe(self):
+        with stand_in() as library:
+            reader, writer = CreatePipe()
+            CloseHandle(reader)
+            try:
+                with self.assertRaises(WindowsAPIError) as error:
+                    WriteFile(writer, b"hello world")
+                self.assertEqual(
+                    error.exception.errno, library.ERROR_BROKEN_PIPE)
+            finally:
+                CloseHandle(writer)
@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+from pywincffi.dev.benchmark import stand_in
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import WindowsAPIError
+from pywincffi.kernel32 import (
+    CloseHandle, CreateEvent, CreatePipe, ReadFile, ResetEvent, SetEvent,
+    WaitForMultipleObjects, WaitForSingleObject, WriteFile)
+
+if os.name != "nt":
+    from pywincffi.dev.posix import PosixLibrary
+
+
+class PosixTestCase(TestCase):
+    """
+    Runs each test with :class:`pywincffi.dev.posix.PosixLibrary` in
+    place of the compiled library.
+    """
+    def setUp(self):
+        super(PosixTestCase, self).setUp()
+        if os.name == "nt":
+            self.skipTest("The posix backend requires a POSIX host")
+
+        context = stand_in(PosixLibrary())
+        self.library = context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def create_event(self, manual_reset=False, initial_state=False):
+        hEvent = CreateEvent(manual_reset, initial_state)
+        self.addCleanup(CloseHandle, hEvent)
+        return hEvent
+
+
+class TestPipe(PosixTestCase):
+    """
+    Tests for the pipe functions of :class:`pywincffi.dev.posix.PosixLibrary`
+    """
+    def test_write_and_read(self):
+        reader, writer = CreatePipe()
+        self.addCleanup(CloseHandle, reader)
+        WriteFile(writer, b"hello world")
+        CloseHandle(writer)
+        self.assertEqual(ReadFile(reader, 11), b"hello world")
+
+        with self.assertRaises(WindowsAPIError) as error:
+            ReadFile(reader, 11)
+        self.assertEqual(error.exception.errno, self.library.ERROR_BROKEN_PIPE)
+
+
+class TestEvents(PosixTestCase):
+    """
+    Tests for the event and wait functions of
+    :class:`pywincffi.dev.posix.PosixLibrary`
+    """
+    def test_timeout(self):
+        hEvent = self.create_event()
+        self.assertEqual(
+            WaitForSingleObject(hEvent, 10), self.library.WAIT_TIMEOUT)
+
+    def test_auto_reset(self):
+        hEvent = self.create_event(initial_state=True)
+        self.assertEqual(
+            WaitForSingleObject(hEvent, 0), self.library.WAIT_OBJECT_0)
+        self.assertEqual(
+            WaitForSingleObject(hEvent, 0), self.library.WAIT_TIMEOUT)
+
+    def test_manual_reset(self):
+        hEvent = self.create_event(manual_reset=True)
+        SetEvent(hEvent)
+        for _ in range(2):
+            self.assertEqual(
+                WaitForSingleObject(hEvent, 0), self.library.WAIT_OBJECT_0)
+
+        ResetEvent(hEvent)
+        self.assertEqual(
+            WaitForSingleObject(hEvent, 0), self.library.WAIT_TIMEOUT)
+
+    def test_set_from_thread(self):
+        hEvent = self.create_event()
+        thread = threading.Timer(0.05, SetEvent, args=(hEvent, ))
+        thread.start()
+        self.addCleanup(thread.join)
+        start = time.time()
+        self.assertEqual(
+            WaitForSingleObject(hEvent, self.library.INFINITE),
+            self.library.WAIT_OBJECT_0)
+        self.assertGreater(time.time() - start, 0.01)
+
+    def test_wait_for_any(self):
+        events = [self.create_event() for _ in range(3)]
+        SetEvent(events[2])
+        self.assertEqual(
+            WaitForMultipleObjects(events, False, 0),
+            self.library.WAIT_OBJECT_0 + 2)
+
+    def test_wait_for_all(self):
+        events = [self.create_event() for _ in range(2)]
+        SetEvent(events[0])
+        self.assertEqual(
+            WaitForMultipleObjects(events, True, 10),
+            self.library.WAIT_TIMEOUT)
+
+        SetEvent(events[1])
+        self.assertEqual(
+            WaitForMultipleObjects(events, True, 0),
+            self.library.WAIT_OBJECT_0)
+
+    def test_wait_on_non_event(self):
+        reader, writer = CreatePipe()
+        self.addCleanup(CloseHandle, reader)
+        self.addCleanup(CloseHandle, writer)
+        with self.assertRaises(WindowsAPIError) as error:
+            WaitForMultipleObjects([reader], False, 0)
+        self.assertEqual(
+            error.exception.errno, self.library.ERROR_INVALID_HANDLE)
+
+    def test_named_event_unsupported(self):
+        with self.assertRaises(WindowsAPIError) as error:
+            CreateEvent(False, False, lpName=u"event")
+        self.assertEqual(
+            error.exception.errno, self.library.ERROR_NOT_SUPPORTED)
@@ -0,0 +1,166 @@
+import os
+import tempfile
+import threading
+
+from mock import patch
+from six import text_type
+
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import (
+    AppendLog, CreateFile, CloseHandle, WriteFile, FlushFileBuffers)
+
+
+def record(index):
+    return ("%02d\n" % index).encode("ascii")
+
+
+class TestAppendLog(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.AppendLog`
+    """
+    def setUp(self):
+        super(TestAppendLog, self).setUp()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.path = path
+        self.addCleanup(os.remove, path)
+        _, library = dist.load()
+        self.handle = CreateFile(
+            text_type(path), library.GENERIC_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING)
+        self.addCleanup(CloseHandle, self.handle)
+
+    def read(self):
+        with open(self.path, "rb") as file_:
+            return file_.read()
+
+    def test_append_returns_offset(self):
+        with AppendLog(self.handle) as log:
+            first = log.append(b"hello ")
+            second = log.append(b"world")
+            self.assertEqual(first.result(), 0)
+            self.assertEqual(second.result(), 6)
+
+        self.assertEqual(self.read(), b"hello world")
+
+    def test_appends_to_end_of_file(self):
+        WriteFile(self.handle, b"header\n")
+        FlushFileBuffers(self.handle)
+
+        with AppendLog(self.handle) as log:
+            self.assertEqual(log.append(b"record\n").result(), 7)
+
+        self.assertEqual(self.read(), b"header\nrecord\n")
+
+    def test_concurrent_producers(self):
+        futures = []
+        lock = threading.Lock()
+
+        with AppendLog(self.handle, commit_window=0.01) as log:
+            def producer(index):
+                for _ in range(25):
+                    future = log.append(record(index))
+                    with lock:
+                        futures.append((index, future))
+
+            threads = [
+                threading.Thread(target=producer, args=(index, ))
+                for index in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        contents = self.read()
+        self.assertEqual(len(contents), 8 * 25 * 3)
+        self.assertEqual(log.records, 8 * 25)
+        self.assertEqual(log.bytes_written, len(contents))
+        self.assertLessEqual(log.commits, log.records)
+
+        for index, future in futures:
+            offset = future.result()
+            self.assertEqual(
+                contents[offset:offset + 3], record(index))
+
+    def test_max_batch_bytes(self):
+        with AppendLog(self.handle, max_batch_bytes=4,
+                       commit_window=0.05) as log:
+            for _ in range(4):
+                log.append(b"abcd")
+
+        self.assertEqual(log.commits, 4)
+        self.assertEqual(self.read(), b"abcd" * 4)
+
+    def test_close_drains_queue(self):
+        log = AppendLog(self.handle, commit_window=0.5)
+        futures = [log.append(b"x") for _ in range(10)]
+        log.close()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.read(), b"x" * 10)
+
+    def test_append_after_close(self):
+        log = AppendLog(self.handle)
+        log.close()
+        with self.assertRaises(ValueError):
+            log.append(b"x")
+
+    def test_cancelled_record_is_not_written(self):
+        log = AppendLog(self.handle, commit_window=0.5)
+        first = log.append(b"first")
+        second = log.append(b"second")
+        self.assertTrue(first.cancel())
+        log.close()
+        self.assertEqual(second.result(), 0)
+        self.assertEqual(self.read(), b"second")
+
+    def test_write_failure_sets_exception(self):
+        _, library = dist.load()
+        handle = CreateFile(
+            text_type(self.path), library.GENERIC_READ,
+            dwCreationDisposition=library.OPEN_EXISTING)
+        self.addCleanup(CloseHandle, handle)
+
+        with AppendLog(handle) as log:
+            future = log.append(b"x")
+            with self.assertRaises(WindowsAPIError):
+                future.result()
+
+    def test_failed_commit_is_truncated(self):
+        error = WindowsAPIError("FlushFileBuffers", "failed", 5)
+
+        with AppendLog(self.handle) as log:
+            self.assertEqual(log.append(b"first").result(), 0)
+
+            with patch("pywincffi.kernel32.appendlog.FlushFileBuffers",
+                       side_effect=error):
+                with self.assertRaises(WindowsAPIError):
+                    log.append(b"second").result()
+
+            self.assertEqual(self.read(), b"first")
+            self.assertEqual(log.append(b"third").result(), 5)
+
+        self.assertEqual(self.read(), b"firstthird")
+
+    def test_append_after_failure(self):
+        _, library = dist.load()
+        handle = CreateFile(
+            text_type(self.path), library.GENERIC_READ,
+            dwCreationDisposition=library.OPEN_EXISTING)
+        self.addCleanup(CloseHandle, handle)
+
+        with AppendLog(handle) as log:
+            with self.assertRaises(WindowsAPIError):
+                log.append(b"x").result()
+            with self.assertRaises(ValueError):
+                log.append(b"y")
+
+    def test_data_type_check(self):
+        with AppendLog(self.handle) as log:
+            with self.assertRaises(InputError):
+                log.append(u"text")
+
+    def test_max_batch_bytes_check(self):
+        with self.assertRaises(InputError):
+            AppendLog(self.handle, max_batch_bytes=0)
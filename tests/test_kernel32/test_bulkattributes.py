@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+
+from six import text_type
+
+from pywincffi.dev.benchmark import stand_in
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import bulk_file_attributes
+from pywincffi.kernel32.directory import FILETIME_EPOCH_OFFSET
+
+
+class TestBulkFileAttributes(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.bulk_file_attributes`
+    """
+    def setUp(self):
+        super(TestBulkFileAttributes, self).setUp()
+        context = stand_in()
+        self.library = context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+        self.directory = text_type(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.paths = []
+        for index in range(50):
+            path = join(self.directory, u"file%d" % index)
+            with open(path, "wb") as file_:
+                file_.write(b"x" * index)
+            self.paths.append(path)
+
+    def test_sizes(self):
+        result = bulk_file_attributes(
+            self.paths, max_workers=4, chunk_size=7)
+        self.assertEqual(list(result.sizes), list(range(50)))
+        self.assertEqual(list(result.errors), [0] * 50)
+
+    def test_last_write_times(self):
+        result = bulk_file_attributes(self.paths[:1])
+        timestamp = (
+            result.last_write_times[0] - FILETIME_EPOCH_OFFSET) / 10000000.0
+        self.assertAlmostEqual(
+            timestamp, os.stat(self.paths[0]).st_mtime, places=3)
+
+    def test_errors_do_not_raise(self):
+        paths = [
+            self.paths[1], join(self.directory, u"missing"), self.directory]
+        result = bulk_file_attributes(paths)
+        self.assertEqual(
+            list(result.errors), [0, self.library.ERROR_FILE_NOT_FOUND, 0])
+        self.assertEqual(result.sizes[1], 0)
+        self.assertTrue(
+            result.attributes[2] & self.library.FILE_ATTRIBUTE_DIRECTORY)
+        self.assertEqual(self.library.last_error, 0)
+
+    def test_empty(self):
+        self.assertEqual(len(bulk_file_attributes([]).sizes), 0)
+
+    def test_invalid_path(self):
+        with self.assertRaises(InputError):
+            bulk_file_attributes([1])
+
+    def test_invalid_max_workers(self):
+        with self.assertRaises(InputError):
+            bulk_file_attributes(self.paths, max_workers=0)
@@ -0,0 +1,84 @@
+import os
+import pickle
+import threading
+
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import CloseHandle, CreatePipe, PipeChannel
+
+
+class TestPipeChannel(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.PipeChannel`
+    """
+    def setUp(self):
+        super(TestPipeChannel, self).setUp()
+        hRead, hWrite = CreatePipe()
+        self.sender = PipeChannel(hWrite=hWrite)
+        self.receiver = PipeChannel(hRead=hRead)
+        self.addCleanup(self.sender.close)
+        self.addCleanup(self.receiver.close)
+
+    def send_in_thread(self, *objects):
+        def send():
+            for obj in objects:
+                self.sender.send(obj)
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        self.addCleanup(thread.join)
+
+    def test_send_objects(self):
+        objects = [None, 1, u"text", {"key": [1, 2, 3]}]
+        self.send_in_thread(*objects)
+        for obj in objects:
+            self.assertEqual(self.receiver.recv(), obj)
+
+    def test_send_large_bytes(self):
+        data = os.urandom(1 << 20)
+        self.send_in_thread(data)
+        self.assertEqual(self.receiver.recv(), data)
+
+    def test_out_of_band_buffers(self):
+        if not self.receiver.out_of_band:
+            self.skipTest("Pickle protocol 5 is not supported")
+
+        data = bytearray(os.urandom(1 << 20))
+        # pylint: disable=no-member
+        self.send_in_thread([pickle.PickleBuffer(data), b"end"])
+        buffer_, end = self.receiver.recv()
+        self.assertIsInstance(buffer_, bytearray)
+        self.assertEqual(buffer_, data)
+        self.assertEqual(end, b"end")
+
+    def test_in_band_protocol(self):
+        hRead, hWrite = CreatePipe()
+        sender = PipeChannel(hWrite=hWrite, protocol=2)
+        receiver = PipeChannel(hRead=hRead, protocol=2)
+        self.addCleanup(receiver.close)
+        self.assertFalse(sender.out_of_band)
+        sender.send([1, 2, 3])
+        sender.close()
+        self.assertEqual(receiver.recv(), [1, 2, 3])
+
+    def test_recv_after_close_raises_eof(self):
+        self.sender.send(1)
+        self.sender.close()
+        self.assertEqual(self.receiver.recv(), 1)
+        with self.assertRaises(EOFError):
+            self.receiver.recv()
+
+    def test_send_without_write_handle(self):
+        with self.assertRaises(ValueError):
+            self.receiver.send(1)
+
+    def test_requires_a_handle(self):
+        with self.assertRaises(InputError):
+            PipeChannel()
+
+    def test_close_shared_handle_once(self):
+        hRead, hWrite = CreatePipe()
+        self.addCleanup(CloseHandle, hWrite)
+        channel = PipeChannel(hRead=hRead, hWrite=hRead)
+        channel.close()
+        self.assertIsNone(channel.hRead)
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+from six import text_type
+
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import CreateFile, CloseHandle, DeviceIoControl
+
+
+class TestDeviceIoControl(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.DeviceIoControl`
+    """
+    def setUp(self):
+        super(TestDeviceIoControl, self).setUp()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        _, library = dist.load()
+        self.handle = CreateFile(
+            text_type(path), library.GENERIC_READ,
+            dwCreationDisposition=library.OPEN_EXISTING)
+        self.addCleanup(CloseHandle, self.handle)
+
+    def test_invalid_control_code(self):
+        ffi, _ = dist.load()
+        with self.assertRaises(WindowsAPIError):
+            DeviceIoControl(self.handle, 0, None, ffi.new("char[]", 64))
+        self.SetLastError(0)
+
+    def test_in_buffer_type_check(self):
+        with self.assertRaises(InputError):
+            DeviceIoControl(self.handle, 0, u"", None)
+
+    def test_out_buffer_type_check(self):
+        with self.assertRaises(InputError):
+            DeviceIoControl(self.handle, 0, None, bytearray(64))
@@ -0,0 +1,334 @@
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+from six import text_type
+
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32 import (
+    FindFirstFileEx, FindNextFile, FindClose, ScandirIterator, scandir,
+    DirectoryReader, GetFileInformationByHandleEx,
+    parse_file_id_directory_info, DirectoryWatcher, DirectoryChange,
+    parse_file_notify_information, WaitForSingleObject)
+from pywincffi.kernel32.directory import (
+    FILETIME_EPOCH_OFFSET, FILE_ID_BOTH_DIR_INFO, FILE_ID_EXTD_DIR_INFO,
+    FILE_NOTIFY_INFORMATION)
+from pywincffi.wintypes import WIN32_FIND_DATA
+
+
+class DirectoryCase(TestCase):
+    def setUp(self):
+        super(DirectoryCase, self).setUp()
+        self.path = text_type(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+
+    def create_file(self, name, contents=b""):
+        with open(os.path.join(self.path, name), "wb") as file_:
+            file_.write(contents)
+
+
+class TestFindFirstFileEx(DirectoryCase):
+    """
+    Tests for :func:`pywincffi.kernel32.FindFirstFileEx`,
+    :func:`pywincffi.kernel32.FindNextFile` and
+    :func:`pywincffi.kernel32.FindClose`
+    """
+    def test_find_file(self):
+        self.create_file("hello.txt", b"hello")
+        hFindFile, data = FindFirstFileEx(
+            os.path.join(self.path, u"hello.txt"))
+        self.addCleanup(FindClose, hFindFile)
+        self.assertIsInstance(data, WIN32_FIND_DATA)
+        self.assertEqual(data.cFileName, u"hello.txt")
+        self.assertEqual(data.nFileSize, 5)
+        self.assertFalse(FindNextFile(hFindFile, data))
+
+    def test_large_fetch_basic(self):
+        _, library = dist.load()
+        for index in range(3):
+            self.create_file("%d.txt" % index)
+
+        hFindFile, data = FindFirstFileEx(
+            os.path.join(self.path, u"*.txt"), library.FindExInfoBasic,
+            dwAdditionalFlags=library.FIND_FIRST_EX_LARGE_FETCH)
+        self.addCleanup(FindClose, hFindFile)
+
+        names = [data.cFileName]
+        while FindNextFile(hFindFile, data):
+            names.append(data.cFileName)
+        self.assertEqual(sorted(names), [u"0.txt", u"1.txt", u"2.txt"])
+
+    def test_no_match(self):
+        _, library = dist.load()
+        with self.assertRaises(WindowsAPIError) as error:
+            FindFirstFileEx(os.path.join(self.path, u"missing"))
+
+        self.assertEqual(error.exception.errno, library.ERROR_FILE_NOT_FOUND)
+        self.SetLastError(0)
+
+    def test_info_level_check(self):
+        with self.assertRaises(InputError):
+            FindFirstFileEx(os.path.join(self.path, u"*"), fInfoLevelId=42)
+
+
+class TestScandir(DirectoryCase):  # pylint: disable=protected-access
+    """
+    Tests for :func:`pywincffi.kernel32.scandir`
+    """
+    def test_entries(self):
+        self.create_file("a.txt", b"a" * 10)
+        os.mkdir(os.path.join(self.path, "b"))
+
+        entries = dict((entry.name, entry) for entry in scandir(self.path))
+        self.assertEqual(sorted(entries), [u"a.txt", u"b"])
+
+        self.assertTrue(entries[u"a.txt"].is_file())
+        self.assertFalse(entries[u"a.txt"].is_symlink())
+        self.assertEqual(entries[u"a.txt"].size, 10)
+        self.assertEqual(
+            entries[u"a.txt"].path, os.path.join(self.path, u"a.txt"))
+        self.assertTrue(entries[u"b"].is_dir())
+
+    def test_timestamps(self):
+        self.create_file("a.txt")
+        stat = os.stat(os.path.join(self.path, "a.txt"))
+        entry, = scandir(self.path)
+        self.assertAlmostEqual(entry.last_write_time, stat.st_mtime, 1)
+        self.assertAlmostEqual(entry.creation_time, time.time(), delta=60)
+
+    def test_pattern(self):
+        self.create_file("a.txt")
+        self.create_file("b.log")
+        names = [entry.name for entry in scandir(self.path, u"*.log")]
+        self.assertEqual(names, [u"b.log"])
+
+    def test_empty(self):
+        self.assertEqual(list(scandir(self.path, u"*.missing")), [])
+
+    def test_context_closes_handle(self):
+        self.create_file("a.txt")
+        self.create_file("b.txt")
+        with scandir(self.path) as entries:
+            self.assertIsInstance(entries, ScandirIterator)
+            next(entries)
+
+        self.assertIsNone(entries._hFindFile)
+        self.assertEqual(list(entries), [])
+
+    def test_exhausted_closes_handle(self):
+        self.create_file("a.txt")
+        entries = scandir(self.path)
+        list(entries)
+        self.assertIsNone(entries._hFindFile)
+
+    def test_missing_directory(self):
+        with self.assertRaises(WindowsAPIError):
+            scandir(os.path.join(self.path, u"missing"))
+        self.SetLastError(0)
+
+
+def pack_record(name, file_id, size, extended=False, last=False):
+    """Packs a single FILE_ID_BOTH_DIR_INFO or FILE_ID_EXTD_DIR_INFO"""
+    encoded = name.encode("utf-16-le")
+    header = FILE_ID_EXTD_DIR_INFO if extended else FILE_ID_BOTH_DIR_INFO
+    length = header.size + len(encoded)
+    length += -length % 8
+    times = [FILETIME_EPOCH_OFFSET + 10000000 * index for index in range(4)]
+
+    if extended:
+        fields = [0x10, 0xA000000C, struct.pack(
+            "<2Q", file_id & 0xFFFFFFFFFFFFFFFF, file_id >> 64)]
+    else:
+        fields = [0, 0, file_id]
+
+    values = [0 if last else length, 0] + times + [size, 4096, 0x20]
+    values += [len(encoded)] + fields
+    data = header.pack(*values)
+    return (data + encoded).ljust(length, b"\x00")
+
+
+class TestParseFileIdDirectoryInfo(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.parse_file_id_directory_info`
+    """
+    def test_both(self):
+        data = pack_record(u".", 1, 0) + pack_record(u"a.txt", 2, 10) + \
+            pack_record(u"\u00e9.txt", 3, 20, last=True)
+        entries = parse_file_id_directory_info(data)
+        self.assertEqual(
+            [(entry.name, entry.file_id, entry.size) for entry in entries],
+            [(u"a.txt", 2, 10), (u"\u00e9.txt", 3, 20)])
+
+        entry = entries[0]
+        self.assertEqual(entry.attributes, 0x20)
+        self.assertEqual(entry.allocation_size, 4096)
+        self.assertEqual(entry.creation_time, 0)
+        self.assertEqual(entry.last_access_time, 1)
+        self.assertEqual(entry.last_write_time, 2)
+        self.assertEqual(entry.change_time, 3)
+        self.assertIsNone(entry.reparse_tag)
+
+    def test_extended(self):
+        file_id = (1 << 100) + 5
+        data = pack_record(u"a.txt", file_id, 10, extended=True, last=True)
+        entry, = parse_file_id_directory_info(data, extended=True)
+        self.assertEqual(entry.name, u"a.txt")
+        self.assertEqual(entry.file_id, file_id)
+        self.assertEqual(entry.reparse_tag, 0xA000000C)
+
+    def test_trailing_data_ignored(self):
+        data = pack_record(u"a.txt", 1, 0, last=True) + b"\xff" * 128
+        self.assertEqual(len(parse_file_id_directory_info(data)), 1)
+
+
+class TestGetFileInformationByHandleEx(DirectoryCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetFileInformationByHandleEx`
+    """
+    def test_buffer_type_check(self):
+        with DirectoryReader(self.path) as reader:
+            with self.assertRaises(InputError):
+                GetFileInformationByHandleEx(
+                    reader.hDirectory, 10, bytearray(1024))
+
+
+class TestDirectoryReader(DirectoryCase):
+    """
+    Tests for :class:`pywincffi.kernel32.DirectoryReader`
+    """
+    def test_entries(self):
+        self.create_file("a.txt", b"a" * 10)
+        os.mkdir(os.path.join(self.path, "b"))
+
+        with DirectoryReader(self.path) as reader:
+            entries = dict((entry.name, entry) for entry in reader)
+
+        _, library = dist.load()
+        self.assertEqual(sorted(entries), [u"a.txt", u"b"])
+        self.assertEqual(entries[u"a.txt"].size, 10)
+        self.assertTrue(
+            entries[u"b"].attributes & library.FILE_ATTRIBUTE_DIRECTORY)
+        self.assertNotEqual(entries[u"a.txt"].file_id, 0)
+        self.assertNotEqual(
+            entries[u"a.txt"].file_id, entries[u"b"].file_id)
+
+    def test_small_buffer_many_calls(self):
+        for index in range(100):
+            self.create_file("%03d.txt" % index)
+
+        with DirectoryReader(self.path, buffer_size=1024) as reader:
+            names = [entry.name for entry in reader]
+
+        self.assertEqual(
+            sorted(names), ["%03d.txt" % index for index in range(100)])
+
+    def test_both_directory_info(self):
+        self.create_file("a.txt")
+        with DirectoryReader(self.path, extended=False) as reader:
+            entry, = list(reader)
+        self.assertEqual(entry.name, u"a.txt")
+        self.assertIsNone(entry.reparse_tag)
+
+    def test_restart(self):
+        self.create_file("a.txt")
+        with DirectoryReader(self.path) as reader:
+            self.assertEqual(len(list(reader)), 1)
+            self.assertEqual(reader.read(), [])
+            reader.restart()
+            self.assertEqual(len(list(reader)), 1)
+
+    def test_buffer_size_check(self):
+        with self.assertRaises(InputError):
+            DirectoryReader(self.path, buffer_size=10)
+
+
+def pack_notification(action, name, last=False):
+    """Packs a single FILE_NOTIFY_INFORMATION record"""
+    encoded = name.encode("utf-16-le")
+    length = FILE_NOTIFY_INFORMATION.size + len(encoded)
+    length += -length % 4
+    data = FILE_NOTIFY_INFORMATION.pack(
+        0 if last else length, action, len(encoded)) + encoded
+    return data.ljust(length, b"\x00")
+
+
+class TestParseFileNotifyInformation(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.parse_file_notify_information`
+    """
+    def test_parse(self):
+        data = pack_notification(1, u"a.txt") + \
+            pack_notification(4, u"b.txt") + \
+            pack_notification(5, u"c\\d.txt", last=True)
+        self.assertEqual(
+            parse_file_notify_information(data),
+            [DirectoryChange(1, u"a.txt"), DirectoryChange(4, u"b.txt"),
+             DirectoryChange(5, u"c\\d.txt")])
+
+    def test_coalesce_duplicates(self):
+        data = pack_notification(3, u"a.txt") + \
+            pack_notification(3, u"b.txt") + \
+            pack_notification(3, u"a.txt") + \
+            pack_notification(3, u"a.txt", last=True)
+        self.assertEqual(
+            parse_file_notify_information(data),
+            [DirectoryChange(3, u"a.txt"), DirectoryChange(3, u"b.txt")])
+
+    def test_keeps_distinct_sequence(self):
+        data = pack_notification(1, u"a.txt") + \
+            pack_notification(2, u"a.txt") + \
+            pack_notification(1, u"a.txt", last=True)
+        self.assertEqual(
+            [change.action for change in parse_file_notify_information(data)],
+            [1, 2, 1])
+
+
+class TestDirectoryWatcher(DirectoryCase):
+    """
+    Tests for :class:`pywincffi.kernel32.DirectoryWatcher`
+    """
+    def setUp(self):
+        super(TestDirectoryWatcher, self).setUp()
+        self.watcher = DirectoryWatcher(self.path)
+        self.addCleanup(self.watcher.close)
+
+    def test_added(self):
+        _, library = dist.load()
+        self.create_file("a.txt")
+        changes = self.watcher.read(timeout=5000)
+        self.assertIn(
+            DirectoryChange(library.FILE_ACTION_ADDED, u"a.txt"), changes)
+
+    def test_event_signaled(self):
+        _, library = dist.load()
+        self.assertEqual(
+            WaitForSingleObject(self.watcher.event, 0), library.WAIT_TIMEOUT)
+        self.create_file("a.txt")
+        self.assertEqual(
+            WaitForSingleObject(self.watcher.event, 5000),
+            library.WAIT_OBJECT_0)
+
+    def test_timeout(self):
+        self.assertEqual(self.watcher.read(timeout=10), [])
+
+    def test_iterate(self):
+        self.create_file("a.txt")
+        change = next(iter(self.watcher))
+        self.assertEqual(change.name, u"a.txt")
+
+    def test_overflow(self):
+        watcher = DirectoryWatcher(self.path, buffer_size=16)
+        self.addCleanup(watcher.close)
+        for index in range(10):
+            self.create_file("%d.txt" % index)
+        self.assertEqual(
+            watcher.read(timeout=5000), [DirectoryChange(None, None)])
+
+    def test_read_after_close(self):
+        self.watcher.close()
+        with self.assertRaises(ValueError):
+            self.watcher.read()
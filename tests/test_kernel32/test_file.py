@@ -15,8 +15,16 @@ from pywincffi.exceptions import WindowsAPIError
 from pywincffi.kernel32 import file as _file  # used for mocks
 from pywincffi.kernel32 import (
     CreateFile, CloseHandle, MoveFileEx, WriteFile, FlushFileBuffers,
-    LockFileEx, UnlockFileEx, ReadFile)
-from pywincffi.wintypes import handle_from_file
+    LockFileEx, UnlockFileEx, ReadFile, ReadFileInto, ReadFileScatter,
+    WriteFileGather, SegmentArray, PageAllocator, CreateEvent,
+    GetOverlappedResult, GetDiskFreeSpace, GetDiskFreeSpaceResult,
+    GetVolumePathName, DirectFile, sector_size, SetFilePointerEx, SetEndOfFile,
+    SetFileInformationByHandle, preallocate, truncate, GetFileSizeEx,
+    CopyFileEx, GetFileAttributesEx, SetFileCompletionNotificationModes,
+    HasOverlappedIoCompleted)
+from pywincffi.exceptions import InputError
+from pywincffi.wintypes import (
+    OVERLAPPED, FILE_END_OF_FILE_INFO, handle_from_file)
 
 
 class TestWriteFile(TestCase):
@@ -86,6 +94,32 @@ class TestReadFile(TestCase):
         contents = ReadFile(hFile, 4)
         self.assertEqual(contents, b"test")
 
+    def test_read_into_bytearray(self):
+        path = self._create_file(b"hello world")
+        hFile = self._handle_to_read_file(path)
+        buffer_ = bytearray(16)
+        self.assertEqual(ReadFileInto(hFile, buffer_), 11)
+        self.assertEqual(bytes(buffer_[:11]), b"hello world")
+
+    def test_read_into_memoryview_slice(self):
+        path = self._create_file(b"hello world")
+        hFile = self._handle_to_read_file(path)
+        buffer_ = bytearray(b"xx" + b"\x00" * 8)
+        self.assertEqual(ReadFileInto(hFile, memoryview(buffer_)[2:], 5), 5)
+        self.assertEqual(bytes(buffer_[:7]), b"xxhello")
+
+    def test_read_into_read_only(self):
+        path = self._create_file(b"hello world")
+        hFile = self._handle_to_read_file(path)
+        with self.assertRaises(InputError):
+            ReadFileInto(hFile, memoryview(b"0123"))
+
+    def test_read_into_too_many_bytes(self):
+        path = self._create_file(b"hello world")
+        hFile = self._handle_to_read_file(path)
+        with self.assertRaises(InputError):
+            ReadFileInto(hFile, bytearray(4), 5)
+
 
 class TestMoveFileEx(TestCase):
     """
@@ -294,3 +328,357 @@ class TestUnlockFileEx(LockFileCase):
 
         subprocess.check_call([
             sys.executable, "-c", "open(%r, 'r').read()" % self.path])
+
+
+class TestScatterGather(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.ReadFileScatter` and
+    :func:`pywincffi.kernel32.WriteFileGather`
+    """
+    def setUp(self):
+        super(TestScatterGather, self).setUp()
+        _, library = dist.load()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        self.handle = CreateFile(
+            text_type(path), library.GENERIC_READ | library.GENERIC_WRITE,
+            dwFlagsAndAttributes=library.FILE_FLAG_NO_BUFFERING |
+            library.FILE_FLAG_OVERLAPPED)
+        self.assert_last_error(library.ERROR_ALREADY_EXISTS)
+        self.addCleanup(CloseHandle, self.handle)
+
+        self.allocator = PageAllocator(arena_pages=4)
+        self.addCleanup(self.allocator.close)
+
+    def overlapped(self):
+        overlapped = OVERLAPPED()
+        overlapped.hEvent = CreateEvent(True, False)
+        self.addCleanup(CloseHandle, overlapped.hEvent)
+        return overlapped
+
+    def test_write_then_read(self):
+        _, library = dist.load()
+        page_size = self.allocator.page_size
+        pages = self.allocator.acquire(2)
+        self.allocator.buffer(pages[0])[:] = b"a" * page_size
+        self.allocator.buffer(pages[1])[:] = b"b" * page_size
+
+        overlapped = self.overlapped()
+        completed = WriteFileGather(
+            self.handle, pages, page_size * 2, overlapped)
+        self.maybe_assert_last_error(library.ERROR_IO_PENDING)
+        self.assertIsInstance(completed, bool)
+        self.assertEqual(
+            GetOverlappedResult(self.handle, overlapped, True), page_size * 2)
+
+        targets = SegmentArray(self.allocator.acquire(2))
+        overlapped = self.overlapped()
+        completed = ReadFileScatter(
+            self.handle, targets, page_size * 2, overlapped)
+        self.maybe_assert_last_error(library.ERROR_IO_PENDING)
+        if completed:
+            self.assertTrue(HasOverlappedIoCompleted(overlapped))
+        self.assertEqual(
+            GetOverlappedResult(self.handle, overlapped, True), page_size * 2)
+
+        self.assertEqual(
+            self.allocator.buffer(targets.buffers[0])[:], b"a" * page_size)
+        self.assertEqual(
+            self.allocator.buffer(targets.buffers[1])[:], b"b" * page_size)
+
+    def test_segment_array_update(self):
+        segments = SegmentArray(self.allocator.acquire(2))
+        segments.update(self.allocator.acquire(1))
+        self.assertEqual(len(segments), 1)
+
+    def test_segment_array_update_too_large(self):
+        segments = SegmentArray(self.allocator.acquire(1))
+        with self.assertRaises(InputError):
+            segments.update(self.allocator.acquire(2))
+
+
+class TestSetFileCompletionNotificationModes(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.SetFileCompletionNotificationModes`
+    """
+    def test_skip_set_event(self):
+        _, library = dist.load()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        handle = CreateFile(
+            text_type(path), library.GENERIC_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=library.FILE_FLAG_OVERLAPPED)
+        self.addCleanup(CloseHandle, handle)
+
+        SetFileCompletionNotificationModes(
+            handle, library.FILE_SKIP_SET_EVENT_ON_HANDLE |
+            library.FILE_SKIP_COMPLETION_PORT_ON_SUCCESS)
+
+
+class TestGetVolumePathName(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetVolumePathName`
+    """
+    def test_volume_of_temp_dir(self):
+        path = text_type(tempfile.gettempdir())
+        volume = GetVolumePathName(path)
+        self.assertTrue(path.lower().startswith(volume.lower()))
+        self.assertTrue(volume.endswith(u"\\"))
+
+
+class TestGetDiskFreeSpace(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetDiskFreeSpace`
+    """
+    def test_return_type(self):
+        self.assertIsInstance(GetDiskFreeSpace(), GetDiskFreeSpaceResult)
+
+    def test_sector_size(self):
+        result = GetDiskFreeSpace(
+            GetVolumePathName(text_type(tempfile.gettempdir())))
+        self.assertGreater(result.lpBytesPerSector, 0)
+        self.assertEqual(
+            sector_size(text_type(tempfile.gettempdir())),
+            result.lpBytesPerSector)
+
+
+class TestDirectFile(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.DirectFile`
+    """
+    def create_file(self, size):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        contents = b"".join(
+            chr(index % 251).encode("latin-1") for index in range(size))
+        with os.fdopen(fd, "wb") as file_:
+            file_.write(contents)
+        return text_type(path), contents
+
+    def open(self, path, **kwargs):
+        file_ = DirectFile(path, **kwargs)
+        self.addCleanup(file_.close)
+        return file_
+
+    def test_buffer_size_is_sector_aligned(self):
+        path, _ = self.create_file(10)
+        file_ = self.open(path, buffer_size=1000)
+        self.assertEqual(file_.buffer_size % file_.sector_size, 0)
+        self.assertGreaterEqual(file_.buffer_size, 1000)
+
+    def test_unaligned_read(self):
+        path, contents = self.create_file(10000)
+        file_ = self.open(path)
+        self.assertEqual(file_.read(13, 1000), contents[13:1013])
+
+    def test_read_spans_buffers(self):
+        path, contents = self.create_file(20000)
+        file_ = self.open(path, buffer_size=4096)
+        self.assertEqual(file_.read(100, 15000), contents[100:15100])
+
+    def test_tail_read(self):
+        path, contents = self.create_file(5000)
+        file_ = self.open(path)
+        self.assertEqual(file_.read(4990, 100), contents[4990:])
+
+    def test_read_past_end(self):
+        path, _ = self.create_file(100)
+        file_ = self.open(path)
+        self.assertEqual(file_.read(1 << 20, 10), b"")
+
+    def test_negative_offset_or_size(self):
+        path, _ = self.create_file(100)
+        file_ = self.open(path)
+        with self.assertRaises(InputError):
+            file_.read(-1, 10)
+        with self.assertRaises(InputError):
+            file_.read(0, -1)
+
+    def test_scan(self):
+        path, contents = self.create_file(10000)
+        file_ = self.open(path, buffer_size=4096)
+        chunks = list(file_.scan())
+        self.assertEqual(b"".join(chunks), contents)
+        self.assertEqual(len(chunks[0]), file_.buffer_size)
+
+
+class FileSizeCase(TestCase):
+    def setUp(self):
+        super(FileSizeCase, self).setUp()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.path = path
+        self.addCleanup(os.remove, path)
+        _, library = dist.load()
+        self.handle = CreateFile(
+            text_type(path), library.GENERIC_READ | library.GENERIC_WRITE)
+        self.assert_last_error(library.ERROR_ALREADY_EXISTS)
+        self.addCleanup(CloseHandle, self.handle)
+        WriteFile(self.handle, b"hello world")
+
+
+class TestSetFilePointerEx(FileSizeCase):
+    """
+    Tests for :func:`pywincffi.kernel32.SetFilePointerEx`
+    """
+    def test_begin(self):
+        self.assertEqual(SetFilePointerEx(self.handle, 6), 6)
+        self.assertEqual(ReadFile(self.handle, 5), b"world")
+
+    def test_current(self):
+        _, library = dist.load()
+        SetFilePointerEx(self.handle, 2)
+        self.assertEqual(
+            SetFilePointerEx(self.handle, 4, library.FILE_CURRENT), 6)
+
+    def test_end(self):
+        _, library = dist.load()
+        self.assertEqual(
+            SetFilePointerEx(self.handle, -5, library.FILE_END), 6)
+
+    def test_beyond_4gb(self):
+        offset = (1 << 32) + 10
+        self.assertEqual(SetFilePointerEx(self.handle, offset), offset)
+
+    def test_invalid_move_method(self):
+        with self.assertRaises(InputError):
+            SetFilePointerEx(self.handle, 0, 42)
+
+
+class TestSetEndOfFile(FileSizeCase):
+    """
+    Tests for :func:`pywincffi.kernel32.SetEndOfFile`
+    """
+    def test_truncate(self):
+        SetFilePointerEx(self.handle, 5)
+        SetEndOfFile(self.handle)
+        FlushFileBuffers(self.handle)
+        self.assertEqual(os.path.getsize(self.path), 5)
+
+    def test_extend(self):
+        SetFilePointerEx(self.handle, 4096)
+        SetEndOfFile(self.handle)
+        self.assertEqual(os.path.getsize(self.path), 4096)
+
+
+class TestSetFileInformationByHandle(FileSizeCase):
+    """
+    Tests for :func:`pywincffi.kernel32.SetFileInformationByHandle`,
+    :func:`pywincffi.kernel32.preallocate` and
+    :func:`pywincffi.kernel32.truncate`
+    """
+    def test_end_of_file_info(self):
+        _, library = dist.load()
+        info = FILE_END_OF_FILE_INFO()
+        info.EndOfFile = 3
+        SetFileInformationByHandle(
+            self.handle, library.FileEndOfFileInfo, info)
+        self.assertEqual(os.path.getsize(self.path), 3)
+
+    def test_wrong_information_type(self):
+        _, library = dist.load()
+        with self.assertRaises(InputError):
+            SetFileInformationByHandle(
+                self.handle, library.FileEndOfFileInfo, OVERLAPPED())
+
+    def test_preallocate_does_not_change_size(self):
+        preallocate(self.handle, 1024 * 1024)
+        self.assertEqual(os.path.getsize(self.path), 11)
+
+    def test_preallocate_then_write(self):
+        preallocate(self.handle, 1024 * 1024)
+        WriteFile(self.handle, b"!" * 4096)
+        FlushFileBuffers(self.handle)
+        self.assertEqual(os.path.getsize(self.path), 11 + 4096)
+
+    def test_truncate(self):
+        truncate(self.handle, 5)
+        self.assertEqual(os.path.getsize(self.path), 5)
+        SetFilePointerEx(self.handle, 0)
+        self.assertEqual(ReadFile(self.handle, 1024), b"hello")
+
+    def test_truncate_extends(self):
+        truncate(self.handle, 100)
+        self.assertEqual(os.path.getsize(self.path), 100)
+
+
+class TestGetFileSizeEx(FileSizeCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetFileSizeEx`
+    """
+    def test_size(self):
+        self.assertEqual(GetFileSizeEx(self.handle), 11)
+
+    def test_beyond_4gb(self):
+        truncate(self.handle, (1 << 32) + 10)
+        self.assertEqual(GetFileSizeEx(self.handle), (1 << 32) + 10)
+
+
+class TestGetFileAttributesEx(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetFileAttributesEx`
+    """
+    def test_file(self):
+        _, library = dist.load()
+        fd, path = tempfile.mkstemp()
+        os.write(fd, b"hello")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        data = GetFileAttributesEx(text_type(path))
+        self.assertEqual(data.nFileSize, 5)
+        self.assertFalse(
+            data.dwFileAttributes & library.FILE_ATTRIBUTE_DIRECTORY)
+
+    def test_directory(self):
+        _, library = dist.load()
+        data = GetFileAttributesEx(text_type(tempfile.gettempdir()))
+        self.assertTrue(
+            data.dwFileAttributes & library.FILE_ATTRIBUTE_DIRECTORY)
+
+    def test_missing(self):
+        _, library = dist.load()
+        with self.assertRaises(WindowsAPIError) as error:
+            GetFileAttributesEx(text_type(tempfile.mktemp()))
+        self.assertEqual(error.exception.errno, library.ERROR_FILE_NOT_FOUND)
+        library.SetLastError(0)
+
+
+class TestCopyFileEx(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.CopyFileEx`
+    """
+    def setUp(self):
+        super(TestCopyFileEx, self).setUp()
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "wb") as file_:
+            file_.write(b"hello world")
+        self.source = text_type(path)
+        self.destination = self.source + u".copy"
+        self.addCleanup(
+            lambda: isfile(self.destination) and os.remove(self.destination))
+
+    def test_copy(self):
+        CopyFileEx(self.source, self.destination)
+        with open(self.destination, "rb") as file_:
+            self.assertEqual(file_.read(), b"hello world")
+
+    def test_progress(self):
+        calls = []
+        CopyFileEx(
+            self.source, self.destination,
+            lambda total, copied: calls.append((total, copied)))
+        self.assertEqual(calls[-1], (11, 11))
+
+    def test_progress_exception_cancels(self):
+        def progress(total, copied):
+            raise ValueError("cancelled")
+
+        with self.assertRaises(ValueError):
+            CopyFileEx(self.source, self.destination, progress)
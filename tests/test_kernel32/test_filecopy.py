@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+from six import text_type
+
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import CopyProgress, copyfile
+
+
+class TestCopyFile(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.copyfile`
+    """
+    def create_file(self, size):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        contents = b"".join(
+            chr(index % 251).encode("latin-1") for index in range(size))
+        with os.fdopen(fd, "wb") as file_:
+            file_.write(contents)
+
+        destination = path + ".copy"
+        self.addCleanup(
+            lambda: os.path.isfile(destination) and os.remove(destination))
+        return text_type(path), text_type(destination), contents
+
+    def read(self, path):
+        with open(path, "rb") as file_:
+            return file_.read()
+
+    def test_unaligned_size(self):
+        source, destination, contents = self.create_file(100000)
+        self.assertEqual(
+            copyfile(source, destination, chunk_size=4096), len(contents))
+        self.assertEqual(self.read(destination), contents)
+
+    def test_buffered(self):
+        source, destination, contents = self.create_file(10000)
+        copyfile(source, destination, chunk_size=1000, unbuffered=False)
+        self.assertEqual(self.read(destination), contents)
+
+    def test_replaces_destination(self):
+        source, destination, contents = self.create_file(10)
+        with open(destination, "wb") as file_:
+            file_.write(b"x" * 100000)
+        copyfile(source, destination)
+        self.assertEqual(self.read(destination), contents)
+
+    def test_empty_file(self):
+        source, destination, _ = self.create_file(0)
+        self.assertEqual(copyfile(source, destination), 0)
+        self.assertEqual(self.read(destination), b"")
+
+    def test_progress(self):
+        source, destination, _ = self.create_file(65536)
+        progress = []
+        copyfile(
+            source, destination, chunk_size=4096, max_in_flight=2,
+            progress=progress.append)
+        self.assertEqual(len(progress), 16)
+        self.assertIsInstance(progress[-1], CopyProgress)
+        self.assertEqual(progress[-1].bytes_copied, 65536)
+        self.assertEqual(progress[-1].total_bytes, 65536)
+
+    def test_copy_file_ex(self):
+        source, destination, contents = self.create_file(10000)
+        progress = []
+        self.assertEqual(
+            copyfile(
+                source, destination, use_copy_file_ex=True,
+                progress=progress.append),
+            len(contents))
+        self.assertEqual(self.read(destination), contents)
+        self.assertEqual(progress[-1].bytes_copied, len(contents))
+
+    def test_copy_file_ex_progress(self):
+        source, destination, contents = self.create_file(2097152)
+        progress = []
+        copyfile(
+            source, destination, use_copy_file_ex=True,
+            progress=progress.append)
+
+        # The first call is made before any data has been copied.
+        self.assertLess(progress[0].bytes_copied, len(contents))
+        for status in progress:
+            self.assertEqual(status.total_bytes, len(contents))
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(InputError):
+            copyfile(u"a", u"b", chunk_size=0)
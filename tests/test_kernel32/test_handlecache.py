@@ -0,0 +1,118 @@
+import os
+import tempfile
+
+from six import text_type
+
+from pywincffi.dev.benchmark import stand_in
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import HandleCache, ReadFile, SetFilePointerEx
+
+
+class TestHandleCache(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.HandleCache`
+    """
+    def setUp(self):
+        super(TestHandleCache, self).setUp()
+        context = stand_in()
+        self.library = context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+        self.paths = []
+        for index in range(3):
+            fd, path = tempfile.mkstemp()
+            os.write(fd, ("file%d" % index).encode("ascii"))
+            os.close(fd)
+            self.addCleanup(os.remove, path)
+            self.paths.append(text_type(path))
+
+    def cache(self, max_handles=2):
+        cache = HandleCache(max_handles=max_handles)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_max_handles(self):
+        with self.assertRaises(InputError):
+            HandleCache(max_handles=0)
+
+    def test_hit(self):
+        cache = self.cache()
+        with cache.lease(self.paths[0], self.library.GENERIC_READ) as first:
+            handle = first.handle
+
+        with cache.lease(self.paths[0], self.library.GENERIC_READ) as second:
+            self.assertIs(second.handle, handle)
+            self.assertEqual(ReadFile(second.handle, 5), b"file0")
+
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.open, 1)
+        self.assertEqual(cache.stats.leased, 0)
+
+    def test_key_includes_access(self):
+        cache = self.cache()
+        read = cache.lease(self.paths[0], self.library.GENERIC_READ)
+        write = cache.lease(self.paths[0], self.library.GENERIC_WRITE)
+        self.assertIsNot(read.handle, write.handle)
+        self.assertEqual(cache.stats.misses, 2)
+        read.release()
+        write.release()
+
+    def test_evicts_least_recently_used(self):
+        cache = self.cache()
+        for path in self.paths[:2]:
+            cache.lease(path, self.library.GENERIC_READ).release()
+
+        # Make the first path the most recently used.
+        cache.lease(self.paths[0], self.library.GENERIC_READ).release()
+        cache.lease(self.paths[2], self.library.GENERIC_READ).release()
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.open, 2)
+
+        cache.lease(self.paths[0], self.library.GENERIC_READ).release()
+        self.assertEqual(cache.stats.hits, 2)
+
+    def test_leased_handles_are_not_evicted(self):
+        cache = self.cache(max_handles=1)
+        first = cache.lease(self.paths[0], self.library.GENERIC_READ)
+        second = cache.lease(self.paths[1], self.library.GENERIC_READ)
+        self.assertEqual(cache.stats.open, 2)
+        self.assertEqual(cache.stats.leased, 2)
+
+        # Still usable, the cache is only trimmed once released.
+        SetFilePointerEx(first.handle, 0)
+        self.assertEqual(ReadFile(first.handle, 5), b"file0")
+        first.release()
+        self.assertEqual(cache.stats.evictions, 1)
+        second.release()
+        self.assertEqual(cache.stats.open, 1)
+
+    def test_invalidate_closes_on_release(self):
+        cache = self.cache()
+        lease = cache.lease(self.paths[0], self.library.GENERIC_READ)
+        handle = lease.handle
+        cache.invalidate(self.paths[0])
+        self.assertEqual(cache.stats.open, 0)
+        self.assertEqual(ReadFile(handle, 5), b"file0")
+        lease.release()
+
+        with self.assertRaises(WindowsAPIError):
+            ReadFile(handle, 5)
+        self.library.SetLastError(0)
+
+    def test_release_twice(self):
+        cache = self.cache()
+        lease = cache.lease(self.paths[0], self.library.GENERIC_READ)
+        lease.release()
+        lease.release()
+        self.assertEqual(cache.stats.leased, 0)
+
+        with self.assertRaises(ValueError):
+            lease.handle  # pylint: disable=pointless-statement
+
+    def test_missing_file(self):
+        cache = self.cache()
+        with self.assertRaises(WindowsAPIError):
+            cache.lease(self.paths[0] + u".missing", self.library.GENERIC_READ)
+        self.library.SetLastError(0)
+        self.assertEqual(cache.stats.open, 0)
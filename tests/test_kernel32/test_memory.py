@@ -0,0 +1,159 @@
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32 import (
+    VirtualAlloc, VirtualFree, GetSystemInfo, PageAllocator,
+    CloseHandle, CreateFileMapping, OpenFileMapping, MapViewOfFile,
+    UnmapViewOfFile)
+from pywincffi.wintypes import SYSTEM_INFO
+
+
+class TestVirtualAlloc(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.VirtualAlloc` and
+    :func:`pywincffi.kernel32.VirtualFree`
+    """
+    def test_allocate_and_free(self):
+        ffi, library = dist.load()
+        address = VirtualAlloc(
+            None, 4096, library.MEM_COMMIT | library.MEM_RESERVE,
+            library.PAGE_READWRITE)
+        self.assertNotEqual(address, ffi.NULL)
+
+        buffer_ = ffi.buffer(address, 4096)
+        self.assertEqual(buffer_[:], b"\x00" * 4096)
+        buffer_[0:5] = b"hello"
+        self.assertEqual(buffer_[0:5], b"hello")
+
+        VirtualFree(address, 0, library.MEM_RELEASE)
+
+    def test_allocate_failure(self):
+        _, library = dist.load()
+        with self.assertRaises(WindowsAPIError):
+            VirtualAlloc(
+                None, 0, library.MEM_COMMIT | library.MEM_RESERVE,
+                library.PAGE_READWRITE)
+
+        self.assert_last_error(library.ERROR_INVALID_PARAMETER)
+
+    def test_free_type_check(self):
+        with self.assertRaises(InputError):
+            VirtualFree(None, 0, 0)
+
+
+class TestGetSystemInfo(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetSystemInfo`
+    """
+    def test_return_type(self):
+        self.assertIsInstance(GetSystemInfo(), SYSTEM_INFO)
+
+    def test_page_size(self):
+        info = GetSystemInfo()
+        self.assertGreater(info.dwPageSize, 0)
+        self.assertEqual(info.dwAllocationGranularity % info.dwPageSize, 0)
+
+
+class TestPageAllocator(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.PageAllocator`
+    """
+    def setUp(self):
+        super(TestPageAllocator, self).setUp()
+        self.allocator = PageAllocator(arena_pages=2)
+        self.addCleanup(self.allocator.close)
+
+    def address(self, page):
+        ffi, _ = dist.load()
+        return int(ffi.cast("uintptr_t", page))
+
+    def test_default_page_size(self):
+        self.assertEqual(
+            self.allocator.page_size, GetSystemInfo().dwPageSize)
+
+    def test_pages_are_aligned(self):
+        for page in self.allocator.acquire(5):
+            self.assertEqual(
+                self.address(page) % self.allocator.page_size, 0)
+
+    def test_grows_arenas(self):
+        pages = self.allocator.acquire(5)
+        self.assertEqual(len(set(self.address(page) for page in pages)), 5)
+        self.assertEqual(self.allocator.in_use, 5)
+
+    def test_release_reuses_pages(self):
+        pages = self.allocator.acquire(2)
+        self.allocator.release(pages)
+        self.assertEqual(self.allocator.in_use, 0)
+        reused = self.allocator.acquire(2)
+        self.assertEqual(
+            set(self.address(page) for page in pages),
+            set(self.address(page) for page in reused))
+
+    def test_release_twice(self):
+        pages = self.allocator.acquire(1)
+        self.allocator.release(pages)
+        with self.assertRaises(InputError):
+            self.allocator.release(pages)
+
+    def test_buffer(self):
+        page, = self.allocator.acquire(1)
+        buffer_ = self.allocator.buffer(page)
+        self.assertEqual(len(buffer_), self.allocator.page_size)
+        buffer_[0:3] = b"abc"
+        self.assertEqual(self.allocator.buffer(page)[0:3], b"abc")
+
+    def test_page_size_power_of_two(self):
+        with self.assertRaises(InputError):
+            PageAllocator(page_size=3000)
+
+
+class TestFileMapping(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.CreateFileMapping`,
+    :func:`pywincffi.kernel32.OpenFileMapping`,
+    :func:`pywincffi.kernel32.MapViewOfFile` and
+    :func:`pywincffi.kernel32.UnmapViewOfFile`
+    """
+    def setUp(self):
+        super(TestFileMapping, self).setUp()
+        self.name = u"Local\\" + self.random_string(16)
+
+    def map(self, hMapping):
+        _, library = dist.load()
+        address = MapViewOfFile(hMapping, library.FILE_MAP_ALL_ACCESS)
+        self.addCleanup(UnmapViewOfFile, address)
+        return address
+
+    def test_shared_between_views(self):
+        ffi, library = dist.load()
+        hMapping = CreateFileMapping(
+            None, library.PAGE_READWRITE, 4096, lpName=self.name)
+        self.addCleanup(CloseHandle, hMapping)
+        hOpened = OpenFileMapping(
+            library.FILE_MAP_ALL_ACCESS, False, self.name)
+        self.addCleanup(CloseHandle, hOpened)
+
+        first = self.map(hMapping)
+        second = self.map(hOpened)
+        ffi.buffer(first, 5)[:] = b"hello"
+        self.assertEqual(ffi.buffer(second, 5)[:], b"hello")
+
+    def test_create_existing(self):
+        _, library = dist.load()
+        hMapping = CreateFileMapping(
+            None, library.PAGE_READWRITE, 4096, lpName=self.name)
+        self.addCleanup(CloseHandle, hMapping)
+        hExisting = CreateFileMapping(
+            None, library.PAGE_READWRITE, 4096, lpName=self.name)
+        self.addCleanup(CloseHandle, hExisting)
+        self.SetLastError(0)
+
+    def test_open_missing(self):
+        _, library = dist.load()
+
+        with self.assertRaises(WindowsAPIError) as error:
+            OpenFileMapping(library.FILE_MAP_READ, False, self.name)
+
+        self.assertEqual(error.exception.errno, library.ERROR_FILE_NOT_FOUND)
+        self.SetLastError(0)
@@ -0,0 +1,74 @@
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import (
+    CloseHandle, CreateFile, CreateNamedPipe, ConnectNamedPipe, WriteFile,
+    SetNamedPipeHandleState, MessageReader)
+
+
+class TestMessageReader(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.MessageReader`
+    """
+    def setUp(self):
+        super(TestMessageReader, self).setUp()
+        _, library = dist.load()
+        name = u"\\\\.\\pipe\\" + self.random_string(16)
+        self.server = CreateNamedPipe(
+            name, library.PIPE_ACCESS_DUPLEX,
+            library.PIPE_TYPE_MESSAGE | library.PIPE_READMODE_MESSAGE,
+            nMaxInstances=1)
+        self.addCleanup(self.close_server)
+
+        self.client = CreateFile(
+            name, library.GENERIC_READ | library.GENERIC_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING)
+        self.addCleanup(CloseHandle, self.client)
+        SetNamedPipeHandleState(
+            self.client, lpMode=library.PIPE_READMODE_MESSAGE)
+        ConnectNamedPipe(self.server)
+
+    def close_server(self):
+        if self.server is not None:
+            CloseHandle(self.server)
+            self.server = None
+
+    def test_small_message(self):
+        WriteFile(self.server, b"hello")
+        reader = MessageReader(self.client)
+        self.assertEqual(reader.read_message(), b"hello")
+        self.assertEqual(reader.grows, 0)
+
+    def test_message_larger_than_buffer(self):
+        data = b"abcdefgh" * 1024
+        WriteFile(self.server, data)
+        WriteFile(self.server, b"next")
+        reader = MessageReader(self.client, buffer_size=16)
+        self.assertEqual(reader.read_message(), data)
+        self.assertEqual(reader.read_message(), b"next")
+        self.assertEqual(reader.grows, 1)
+        self.assertGreaterEqual(reader.buffer_size, len(data))
+
+    def test_read_messages_drains_queue(self):
+        for index in range(5):
+            WriteFile(self.server, ("message %d" % index).encode())
+
+        reader = MessageReader(self.client, buffer_size=4)
+        self.assertEqual(
+            reader.read_messages(max_messages=3),
+            [b"message 0", b"message 1", b"message 2"])
+        self.assertEqual(
+            reader.read_messages(), [b"message 3", b"message 4"])
+        self.assertEqual(reader.messages, 5)
+
+    def test_iterate_until_closed(self):
+        WriteFile(self.server, b"one")
+        WriteFile(self.server, b"two")
+        self.close_server()
+
+        reader = MessageReader(self.client)
+        self.assertEqual(list(reader), [b"one", b"two"])
+
+    def test_invalid_buffer_size(self):
+        with self.assertRaises(InputError):
+            MessageReader(self.client, buffer_size=0)
@@ -0,0 +1,151 @@
+import threading
+
+from mock import patch
+from six.moves import queue
+
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import (
+    CloseHandle, WriteFile, PipeMultiplexer, PipeChunk,
+    create_overlapped_pipe)
+
+
+class TestPipeMultiplexer(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.PipeMultiplexer`
+    """
+    def collect(self, multiplexer, count):
+        """Returns the data read from ``count`` pipes keyed by tag"""
+        output = {}
+        while count:
+            chunk = multiplexer.queue.get(timeout=5)
+            multiplexer.consumed(chunk)
+            if not chunk.data:
+                count -= 1
+            output[chunk.tag] = output.get(chunk.tag, b"") + chunk.data
+        return output
+
+    def test_many_pipes(self):
+        with PipeMultiplexer(group_size=2) as multiplexer:
+            writers = []
+            for index in range(5):
+                reader, writer = create_overlapped_pipe()
+                multiplexer.attach(reader, index)
+                writers.append(writer)
+
+            for index, writer in enumerate(writers):
+                WriteFile(writer, ("pipe %d" % index).encode())
+                CloseHandle(writer)
+
+            output = self.collect(multiplexer, 5)
+
+        self.assertEqual(
+            output, dict(
+                (index, ("pipe %d" % index).encode())
+                for index in range(5)))
+
+    def test_concurrent_writers_in_one_group(self):
+        expected = {}
+        with PipeMultiplexer(group_size=16) as multiplexer:
+            threads = []
+            for index in range(16):
+                reader, writer = create_overlapped_pipe()
+                multiplexer.attach(reader, index)
+                chunks = [
+                    ("%d:%d;" % (index, number)).encode()
+                    for number in range(200)]
+                expected[index] = b"".join(chunks)
+
+                def write(writer=writer, chunks=chunks):
+                    for chunk in chunks:
+                        WriteFile(writer, chunk)
+                    CloseHandle(writer)
+
+                threads.append(threading.Thread(target=write))
+
+            for thread in threads:
+                thread.start()
+
+            # A completion lost while another read in the group starts
+            # leaves a pipe unread and times out here.
+            output = self.collect(multiplexer, 16)
+
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(output, expected)
+
+    def test_callback(self):
+        chunks = []
+        finished = threading.Event()
+
+        def callback(chunk):
+            chunks.append(chunk)
+            if not chunk.data:
+                finished.set()
+
+        with PipeMultiplexer(callback=callback) as multiplexer:
+            reader, writer = create_overlapped_pipe()
+            multiplexer.attach(reader, "stdout")
+            WriteFile(writer, b"hello")
+            CloseHandle(writer)
+            self.assertTrue(finished.wait(5))
+
+        self.assertEqual(
+            chunks,
+            [PipeChunk("stdout", b"hello"), PipeChunk("stdout", b"")])
+
+    def test_backpressure(self):
+        with PipeMultiplexer(max_buffered=1) as multiplexer:
+            reader, writer = create_overlapped_pipe()
+            self.addCleanup(CloseHandle, writer)
+            multiplexer.attach(reader, "stdout")
+
+            WriteFile(writer, b"one")
+            first = multiplexer.queue.get(timeout=5)
+            self.assertEqual(first, PipeChunk("stdout", b"one"))
+
+            WriteFile(writer, b"two")
+            with self.assertRaises(queue.Empty):
+                multiplexer.queue.get(timeout=0.5)
+
+            multiplexer.consumed(first)
+            self.assertEqual(
+                multiplexer.queue.get(timeout=5), PipeChunk("stdout", b"two"))
+
+    def test_duplicate_tag(self):
+        with PipeMultiplexer() as multiplexer:
+            reader, writer = create_overlapped_pipe()
+            self.addCleanup(CloseHandle, writer)
+            multiplexer.attach(reader, "stdout")
+
+            with self.assertRaises(InputError):
+                multiplexer.attach(reader, "stdout")
+
+    def test_close_after_failed_cancel(self):
+        multiplexer = PipeMultiplexer()
+        multiplexer.start()
+        writers = []
+        for tag in ("stdout", "stderr"):
+            reader, writer = create_overlapped_pipe()
+            self.addCleanup(CloseHandle, writer)
+            multiplexer.attach(reader, tag)
+            writers.append(writer)
+
+        WriteFile(writers[0], b"one")
+        multiplexer.queue.get(timeout=5)
+
+        with patch("pywincffi.kernel32.multiplexer.cancel_overlapped",
+                   side_effect=WindowsAPIError("CancelIoEx", "failed", 6)) \
+                as cancel:
+            multiplexer.close()
+
+        # Every pipe is still closed, so the writers can no longer write.
+        self.assertEqual(cancel.call_count, 2)
+        for writer in writers:
+            with self.assertRaises(WindowsAPIError):
+                WriteFile(writer, b"two")
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(InputError):
+            PipeMultiplexer(chunk_size=0)
@@ -8,8 +8,12 @@ from pywincffi.dev.testutil import TestCase
 
 from pywincffi.core import dist
 
+from pywincffi.exceptions import WindowsAPIError
 from pywincffi.kernel32 import (
-    CreateFile, WriteFile, CloseHandle, CreateEvent, GetOverlappedResult)
+    CreateFile, ReadFile, WriteFile, CloseHandle, CreateEvent,
+    GetOverlappedResult, GetOverlappedResultEx, CancelIo, CancelIoEx,
+    ReadDirectoryChangesW, cancel_overlapped, HasOverlappedIoCompleted,
+    OverlappedRead, ReadFileInto, create_overlapped_pipe)
 from pywincffi.wintypes import OVERLAPPED
 
 
@@ -56,11 +60,177 @@ class TestOverlappedWriteFile(TestCase):
         # - Assert GetLastError is either ERROR_IO_PENDING or ERROR_SUCCESS.
         # - Later validate that the correct number of bytes was written.
 
-        _ = WriteFile(handle, file_contents, lpOverlapped=ovr)
-        self.maybe_assert_last_error(lib.ERROR_IO_PENDING)
+        completed = WriteFile(handle, file_contents, lpOverlapped=ovr)
+        self.assertIsInstance(completed, bool)
+        self.assert_last_error(0)
 
         # Block until async write is completed.
         num_bytes_written = GetOverlappedResult(handle, ovr, bWait=True)
         self.assertEqual(num_bytes_written, len(file_contents))
 
         CloseHandle(handle)
+
+    def test_overlapped_read_file(self):
+        temp_dir = tempfile.mkdtemp(prefix="pywincffi-test-ovr-")
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+
+        filename = os.path.join(temp_dir, "overlapped-read-file")
+        with open(filename, "wb") as file_:
+            file_.write(b"hello overlapped world")
+
+        ffi, lib = dist.load()
+        handle = CreateFile(
+            lpFileName=text_type(filename),
+            dwDesiredAccess=lib.GENERIC_READ,
+            dwCreationDisposition=lib.OPEN_EXISTING,
+            dwFlagsAndAttributes=lib.FILE_FLAG_OVERLAPPED,
+        )
+        self.addCleanup(CloseHandle, handle)
+
+        ovr = OVERLAPPED()
+        ovr.hEvent = CreateEvent(bManualReset=True, bInitialState=False)
+        self.addCleanup(CloseHandle, ovr.hEvent)
+
+        result = ReadFile(handle, 5, lpOverlapped=ovr)
+        self.assertIsInstance(result, OverlappedRead)
+        self.assert_last_error(0)
+
+        if result.completed:
+            self.assertEqual(result.data, b"hello")
+        else:
+            self.assertIsNone(result.data)
+            size = GetOverlappedResult(handle, ovr, bWait=True)
+            self.assertEqual(ffi.buffer(result.buffer, size)[:], b"hello")
+
+    def test_overlapped_read_file_into_pending(self):
+        reader, writer = create_overlapped_pipe()
+        self.addCleanup(CloseHandle, reader)
+        self.addCleanup(CloseHandle, writer)
+
+        ovr = OVERLAPPED()
+        ovr.hEvent = CreateEvent(bManualReset=True, bInitialState=False)
+        self.addCleanup(CloseHandle, ovr.hEvent)
+
+        # Nothing has been written so the read remains pending.
+        buffer_ = bytearray(16)
+        self.assertEqual(ReadFileInto(reader, buffer_, lpOverlapped=ovr), 0)
+        self.assert_last_error(0)
+
+        WriteFile(writer, b"hello")
+        self.assertEqual(GetOverlappedResult(reader, ovr, bWait=True), 5)
+        self.assertEqual(bytes(buffer_[:5]), b"hello")
+
+
+class PendingReadCase(TestCase):
+    """
+    Starts a ReadDirectoryChangesW() call on an empty directory which
+    remains pending until it's canceled.
+    """
+    def setUp(self):
+        super(PendingReadCase, self).setUp()
+        ffi, library = dist.load()
+        path = tempfile.mkdtemp(prefix="pywincffi-test-cancel-")
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+
+        self.handle = CreateFile(
+            text_type(path), library.FILE_LIST_DIRECTORY,
+            dwShareMode=library.FILE_SHARE_READ | library.FILE_SHARE_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=library.FILE_FLAG_BACKUP_SEMANTICS |
+            library.FILE_FLAG_OVERLAPPED)
+        self.addCleanup(CloseHandle, self.handle)
+
+        self.overlapped = OVERLAPPED()
+        self.overlapped.hEvent = CreateEvent(True, False)
+        self.addCleanup(CloseHandle, self.overlapped.hEvent)
+        self.buffer = ffi.new("char[]", 4096)
+
+    def start(self):
+        _, library = dist.load()
+        ReadDirectoryChangesW(
+            self.handle, self.buffer, False,
+            library.FILE_NOTIFY_CHANGE_FILE_NAME,
+            lpOverlapped=self.overlapped)
+        self.maybe_assert_last_error(library.ERROR_IO_PENDING)
+
+
+class TestGetOverlappedResultEx(PendingReadCase):
+    """
+    Tests for :func:`pywincffi.kernel32.GetOverlappedResultEx`
+    """
+    def test_timeout(self):
+        _, library = dist.load()
+        self.start()
+        self.addCleanup(cancel_overlapped, self.handle, self.overlapped)
+
+        with self.assertRaises(WindowsAPIError) as error:
+            GetOverlappedResultEx(self.handle, self.overlapped, 10)
+        self.assertEqual(error.exception.errno, library.WAIT_TIMEOUT)
+        library.SetLastError(0)
+
+    def test_poll(self):
+        _, library = dist.load()
+        self.start()
+        self.addCleanup(cancel_overlapped, self.handle, self.overlapped)
+
+        with self.assertRaises(WindowsAPIError) as error:
+            GetOverlappedResultEx(self.handle, self.overlapped, 0)
+        self.assertEqual(error.exception.errno, library.ERROR_IO_INCOMPLETE)
+        library.SetLastError(0)
+
+
+class TestCancelIo(PendingReadCase):
+    """
+    Tests for :func:`pywincffi.kernel32.CancelIo`
+    """
+    def test_cancel(self):
+        _, library = dist.load()
+        self.start()
+        CancelIo(self.handle)
+
+        with self.assertRaises(WindowsAPIError) as error:
+            GetOverlappedResult(self.handle, self.overlapped, True)
+        self.assertEqual(
+            error.exception.errno, library.ERROR_OPERATION_ABORTED)
+        library.SetLastError(0)
+
+
+class TestCancelIoEx(PendingReadCase):
+    """
+    Tests for :func:`pywincffi.kernel32.CancelIoEx`
+    """
+    def test_nothing_to_cancel(self):
+        _, library = dist.load()
+        with self.assertRaises(WindowsAPIError) as error:
+            CancelIoEx(self.handle, self.overlapped)
+        self.assertEqual(error.exception.errno, library.ERROR_NOT_FOUND)
+        library.SetLastError(0)
+
+    def test_cancel_all(self):
+        self.start()
+        CancelIoEx(self.handle)
+        self.assertIsNone(cancel_overlapped(self.handle, self.overlapped))
+
+
+class TestCancelOverlapped(PendingReadCase):
+    """
+    Tests for :func:`pywincffi.kernel32.cancel_overlapped`
+    """
+    def test_cancel_pending(self):
+        self.start()
+        self.assertIsNone(cancel_overlapped(self.handle, self.overlapped))
+
+        # The OVERLAPPED structure can be reused.
+        self.start()
+        self.assertIsNone(cancel_overlapped(self.handle, self.overlapped))
+
+
+class TestHasOverlappedIoCompleted(PendingReadCase):
+    """
+    Tests for :func:`pywincffi.kernel32.HasOverlappedIoCompleted`
+    """
+    def test_pending(self):
+        self.start()
+        self.assertFalse(HasOverlappedIoCompleted(self.overlapped))
+        cancel_overlapped(self.handle, self.overlapped)
+        self.assertTrue(HasOverlappedIoCompleted(self.overlapped))
@@ -2,7 +2,10 @@ from pywincffi.dev.testutil import TestCase
 from pywincffi.exceptions import WindowsAPIError
 from pywincffi.kernel32 import (
     CreatePipe, PeekNamedPipe, PeekNamedPipeResult, ReadFile, WriteFile,
-    CloseHandle, SetNamedPipeHandleState)
+    CloseHandle, SetNamedPipeHandleState, pipe_bytes_available,
+    CreateNamedPipe, ConnectNamedPipe, DisconnectNamedPipe, WaitNamedPipe,
+    CreateEvent, CreateFile, WaitForSingleObject)
+from pywincffi.wintypes import OVERLAPPED
 from pywincffi.core import dist
 
 # For pylint on non-windows platforms
@@ -107,6 +110,17 @@ class TestPeekNamedPipe(PipeBaseTestCase):
         _, library = dist.load()
         self.maybe_assert_last_error(library.ERROR_INVALID_HANDLE)
 
+    def test_peeked_data(self):
+        reader, writer = self.create_anonymous_pipes()
+        WriteFile(writer, b"hello world")
+
+        result = PeekNamedPipe(reader, 5)
+        self.assertEqual(result.lpBuffer, b"hello")
+        self.assertEqual(PeekNamedPipe(reader, 64).lpBuffer, b"hello world")
+        self.assertEqual(PeekNamedPipe(reader, 0).lpBuffer, b"")
+        _, library = dist.load()
+        self.maybe_assert_last_error(library.ERROR_INVALID_HANDLE)
+
     def test_total_bytes_avail(self):
         reader, writer = self.create_anonymous_pipes()
 
@@ -134,6 +148,33 @@ class TestPeekNamedPipe(PipeBaseTestCase):
         self.maybe_assert_last_error(library.ERROR_INVALID_HANDLE)
 
 
+class TestPipeBytesAvailable(PipeBaseTestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.pipe_bytes_available`.
+    """
+    def test_empty(self):
+        reader, _ = self.create_anonymous_pipes()
+        self.assertEqual(pipe_bytes_available(reader), 0)
+
+    def test_available(self):
+        reader, writer = self.create_anonymous_pipes()
+        WriteFile(writer, b"hello world")
+        self.assertEqual(pipe_bytes_available(reader), 11)
+        ReadFile(reader, 5)
+        self.assertEqual(pipe_bytes_available(reader), 6)
+
+    def test_broken_pipe(self):
+        _, library = dist.load()
+        reader, writer = CreatePipe()
+        self.addCleanup(CloseHandle, reader)
+        CloseHandle(writer)
+
+        with self.assertRaises(WindowsAPIError) as error:
+            pipe_bytes_available(reader)
+        self.assertEqual(error.exception.errno, library.ERROR_BROKEN_PIPE)
+        library.SetLastError(0)
+
+
 class TestSetNamedPipeHandleState(PipeBaseTestCase):
     """
     Tests for :func:`pywincffi.kernel32.SetNamedPipeHandleState`.
@@ -194,3 +235,74 @@ class TestSetNamedPipeHandleState(PipeBaseTestCase):
 
         _, library = dist.load()
         self.assert_last_error(library.ERROR_INVALID_PARAMETER)
+
+
+class TestNamedPipe(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.CreateNamedPipe`,
+    :func:`pywincffi.kernel32.ConnectNamedPipe`,
+    :func:`pywincffi.kernel32.DisconnectNamedPipe` and
+    :func:`pywincffi.kernel32.WaitNamedPipe`.
+    """
+    def setUp(self):
+        super(TestNamedPipe, self).setUp()
+        self.name = u"\\\\.\\pipe\\" + self.random_string(16)
+
+    def create_server(self, flags=0):
+        _, library = dist.load()
+        server = CreateNamedPipe(
+            self.name, library.PIPE_ACCESS_DUPLEX | flags,
+            library.PIPE_TYPE_BYTE | library.PIPE_REJECT_REMOTE_CLIENTS,
+            nMaxInstances=1)
+        self.addCleanup(CloseHandle, server)
+        return server
+
+    def connect_client(self):
+        _, library = dist.load()
+        WaitNamedPipe(self.name, 1000)
+        client = CreateFile(
+            self.name, library.GENERIC_READ | library.GENERIC_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING)
+        self.addCleanup(CloseHandle, client)
+        return client
+
+    def test_already_connected(self):
+        server = self.create_server()
+        client = self.connect_client()
+        self.assertTrue(ConnectNamedPipe(server))
+
+        WriteFile(client, b"hello")
+        self.assertEqual(ReadFile(server, 5), b"hello")
+        DisconnectNamedPipe(server)
+
+    def test_overlapped_pending(self):
+        _, library = dist.load()
+        server = self.create_server(library.FILE_FLAG_OVERLAPPED)
+        overlapped = OVERLAPPED()
+        overlapped.hEvent = CreateEvent(True, False)
+        self.addCleanup(CloseHandle, overlapped.hEvent)
+
+        self.assertFalse(ConnectNamedPipe(server, overlapped))
+        self.connect_client()
+        self.assertEqual(
+            WaitForSingleObject(overlapped.hEvent, 1000),
+            library.WAIT_OBJECT_0)
+
+    def test_second_instance_fails(self):
+        _, library = dist.load()
+        self.create_server()
+
+        with self.assertRaises(WindowsAPIError) as error:
+            self.create_server()
+
+        self.assertEqual(error.exception.errno, library.ERROR_PIPE_BUSY)
+        self.SetLastError(0)
+
+    def test_wait_missing_pipe(self):
+        _, library = dist.load()
+
+        with self.assertRaises(WindowsAPIError) as error:
+            WaitNamedPipe(self.name, 0)
+
+        self.assertEqual(error.exception.errno, library.ERROR_FILE_NOT_FOUND)
+        self.SetLastError(0)
@@ -0,0 +1,144 @@
+import threading
+import time
+
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import (
+    CloseHandle, CreateFile, ReadFile, WriteFile, WaitNamedPipe,
+    NamedPipeServer, NamedPipeServerStats)
+
+
+def echo(_, request):
+    return request
+
+
+class TestNamedPipeServer(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.NamedPipeServer`
+    """
+    def setUp(self):
+        super(TestNamedPipeServer, self).setUp()
+        self.name = u"\\\\.\\pipe\\" + self.random_string(16)
+
+    def connect(self):
+        _, library = dist.load()
+        WaitNamedPipe(self.name, 5000)
+        return CreateFile(
+            self.name, library.GENERIC_READ | library.GENERIC_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING)
+
+    def test_echo(self):
+        with NamedPipeServer(self.name, echo, instances=2) as server:
+            clients = [self.connect() for _ in range(4)]
+            for index, client in enumerate(clients):
+                WriteFile(client, ("client %d" % index).encode())
+            for index, client in enumerate(clients):
+                self.assertEqual(
+                    ReadFile(client, 8), ("client %d" % index).encode())
+                CloseHandle(client)
+
+        stats = server.stats
+        self.assertIsInstance(stats, NamedPipeServerStats)
+        self.assertEqual(stats.connections, 4)
+        self.assertEqual(stats.active, 0)
+        self.assertEqual(stats.requests, 4)
+        self.assertEqual(stats.waiting, 0)
+        self.assertEqual(stats.failed, 0)
+        self.assertEqual(stats.bytes_read, 32)
+        self.assertEqual(stats.bytes_written, 32)
+
+    def test_more_clients_than_threads(self):
+        # More clients than a single WaitForMultipleObjects call could
+        # wait for, all connected at once and served by two workers.
+        _, library = dist.load()
+        count = library.MAXIMUM_WAIT_OBJECTS * 2
+        with NamedPipeServer(
+                self.name, echo, workers=2, group_size=8) as server:
+            clients = [self.connect() for _ in range(count)]
+            for index, client in enumerate(clients):
+                WriteFile(client, ("%04d" % index).encode())
+            for index, client in enumerate(clients):
+                self.assertEqual(
+                    ReadFile(client, 4), ("%04d" % index).encode())
+                CloseHandle(client)
+
+        self.assertEqual(server.stats.connections, count)
+        self.assertEqual(server.stats.requests, count)
+
+    def test_message_longer_than_buffer(self):
+        message = b"x" * 100
+        with NamedPipeServer(
+                self.name, echo, buffer_size=16, message_mode=True):
+            client = self.connect()
+            WriteFile(client, message)
+            self.assertEqual(ReadFile(client, 100), message)
+            CloseHandle(client)
+
+    def test_requests_wait_for_a_worker(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def handler(_, request):
+            started.set()
+            release.wait()
+            return request
+
+        with NamedPipeServer(
+                self.name, handler, instances=2, workers=1) as server:
+            clients = [self.connect() for _ in range(2)]
+            for client in clients:
+                WriteFile(client, b"ping")
+            self.assertTrue(started.wait(5))
+            deadline = time.time() + 5
+            while server.stats.requests < 2 and time.time() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(server.stats.active, 2)
+            self.assertEqual(server.stats.waiting, 1)
+            release.set()
+            for client in clients:
+                self.assertEqual(ReadFile(client, 4), b"ping")
+                CloseHandle(client)
+
+        self.assertEqual(server.stats.waiting, 0)
+
+    def test_close_connection_after_reply(self):
+        def handler(connection, _):
+            connection.close()
+            return b"bye"
+
+        with NamedPipeServer(self.name, handler, instances=1):
+            client = self.connect()
+            WriteFile(client, b"ping")
+            self.assertEqual(ReadFile(client, 3), b"bye")
+            with self.assertRaises(WindowsAPIError):
+                ReadFile(client, 1)
+            CloseHandle(client)
+
+    def test_handler_exception_counted(self):
+        def handler(*_):
+            raise ValueError("failed")
+
+        with NamedPipeServer(self.name, handler, instances=1) as server:
+            client = self.connect()
+            WriteFile(client, b"ping")
+            with self.assertRaises(WindowsAPIError):
+                ReadFile(client, 1)
+            CloseHandle(client)
+
+        self.assertEqual(server.stats.failed, 1)
+
+    def test_close_without_clients(self):
+        server = NamedPipeServer(self.name, echo)
+        server.start()
+        server.close()
+        self.assertEqual(server.stats.connections, 0)
+
+    def test_no_instances(self):
+        with self.assertRaises(InputError):
+            NamedPipeServer(self.name, echo, instances=0)
+
+    def test_handler_not_callable(self):
+        with self.assertRaises(InputError):
+            NamedPipeServer(self.name, None)
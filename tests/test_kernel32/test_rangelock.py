@@ -0,0 +1,151 @@
+import os
+import tempfile
+
+from six import text_type
+
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import (
+    CreateFile, CloseHandle, RangeLockManager, coalesce)
+from pywincffi.kernel32.rangelock import _covers, _overlaps
+
+
+class TestCoalesce(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.coalesce`
+    """
+    def test_adjacent(self):
+        self.assertEqual(
+            coalesce([(100, 200), (0, 100), (300, 400)]),
+            [(0, 200), (300, 400)])
+
+    def test_contained(self):
+        self.assertEqual(coalesce([(0, 400), (100, 200)]), [(0, 400)])
+
+    def test_covers(self):
+        intervals = coalesce([(0, 100), (100, 200), (300, 400)])
+        self.assertTrue(_covers(intervals, 50, 150))
+        self.assertFalse(_covers(intervals, 150, 350))
+        self.assertFalse(_covers([], 0, 1))
+
+    def test_overlaps(self):
+        intervals = coalesce([(0, 200), (300, 400)])
+        self.assertFalse(_overlaps(intervals, 200, 300))
+        self.assertTrue(_overlaps(intervals, 250, 301))
+        self.assertTrue(_overlaps(intervals, 199, 200))
+
+
+class TestRangeLockManager(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.RangeLockManager`
+    """
+    def setUp(self):
+        super(TestRangeLockManager, self).setUp()
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        self.path = text_type(path)
+        self.manager = self.create_manager()
+
+    def create_manager(self):
+        _, library = dist.load()
+        handle = CreateFile(
+            self.path, library.GENERIC_READ | library.GENERIC_WRITE,
+            dwShareMode=library.FILE_SHARE_READ | library.FILE_SHARE_WRITE,
+            dwCreationDisposition=library.OPEN_EXISTING,
+            dwFlagsAndAttributes=library.FILE_FLAG_OVERLAPPED)
+        self.addCleanup(CloseHandle, handle)
+        manager = RangeLockManager(handle)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_beyond_4gb(self):
+        with self.manager.acquire(1 << 33, 4096) as lock:
+            self.assertTrue(lock.acquired)
+            self.assertEqual(self.manager.held(), [(1 << 33, 4096)])
+        self.assertEqual(self.manager.held(), [])
+        self.assertEqual(self.manager.stats.acquired, 1)
+
+    def test_adjacent_ranges_coalesced(self):
+        first = self.manager.acquire(0, 100)
+        second = self.manager.acquire(100, 100)
+        self.assertEqual(self.manager.held(), [(0, 200)])
+
+        nested = self.manager.acquire(50, 100)
+        self.assertIsNone(nested.event)
+        self.assertEqual(self.manager.stats.nested, 1)
+
+        # The nested lock keeps both ranges locked until it's released.
+        first.release()
+        self.assertEqual(self.manager.held(), [(0, 200)])
+        nested.release()
+        self.assertEqual(self.manager.held(), [(100, 100)])
+        second.release()
+        self.assertEqual(self.manager.held(), [])
+
+    def test_partial_overlap(self):
+        with self.manager.acquire(0, 100):
+            with self.assertRaises(InputError):
+                self.manager.acquire(50, 100)
+
+    def test_exclusive_inside_shared(self):
+        with self.manager.acquire(0, 100, exclusive=False):
+            with self.assertRaises(InputError):
+                self.manager.acquire(0, 10)
+
+    def test_contended(self):
+        other = self.create_manager()
+        lock = self.manager.acquire(0, 100)
+        pending = other.acquire(0, 100, wait=False)
+        self.assertFalse(pending.wait(timeout=0.01))
+        self.assertEqual(other.stats.contended, 1)
+
+        with self.assertRaises(ValueError):
+            pending.release()
+
+        lock.release()
+        self.assertTrue(pending.wait(timeout=5))
+        pending.release()
+
+    def test_cancel_pending(self):
+        other = self.create_manager()
+        with self.manager.acquire(0, 100):
+            pending = other.acquire(0, 100, wait=False)
+            pending.cancel()
+
+        self.assertFalse(pending.acquired)
+        self.assertEqual(other.stats.failed, 1)
+        self.assertEqual(other.held(), [])
+
+        with other.acquire(0, 100, fail_immediately=True):
+            pass
+
+    def test_fail_immediately(self):
+        _, library = dist.load()
+        other = self.create_manager()
+        with self.manager.acquire(0, 100):
+            with self.assertRaises(WindowsAPIError) as error:
+                other.acquire(0, 100, fail_immediately=True)
+
+        self.assertEqual(error.exception.errno, library.ERROR_LOCK_VIOLATION)
+        self.assertEqual(other.stats.failed, 1)
+        library.SetLastError(0)
+
+    def test_close_unlocks_released_parent(self):
+        other = self.create_manager()
+        parent = self.manager.acquire(0, 100)
+        self.manager.acquire(50, 10)
+        parent.release()
+        self.manager.close()
+        self.assertEqual(self.manager.held(), [])
+
+        with other.acquire(0, 100, fail_immediately=True):
+            pass
+
+    def test_invalid_range(self):
+        with self.assertRaises(InputError):
+            self.manager.acquire(0, 0)
+
+        with self.assertRaises(InputError):
+            self.manager.acquire((1 << 64) - 1, 2)
@@ -0,0 +1,47 @@
+import binascii
+import pickle
+
+from pywincffi.dev.testutil import TestCase
+from pywincffi.kernel32 import (
+    CloseHandle, CreatePipe, ReadFile, WriteFile, reduce_handle,
+    rebuild_handle)
+from pywincffi.kernel32.reduction import ForkingPickler
+from pywincffi.wintypes import HANDLE
+
+
+class TestHandleReduction(TestCase):
+    """
+    Tests for :mod:`pywincffi.kernel32.reduction`
+    """
+    def setUp(self):
+        super(TestHandleReduction, self).setUp()
+        self.reader, self.writer = CreatePipe()
+        self.addCleanup(CloseHandle, self.reader)
+        self.addCleanup(CloseHandle, self.writer)
+
+    def test_reduce_duplicates(self):
+        function, (value, source_pid) = reduce_handle(self.writer)
+        self.assertIs(function, rebuild_handle)
+        self.assertIsNotNone(source_pid)
+
+        handle = rebuild_handle(value, source_pid)
+        self.addCleanup(CloseHandle, handle)
+        self.assertIsInstance(handle, HANDLE)
+        self.assertNotEqual(handle, self.writer)
+
+    def test_pickle_in_same_process(self):
+        handle = pickle.loads(ForkingPickler.dumps(self.writer))
+        self.addCleanup(CloseHandle, handle)
+        WriteFile(handle, b"hello")
+        self.assertEqual(ReadFile(self.reader, 5), b"hello")
+
+    def test_pickle_to_child_process(self):
+        data = binascii.hexlify(bytes(ForkingPickler.dumps(self.writer)))
+        process = self.create_python_process(
+            "import binascii, pickle; "
+            "from pywincffi.kernel32 import CloseHandle, WriteFile; "
+            "handle = pickle.loads(binascii.unhexlify(%r)); "
+            "WriteFile(handle, b'child'); "
+            "CloseHandle(handle)" % data.decode())
+        self.assertEqual(process.wait(), 0)
+        self.assertEqual(ReadFile(self.reader, 5), b"child")
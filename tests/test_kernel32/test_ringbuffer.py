@@ -0,0 +1,81 @@
+import threading
+
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import SharedRingBuffer
+
+
+class TestSharedRingBuffer(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.SharedRingBuffer`
+    """
+    def setUp(self):
+        super(TestSharedRingBuffer, self).setUp()
+        self.name = u"Local\\" + self.random_string(16)
+
+    def create(self, capacity=256, **kwargs):
+        ring = SharedRingBuffer(self.name, capacity=capacity, **kwargs)
+        self.addCleanup(ring.close)
+        reader = SharedRingBuffer(self.name)
+        self.addCleanup(reader.close)
+        return ring, reader
+
+    def test_write_and_read(self):
+        writer, reader = self.create()
+        self.assertTrue(writer.write(b"hello"))
+        self.assertEqual(reader.read(timeout=0).tobytes(), b"hello")
+        self.assertIsNone(reader.read(timeout=0))
+
+    def test_reserve_and_commit(self):
+        writer, reader = self.create()
+        view = writer.reserve(4)
+        view[:] = b"data"
+        self.assertIsNone(reader.read(timeout=0))
+        writer.commit()
+        self.assertEqual(reader.read(timeout=0).tobytes(), b"data")
+
+    def test_wraps(self):
+        writer, reader = self.create()
+        for index in range(100):
+            message = ("message %d" % index).encode() * (index % 5 + 1)
+            self.assertTrue(writer.write(message, timeout=0))
+            self.assertEqual(reader.read(timeout=0).tobytes(), message)
+
+    def test_full(self):
+        writer, _ = self.create()
+        while writer.write(b"x" * 60, timeout=0):
+            pass
+        self.assertIsNone(writer.reserve(60, timeout=0))
+
+    def test_reader_wakes_writer(self):
+        writer, reader = self.create()
+        messages = [("message %d" % index).encode() for index in range(200)]
+
+        def write():
+            for message in messages:
+                writer.write(message)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        received = [reader.read(timeout=5).tobytes() for _ in messages]
+        thread.join()
+        self.assertEqual(received, messages)
+
+    def test_multiple_writers(self):
+        writer, reader = self.create(multiple_writers=True)
+        self.assertTrue(reader.multiple_writers)
+        writer.write(b"one")
+        self.assertEqual(reader.read(timeout=0).tobytes(), b"one")
+
+    def test_message_too_large(self):
+        writer, _ = self.create()
+        with self.assertRaises(InputError):
+            writer.reserve(writer.max_message_size + 1)
+
+    def test_open_missing(self):
+        with self.assertRaises(InputError):
+            SharedRingBuffer(self.name)
+
+    def test_capacity_power_of_two(self):
+        with self.assertRaises(InputError):
+            SharedRingBuffer(self.name, capacity=100)
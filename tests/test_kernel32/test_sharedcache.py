@@ -0,0 +1,106 @@
+import threading
+
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import SharedCache
+from pywincffi.kernel32.sharedcache import _hash
+
+
+class TestSharedCache(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.SharedCache`
+    """
+    def setUp(self):
+        super(TestSharedCache, self).setUp()
+        self.name = u"Local\\" + self.random_string(16)
+
+    def create(self, **kwargs):
+        kwargs.setdefault("slots", 64)
+        cache = SharedCache(self.name, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_set_and_get(self):
+        cache = self.create()
+        self.assertTrue(cache.set(b"key", b"value"))
+        self.assertEqual(cache.get(b"key"), b"value")
+        self.assertIsNone(cache.get(b"missing"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_replace(self):
+        cache = self.create()
+        cache.set(b"key", b"first")
+        cache.set(b"key", b"second")
+        self.assertEqual(cache.get(b"key"), b"second")
+
+    def test_shared_between_instances(self):
+        cache = self.create(key_size=16, value_size=32)
+        cache.set(b"key", b"value")
+
+        other = SharedCache(self.name)
+        self.addCleanup(other.close)
+        self.assertEqual((other.key_size, other.value_size), (16, 32))
+        self.assertEqual(other.get(b"key"), b"value")
+
+    def test_lookup_is_invalidated(self):
+        cache = self.create()
+        cache.set(b"key", b"first")
+        value = cache.lookup(b"key")
+        self.assertEqual(value.view.tobytes(), b"first")
+        self.assertTrue(value.valid())
+
+        cache.set(b"key", b"other")
+        self.assertFalse(value.valid())
+
+    def test_slot_left_by_dead_writer(self):
+        cache = self.create()
+        cache.set(b"key", b"value")
+        bucket_hash, full_hash = _hash(b"key")
+        _, sequence, _ = cache._find(
+            b"key", full_hash, bucket_hash % cache.buckets)
+
+        # The thread exits while holding the mutex, abandoning it, and
+        # leaves the slot half written.
+        def writer():
+            cache._lock()
+            sequence[0] += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        thread.join()
+
+        self.assertIsNone(cache.get(b"key"))
+        self.assertTrue(cache.set(b"key", b"repaired"))
+        self.assertEqual(cache.get(b"key"), b"repaired")
+
+    def test_delete(self):
+        cache = self.create()
+        cache.set(b"key", b"value")
+        self.assertTrue(cache.delete(b"key"))
+        self.assertFalse(cache.delete(b"key"))
+        self.assertIsNone(cache.get(b"key"))
+
+    def test_evicts_unreferenced(self):
+        cache = self.create(slots=2, ways=2)
+        cache.set(b"a", b"1")
+        cache.set(b"b", b"2")
+        cache.get(b"a")
+        cache.set(b"c", b"3")
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.get(b"a"), b"1")
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"c"), b"3")
+
+    def test_value_too_large(self):
+        cache = self.create(value_size=4)
+        with self.assertRaises(InputError):
+            cache.set(b"key", b"value")
+
+    def test_too_many_ways(self):
+        with self.assertRaises(InputError):
+            SharedCache(self.name, slots=1024, ways=256)
+
+    def test_open_missing(self):
+        with self.assertRaises(InputError):
+            SharedCache(self.name)
@@ -1,7 +1,9 @@
 from pywincffi.core import dist
 from pywincffi.dev.testutil import TestCase
-from pywincffi.exceptions import WindowsAPIError
-from pywincffi.kernel32 import CloseHandle, OpenProcess, WaitForSingleObject
+from pywincffi.exceptions import WindowsAPIError, InputError
+from pywincffi.kernel32 import (
+    CloseHandle, CreateEvent, OpenProcess, WaitForSingleObject,
+    WaitForMultipleObjects, CreateMutex, OpenMutex, ReleaseMutex)
 
 
 class TestWaitForSingleObject(TestCase):
@@ -48,3 +50,68 @@ class TestWaitForSingleObject(TestCase):
         self.assertEqual(
             WaitForSingleObject(hProcess, library.INFINITE),
             library.WAIT_OBJECT_0)
+
+
+class TestWaitForMultipleObjects(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.WaitForMultipleObjects`
+    """
+    def setUp(self):
+        super(TestWaitForMultipleObjects, self).setUp()
+        self.events = [CreateEvent(True, False), CreateEvent(True, True)]
+        for event in self.events:
+            self.addCleanup(CloseHandle, event)
+
+    def test_wait_any(self):
+        _, library = dist.load()
+        self.assertEqual(
+            WaitForMultipleObjects(self.events, False, 0),
+            library.WAIT_OBJECT_0 + 1)
+
+    def test_wait_all_timeout(self):
+        _, library = dist.load()
+        self.assertEqual(
+            WaitForMultipleObjects(self.events, True, 0),
+            library.WAIT_TIMEOUT)
+
+    def test_count_limits_handles(self):
+        _, library = dist.load()
+        self.assertEqual(
+            WaitForMultipleObjects(self.events, False, 0, nCount=1),
+            library.WAIT_TIMEOUT)
+
+    def test_invalid_count(self):
+        for nCount in (0, len(self.events) + 1):
+            with self.assertRaises(InputError):
+                WaitForMultipleObjects(self.events, False, 0, nCount=nCount)
+
+
+class TestMutex(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.CreateMutex`,
+    :func:`pywincffi.kernel32.OpenMutex` and
+    :func:`pywincffi.kernel32.ReleaseMutex`
+    """
+    def test_acquire_and_release(self):
+        _, library = dist.load()
+        name = u"Local\\" + self.random_string(16)
+        hMutex = CreateMutex(False, lpName=name)
+        self.addCleanup(CloseHandle, hMutex)
+        hOpened = OpenMutex(
+            library.SYNCHRONIZE | library.MUTEX_MODIFY_STATE, False, name)
+        self.addCleanup(CloseHandle, hOpened)
+
+        self.assertEqual(
+            WaitForSingleObject(hOpened, 0), library.WAIT_OBJECT_0)
+        ReleaseMutex(hOpened)
+
+    def test_release_not_owned(self):
+        _, library = dist.load()
+        hMutex = CreateMutex(False)
+        self.addCleanup(CloseHandle, hMutex)
+
+        with self.assertRaises(WindowsAPIError) as error:
+            ReleaseMutex(hMutex)
+
+        self.assertEqual(error.exception.errno, library.ERROR_NOT_OWNER)
+        self.SetLastError(0)
@@ -0,0 +1,118 @@
+import os
+import struct
+
+from pywincffi.core import dist
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError, WindowsAPIError
+from pywincffi.kernel32 import (
+    UsnJournal, UsnCheckpoint, parse_usn_journal_data, parse_usn_records)
+from pywincffi.kernel32.directory import FILETIME_EPOCH_OFFSET
+from pywincffi.kernel32.usn import (
+    USN_JOURNAL_DATA, USN_RECORD_V2, USN_RECORD_V3)
+
+
+def pack_record(usn, name, version=2, reason=0x100):
+    """Packs a USN_RECORD_V2 or USN_RECORD_V3 as the journal would"""
+    encoded = name.encode("utf-16-le")
+    header = USN_RECORD_V2 if version == 2 else USN_RECORD_V3
+    length = header.size + len(encoded)
+    length += -length % 8
+
+    if version == 2:
+        ids = [5, 6]
+    else:
+        ids = [struct.pack("<2Q", 5, 1), struct.pack("<2Q", 6, 0)]
+
+    data = header.pack(
+        length, version, 0, ids[0], ids[1], usn,
+        FILETIME_EPOCH_OFFSET + 10000000, reason, 0, 0, 0x20,
+        len(encoded), header.size)
+    return (data + encoded).ljust(length, b"\x00")
+
+
+class TestParseUsnRecords(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.parse_usn_records`
+    """
+    def test_empty(self):
+        result = parse_usn_records(struct.pack("<q", 42))
+        self.assertEqual(result.next, 42)
+        self.assertEqual(result.records, [])
+
+    def test_v2(self):
+        data = struct.pack("<q", 300) + pack_record(100, u"a.txt") + \
+            pack_record(200, u"\u00e9.txt")
+        result = parse_usn_records(data)
+        self.assertEqual(result.next, 300)
+        self.assertEqual(
+            [(record.usn, record.name) for record in result.records],
+            [(100, u"a.txt"), (200, u"\u00e9.txt")])
+
+        record = result.records[0]
+        self.assertEqual(record.major_version, 2)
+        self.assertEqual(record.file_reference_number, 5)
+        self.assertEqual(record.parent_file_reference_number, 6)
+        self.assertEqual(record.timestamp, 1.0)
+        self.assertEqual(record.reason, 0x100)
+        self.assertEqual(record.attributes, 0x20)
+
+    def test_v3(self):
+        data = struct.pack("<q", 0) + pack_record(100, u"a.txt", version=3)
+        record, = parse_usn_records(data).records
+        self.assertEqual(record.major_version, 3)
+        self.assertEqual(record.file_reference_number, (1 << 64) + 5)
+        self.assertEqual(record.parent_file_reference_number, 6)
+        self.assertEqual(record.name, u"a.txt")
+
+    def test_unknown_version_skipped(self):
+        unknown = struct.pack("<LHH", 16, 4, 0) + b"\x00" * 8
+        data = struct.pack("<q", 0) + unknown + pack_record(100, u"a.txt")
+        record, = parse_usn_records(data).records
+        self.assertEqual(record.name, u"a.txt")
+
+
+class TestParseUsnJournalData(TestCase):
+    """
+    Tests for :func:`pywincffi.kernel32.parse_usn_journal_data`
+    """
+    def test_parse(self):
+        data = USN_JOURNAL_DATA.pack(1, 2, 3, 4, 5, 6, 7)
+        journal = parse_usn_journal_data(data)
+        self.assertEqual(journal.journal_id, 1)
+        self.assertEqual(journal.next_usn, 3)
+        self.assertEqual(journal.allocation_delta, 7)
+
+
+class TestUsnJournal(TestCase):
+    """
+    Tests for :class:`pywincffi.kernel32.UsnJournal`
+    """
+    def setUp(self):
+        super(TestUsnJournal, self).setUp()
+        _, library = dist.load()
+        drive = os.path.splitdrive(os.getcwd())[0]
+
+        try:
+            self.journal = UsnJournal(drive)
+            self.addCleanup(self.journal.close)
+            self.journal.query()
+        except WindowsAPIError as error:
+            self.SetLastError(0)
+            if error.errno in (library.ERROR_ACCESS_DENIED,
+                               library.ERROR_JOURNAL_NOT_ACTIVE):
+                self.skipTest("USN journal unavailable: %s" % error)
+            raise
+
+    def test_read_from_checkpoint(self):
+        journal = self.journal.query()
+        checkpoint = UsnCheckpoint(journal.journal_id, journal.next_usn)
+        list(self.journal.read(checkpoint))
+        self.assertEqual(self.journal.checkpoint.journal_id,
+                         journal.journal_id)
+        self.assertGreaterEqual(self.journal.checkpoint.usn, journal.next_usn)
+
+    def test_invalid_checkpoint(self):
+        journal = self.journal.query()
+        checkpoint = UsnCheckpoint(journal.journal_id + 1, 0)
+        with self.assertRaises(InputError):
+            list(self.journal.read(checkpoint))
@@ -0,0 +1,124 @@
+import ntpath
+import os
+import tempfile
+
+from mock import patch
+from six import text_type
+
+from pywincffi.dev.benchmark import stand_in
+from pywincffi.dev.testutil import TestCase
+from pywincffi.exceptions import InputError
+from pywincffi.kernel32 import CreateFile, CloseHandle, ReadFile
+from pywincffi.wintypes import WidePath, path_to_text, path_to_cdata
+
+
+class PathLike(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, path):
+        self.path = path
+
+    def __fspath__(self):
+        return self.path
+
+
+class TestWidePathNormalize(TestCase):
+    """
+    Tests for :meth:`pywincffi.wintypes.WidePath.normalize`
+    """
+    def test_short_path(self):
+        self.assertEqual(
+            WidePath.normalize(u"C:/data/../data/file.bin"),
+            u"C:\\data\\file.bin")
+
+    def test_long_path(self):
+        path = u"C:\\" + u"a" * 300
+        self.assertEqual(WidePath.normalize(path), u"\\\\?\\" + path)
+
+    def test_long_drive_relative_path(self):
+        def abspath(path):
+            return u"C:\\cwd\\" + path[2:]
+
+        with patch.object(ntpath, "abspath", side_effect=abspath):
+            self.assertEqual(
+                WidePath.normalize(u"C:" + u"a" * 300),
+                u"\\\\?\\C:\\cwd\\" + u"a" * 300)
+
+    def test_long_unc_path(self):
+        path = u"\\\\server\\share\\" + u"a" * 300
+        self.assertEqual(
+            WidePath.normalize(path),
+            u"\\\\?\\UNC\\server\\share\\" + u"a" * 300)
+
+    def test_prefixed_paths_unchanged(self):
+        for path in (u"\\\\?\\C:\\a\\..\\b", u"\\\\.\\PhysicalDrive0"):
+            self.assertEqual(WidePath.normalize(path), path)
+
+
+class TestWidePath(TestCase):
+    """
+    Tests for :class:`pywincffi.wintypes.WidePath`
+    """
+    def setUp(self):
+        super(TestWidePath, self).setUp()
+        context = stand_in()
+        self.library = context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def test_cdata(self):
+        path = WidePath(u"C:\\data\\file.bin")
+        self.assertEqual(
+            self.library.ffi.string(path_to_cdata("path", path)),
+            u"C:\\data\\file.bin")
+
+    def test_equality(self):
+        path = WidePath(u"C:\\data")
+        self.assertEqual(path, WidePath(u"C:/data"))
+        self.assertEqual(path, u"C:\\data")
+        self.assertEqual(hash(path), hash(u"C:\\data"))
+
+    def test_from_path_like(self):
+        self.assertEqual(WidePath(PathLike(u"C:\\data")).path, u"C:\\data")
+
+    def test_fspath(self):
+        path = WidePath(u"C:/data")
+        self.assertEqual(path.__fspath__(), u"C:\\data")
+        self.assertEqual(path_to_text("path", path), u"C:\\data")
+
+
+class TestPathToText(TestCase):
+    """
+    Tests for :func:`pywincffi.wintypes.path_to_text`
+    """
+    def test_text(self):
+        self.assertEqual(path_to_text("path", u"foo"), u"foo")
+
+    def test_path_like(self):
+        self.assertEqual(path_to_text("path", PathLike(u"foo")), u"foo")
+
+    def test_bytes_path_like(self):
+        with self.assertRaises(InputError):
+            path_to_text("path", PathLike(b"foo"))
+
+    def test_invalid_type(self):
+        with self.assertRaises(InputError):
+            path_to_text("path", 1)
+
+
+class TestCreateFilePathLike(TestCase):
+    """
+    Tests that :func:`pywincffi.kernel32.CreateFile` accepts path like
+    objects.
+    """
+    def test_path_like(self):
+        fd, path = tempfile.mkstemp()
+        os.write(fd, b"data")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        with stand_in() as library:
+            hFile = CreateFile(
+                PathLike(text_type(path)), library.GENERIC_READ,
+                dwCreationDisposition=library.OPEN_EXISTING)
+            try:
+                self.assertEqual(ReadFile(hFile, 4), b"data")
+            finally:
+                CloseHandle(hFile)
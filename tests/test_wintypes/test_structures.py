@@ -2,7 +2,8 @@ from pywincffi.core import dist
 from pywincffi.dev.testutil import TestCase
 from pywincffi.wintypes import (
     HANDLE, SECURITY_ATTRIBUTES, OVERLAPPED, FILETIME, LPWSANETWORKEVENTS,
-    PROCESS_INFORMATION, STARTUPINFO)
+    PROCESS_INFORMATION, STARTUPINFO, SYSTEM_INFO, FILE_ALLOCATION_INFO,
+    FILE_END_OF_FILE_INFO, WIN32_FIND_DATA)
 
 
 class TestSECURITY_ATTRIBUTES(TestCase):
@@ -157,3 +158,52 @@ class TestSTARTUPINFO(TestCase):
         info = STARTUPINFO()
         with self.assertRaises(TypeError):
             info.hStdError = 1
+
+
+class TestSYSTEM_INFO(TestCase):
+    """
+    Tests for :class:`pywincffi.wintypes.SYSTEM_INFO`
+    """
+    def test_attr_dwPageSize(self):
+        info = SYSTEM_INFO()
+        self.assertEqual(info.dwPageSize, 0)
+
+    def test_missing_attr(self):
+        info = SYSTEM_INFO()
+        with self.assertRaises(AttributeError):
+            info.no_such_attr = None
+
+
+class TestFILE_ALLOCATION_INFO(TestCase):
+    """
+    Tests for :class:`pywincffi.wintypes.FILE_ALLOCATION_INFO`
+    """
+    def test_attr_AllocationSize(self):
+        info = FILE_ALLOCATION_INFO()
+        info.AllocationSize = (1 << 32) + 1
+        self.assertEqual(info.AllocationSize, (1 << 32) + 1)
+
+
+class TestFILE_END_OF_FILE_INFO(TestCase):
+    """
+    Tests for :class:`pywincffi.wintypes.FILE_END_OF_FILE_INFO`
+    """
+    def test_attr_EndOfFile(self):
+        info = FILE_END_OF_FILE_INFO()
+        info.EndOfFile = (1 << 32) + 1
+        self.assertEqual(info.EndOfFile, (1 << 32) + 1)
+
+
+class TestWIN32_FIND_DATA(TestCase):
+    """
+    Tests for :class:`pywincffi.wintypes.WIN32_FIND_DATA`
+    """
+    def test_attr_cFileName(self):
+        data = WIN32_FIND_DATA()
+        self.assertEqual(data.cFileName, u"")
+
+    def test_attr_nFileSize(self):
+        data = WIN32_FIND_DATA()
+        data.nFileSizeHigh = 1
+        data.nFileSizeLow = 2
+        self.assertEqual(data.nFileSize, (1 << 32) + 2)
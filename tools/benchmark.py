@@ -0,0 +1,614 @@
+#!/usr/bin/env python
+
+"""
+Runs pywincffi's benchmarks and prints, or optionally saves, the results.
+On hosts without the compiled library pass ``--stand-in`` to run against
+:class:`pywincffi.dev.benchmark.StandInLibrary` instead.
+"""
+
+from __future__ import print_function
+
+import argparse
+import functools
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from os.path import dirname, abspath, join
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+# Add the root of the repo to sys.path so
+# we can import pywcinffi directly.
+sys.path.insert(0, ROOT)
+
+from pywincffi.core import dist
+from pywincffi.core.logger import get_logger, STREAM_HANDLER
+from pywincffi.dev.benchmark import (
+    StandInLibrary, measure, stand_in, write_results)
+from pywincffi.kernel32 import (
+    AppendLog, CloseHandle, ConnectNamedPipe, CreateFile, CreateNamedPipe,
+    CreatePipe, FlushFileBuffers, MessageReader, PeekNamedPipe, ReadFile,
+    ReadFileInto, SharedRingBuffer, WriteFile, bulk_file_attributes,
+    copyfile, pipe_bytes_available)
+
+logger = get_logger("dev.benchmark")
+logging.basicConfig(
+    level=logging.INFO,
+    handlers=[STREAM_HANDLER]
+)
+
+
+def open_log(path):
+    """Creates ``path`` and returns a handle which can write to it"""
+    _, library = dist.load()
+    return CreateFile(
+        path, library.GENERIC_WRITE,
+        dwCreationDisposition=library.CREATE_ALWAYS)
+
+
+def run_producers(producers, records, target):
+    """
+    Starts ``producers`` threads which each call ``target`` ``records``
+    times then waits for them to finish.
+    """
+    def producer():
+        for _ in range(records):
+            target()
+
+    threads = [threading.Thread(target=producer) for _ in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def appendlog(args, workspace):
+    """
+    Compares a write and flush per record against
+    :class:`pywincffi.kernel32.AppendLog`.
+    """
+    record = b"x" * (args.record_size - 1) + b"\n"
+    total = args.producers * args.records
+    results = []
+
+    def per_record(producers, records):
+        hFile = open_log(join(workspace, u"per-record.log"))
+        lock = threading.Lock()
+
+        def write():
+            with lock:
+                WriteFile(hFile, record)
+                FlushFileBuffers(hFile)
+
+        try:
+            run_producers(producers, records, write)
+        finally:
+            CloseHandle(hFile)
+
+    def group_commit(producers, records):
+        hFile = open_log(join(workspace, u"group-commit.log"))
+
+        try:
+            with AppendLog(hFile, commit_window=args.commit_window) as log:
+                run_producers(
+                    producers, records,
+                    lambda: log.append(record).result())
+                logger.info(
+                    "%d records in %d commits", log.records, log.commits)
+        finally:
+            CloseHandle(hFile)
+
+    for name, function in (("appendlog.per_record", per_record),
+                           ("appendlog.group_commit", group_commit)):
+        results.append(measure(
+            name, function, operations=total,
+            bytes_=total * args.record_size, repeat=args.repeat,
+            producers=args.producers, records=args.records))
+
+    return results
+
+
+def copy(args, workspace):
+    """
+    Compares :func:`shutil.copyfile` with :func:`pywincffi.kernel32.copyfile`
+    using overlapped I/O and using ``CopyFileEx``.
+    """
+    if isinstance(dist.load()[1], StandInLibrary):
+        logger.warning("The copy benchmark can't be run with --stand-in")
+        return []
+
+    size = args.file_size * 1048576
+    source = join(workspace, u"source.bin")
+    destination = join(workspace, u"destination.bin")
+    block = os.urandom(1048576)
+
+    with open(source, "wb") as file_:
+        for _ in range(args.file_size):
+            file_.write(block)
+
+    def overlapped(**kwargs):
+        copyfile(source, destination, **kwargs)
+
+    def copy_file_ex():
+        copyfile(source, destination, use_copy_file_ex=True)
+
+    return [
+        measure(
+            "copy.shutil", lambda: shutil.copyfile(source, destination),
+            operations=1, bytes_=size, repeat=args.repeat),
+        measure(
+            "copy.overlapped", overlapped, operations=1, bytes_=size,
+            repeat=args.repeat, chunk_size=args.chunk_size,
+            max_in_flight=args.in_flight),
+        measure(
+            "copy.copy_file_ex", copy_file_ex, operations=1, bytes_=size,
+            repeat=args.repeat)
+    ]
+
+
+def attributes(args, workspace):
+    """
+    Compares calling :func:`os.stat` for each path with
+    :func:`pywincffi.kernel32.bulk_file_attributes`.
+    """
+    paths = []
+    for index in range(args.paths):
+        path = join(workspace, u"attributes%d.bin" % index)
+        with open(path, "wb") as file_:
+            file_.write(b"x" * (index % 4096))
+        paths.append(path)
+
+    def stat():
+        for path in paths:
+            os.stat(path)
+
+    def bulk(workers):
+        bulk_file_attributes(paths, max_workers=workers)
+
+    return [
+        measure(
+            "attributes.stat", stat, operations=len(paths),
+            repeat=args.repeat),
+        measure(
+            "attributes.bulk", bulk, operations=len(paths),
+            repeat=args.repeat, workers=args.workers)
+    ]
+
+
+def read_exactly(hFile, size):
+    """Reads ``size`` bytes from the pipe ``hFile``"""
+    data = b""
+    while len(data) < size:
+        data += ReadFile(hFile, size - len(data))
+    return data
+
+
+def run_threads(send, receive, count):
+    """
+    Calls ``receive(count)`` in a new thread and ``send(count)`` in this
+    one then waits for both to finish.
+    """
+    thread = threading.Thread(target=receive, args=(count, ))
+    thread.start()
+    send(count)
+    thread.join()
+
+
+def ringbuffer(args, workspace):  # pylint: disable=unused-argument
+    """
+    Compares sending messages through pipes created by
+    :func:`pywincffi.kernel32.CreatePipe` with
+    :class:`pywincffi.kernel32.SharedRingBuffer`.  The ``stream``
+    benchmarks measure throughput, the ``ping`` benchmarks the round trip
+    latency of a single message.
+    """
+    if isinstance(dist.load()[1], StandInLibrary):
+        logger.warning("The ringbuffer benchmark can't be run with --stand-in")
+        return []
+
+    message = b"x" * args.record_size
+    name = u"Local\\pywincffi-benchmark-%d" % os.getpid()
+
+    def pipe_stream(messages):
+        reader, writer = CreatePipe()
+
+        def send(count):
+            for _ in range(count):
+                WriteFile(writer, message)
+
+        def receive(count):
+            for _ in range(count):
+                read_exactly(reader, len(message))
+
+        try:
+            run_threads(send, receive, messages)
+        finally:
+            CloseHandle(reader)
+            CloseHandle(writer)
+
+    def ring_stream(messages):
+        with SharedRingBuffer(name, capacity=args.ring_size) as writer:
+            with SharedRingBuffer(name) as reader:
+                def send(count):
+                    for _ in range(count):
+                        writer.write(message)
+
+                def receive(count):
+                    for _ in range(count):
+                        reader.read()
+                    reader.release()
+
+                run_threads(send, receive, messages)
+
+    def pipe_ping(round_trips):
+        requests, request_writer = CreatePipe()
+        responses, response_writer = CreatePipe()
+
+        def send(count):
+            for _ in range(count):
+                WriteFile(request_writer, message)
+                read_exactly(responses, len(message))
+
+        def receive(count):
+            for _ in range(count):
+                WriteFile(
+                    response_writer, read_exactly(requests, len(message)))
+
+        try:
+            run_threads(send, receive, round_trips)
+        finally:
+            for handle in (requests, request_writer, responses,
+                           response_writer):
+                CloseHandle(handle)
+
+    def ring_ping(round_trips):
+        with SharedRingBuffer(name + u"-requests",
+                              capacity=args.ring_size) as requests:
+            with SharedRingBuffer(name + u"-responses",
+                                  capacity=args.ring_size) as responses:
+                def send(count):
+                    for _ in range(count):
+                        requests.write(message)
+                        responses.read()
+                    responses.release()
+
+                def receive(count):
+                    for _ in range(count):
+                        responses.write(requests.read().tobytes())
+                    requests.release()
+
+                run_threads(send, receive, round_trips)
+
+    size = args.messages * len(message)
+    return [
+        measure(
+            "ringbuffer.pipe_stream", pipe_stream,
+            operations=args.messages, bytes_=size, repeat=args.repeat,
+            messages=args.messages),
+        measure(
+            "ringbuffer.ring_stream", ring_stream,
+            operations=args.messages, bytes_=size, repeat=args.repeat,
+            messages=args.messages),
+        measure(
+            "ringbuffer.pipe_ping", pipe_ping, operations=args.round_trips,
+            repeat=args.repeat, round_trips=args.round_trips),
+        measure(
+            "ringbuffer.ring_ping", ring_ping, operations=args.round_trips,
+            repeat=args.repeat, round_trips=args.round_trips)
+    ]
+
+
+def pipe(args, workspace):  # pylint: disable=unused-argument
+    """
+    Measures pipes created by :func:`pywincffi.kernel32.CreatePipe`: the
+    throughput for each of the ``--pipe-sizes`` buffer sizes, the round
+    trip latency, the cost of polling with ``PeekNamedPipe`` and the cost
+    of reading a named pipe in message mode instead of byte mode.  The
+    same transfers are made with :func:`multiprocessing.Pipe` for
+    comparison.
+    """
+    _, library = dist.load()
+    block = b"x" * args.pipe_chunk
+    size = args.pipe_data * 1048576
+    chunks = size // len(block)
+    message = b"x" * args.record_size
+    results = []
+
+    def throughput(nSize):
+        reader, writer = CreatePipe(nSize=nSize)
+        buffer_ = bytearray(len(block))
+
+        def send(count):
+            for _ in range(count):
+                WriteFile(writer, block)
+
+        def receive(count):
+            remaining = count * len(block)
+            while remaining:
+                remaining -= ReadFileInto(reader, buffer_)
+
+        try:
+            run_threads(send, receive, chunks)
+        finally:
+            CloseHandle(reader)
+            CloseHandle(writer)
+
+    def multiprocessing_throughput():
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        buffer_ = bytearray(len(block))
+
+        def send(count):
+            for _ in range(count):
+                writer.send_bytes(block)
+
+        def receive(count):
+            for _ in range(count):
+                reader.recv_bytes_into(buffer_)
+
+        try:
+            run_threads(send, receive, chunks)
+        finally:
+            reader.close()
+            writer.close()
+
+    def ping(round_trips):
+        requests, request_writer = CreatePipe()
+        responses, response_writer = CreatePipe()
+
+        def send(count):
+            for _ in range(count):
+                WriteFile(request_writer, message)
+                read_exactly(responses, len(message))
+
+        def receive(count):
+            for _ in range(count):
+                WriteFile(
+                    response_writer, read_exactly(requests, len(message)))
+
+        try:
+            run_threads(send, receive, round_trips)
+        finally:
+            for handle in (requests, request_writer, responses,
+                           response_writer):
+                CloseHandle(handle)
+
+    def multiprocessing_ping(round_trips):
+        client, server = multiprocessing.Pipe()
+
+        def send(count):
+            for _ in range(count):
+                client.send_bytes(message)
+                client.recv_bytes()
+
+        def receive(count):
+            for _ in range(count):
+                server.send_bytes(server.recv_bytes())
+
+        try:
+            run_threads(send, receive, round_trips)
+        finally:
+            client.close()
+            server.close()
+
+    def poll(function, polls):
+        reader, writer = CreatePipe()
+        try:
+            for _ in range(polls):
+                function(reader)
+        finally:
+            CloseHandle(reader)
+            CloseHandle(writer)
+
+    def multiprocessing_poll(polls):
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        try:
+            for _ in range(polls):
+                reader.poll(0)
+        finally:
+            reader.close()
+            writer.close()
+
+    def named_pipe_stream(message_mode, messages):
+        name = u"\\\\.\\pipe\\pywincffi-benchmark-%d" % os.getpid()
+        mode = library.PIPE_WAIT
+        if message_mode:
+            mode |= library.PIPE_TYPE_MESSAGE | library.PIPE_READMODE_MESSAGE
+
+        reader = CreateNamedPipe(
+            name, library.PIPE_ACCESS_INBOUND, mode, nMaxInstances=1)
+        writer = None
+        try:
+            writer = CreateFile(
+                name, library.GENERIC_WRITE,
+                dwCreationDisposition=library.OPEN_EXISTING)
+            ConnectNamedPipe(reader)
+
+            if message_mode:
+                read = MessageReader(
+                    reader, buffer_size=len(message)).read_message
+            else:
+                read = functools.partial(read_exactly, reader, len(message))
+
+            def send(count):
+                for _ in range(count):
+                    WriteFile(writer, message)
+
+            def receive(count):
+                for _ in range(count):
+                    read()
+
+            run_threads(send, receive, messages)
+        finally:
+            if writer is not None:
+                CloseHandle(writer)
+            CloseHandle(reader)
+
+    for nSize in args.pipe_sizes:
+        results.append(measure(
+            "pipe.throughput", throughput, operations=chunks, bytes_=size,
+            repeat=args.repeat, nSize=nSize))
+
+    results.extend([
+        measure(
+            "pipe.multiprocessing_throughput", multiprocessing_throughput,
+            operations=chunks, bytes_=size, repeat=args.repeat),
+        measure(
+            "pipe.ping", ping, operations=args.round_trips,
+            repeat=args.repeat, round_trips=args.round_trips),
+        measure(
+            "pipe.multiprocessing_ping", multiprocessing_ping,
+            operations=args.round_trips, repeat=args.repeat,
+            round_trips=args.round_trips),
+        measure(
+            "pipe.peek_named_pipe",
+            functools.partial(poll, lambda reader: PeekNamedPipe(reader, 0)),
+            operations=args.polls, repeat=args.repeat, polls=args.polls),
+        measure(
+            "pipe.bytes_available",
+            functools.partial(poll, pipe_bytes_available),
+            operations=args.polls, repeat=args.repeat, polls=args.polls),
+        measure(
+            "pipe.multiprocessing_poll", multiprocessing_poll,
+            operations=args.polls, repeat=args.repeat, polls=args.polls)
+    ])
+
+    if isinstance(library, StandInLibrary):
+        logger.warning(
+            "The pipe byte and message mode comparison can't be run with "
+            "--stand-in")
+        return results
+
+    message_bytes = args.messages * len(message)
+    results.extend([
+        measure(
+            "pipe.byte_mode", functools.partial(named_pipe_stream, False),
+            operations=args.messages, bytes_=message_bytes,
+            repeat=args.repeat, messages=args.messages),
+        measure(
+            "pipe.message_mode", functools.partial(named_pipe_stream, True),
+            operations=args.messages, bytes_=message_bytes,
+            repeat=args.repeat, messages=args.messages)
+    ])
+    return results
+
+
+BENCHMARKS = {
+    "appendlog": appendlog,
+    "attributes": attributes,
+    "copy": copy,
+    "pipe": pipe,
+    "ringbuffer": ringbuffer
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "benchmarks", nargs="*",
+        help="The benchmark(s) to run, one of %s.  Runs all benchmarks "
+             "by default." % ", ".join(sorted(BENCHMARKS)))
+    parser.add_argument(
+        "--stand-in", action="store_true",
+        help="Run against the stand-in library instead of kernel32.")
+    parser.add_argument(
+        "--output",
+        help="Write the results, as json, to this path.")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="The number of times to run each benchmark.  The fastest "
+             "run is reported.")
+    parser.add_argument(
+        "--producers", type=int, default=8,
+        help="The number of threads producing records.")
+    parser.add_argument(
+        "--records", type=int, default=250,
+        help="The number of records written by each producer.")
+    parser.add_argument(
+        "--record-size", type=int, default=128,
+        help="The size of each record in bytes.")
+    parser.add_argument(
+        "--commit-window", type=float, default=0,
+        help="The commit window, in seconds, used by AppendLog.")
+    parser.add_argument(
+        "--file-size", type=int, default=256,
+        help="The size, in MiB, of the file copied by the copy benchmark.")
+    parser.add_argument(
+        "--chunk-size", type=int, default=1048576,
+        help="The size of each read and write made by copyfile().")
+    parser.add_argument(
+        "--in-flight", type=int, default=4,
+        help="The number of chunks copyfile() keeps in flight.")
+    parser.add_argument(
+        "--paths", type=int, default=10000,
+        help="The number of files queried by the attributes benchmark.")
+    parser.add_argument(
+        "--workers", type=int, default=8,
+        help="The number of threads used by bulk_file_attributes().")
+    parser.add_argument(
+        "--messages", type=int, default=100000,
+        help="The number of --record-size messages sent by the pipe and "
+             "ringbuffer benchmarks.")
+    parser.add_argument(
+        "--round-trips", type=int, default=10000,
+        help="The number of round trips made by the pipe and ringbuffer "
+             "benchmarks.")
+    parser.add_argument(
+        "--ring-size", type=int, default=1048576,
+        help="The capacity of each SharedRingBuffer in bytes.")
+    parser.add_argument(
+        "--pipe-sizes", type=int, nargs="+", default=[4096, 65536, 1048576],
+        help="The pipe buffer sizes, in bytes, measured by the pipe "
+             "benchmark.")
+    parser.add_argument(
+        "--pipe-data", type=int, default=64,
+        help="The amount of data, in MiB, sent through each pipe by the "
+             "pipe benchmark.")
+    parser.add_argument(
+        "--pipe-chunk", type=int, default=65536,
+        help="The size of each write made by the pipe benchmark.")
+    parser.add_argument(
+        "--polls", type=int, default=100000,
+        help="The number of times the pipe benchmark polls an empty pipe.")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("Unknown benchmark %r" % name)
+
+    return args
+
+
+def run(args, workspace):
+    """Runs the requested benchmarks and returns the results"""
+    results = []
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        results.extend(BENCHMARKS[name](args, workspace))
+    return results
+
+
+def main():
+    args = parse_args()
+    workspace = tempfile.mkdtemp(prefix="pywincffi-benchmark-")
+
+    try:
+        if args.stand_in:
+            with stand_in():
+                results = run(args, workspace)
+        else:
+            results = run(args, workspace)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    for result in results:
+        print(result)
+
+    if args.output:
+        write_results(results, os.path.abspath(args.output))
+
+
+if __name__ == "__main__":
+    main()